@@ -0,0 +1,191 @@
+"""
+Vectorized declaration scoring for large evaluation sweeps.
+
+`score_declarations_batch` scores N (output, expected) pairs at once:
+every distinct string is tokenized a single time, token sets are encoded as
+sparse (row, token) coordinates and the Jaccard similarities of all cases are
+computed with NumPy set operations on those coordinates.
+
+Results are identical to `scoring.score_declaration` applied case by case.
+"""
+from itertools import chain
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scoring import DECLARATION_WEIGHTS
+from utils_scoring import normalize_text
+
+TEXT_FIELDS = ("lieu", "description")
+LIST_FIELDS = ("biens_impactes",)
+ROUNDED_FIELDS = TEXT_FIELDS + LIST_FIELDS
+
+
+class TokenEncoder:
+    """
+    Maps tokens to integer ids and memoizes the encoded token set of each
+    input, so repeated strings (expected values shared across prompt
+    variants) are only tokenized once.
+    """
+
+    def __init__(self):
+        self.vocabulary: Dict[str, int] = {}
+        self._text_cache: Dict[Any, Tuple[int, ...]] = {}
+        self._list_cache: Dict[Tuple, Tuple[int, ...]] = {}
+
+    @property
+    def size(self) -> int:
+        return len(self.vocabulary)
+
+    def _ids(self, tokens) -> Tuple[int, ...]:
+        vocab = self.vocabulary
+        return tuple([vocab.setdefault(tok, len(vocab)) for tok in tokens])
+
+    def encode_text(self, text: Optional[str]) -> Tuple[int, ...]:
+        """Token ids of utils_scoring.normalize_text(text)."""
+        ids = self._text_cache.get(text)
+        if ids is None:
+            ids = self._ids(normalize_text(text))
+            self._text_cache[text] = ids
+        return ids
+
+    def encode_list(self, items: Optional[Sequence[str]]) -> Tuple[int, ...]:
+        """Token ids of the lower-cased items (as utils_scoring.list_similarity)."""
+        key = tuple(items or ())
+        ids = self._list_cache.get(key)
+        if ids is None:
+            ids = self._ids(set(map(str.lower, key)))
+            self._list_cache[key] = ids
+        return ids
+
+
+def _to_coo(rows: List[Tuple[int, ...]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Stack per-row token ids into sparse coordinates (row index, token id)."""
+    sizes = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows))
+    row_idx = np.repeat(np.arange(len(rows), dtype=np.int64), sizes)
+    tokens = np.fromiter(chain.from_iterable(rows), dtype=np.int64, count=int(sizes.sum()))
+    return row_idx, tokens
+
+
+def batch_jaccard(a_rows: List[Tuple[int, ...]], b_rows: List[Tuple[int, ...]], vocab_size: int) -> np.ndarray:
+    """
+    Row-wise Jaccard similarity between two sparse binary token matrices.
+    Rows where either side is empty score 0.0 (same convention as utils_scoring).
+    """
+    n = len(a_rows)
+    if n != len(b_rows):
+        raise ValueError("a_rows and b_rows must have the same length")
+
+    rows_a, tok_a = _to_coo(a_rows)
+    rows_b, tok_b = _to_coo(b_rows)
+    width = max(vocab_size, 1)
+
+    # a (row, token) cell is set in both matrices <=> its flat key is in both
+    keys_a = rows_a * width + tok_a
+    keys_b = rows_b * width + tok_b
+    common = np.isin(keys_a, keys_b, assume_unique=True)
+
+    inter = np.bincount(rows_a[common], minlength=n)
+    size_a = np.bincount(rows_a, minlength=n)
+    size_b = np.bincount(rows_b, minlength=n)
+    union = size_a + size_b - inter
+
+    scores = np.zeros(n, dtype=np.float64)
+    valid = (size_a > 0) & (size_b > 0)
+    np.divide(inter, union, out=scores, where=valid)
+    return scores
+
+
+class ScoreTable:
+    """
+    Per-field declaration scores for a batch of cases.
+
+    Attributes:
+        case_ids: identifiers of the rows.
+        fields: {field: np.ndarray of raw (unrounded) scores}.
+        total: np.ndarray of raw weighted totals.
+    """
+
+    def __init__(self, case_ids: List[Hashable], fields: Dict[str, np.ndarray], total: np.ndarray):
+        self.case_ids = case_ids
+        self.fields = fields
+        self.total = total
+
+    def __len__(self) -> int:
+        return len(self.case_ids)
+
+    def case_result(self, i: int) -> Tuple[float, str]:
+        """(score, details) exactly as returned by scoring.score_declaration."""
+        details = {}
+        for field in DECLARATION_WEIGHTS:
+            value = float(self.fields[field][i])
+            details[field] = round(value, 2) if field in ROUNDED_FIELDS else value
+        return round(float(self.total[i]), 3), str(details)
+
+    def case_results(self) -> List[Tuple[float, str]]:
+        return [self.case_result(i) for i in range(len(self))]
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        """One dict per case: case_id, one column per field and the total score."""
+        records = []
+        for i, case_id in enumerate(self.case_ids):
+            record = {"case_id": case_id}
+            record.update({field: float(values[i]) for field, values in self.fields.items()})
+            record["score"] = round(float(self.total[i]), 3)
+            records.append(record)
+        return records
+
+
+def score_declarations_batch(
+    parsed_declarations: Sequence[Dict],
+    expected: Sequence[Dict],
+    case_ids: Optional[Sequence[Hashable]] = None,
+    encoder: Optional[TokenEncoder] = None,
+) -> ScoreTable:
+    """
+    Score many declaration outputs against their expectations in one pass.
+
+    Args:
+        parsed_declarations: agent outputs (same shape as score_declaration's parsed_declaration).
+        expected: expected blocks (same shape as score_declaration's expected).
+        case_ids: optional row identifiers, defaults to 0..N-1.
+        encoder: optional TokenEncoder to share the tokenization cache across batches.
+    """
+    n = len(parsed_declarations)
+    if len(expected) != n:
+        raise ValueError("parsed_declarations and expected must have the same length")
+    case_ids = list(case_ids) if case_ids is not None else list(range(n))
+    encoder = encoder or TokenEncoder()
+
+    out_extracted = [p.get("extracted", {}) for p in parsed_declarations]
+    exp_parsed = [e["parsed_declaration"] for e in expected]
+    exp_extracted = [e["extracted"] for e in exp_parsed]
+
+    fields: Dict[str, np.ndarray] = {}
+    fields["sinistre_type"] = np.array(
+        [p.get("sinistre_type") == e["sinistre_type"] for p, e in zip(parsed_declarations, exp_parsed)],
+        dtype=np.float64,
+    )
+    fields["date_sinistre"] = np.array(
+        [o.get("date_sinistre") == e.get("date_sinistre") for o, e in zip(out_extracted, exp_extracted)],
+        dtype=np.float64,
+    )
+    for field in TEXT_FIELDS:
+        fields[field] = batch_jaccard(
+            [encoder.encode_text(o.get(field, "")) for o in out_extracted],
+            [encoder.encode_text(e.get(field, "")) for e in exp_extracted],
+            encoder.size,
+        )
+    for field in LIST_FIELDS:
+        fields[field] = batch_jaccard(
+            [encoder.encode_list(o.get(field, [])) for o in out_extracted],
+            [encoder.encode_list(e.get(field, [])) for e in exp_extracted],
+            encoder.size,
+        )
+
+    # accumulate in the same order as score_declaration for bit-identical totals
+    total = np.zeros(n, dtype=np.float64)
+    for field, weight in DECLARATION_WEIGHTS.items():
+        total += fields[field] * weight
+
+    return ScoreTable(case_ids, {f: fields[f] for f in DECLARATION_WEIGHTS}, total)
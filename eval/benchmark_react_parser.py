@@ -0,0 +1,95 @@
+"""
+Microbenchmark of the ReAct output parser.
+
+Compares utils.parse_step with the previous regex-based parse_output on a
+corpus of recorded LLM outputs (JSONL, one {"output": "..."} per line; e.g.
+exported from Langfuse traces) and reports time per call and failures.
+
+Usage:
+    python eval/benchmark_react_parser.py --corpus eval/react_corpus.jsonl --repeat 2000
+"""
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+EVAL_DIR = Path(__file__).resolve().parent
+sys.path.append(str(EVAL_DIR.parent / "src"))
+
+from assurhabitat_agents.utils import parse_step
+
+
+def legacy_parse_output(output: str):
+    """parse_output as it was before parse_step (kept here for comparison)."""
+    text = output.strip()
+    m_action = re.search(r"(?mi)^Action:\s*(?P<tool>[^\n]+)", text)
+    m_args = re.search(r"(?mi)^Arguments:\s*(?P<args>[\s\S]+)$", text)
+    if m_action:
+        tool = m_action.group("tool").strip()
+        args = {}
+        if m_args:
+            raw = m_args.group("args").strip()
+            for token in ["Observation", "LLM output", "Thought", "Action"]:
+                idx = raw.find(token)
+                if idx > 0:
+                    raw = raw[:idx].strip()
+            try:
+                parsed = json.loads(raw)
+                if not isinstance(parsed, dict):
+                    raise ValueError("Arguments must be a JSON object.")
+                args = parsed
+            except Exception:
+                raise ValueError(f"Invalid JSON arguments: {raw}")
+        return ("action", tool, args)
+    m_resp = re.search(r"(?mi)^(Réponse|Answer):\s*(?P<ans>[\s\S]+)$", text)
+    if m_resp:
+        return ("answer", m_resp.group("ans").strip(), None)
+    return ("thought", text, None)
+
+
+def load_corpus(path: Path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["output"] for line in f if line.strip()]
+
+
+def parses(parse, output: str) -> bool:
+    try:
+        return not getattr(parse(output), "error", None)
+    except ValueError:
+        return False
+
+
+def bench(parse, corpus, repeat: int):
+    failures = sum(not parses(parse, output) for output in corpus)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for output in corpus:
+            try:
+                parse(output)
+            except ValueError:
+                pass
+    elapsed = time.perf_counter() - start
+    return {"us_per_call": elapsed / (repeat * len(corpus)) * 1e6, "failures": failures}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ReAct parser microbenchmark")
+    parser.add_argument("--corpus", type=Path, default=EVAL_DIR / "react_corpus.jsonl")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    well_formed = [output for output in corpus if parses(legacy_parse_output, output)]
+    print(f"{len(corpus)} recorded outputs ({len(well_formed)} well-formed), {args.repeat} repetitions")
+    for label, outputs in (("all outputs", corpus), ("well-formed only", well_formed)):
+        print(label)
+        for name, parse in (("legacy parse_output", legacy_parse_output), ("parse_step", parse_step)):
+            result = bench(parse, outputs, args.repeat)
+            print(f"  {name:>20}: {result['us_per_call']:.2f} us/call, {result['failures']} parse failures")
+    print("Every legacy failure raised and cost one more LLM call.")
+
+
+if __name__ == "__main__":
+    main()
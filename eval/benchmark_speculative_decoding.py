@@ -0,0 +1,102 @@
+"""
+Benchmark of speculative decoding on the declaration agent's prompts.
+
+For every golden case, the first ReAct prompt of the declaration agent is
+decoded greedily by Devstral alone, then with the draft model (--draft).
+Reports the latency speedup, the draft acceptance rate and the number of
+outputs that differ (0 expected: the output is the target's greedy output).
+
+Needs the GPU node (Devstral is loaded in 4 bits as in production).
+
+Usage:
+    python eval/benchmark_speculative_decoding.py --draft <hf model id> --draft-tokens 4
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+EVAL_DIR = Path(__file__).resolve().parent
+sys.path.append(str(EVAL_DIR.parent / "src"))
+
+import torch
+from transformers import AutoModelForCausalLM
+from mistral_common.protocol.instruct.messages import UserMessage
+from mistral_common.protocol.instruct.request import ChatCompletionRequest
+
+from assurhabitat_agents.agents.declaration_agent import format_prompt_declar, tool_names
+from assurhabitat_agents.model.llm_model_loading import _load_model
+from assurhabitat_agents.model.speculative_decoding import (
+    SpeculativeStats,
+    check_draft_compatible,
+    speculative_generate,
+)
+
+
+def build_prompts(dataset_path: Path):
+    with open(dataset_path, encoding="utf-8") as f:
+        cases = json.load(f)
+    for case in cases:
+        state = {
+            "question": case["input"]["user_text"],
+            "pictures": case["input"]["image_paths"],
+            "history": [],
+            "last_action": None,
+            "last_arguments": None,
+            "last_observation": None,
+            "is_complete": False,
+            "parsed_declaration": None,
+            "missing": [],
+        }
+        yield case["case_id"], format_prompt_declar(state, tool_names)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Speculative decoding benchmark")
+    parser.add_argument("--draft", required=True, help="draft model sharing Devstral's tokenizer")
+    parser.add_argument("--draft-tokens", type=int, default=4)
+    parser.add_argument("--max-new-tokens", type=int, default=256)
+    parser.add_argument("--dataset", type=Path, default=EVAL_DIR / "golden_dataset.json")
+    args = parser.parse_args()
+
+    tokenizer, model = _load_model()
+    draft = AutoModelForCausalLM.from_pretrained(args.draft, device_map="auto", torch_dtype=torch.bfloat16)
+    check_draft_compatible(model, draft)
+    eos_id = tokenizer.instruct_tokenizer.tokenizer.eos_id
+    stats = SpeculativeStats()
+
+    plain_seconds = speculative_seconds = 0.0
+    mismatches = 0
+    for case_id, prompt in build_prompts(args.dataset):
+        tokens = tokenizer.encode_chat_completion(ChatCompletionRequest(messages=[UserMessage(content=prompt)])).tokens
+        input_ids = torch.tensor([tokens]).to("cuda")
+
+        start = time.perf_counter()
+        plain = model.generate(input_ids=input_ids, max_new_tokens=args.max_new_tokens, do_sample=False)
+        plain_seconds += time.perf_counter() - start
+
+        start = time.perf_counter()
+        assisted = speculative_generate(
+            model, draft, input_ids, args.max_new_tokens, args.draft_tokens,
+            eos_token_id=eos_id, call_site=case_id, stats=stats,
+        )
+        speculative_seconds += time.perf_counter() - start
+
+        same = plain[0].tolist() == assisted[0].tolist()
+        mismatches += not same
+        report = stats.report()[case_id]
+        print(f"{case_id}: {report['new_tokens']} tokens, acceptance {report['acceptance_rate']:.0%}, "
+              f"{report['tokens_per_target_step']:.2f} tokens/target step{'' if same else ', OUTPUT DIFFERS'}")
+
+    reports = stats.report().values()
+    proposed = sum(r["proposed"] for r in reports)
+    accepted = sum(r["accepted"] for r in reports)
+    print(f"acceptance rate: {accepted / proposed if proposed else 0.0:.1%}")
+    print(f"plain: {plain_seconds:.1f}s, speculative: {speculative_seconds:.1f}s, "
+          f"speedup x{plain_seconds / speculative_seconds:.2f}")
+    print(f"outputs differing from plain greedy decoding: {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
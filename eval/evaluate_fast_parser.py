@@ -0,0 +1,100 @@
+"""
+Accuracy and LLM bypass rate of the fast declaration parser.
+
+Runs the first tier of parse_declaration (keyword classifier + regex
+extractors, no model loaded) on the golden dataset and reports:
+  - the bypass rate (declarations answered without the LLM),
+  - the classifier accuracy on every case and on the bypassed ones,
+  - the declaration score (scoring.score_declaration) of the bypassed ones.
+
+Dates without a year are resolved against --reference-date; the golden
+dataset was annotated in 2023.
+
+Usage:
+    python eval/evaluate_fast_parser.py --threshold 0.85
+"""
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+EVAL_DIR = Path(__file__).resolve().parent
+sys.path.append(str(EVAL_DIR.parent / "src"))
+
+from scoring import score_declaration
+from assurhabitat_agents.tools.declaration_fast_path import classify, fast_parse
+from assurhabitat_agents.utils import get_policy_kb
+
+
+def evaluate(cases, threshold: float, reference: date):
+    kb = get_policy_kb()
+    rows = []
+    for case in cases:
+        text = case["input"]["user_text"]
+        expected = case["expected_declaration_agent"]
+        # golden labels use aliases (e.g. degat_des_eaux)
+        expected_type = kb.resolve(expected["parsed_declaration"]["sinistre_type"])
+        scores = classify(text)["scores"]
+        predicted = max(scores, key=scores.get)
+
+        parsed = fast_parse(text, threshold, reference)
+        row = {
+            "case_id": case["case_id"],
+            "expected": expected_type,
+            "predicted": predicted,
+            "confidence": round(scores[predicted], 3),
+            "bypassed": parsed is not None,
+        }
+        if parsed is not None:
+            normalized = {"parsed_declaration": {**expected["parsed_declaration"], "sinistre_type": expected_type}}
+            row["declaration_score"], row["details"] = score_declaration(parsed, normalized)
+        rows.append(row)
+    return rows
+
+
+def summarize(rows):
+    bypassed = [r for r in rows if r["bypassed"]]
+    correct = lambda rs: sum(r["predicted"] == r["expected"] for r in rs)
+    return {
+        "cases": len(rows),
+        "bypass_rate": len(bypassed) / len(rows) if rows else 0.0,
+        "classifier_accuracy": correct(rows) / len(rows) if rows else 0.0,
+        "bypassed_accuracy": correct(bypassed) / len(bypassed) if bypassed else None,
+        "bypassed_declaration_score": (
+            sum(r["declaration_score"] for r in bypassed) / len(bypassed) if bypassed else None
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast declaration parser evaluation")
+    parser.add_argument("--dataset", type=Path, default=EVAL_DIR / "golden_dataset.json")
+    parser.add_argument("--threshold", type=float, default=0.85)
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=date(2023, 12, 31))
+    parser.add_argument("--json", action="store_true", help="print the per-case rows as JSON")
+    args = parser.parse_args()
+
+    with open(args.dataset, encoding="utf-8") as f:
+        cases = json.load(f)
+    rows = evaluate(cases, args.threshold, args.reference_date)
+
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        for r in rows:
+            tier = "fast" if r["bypassed"] else "LLM "
+            score = f"  score={r['declaration_score']}" if r["bypassed"] else ""
+            print(f"{r['case_id']:>8} [{tier}] {r['predicted']:<20} ({r['confidence']:.2f}) expected {r['expected']}{score}")
+
+    summary = summarize(rows)
+    print(f"\n{summary['cases']} cases, threshold {args.threshold}")
+    print(f"  bypass rate:                 {summary['bypass_rate']:.0%}")
+    print(f"  classifier accuracy (all):   {summary['classifier_accuracy']:.0%}")
+    if summary["bypassed_accuracy"] is not None:
+        print(f"  accuracy on bypassed cases:  {summary['bypassed_accuracy']:.0%}")
+        print(f"  declaration score (bypassed): {summary['bypassed_declaration_score']:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Offline evaluation store.
+
+Keeps the golden dataset, per-case scores and orchestrator traces in a local
+SQLite file so regression sweeps can run on nodes without Langfuse access.
+Results can be pushed to Langfuse afterwards with `sync_to_langfuse`.
+"""
+import json
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cases (
+    case_id TEXT PRIMARY KEY,
+    sinistre_family TEXT,
+    input_json TEXT NOT NULL,
+    expected_json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    metadata_json TEXT
+);
+CREATE TABLE IF NOT EXISTS scores (
+    run_id TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    sinistre_family TEXT,
+    name TEXT NOT NULL,
+    value REAL NOT NULL,
+    comment TEXT,
+    PRIMARY KEY (run_id, case_id, name)
+);
+CREATE TABLE IF NOT EXISTS traces (
+    run_id TEXT NOT NULL,
+    case_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    duration_s REAL,
+    output_json TEXT,
+    synced INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, case_id)
+);
+"""
+
+
+def load_local_dataset(path: Path) -> List[Dict[str, Any]]:
+    """
+    Read golden cases from local files.
+    Accepts a JSON file holding a list of cases, a JSONL file (one case per line)
+    or a directory containing such files.
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Dataset not found: {path}")
+
+    if path.is_dir():
+        cases: List[Dict[str, Any]] = []
+        for file in sorted(path.iterdir()):
+            if file.suffix in (".json", ".jsonl"):
+                cases.extend(load_local_dataset(file))
+        return cases
+
+    with open(path, "r", encoding="utf-8") as f:
+        if path.suffix == ".jsonl":
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data if isinstance(data, list) else [data]
+
+
+class OfflineEvalStore:
+    """
+    SQLite-backed store for offline evaluation runs.
+
+    Usage:
+        store = OfflineEvalStore("eval/offline.db")
+        store.add_cases(load_local_dataset("eval/golden_dataset.json"))
+        run_id = store.start_run({"model": "..."})
+        run_parallel_evaluation(..., sink=store.sink(run_id))
+        store.aggregate_by_family(run_id)
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # workers of the parallel runner report from several threads
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---- DATASET ----
+    def add_cases(self, cases: List[Dict[str, Any]]) -> None:
+        rows = [
+            (
+                case["case_id"],
+                case.get("sinistre_family"),
+                json.dumps(case["input"], ensure_ascii=False),
+                json.dumps({
+                    "expected_declaration_agent": case.get("expected_declaration_agent"),
+                    "expected_validation_agent": case.get("expected_validation_agent"),
+                }, ensure_ascii=False),
+            )
+            for case in cases
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO cases VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+
+    def get_cases(self) -> List[Dict[str, Any]]:
+        cases = []
+        for case_id, family, input_json, expected_json in self._conn.execute(
+            "SELECT case_id, sinistre_family, input_json, expected_json FROM cases ORDER BY case_id"
+        ):
+            case = {"case_id": case_id, "sinistre_family": family, "input": json.loads(input_json)}
+            case.update(json.loads(expected_json))
+            cases.append(case)
+        return cases
+
+    # ---- RUNS ----
+    def start_run(self, metadata: Optional[Dict[str, Any]] = None, run_id: Optional[str] = None) -> str:
+        run_id = run_id or uuid.uuid4().hex[:12]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO runs VALUES (?, ?, ?)",
+                (run_id, datetime.now(timezone.utc).isoformat(), json.dumps(metadata or {}, ensure_ascii=False)),
+            )
+            self._conn.commit()
+        return run_id
+
+    def record_case(self, run_id: str, record: Dict[str, Any], trace: Optional[Dict[str, Any]] = None) -> None:
+        """Store the scores and the trace of one evaluated case (record from parallel_evaluation)."""
+        case_id = record["case_id"]
+        family = record.get("sinistre_family")
+        details = record.get("details", {})
+        score_rows = [
+            (run_id, case_id, family, name, float(value), details.get(name))
+            for name, value in record.get("scores", {}).items()
+        ]
+        with self._lock:
+            self._conn.execute("DELETE FROM scores WHERE run_id = ? AND case_id = ?", (run_id, case_id))
+            self._conn.executemany("INSERT INTO scores VALUES (?, ?, ?, ?, ?, ?)", score_rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO traces VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (
+                    run_id,
+                    case_id,
+                    record.get("status", "ok"),
+                    record.get("error"),
+                    record.get("duration_s"),
+                    json.dumps(trace, ensure_ascii=False, default=str) if trace is not None else None,
+                ),
+            )
+            self._conn.commit()
+
+    def sink(self, run_id: str):
+        """Callable(record, trace) to plug into run_parallel_evaluation."""
+        return lambda record, trace: self.record_case(run_id, record, trace)
+
+    def get_scores(self, run_id: str) -> Dict[str, Dict[str, float]]:
+        scores: Dict[str, Dict[str, float]] = {}
+        for case_id, name, value in self._conn.execute(
+            "SELECT case_id, name, value FROM scores WHERE run_id = ? ORDER BY case_id", (run_id,)
+        ):
+            scores.setdefault(case_id, {})[name] = value
+        return scores
+
+    # ---- METRICS ----
+    def aggregate_by_family(self, run_id: str) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """
+        Aggregate metrics per sinistre_family and score name:
+            {family: {score_name: {"mean", "min", "max", "count"}}}
+        The "_all" family aggregates every case of the run.
+        """
+        query = """
+            SELECT COALESCE(sinistre_family, 'unknown'), name, AVG(value), MIN(value), MAX(value), COUNT(*)
+            FROM scores WHERE run_id = ? GROUP BY 1, 2
+            UNION ALL
+            SELECT '_all', name, AVG(value), MIN(value), MAX(value), COUNT(*)
+            FROM scores WHERE run_id = ? GROUP BY 2
+        """
+        metrics: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for family, name, mean, min_v, max_v, count in self._conn.execute(query, (run_id, run_id)):
+            metrics.setdefault(family, {})[name] = {
+                "mean": round(mean, 4),
+                "min": min_v,
+                "max": max_v,
+                "count": count,
+            }
+        return metrics
+
+    def error_rate(self, run_id: str) -> float:
+        total, errors = self._conn.execute(
+            "SELECT COUNT(*), SUM(status != 'ok') FROM traces WHERE run_id = ?", (run_id,)
+        ).fetchone()
+        return (errors or 0) / total if total else 0.0
+
+    # ---- LANGFUSE SYNC ----
+    def sync_to_langfuse(self, run_id: str, client=None, dataset_name: Optional[str] = None) -> int:
+        """
+        Push the traces and scores of a run to Langfuse (optional step, needs network
+        and credentials). Already synced cases are skipped. Returns the number of cases pushed.
+        """
+        if client is None:
+            from langfuse import Langfuse
+            client = Langfuse()
+
+        if dataset_name:
+            try:
+                client.get_dataset(dataset_name)
+            except Exception:
+                client.create_dataset(name=dataset_name, description="AssurHabitat offline evaluation")
+                for case in self.get_cases():
+                    client.create_dataset_item(
+                        dataset_name=dataset_name,
+                        input=case["input"],
+                        expected_output={
+                            "expected_declaration_agent": case["expected_declaration_agent"],
+                            "expected_validation_agent": case["expected_validation_agent"]
+                        },
+                        metadata={"case_id": case["case_id"], "sinistre_family": case["sinistre_family"]}
+                    )
+
+        pending = self._conn.execute(
+            "SELECT case_id, output_json FROM traces WHERE run_id = ? AND synced = 0 AND status = 'ok'",
+            (run_id,),
+        ).fetchall()
+
+        pushed = 0
+        for case_id, output_json in pending:
+            rows = self._conn.execute(
+                "SELECT name, value, comment FROM scores WHERE run_id = ? AND case_id = ?", (run_id, case_id)
+            ).fetchall()
+            with client.start_as_current_observation(as_type="span", name="offline_evaluation") as span:
+                span.update(
+                    output=json.loads(output_json) if output_json else None,
+                    metadata={"run_id": run_id, "case_id": case_id},
+                )
+                for name, value, comment in rows:
+                    span.score(name=f"{name}_score", value=value, data_type="NUMERIC", comment=comment)
+            with self._lock:
+                self._conn.execute(
+                    "UPDATE traces SET synced = 1 WHERE run_id = ? AND case_id = ?", (run_id, case_id)
+                )
+                self._conn.commit()
+            pushed += 1
+
+        client.flush()
+        return pushed
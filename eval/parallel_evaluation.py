@@ -0,0 +1,297 @@
+"""
+Parallel golden-dataset evaluation.
+
+Cases are fanned out over a pool of workers, each worker owning its own
+Orchestrator (and therefore its own model-server client). Every scored case
+is appended to a JSONL results file as soon as it finishes, so an interrupted
+sweep can be resumed: a case is only re-run when its fingerprint (case inputs,
+prompt sources, model version) differs from the one stored in the file.
+
+Usage:
+    cd src/
+    python ../eval/parallel_evaluation.py --workers 4 --results ../eval/results.jsonl
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+EVAL_DIR = Path(__file__).resolve().parent
+SRC_DIR = EVAL_DIR.parents[0] / "src"
+sys.path.append(str(SRC_DIR))
+sys.path.append(str(EVAL_DIR))
+
+from scoring import score_case
+
+GOLDEN_DATASET_PATH = EVAL_DIR / "golden_dataset.json"
+DEFAULT_RESULTS_PATH = EVAL_DIR / "results.jsonl"
+
+# Modules holding the prompts sent to the LLM/VLM. Any edit to them
+# invalidates previously stored scores.
+PROMPT_SOURCES = [
+    SRC_DIR / "assurhabitat_agents" / "agents",
+    SRC_DIR / "assurhabitat_agents" / "tools",
+    SRC_DIR / "assurhabitat_agents" / "config" / "tool_config.py",
+]
+
+
+# =====================================================
+# 1. Fingerprints
+# =====================================================
+def prompts_fingerprint(sources: Iterable[Path] = PROMPT_SOURCES) -> str:
+    """Hash the content of every python file holding prompts."""
+    digest = hashlib.sha256()
+    for source in sources:
+        files = sorted(source.rglob("*.py")) if source.is_dir() else [source]
+        for file in files:
+            if file.exists():
+                digest.update(file.name.encode("utf-8"))
+                digest.update(file.read_bytes())
+    return digest.hexdigest()
+
+
+def case_fingerprint(case: Dict[str, Any], prompts_fp: str, model_version: str) -> str:
+    """Hash of everything that can change the outcome of a case."""
+    payload = json.dumps(
+        {"case": case, "prompts": prompts_fp, "model": model_version},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# =====================================================
+# 2. Incremental JSONL results
+# =====================================================
+class ResultsLog:
+    """
+    Append-only JSONL file of evaluated cases.
+    When a case appears several times, the last line wins.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._tail_checked = False
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        records: Dict[str, Dict[str, Any]] = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # truncated last line of an interrupted run
+                    continue
+                records[record["case_id"]] = record
+        return records
+
+    def append(self, record: Dict[str, Any]) -> None:
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                if not self._tail_checked:
+                    # an interrupted run may have left a line without its newline:
+                    # end it so the next record starts on its own line
+                    if self._ends_mid_line():
+                        f.write("\n")
+                    self._tail_checked = True
+                f.write(line + "\n")
+                f.flush()
+
+
+    def _ends_mid_line(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return False
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
+
+
+def cases_to_run(cases: List[Dict[str, Any]], done: Dict[str, Dict[str, Any]], fingerprints: Dict[str, str]) -> List[Dict[str, Any]]:
+    """Keep the cases never evaluated, failed, or whose fingerprint changed."""
+    pending = []
+    for case in cases:
+        previous = done.get(case["case_id"])
+        if previous and previous.get("status") == "ok" and previous.get("fingerprint") == fingerprints[case["case_id"]]:
+            continue
+        pending.append(case)
+    return pending
+
+
+# =====================================================
+# 3. Workers
+# =====================================================
+def evaluate_case(case: Dict[str, Any], orchestrator) -> Dict[str, Any]:
+    """
+    Run one case through the orchestrator and score it. Never raises.
+    The orchestrator output is returned under "trace" (JSON-safe copy).
+    """
+    start = time.perf_counter()
+    record: Dict[str, Any] = {
+        "case_id": case["case_id"],
+        "sinistre_family": case.get("sinistre_family"),
+    }
+    try:
+        result = orchestrator.run(
+            user_text=case["input"]["user_text"],
+            image_paths=case["input"]["image_paths"]
+        )
+        record["trace"] = json.loads(json.dumps(result, ensure_ascii=False, default=str))
+        record.update(score_case(case, result))
+        record["status"] = "ok"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["duration_s"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+_thread_local = threading.local()
+_process_orchestrator = None
+
+
+def _evaluate_in_thread(case, orchestrator_factory):
+    # one orchestrator (model-server client) per worker thread
+    if getattr(_thread_local, "orchestrator", None) is None:
+        _thread_local.orchestrator = orchestrator_factory()
+    return evaluate_case(case, _thread_local.orchestrator)
+
+
+def _init_process_worker(orchestrator_factory):
+    global _process_orchestrator
+    _process_orchestrator = orchestrator_factory()
+
+
+def _evaluate_in_process(case):
+    return evaluate_case(case, _process_orchestrator)
+
+
+# =====================================================
+# 4. Parallel run
+# =====================================================
+def run_parallel_evaluation(
+    cases: List[Dict[str, Any]],
+    orchestrator_factory: Callable[[], Any],
+    results_path: Path = DEFAULT_RESULTS_PATH,
+    max_workers: int = 4,
+    executor: str = "thread",
+    model_version: str = "",
+    prompts_fp: Optional[str] = None,
+    sink: Optional[Callable[[Dict[str, Any], Optional[Dict[str, Any]]], None]] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Evaluate the golden cases concurrently and return {case_id: record}.
+
+    Args:
+        cases: golden cases (see golden_dataset.json).
+        orchestrator_factory: builds one Orchestrator per worker. Must be a
+            top-level (picklable) function when executor="process".
+        results_path: JSONL file used for incremental writes and resume.
+        max_workers: maximum number of cases evaluated at the same time.
+        executor: "thread" (workers share the process, talk to a model server)
+            or "process" (one model client per process).
+        model_version: identifier of the models used, part of the fingerprint.
+        prompts_fp: prompt fingerprint, computed from PROMPT_SOURCES if None.
+        sink: optional callable(record, trace) called for every evaluated case
+            (e.g. OfflineEvalStore.record_case). Traces are not written to JSONL.
+    """
+    if max_workers < 1:
+        raise ValueError("max_workers must be >= 1")
+    if executor not in ("thread", "process"):
+        raise ValueError(f"Unknown executor: {executor}")
+
+    prompts_fp = prompts_fp if prompts_fp is not None else prompts_fingerprint()
+    fingerprints = {c["case_id"]: case_fingerprint(c, prompts_fp, model_version) for c in cases}
+
+    log = ResultsLog(results_path)
+    done = log.load()
+    pending = cases_to_run(cases, done, fingerprints)
+    print(f"{len(cases) - len(pending)} case(s) up to date, {len(pending)} to evaluate.")
+
+    if executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+        submit = lambda case: pool.submit(_evaluate_in_thread, case, orchestrator_factory)
+    else:
+        pool = ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_process_worker,
+            initargs=(orchestrator_factory,),
+        )
+        submit = lambda case: pool.submit(_evaluate_in_process, case)
+
+    with pool:
+        futures = {submit(case): case for case in pending}
+        for future in as_completed(futures):
+            record = future.result()
+            trace = record.pop("trace", None)
+            record["fingerprint"] = fingerprints[record["case_id"]]
+            log.append(record)
+            if sink is not None:
+                sink(record, trace)
+            done[record["case_id"]] = record
+            print(f"[{record['status']}] {record['case_id']} ({record['duration_s']}s)")
+
+    return {c["case_id"]: done[c["case_id"]] for c in cases if c["case_id"] in done}
+
+
+def default_orchestrator_factory():
+    from assurhabitat_agents.agents.orchestrator import Orchestrator
+    from assurhabitat_agents.agents.declaration_agent import run_declar_agent
+    from assurhabitat_agents.agents.validation_agent import run_valid_agent
+    from assurhabitat_agents.agents.expertise_agent import run_expert_agent
+
+    return Orchestrator(
+        declaration_agent=run_declar_agent,
+        validation_agent=run_valid_agent,
+        expertise_agent=run_expert_agent
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parallel golden dataset evaluation")
+    parser.add_argument("--dataset", type=Path, default=GOLDEN_DATASET_PATH)
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS_PATH)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--generation-stats", type=Path, default=None,
+                        help="Save the constrained decoding counters (thread executor); merge a "
+                             "CONSTRAINED_DECODING=0 and =1 run with python -m assurhabitat_agents.model.constrained_decoding")
+    args = parser.parse_args()
+
+    from assurhabitat_agents.config.model_config import LLM_BASE_MODEL, VLM_BASE_MODEL
+
+    with open(args.dataset, "r", encoding="utf-8") as f:
+        golden_cases = json.load(f)
+
+    print("Starting parallel Golden Dataset evaluation...")
+    results = run_parallel_evaluation(
+        golden_cases,
+        default_orchestrator_factory,
+        results_path=args.results,
+        max_workers=args.workers,
+        executor=args.executor,
+        model_version=f"{LLM_BASE_MODEL}|{VLM_BASE_MODEL}",
+    )
+
+    if args.generation_stats:
+        from assurhabitat_agents.model.constrained_decoding import GENERATION_STATS
+
+        GENERATION_STATS.save(args.generation_stats)
+
+    print("\nEvaluation completed")
+    for r in results.values():
+        print(r)
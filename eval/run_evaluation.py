@@ -4,7 +4,7 @@ from pathlib import Path
 
 sys.path.append(str(Path(__file__).resolve().parents[1] / "src"))
 from assurhabitat_agents.config.langfuse_config import langfuse, observe
-from scoring import score_declaration, score_validation
+from scoring import score_case
 
 from assurhabitat_agents.agents.orchestrator import Orchestrator
 from assurhabitat_agents.agents.declaration_agent import run_declar_agent
@@ -12,47 +12,51 @@ from assurhabitat_agents.agents.validation_agent import run_valid_agent
 from assurhabitat_agents.agents.expertise_agent import run_expert_agent
 
 DATASET_NAME = "assurhabitat-golden-dataset"
+GOLDEN_DATASET_PATH = Path(__file__).resolve().parent / "golden_dataset.json"
 
 
 # =====================================================
 # 1. Load Golden Dataset
 # =====================================================
-with open("/workspace/Assurhabitat_agents/eval/golden_dataset.json", "r") as f:
-    golden_cases = json.load(f)
+def load_golden_cases(path: Path = GOLDEN_DATASET_PATH):
+    """Load the golden cases from a local JSON file (next to this script by default)."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
 
 
 # =====================================================
 # 2. Create dataset if not exists
 # =====================================================
-try:
-    langfuse.get_dataset(DATASET_NAME)
-    print(f"Dataset '{DATASET_NAME}' already exists.")
-except Exception:
-    langfuse.create_dataset(
-        name=DATASET_NAME,
-        description="Golden dataset for AssurHabitat agents evaluation",
-        metadata={
-            "domain": "insurance",
-            "agents": ["declaration", "validation", "expertise"],
-            "author": "RemiNollet"
-        }
-    )
-
-    for case in golden_cases:
-        langfuse.create_dataset_item(
-            dataset_name=DATASET_NAME,
-            input=case["input"],
-            expected_output={
-                "expected_declaration_agent": case["expected_declaration_agent"],
-                "expected_validation_agent": case["expected_validation_agent"]
-            },
+def init_langfuse_dataset(golden_cases):
+    try:
+        langfuse.get_dataset(DATASET_NAME)
+        print(f"Dataset '{DATASET_NAME}' already exists.")
+    except Exception:
+        langfuse.create_dataset(
+            name=DATASET_NAME,
+            description="Golden dataset for AssurHabitat agents evaluation",
             metadata={
-                "case_id": case["case_id"],
-                "sinistre_family": case["sinistre_family"]
+                "domain": "insurance",
+                "agents": ["declaration", "validation", "expertise"],
+                "author": "RemiNollet"
             }
         )
 
-    print("Langfuse dataset initialized.")
+        for case in golden_cases:
+            langfuse.create_dataset_item(
+                dataset_name=DATASET_NAME,
+                input=case["input"],
+                expected_output={
+                    "expected_declaration_agent": case["expected_declaration_agent"],
+                    "expected_validation_agent": case["expected_validation_agent"]
+                },
+                metadata={
+                    "case_id": case["case_id"],
+                    "sinistre_family": case["sinistre_family"]
+                }
+            )
+
+        print("Langfuse dataset initialized.")
 
 
 # =====================================================
@@ -66,17 +70,11 @@ def evaluate_case(case, orchestrator):
         image_paths=case["input"]["image_paths"]
     )
 
-    # -------- Declaration Agent --------
-    decl_score, decl_details = score_declaration(
-        parsed_declaration=result["validation"]["parsed_declaration"],
-        expected=case["expected_declaration_agent"]
-    )
-
-    # -------- Validation Agent --------
-    val_score, val_details = score_validation(
-        output=result["validation"],
-        expected=case["expected_validation_agent"]
-    )
+    scored = score_case(case, result)
+    decl_score = scored["scores"]["declaration_agent"]
+    decl_details = scored["details"]["declaration_agent"]
+    val_score = scored["scores"]["validation_agent"]
+    val_details = scored["details"]["validation_agent"]
 
     # ---- Log scores properly ----
     with langfuse.start_as_current_observation(as_type="span", name="evaluation") as span:
@@ -107,7 +105,11 @@ def evaluate_case(case, orchestrator):
 # =====================================================
 # 4. Run evaluation on all cases
 # =====================================================
-def run_evaluation(orchestrator):
+def run_evaluation(orchestrator, golden_cases=None):
+    if golden_cases is None:
+        golden_cases = load_golden_cases()
+    init_langfuse_dataset(golden_cases)
+
     results = []
 
     for case in golden_cases:
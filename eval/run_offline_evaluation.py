@@ -0,0 +1,80 @@
+"""
+Offline evaluation: no Langfuse needed during the sweep.
+
+Reads the golden dataset from local files, runs it through the parallel
+evaluator and stores scores and traces in SQLite. Langfuse sync is an optional
+separate step (`--sync`), e.g. once results are copied to a connected host.
+
+Usage:
+    cd src/
+    python ../eval/run_offline_evaluation.py --dataset ../eval/golden_dataset.json --db ../eval/offline.db
+    python ../eval/run_offline_evaluation.py --db ../eval/offline.db --sync --run-id <run_id>
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+EVAL_DIR = Path(__file__).resolve().parent
+sys.path.append(str(EVAL_DIR))
+
+from offline_store import OfflineEvalStore, load_local_dataset
+
+DATASET_NAME = "assurhabitat-golden-dataset"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline golden dataset evaluation")
+    parser.add_argument("--dataset", type=Path, default=EVAL_DIR / "golden_dataset.json")
+    parser.add_argument("--db", type=Path, default=EVAL_DIR / "offline.db")
+    parser.add_argument("--results", type=Path, default=EVAL_DIR / "results.jsonl")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--run-id", default=None)
+    parser.add_argument("--sync", action="store_true", help="Only push an existing run to Langfuse")
+    args = parser.parse_args()
+
+    store = OfflineEvalStore(args.db)
+
+    if args.sync:
+        if not args.run_id:
+            parser.error("--sync requires --run-id")
+        pushed = store.sync_to_langfuse(args.run_id, dataset_name=DATASET_NAME)
+        print(f"{pushed} case(s) synced to Langfuse.")
+        return
+
+    # Tracing disabled before any agent module is imported
+    os.environ.setdefault("LANGFUSE_OFFLINE", "1")
+    from parallel_evaluation import run_parallel_evaluation, default_orchestrator_factory
+    from assurhabitat_agents.config.model_config import LLM_BASE_MODEL, VLM_BASE_MODEL
+
+    cases = load_local_dataset(args.dataset)
+    store.add_cases(cases)
+    model_version = f"{LLM_BASE_MODEL}|{VLM_BASE_MODEL}"
+    run_id = store.start_run({"model": model_version, "dataset": str(args.dataset)}, run_id=args.run_id)
+    print(f"Offline run {run_id} on {len(cases)} case(s)")
+
+    records = run_parallel_evaluation(
+        cases,
+        default_orchestrator_factory,
+        results_path=args.results,
+        max_workers=args.workers,
+        executor=args.executor,
+        model_version=model_version,
+        sink=store.sink(run_id),
+    )
+
+    # cases reused from the results file (resume) are attached to this run too
+    stored = store.get_scores(run_id)
+    for record in records.values():
+        if record["case_id"] not in stored:
+            store.record_case(run_id, record)
+
+    print("\nMetrics per sinistre_family:")
+    print(json.dumps(store.aggregate_by_family(run_id), indent=2, ensure_ascii=False))
+    print(f"Error rate: {store.error_rate(run_id):.2%} over {len(records)} case(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,15 @@ import re
 from typing import Dict, Tuple
 from utils_scoring import text_similarity, list_similarity
 
+# Field weights of the declaration score (order matters: fields are summed in this order)
+DECLARATION_WEIGHTS = {
+    "sinistre_type": 0.25,
+    "date_sinistre": 0.15,
+    "lieu": 0.15,
+    "description": 0.20,
+    "biens_impactes": 0.25,
+}
+
 
 def score_declaration(
     parsed_declaration: Dict,
@@ -14,13 +23,7 @@ def score_declaration(
         details (dict explaining per-field scores)
     """
 
-    weights = {
-        "sinistre_type": 0.25,
-        "date_sinistre": 0.15,
-        "lieu": 0.15,
-        "description": 0.20,
-        "biens_impactes": 0.25,
-    }
+    weights = DECLARATION_WEIGHTS
 
     details = {}
     total_score = 0.0
@@ -79,4 +82,31 @@ def score_validation(output, expected):
         score = 0.5
         reasons.append("guarantee mismatch")
 
-    return score, str(reasons)
\ No newline at end of file
+    return score, str(reasons)
+
+def score_case(case: Dict, result: Dict) -> Dict:
+    """
+    Score one orchestrator result against its golden case.
+    Returns:
+        {"scores": {agent: float}, "details": {agent: str}}
+    """
+    decl_score, decl_details = score_declaration(
+        parsed_declaration=result["validation"]["parsed_declaration"],
+        expected=case["expected_declaration_agent"]
+    )
+
+    val_score, val_details = score_validation(
+        output=result["validation"],
+        expected=case["expected_validation_agent"]
+    )
+
+    return {
+        "scores": {
+            "declaration_agent": decl_score,
+            "validation_agent": val_score
+        },
+        "details": {
+            "declaration_agent": decl_details,
+            "validation_agent": val_details
+        }
+    }
@@ -16,7 +16,10 @@ from langgraph.checkpoint.memory import MemorySaver
 # sys.path.insert(0, str(Path.cwd().parent / "src")) -> for notebook only
 from assurhabitat_agents.model.llm_model_loading import llm_inference
 from assurhabitat_agents.config.tool_config import DECLARATION_TOOLS, DECLARATION_TOOLS_DESCRIPTION
-from assurhabitat_agents.utils import parse_output
+from assurhabitat_agents.config.model_config import FAST_REPLY_MERGE
+from assurhabitat_agents.tools.declaration_fast_path import REPLY_MERGE_STATS, merge_reply
+from assurhabitat_agents.tools.ask_human_tool import HumanInputRequired
+from assurhabitat_agents.utils import parse_step
 from assurhabitat_agents.config.langfuse_config import observe
 
 class DeclarationReActState(TypedDict):
@@ -30,6 +33,8 @@ class DeclarationReActState(TypedDict):
     parsed_declaration: dict | None # Stockage json de la declaration parser par le tool
     missing: list[str] | None # champs manquant dans la declarations
     answer: str | None # Final answer
+    pending_question: str | None # Question posée par AskHuman (graphe suspendu)
+    human_reply: str | None # Réponse injectée à la reprise (Orchestrator.resume)
 
 def format_prompt_declar(state: DeclarationReActState, tools) -> str:
     """
@@ -112,34 +117,37 @@ def node_thought_action_declar(state: DeclarationReActState) -> DeclarationReAct
     # It's helpful to include parsed_declaration and missing fields in the prompt so the LLM
     # can reason clearly about the next step.
     prompt = format_prompt_declar(state, tool_names)
-    output = llm_inference(prompt)
+    output = llm_inference(prompt, call_site="declaration_react")
 
-    # parse_output must return a tuple like ("action", tool_name, tool_args)
-    # or ("answer", answer_text) or ("thought", thought_text)
-    step_type, *content = parse_output(output)
+    # parse_step returns a ReActStep (kind "action" | "answer" | "thought");
+    # malformed arguments are reported in step.error instead of raising
+    step = parse_step(output)
 
     # Append the raw LLM output to history for traceability
     state.setdefault("history", [])
     state["history"].append(f"LLM output: {output}")
 
-    if step_type == "action":
-        tool_name, tool_args = content
+    if step.error:
+        # no tool call: the error goes back to the LLM through the history
+        state["history"].append(f"Parse error: {step.error}")
+    elif step.kind == "action":
+        tool_name, tool_args = step.tool, step.arguments
         # store next action and its arguments
         state["last_action"] = tool_name
         state["last_arguments"] = tool_args or {}
         # keep history friendly: record the action intention
         state["history"].append(f"Action: call tool: {tool_name} with args: {tool_args}")
-    elif step_type == "answer":
+    elif step.kind == "answer":
         # final textual answer produced by the LLM
         state["is_complete"] = True
         state["last_action"] = None
         state["last_arguments"] = None
         state["last_observation"] = None
-        state["answer"] = content[0]
-        state["history"].append(f"Answer: {content[0]}")
+        state["answer"] = step.text
+        state["history"].append(f"Answer: {step.text}")
     else:
         # Thought only: no action requested, we keep loop running
-        state["history"].append(f"Thought: {content[0] if content else ''}")
+        state["history"].append(f"Thought: {step.text}")
     return state
 
 @observe(name="declaration_action_step")
@@ -150,6 +158,9 @@ def node_tool_execution_declar(state: DeclarationReActState) -> DeclarationReAct
       - state['parsed_declaration']
       - state['is_complete'], state['missing'] via verify_completeness(parsed_declaration)
     Behavior for ask_human:
+      - Without state['human_reply'], AskHuman suspends the graph: the question
+        goes to state['pending_question'] and the graph ends (see Orchestrator.resume).
+      - With it (resumed claim), the reply is the observation.
       - If parse_declaration tool exists, we call it with a combined raw input that
         contains the old parsed JSON and the new human reply so the LLM can merge them.
       - Otherwise, a simple heuristic fills the first missing field with the reply.
@@ -163,15 +174,25 @@ def node_tool_execution_declar(state: DeclarationReActState) -> DeclarationReAct
         return state
 
     # call the tool if available
-    if tool_name in tools:
+    if tool_name == "AskHuman" and state.get("human_reply") is not None:
+        # resumed claim: the reply replaces the AskHuman call
+        observation = state["human_reply"]
+        state["human_reply"] = None
+    elif tool_name in tools:
         try:
             observation = tools[tool_name](**tool_args)
+        except HumanInputRequired as e:
+            # suspend: last_action is kept so the resumed graph re-enters this node
+            state["pending_question"] = e.question
+            state.setdefault("history", []).append(f"Waiting for human: {e.question}")
+            return state
         except Exception as e:
             observation = f"Error during tool {tool_name}: {e}"
     else:
         observation = f"Error: Unknown tool {tool_name}"
 
     # store observation and history
+    state["pending_question"] = None
     state["last_observation"] = str(observation)
     state.setdefault("history", []).append(f"Observation from {tool_name}: {state['last_observation']}")
 
@@ -207,9 +228,29 @@ def node_tool_execution_declar(state: DeclarationReActState) -> DeclarationReAct
         human_reply = observation if isinstance(observation, str) else str(observation)
         state["history"].append(f"Human replied: {human_reply}")
 
-        # If parse_declaration tool exists, call it with merged input:
+        # First try the typed extractors on the missing fields (no LLM call)
+        merged = None
+        if FAST_REPLY_MERGE and isinstance(state.get("parsed_declaration"), dict) and state.get("missing"):
+            merged = merge_reply(state["parsed_declaration"], state["missing"], human_reply)
+            REPLY_MERGE_STATS.record(bypassed=merged is not None)
+
+        if merged is not None:
+            state["parsed_declaration"] = merged
+            state["history"].append(f"Merged human reply into {state['missing']} (extractors).")
+
+            if "InformationVerification" in tools:
+                try:
+                    verify_res = tools["InformationVerification"](state["parsed_declaration"])
+                    if isinstance(verify_res, dict):
+                        state["is_complete"] = bool(verify_res.get("is_complete", False))
+                        state["missing"] = verify_res.get("missing", [])
+                        state["history"].append(f"Auto-verify after human reply: {verify_res}")
+                except Exception as e:
+                    state["history"].append(f"Auto-verify failed after human reply: {e}")
+
+        # Otherwise, if parse_declaration tool exists, call it with merged input:
         # Build combined raw input: include previous parsed_declaration JSON and the new human reply.
-        if "DeclarationParser" in tools and isinstance(state.get("parsed_declaration"), dict):
+        elif "DeclarationParser" in tools and isinstance(state.get("parsed_declaration"), dict):
             # Convert previous parsed_declaration to compact JSON and instruct the LLM to merge
             prev_json = json.dumps(state["parsed_declaration"], ensure_ascii=False)
             missing = state.get("missing", [])
@@ -342,7 +383,19 @@ def build_graph_declar():
     graph_builder.add_node("thought", node_thought_action_declar)
     graph_builder.add_node("action", node_tool_execution_declar)
 
-    graph_builder.add_edge(START, "thought")
+    def decide_from_start(runtime_state: DeclarationReActState):
+        # a resumed claim continues with the AskHuman call it was suspended on
+        if runtime_state.get("human_reply") is not None and runtime_state.get("last_action"):
+            return "action"
+        return "thought"
+
+    def decide_from_action(runtime_state: DeclarationReActState):
+        # AskHuman suspended the graph: stop until the reply is injected
+        if runtime_state.get("pending_question"):
+            return END
+        return "thought"
+
+    graph_builder.add_conditional_edges(START, decide_from_start)
 
     def decide_from_thought(runtime_state: DeclarationReActState):
         # Stop if done
@@ -355,7 +408,7 @@ def build_graph_declar():
         return "thought"
 
     graph_builder.add_conditional_edges("thought", decide_from_thought)
-    graph_builder.add_edge("action", "thought")
+    graph_builder.add_conditional_edges("action", decide_from_action)
 
     # Compile the graph
     graph = graph_builder.compile(checkpointer=checkpointer)
@@ -371,20 +424,21 @@ def run_declar_agent(initial_state, max_steps=30):
         step += 1
         print(f"Step {step} ##########:\n {event}")
 
-        # Stop condition
-        if event.get('thought'):
-            if event['thought'].get("answer"):
-                final_state = event['thought']
-                break
-
         if event.get('thought'):
             final_state = event['thought']
+        elif event.get('action'):
+            final_state = event['action']
+
+        # Stop condition: final answer, or suspended on AskHuman
+        if final_state and (final_state.get("answer") or final_state.get("pending_question")):
+            break
 
         if step >= max_steps:
             break
 
     print("\n--- FINAL STATE ---")
     print("is_complete:", final_state.get("is_complete"))
+    print("pending_question:", final_state.get("pending_question"))
     print("parsed_declaration:", final_state.get("parsed_declaration"))
     print("missing:", final_state.get("missing"))
     print("answer:", final_state.get("answer"))
@@ -14,7 +14,8 @@ from langgraph.checkpoint.memory import MemorySaver
 
 from assurhabitat_agents.model.llm_model_loading import llm_inference
 from assurhabitat_agents.config.tool_config import EXPERTISE_TOOLS, EXPERTISE_TOOLS_DESCRIPTION
-from assurhabitat_agents.utils import parse_output
+from assurhabitat_agents.tools.ask_human_tool import HumanInputRequired
+from assurhabitat_agents.utils import parse_step
 from assurhabitat_agents.config.langfuse_config import observe
 
 class ExpertiseReActState(TypedDict):
@@ -34,6 +35,10 @@ class ExpertiseReActState(TypedDict):
     # final output
     report: str | None
 
+    # AskHuman suspension (see Orchestrator.resume)
+    pending_question: str | None
+    human_reply: str | None
+
 def format_prompt_expert(state: ExpertiseReActState, tools) -> str:
     
     HISTORY_KEEP = 10
@@ -122,18 +127,21 @@ tool_names = list(EXPERTISE_TOOLS.keys())
 def node_thought_action_expert(state: ExpertiseReActState) -> ExpertiseReActState:
 
     prompt = format_prompt_expert(state, tool_names)
-    output = llm_inference(prompt)
+    output = llm_inference(prompt, call_site="expertise_react")
 
-    # parse_output must return a tuple like ("action", tool_name, tool_args)
-    # or ("answer", answer_text) or ("thought", thought_text)
-    step_type, *content = parse_output(output)
+    # parse_step returns a ReActStep (kind "action" | "answer" | "thought");
+    # malformed arguments are reported in step.error instead of raising
+    step = parse_step(output)
 
     # Append the raw LLM output to history for traceability
     state.setdefault("history", [])
     state["history"].append(f"LLM output: {output}")
 
-    if step_type == "action":
-        tool_name, tool_args = content
+    if step.error:
+        # no tool call: the error goes back to the LLM through the history
+        state["history"].append(f"Parse error: {step.error}")
+    elif step.kind == "action":
+        tool_name, tool_args = step.tool, step.arguments
         # store next action and its arguments
         if tool_name == "CostEstimation":
             tool_args = tool_args or {}
@@ -143,16 +151,16 @@ def node_thought_action_expert(state: ExpertiseReActState) -> ExpertiseReActStat
         state["last_arguments"] = tool_args or {}
         # keep history friendly: record the action intention
         state["history"].append(f"Action: call tool: {tool_name} with args: {tool_args}")
-    elif step_type == "answer":
+    elif step.kind == "answer":
         # final textual answer produced by the LLM
         state["last_action"] = None
         state["last_arguments"] = None
         state["last_observation"] = None
-        state["report"] = content[0]
-        state["history"].append(f"Answer: {content[0]}")
+        state["report"] = step.text
+        state["history"].append(f"Answer: {step.text}")
     else:
         # Thought only: no action requested, we keep loop running
-        state["history"].append(f"Thought: {content[0] if content else ''}")
+        state["history"].append(f"Thought: {step.text}")
     return state
 
 @observe(name="expertise_action_step")
@@ -161,6 +169,8 @@ def node_tool_execution_expert(state: ExpertiseReActState) -> ExpertiseReActStat
     Execute the tool stored in state['last_action'] with state['last_arguments'].
     Update state['last_observation'], state['history'], and structured fields:
       - state['estimation']
+    AskHuman suspends the graph (state['pending_question']) unless the claim
+    was resumed with state['human_reply'].
     """
     tool_name = state.get("last_action")
     tool_args = state.get("last_arguments") or {}
@@ -171,15 +181,25 @@ def node_tool_execution_expert(state: ExpertiseReActState) -> ExpertiseReActStat
         return state
 
     # call the tool if available
-    if tool_name in tools:
+    if tool_name == "AskHuman" and state.get("human_reply") is not None:
+        # resumed claim: the reply replaces the AskHuman call
+        observation = state["human_reply"]
+        state["human_reply"] = None
+    elif tool_name in tools:
         try:
             observation = tools[tool_name](**tool_args)
+        except HumanInputRequired as e:
+            # suspend: last_action is kept so the resumed graph re-enters this node
+            state["pending_question"] = e.question
+            state.setdefault("history", []).append(f"Waiting for human: {e.question}")
+            return state
         except Exception as e:
             observation = f"Error during tool {tool_name}: {e}"
     else:
         observation = f"Error: Unknown tool {tool_name}"
 
     # store observation and history
+    state["pending_question"] = None
     state["last_observation"] = str(observation)
     state.setdefault("history", []).append(f"Observation from {tool_name}: {state['last_observation']}")
 
@@ -203,7 +223,19 @@ def build_graph_expert():
     graph_builder.add_node("thought", node_thought_action_expert)
     graph_builder.add_node("action", node_tool_execution_expert)
 
-    graph_builder.add_edge(START, "thought")
+    def decide_from_start(runtime_state: ExpertiseReActState):
+        # a resumed claim continues with the AskHuman call it was suspended on
+        if runtime_state.get("human_reply") is not None and runtime_state.get("last_action"):
+            return "action"
+        return "thought"
+
+    def decide_from_action(runtime_state: ExpertiseReActState):
+        # AskHuman suspended the graph: stop until the reply is injected
+        if runtime_state.get("pending_question"):
+            return END
+        return "thought"
+
+    graph_builder.add_conditional_edges(START, decide_from_start)
 
     def decide_from_thought(runtime_state: ExpertiseReActState):
         # Stop when the report is available
@@ -218,7 +250,7 @@ def build_graph_expert():
         return "thought"
 
     graph_builder.add_conditional_edges("thought", decide_from_thought)
-    graph_builder.add_edge("action", "thought")
+    graph_builder.add_conditional_edges("action", decide_from_action)
 
     # Compile the graph
     graph = graph_builder.compile(checkpointer=checkpointer)
@@ -244,6 +276,8 @@ def run_expert_agent(initial_state: ExpertiseReActState, max_steps: int = 30):
 
         if event.get('thought'):
             state = event['thought']
+        elif event.get('action'):
+            state = event['action']
 
         # Stop conditions
         if event.get('thought'):
@@ -251,6 +285,9 @@ def run_expert_agent(initial_state: ExpertiseReActState, max_steps: int = 30):
                 state = event['thought']
                 print("\nFinal answer produced.\n")
                 break
+        if state.get("pending_question"):
+            print("\nWaiting for human reply.\n")
+            break
 
     # ---- FINAL STATE ----
     print("--- FINAL STATE ---")
@@ -1,56 +1,194 @@
+import uuid
+
 from assurhabitat_agents.config.langfuse_config import observe
+from assurhabitat_agents.runtime.cpu_tasks import discard_prefetched_images, prefetch_images, render_claim_report
+from assurhabitat_agents.utils import policy_snapshot
+from assurhabitat_agents.contract_store import pin_policy_id
+from assurhabitat_agents.pending_claims import PendingClaimStore
 
 class Orchestrator:
-    def __init__(self, declaration_agent, validation_agent, expertise_agent):
+    def __init__(self, declaration_agent, validation_agent, expertise_agent, cpu_pool=None, pending_store=None,
+                 image_executor=None):
         self.declaration_agent = declaration_agent
         self.validation_agent = validation_agent
         self.expertise_agent = expertise_agent
-        
+        # Optional CpuTaskPool: image decoding and report rendering run in worker processes
+        self.cpu_pool = cpu_pool
+        # Claims suspended on AskHuman (in memory unless a persistent store is given)
+        self.pending_store = pending_store or PendingClaimStore()
+        # Optional thread pool: the VLM analysis of the photos starts during the
+        # declaration stage and CheckConformity reuses it
+        self.image_executor = image_executor
+
+    def start_image_analysis(self, image_paths):
+        """Start the speculative VLM analysis of the photos (no-op without image_executor)."""
+        if self.image_executor is None or not image_paths:
+            return
+        # imported here: loads the VLM stack
+        from assurhabitat_agents.tools.check_conformity_tool import start_image_analysis
+
+        start_image_analysis(self.image_executor, image_paths)
+
+    def discard_image_analysis(self, image_paths):
+        """Drop the speculative analysis a finished claim did not consume."""
+        if self.image_executor is None or not image_paths:
+            return
+        from assurhabitat_agents.tools.check_conformity_tool import discard_image_analysis
+
+        discard_image_analysis(image_paths)
+
+    def pool_metrics(self):
+        """Utilization metrics of the CPU pool (None when running single-threaded)."""
+        return self.cpu_pool.metrics() if self.cpu_pool is not None else None
+
     @observe(name="orchestration")
-    def run(self, user_text, image_paths=None):
+    def run(self, user_text, image_paths=None, on_event=None, policy_id=None):
+        """
+        Process one claim end to end.
+        on_event: optional callable(dict) notified when each agent starts and ends
+        (used by the HTTP service to stream progress).
+        policy_id: contract of the policyholder; guarantee lookups use its terms.
+
+        When an agent asks the policyholder a question (AskHuman), the claim is
+        suspended: its state is saved in pending_store and the result is
+        {"status": "waiting_for_human", "claim_id", "stage", "question"};
+        continue it with resume(claim_id, reply).
+        """
         image_paths = image_paths or []
+        notify = on_event or (lambda event: None)
+        if self.cpu_pool is not None:
+            # decode photos while the declaration agent talks to the LLM
+            prefetch_images(self.cpu_pool, image_paths)
+        self.start_image_analysis(image_paths)
+
+        claim = {
+            "claim_id": uuid.uuid4().hex,
+            "user_text": user_text,
+            "image_paths": image_paths,
+            "policy_id": policy_id,
+        }
+        return self._process(claim, notify)
+
+    @observe(name="orchestration_resume")
+    def resume(self, claim_id, reply, on_event=None):
+        """
+        Continue a claim suspended on AskHuman: the reply becomes the observation
+        of the AskHuman call and the agent graph restarts from its `action` node.
+        Raises KeyError if no claim is waiting under this id.
+        """
+        record = self.pending_store.get(claim_id)
+        if record is None:
+            raise KeyError(f"No claim waiting for a human reply: {claim_id}")
+        if self.cpu_pool is not None:
+            prefetch_images(self.cpu_pool, record["claim"]["image_paths"])
+        if record["stage"] == "declaration":
+            self.start_image_analysis(record["claim"]["image_paths"])
+        state = record["state"]
+        state["human_reply"] = reply
+        state["pending_question"] = None
+        return self._process(record["claim"], on_event or (lambda event: None), resume=(record["stage"], state))
 
+    def _process(self, claim, notify, resume=None):
+        # the claim keeps the policy snapshot it started with, even if the YAML
+        # files are reloaded meanwhile: the version is saved with a suspended
+        # claim and pinned again on resume
+        with policy_snapshot(claim.get("policy_version")) as kb, pin_policy_id(claim["policy_id"]):
+            claim["policy_version"] = kb.version
+            result = self._run_agents(claim, notify, resume)
+        return self.finalize(claim, result, kb)
+
+    def finalize(self, claim, result, kb):
+        """Tag the final result of a claim and render its report."""
+        if result["status"] != "waiting_for_human":
+            self.release(claim)
+        result["claim_id"] = claim["claim_id"]
+        result["policy_version"] = kb.version
+        result["policy_id"] = claim["policy_id"]
+
+        if self.cpu_pool is not None:
+            result["report_markdown"] = self.cpu_pool.run(render_claim_report, result)
+        return result
+
+    def release(self, claim):
+        """Drop what a finished (or failed) claim holds: pending entry, image analysis, decoded photos."""
+        self.pending_store.delete(claim["claim_id"])
+        self.discard_image_analysis(claim["image_paths"])
+        discard_prefetched_images(claim["image_paths"])
+
+    def _suspend(self, claim, stage, state, notify):
+        question = state["pending_question"]
+        self.pending_store.save(claim["claim_id"], stage, question, state, claim)
+        notify({"stage": stage, "status": "waiting_for_human", "question": question})
+        return {"status": "waiting_for_human", "stage": stage, "question": question}
+
+    def _run_agents(self, claim, notify, resume=None):
+        resume_stage, resume_state = resume or (None, None)
+
+        if resume_stage == "expertise":
+            # declaration and validation were done before the suspension
+            return self.stage_expertise(claim, notify, resume_state)
+
+        result = self.stage_declaration(claim, notify, resume_state)
+        if result is None:
+            result = self.stage_validation(claim, notify)
+        if result is None:
+            result = self.stage_expertise(claim, notify)
+        return result
+
+    # ---- STAGES ----
+    # Each stage returns the final result of the claim when it stops there
+    # (suspended, rejected...), else None after storing its output in the claim.
+    # runtime.pipeline.ClaimPipeline runs them on separate workers.
+    def stage_declaration(self, claim, notify, resume_state=None):
         print("\n=== STEP 1 : DECLARATION AGENT ===")
-        declar_state = self.run_declaration_agent(user_text, image_paths)
+        notify({"stage": "declaration", "status": "resumed" if resume_state else "started"})
+        declar_state = self.run_declaration_agent(claim["user_text"], claim["image_paths"], resume_state)
+        if declar_state.get("pending_question"):
+            return self._suspend(claim, "declaration", declar_state, notify)
         parsed = declar_state.get("parsed_declaration", None)
+        notify({"stage": "declaration", "status": "done", "parsed_declaration": parsed})
         if parsed is None:
             return {"status": "error", "message": "Impossible de comprendre la déclaration.", "validation": "Error"}
+        claim["parsed_declaration"] = parsed
+        return None
 
+    def stage_validation(self, claim, notify):
         print("\n=== STEP 2 : VALIDATION AGENT ===")
-        valid_state = self.run_validation_agent(parsed, image_paths)
-
-        if valid_state.get("image_conformity"):
-            if valid_state.get("image_conformity")['compatible'] is False:
-                return {
-                    "status": "rejected",
-                    "reason": "Les photos ne correspondent pas au sinistre déclaré.",
-                    "details": valid_state,
-                    "validation": "Error"
-                }
-
-        if valid_state.get("is_garanteed"):
-            if valid_state.get("is_garanteed")['match'] is False:
-                return {
-                    "status": "not_covered",
-                    "reason": "Le sinistre n'est pas couvert par le contrat.",
-                    "details": valid_state,
-                    "validation": "Error"
-                }
+        notify({"stage": "validation", "status": "started"})
+        valid_state = self.run_validation_agent(claim["parsed_declaration"], claim["image_paths"])
+        notify({
+            "stage": "validation",
+            "status": "done",
+            "image_conformity": valid_state.get("image_conformity"),
+            "guarantee_report": valid_state.get("guarantee_report"),
+        })
+        claim["validation"] = valid_state
+
+        # the validation graph stops on the first rejection (validation_agent.check_rejection)
+        rejection = valid_state.get("rejection")
+        if rejection:
+            return {**rejection, "details": valid_state, "validation": "Error"}
+        return None
 
+    def stage_expertise(self, claim, notify, resume_state=None):
         print("\n=== STEP 3 : EXPERTISE AGENT ===")
-        expertise = self.run_expertise_agent(parsed, image_paths)
+        notify({"stage": "expertise", "status": "resumed" if resume_state else "started"})
+        expertise = self.run_expertise_agent(claim["parsed_declaration"], claim["image_paths"], resume_state)
+        if expertise.get("pending_question"):
+            return self._suspend(claim, "expertise", expertise, notify)
+        notify({"stage": "expertise", "status": "done", "estimation": expertise.get("estimation")})
 
         return {
             "status": "completed",
             "expertise_report": expertise["report"],
             "estimation": expertise["estimation"],
-            "validation": valid_state,
+            "validation": claim["validation"],
         }
 
     # ---- RUN AGENTS ----
     @observe(name="run_declaration_agent")  
-    def run_declaration_agent(self, user_text, image_paths):
-        initial_state = {
+    def run_declaration_agent(self, user_text, image_paths, resume_state=None):
+        initial_state = resume_state or {
             "question": user_text,
             "pictures": image_paths,
             "history": [],
@@ -59,7 +197,9 @@ class Orchestrator:
             "last_observation": None,
             "is_complete": False,
             "parsed_declaration": None,
-            "missing": []
+            "missing": [],
+            "pending_question": None,
+            "human_reply": None,
         }
         final = self.declaration_agent(initial_state)
         print(f"--------Final return of run_declaration_agent: ----------\n {final}")
@@ -75,15 +215,16 @@ class Orchestrator:
             "last_observation": None,
             "parsed_declaration": parsed_decl,
             "image_conformity": None,
-            "guarantee_report": None
+            "guarantee_report": None,
+            "rejection": None,
         }
         final = self.validation_agent(initial_state)
         print(f"--------Final return of run_validation_agent: ----------\n {final}")
         return final
 
     @observe(name="run_validation_agent")  
-    def run_expertise_agent(self, parsed_decl, images):
-        initial_state = {
+    def run_expertise_agent(self, parsed_decl, images, resume_state=None):
+        initial_state = resume_state or {
             "image_paths": images,
             "history": [],
             "last_action": None,
@@ -92,7 +233,9 @@ class Orchestrator:
             "parsed_declaration": parsed_decl,
             "estimation": None,
             "report": None,
-            "images_validated": True
+            "images_validated": True,
+            "pending_question": None,
+            "human_reply": None,
         }
         final = self.expertise_agent(initial_state)
         print(f"--------Final return of run_expertise_agent: ----------\n {final}")
@@ -14,12 +14,19 @@ from langgraph.checkpoint.memory import MemorySaver
 
 from assurhabitat_agents.model.llm_model_loading import llm_inference
 from assurhabitat_agents.config.tool_config import VALIDATION_TOOLS, VALIDATION_TOOLS_DESCRIPTION
-from assurhabitat_agents.utils import parse_output
+from assurhabitat_agents.utils import parse_step
 from assurhabitat_agents.config.langfuse_config import observe
 
 tools = VALIDATION_TOOLS
 tool_names = list(VALIDATION_TOOLS.keys())
 
+# damage types detected by CheckConformity that are compatible with each sinistre type
+COMPATIBILITY_RULES = {
+    "incendie_explosion": {"fire", "soot", "smoke"},
+    "degats_des_eaux": {"water", "mold"},
+    "vol_vandalisme": {"impact", "theft_signs", "vandalism"},
+}
+
 class ValidationReActState(TypedDict):
     images_path: list[str]
     history: list[str]  # L'historique des échanges (Thought, Action, Observation)
@@ -31,8 +38,9 @@ class ValidationReActState(TypedDict):
 
     # results from tools
     image_conformity: dict | None       # {"match": bool, "raw_output": str}
-    guarantee_report: dict | None       # {"is_garanteed": bool, "guarantee": {...}}
+    guarantee_report: dict | None       # {"guaranteed": bool | None, "description": str, ...}
     answer: str | None  # Finale answer
+    rejection: dict | None  # Rejet structuré : le graphe s'arrête dès qu'un outil l'établit
 
 def format_prompt_valid(state: ValidationReActState, tools) -> str:
     
@@ -99,35 +107,62 @@ def format_prompt_valid(state: ValidationReActState, tools) -> str:
 def node_thought_action_valid(state: ValidationReActState) -> ValidationReActState:
 
     prompt = format_prompt_valid(state, tool_names)
-    output = llm_inference(prompt)
+    output = llm_inference(prompt, call_site="validation_react")
 
-    # parse_output must return a tuple like ("action", tool_name, tool_args)
-    # or ("answer", answer_text) or ("thought", thought_text)
-    step_type, *content = parse_output(output)
+    # parse_step returns a ReActStep (kind "action" | "answer" | "thought");
+    # malformed arguments are reported in step.error instead of raising
+    step = parse_step(output)
 
     # Append the raw LLM output to history for traceability
     state.setdefault("history", [])
     state["history"].append(f"LLM output: {output}")
 
-    if step_type == "action":
-        tool_name, tool_args = content
+    if step.error:
+        # no tool call: the error goes back to the LLM through the history
+        state["history"].append(f"Parse error: {step.error}")
+    elif step.kind == "action":
+        tool_name, tool_args = step.tool, step.arguments
         # store next action and its arguments
         state["last_action"] = tool_name
         state["last_arguments"] = tool_args or {}
         # keep history friendly: record the action intention
         state["history"].append(f"Action: call tool: {tool_name} with args: {tool_args}")
-    elif step_type == "answer":
+    elif step.kind == "answer":
         # final textual answer produced by the LLM
         state["last_action"] = None
         state["last_arguments"] = None
         state["last_observation"] = None
-        state["history"].append(f"Answer: {content[0]}")
-        state["answer"] = content[0]
+        state["history"].append(f"Answer: {step.text}")
+        state["answer"] = step.text
     else:
         # Thought only: no action requested, we keep loop running
-        state["history"].append(f"Thought: {content[0] if content else ''}")
+        state["history"].append(f"Thought: {step.text}")
     return state
 
+def check_rejection(state: ValidationReActState) -> dict | None:
+    """
+    Structured rejection once a tool result rules the claim out, else None:
+    incompatible photos ("rejected") or a guarantee that does not cover the
+    sinistre ("not_covered"). An undetermined guarantee (None) is not a rejection.
+    """
+    conformity = state.get("image_conformity") or {}
+    if conformity.get("compatible") is False:
+        return {
+            "status": "rejected",
+            "reason": "Les photos ne correspondent pas au sinistre déclaré.",
+            "criterion": "image_conformity",
+            "detected_damage_types": conformity.get("detected_damage_types", []),
+        }
+    guarantee = state.get("guarantee_report") or {}
+    if guarantee.get("guaranteed") is False:
+        return {
+            "status": "not_covered",
+            "reason": "Le sinistre n'est pas couvert par le contrat.",
+            "criterion": "guarantee",
+            "description": guarantee.get("description"),
+        }
+    return None
+
 @observe(name="validation_action_step")
 def node_tool_execution_valid(state: ValidationReActState) -> ValidationReActState:
     """
@@ -135,6 +170,7 @@ def node_tool_execution_valid(state: ValidationReActState) -> ValidationReActSta
     Update state['last_observation'], state['history'], and structured fields:
       - state['image_conformity']
       - state['guarantee_report']
+      - state['rejection'] (and state['answer']) when the result rules the claim out
     """
     tool_name = state.get("last_action")
     tool_args = state.get("last_arguments") or {}
@@ -163,13 +199,7 @@ def node_tool_execution_valid(state: ValidationReActState) -> ValidationReActSta
 
             sinistre = state["parsed_declaration"]["sinistre_type"]
             detected = observation.get("detected_damage_types", [])
-        
-            COMPATIBILITY_RULES = {
-                "incendie_explosion": {"fire", "soot", "smoke"},
-                "degats_des_eaux": {"water", "mold"},
-                "vol_vandalisme": {"impact", "theft_signs", "vandalism"},
-            }
-        
+
             state["image_conformity"]["compatible"] = bool(
                 set(detected) & COMPATIBILITY_RULES.get(sinistre, set())
             )
@@ -193,6 +223,13 @@ def node_tool_execution_valid(state: ValidationReActState) -> ValidationReActSta
                 }
             state["history"].append("CheckGuarantee failed.")
 
+    # ---------- Early exit: no more LLM steps for a claim already ruled out ----------
+    rejection = check_rejection(state)
+    if rejection:
+        state["rejection"] = rejection
+        state["answer"] = rejection["reason"]
+        state["history"].append(f"Early exit: {rejection['status']} ({rejection['criterion']})")
+
     # reset action so next Thought node computes next step
     state["last_action"] = None
     state["last_arguments"] = None
@@ -221,8 +258,14 @@ def build_graph_valid():
         # Otherwise → continue thinking
         return "thought"
 
+    def decide_from_action(runtime_state: ValidationReActState):
+        # A tool result rejected the claim → stop without another Thought
+        if runtime_state.get("rejection"):
+            return END
+        return "thought"
+
     graph_builder.add_conditional_edges("thought", decide_from_thought)
-    graph_builder.add_edge("action", "thought")
+    graph_builder.add_conditional_edges("action", decide_from_action)
 
     # Compile graph
     graph = graph_builder.compile(checkpointer=checkpointer)
@@ -249,6 +292,8 @@ def run_valid_agent(initial_state: ValidationReActState, max_steps: int = 30):
 
         if event.get('thought'):
             state = event['thought']
+        elif event.get('action'):
+            state = event['action']
 
         # Stop conditions
         if event.get('thought'):
@@ -256,6 +301,9 @@ def run_valid_agent(initial_state: ValidationReActState, max_steps: int = 30):
                 state = event['thought']
                 print("\nFinal answer produced.\n")
                 break
+        if state.get("rejection"):
+            print(f"\nClaim rejected early: {state['rejection']['status']}.\n")
+            break
 
     # ---- FINAL STATE ----
     print("--- FINAL STATE ---")
@@ -1,26 +1,41 @@
 import os
 from dotenv import load_dotenv
-from langfuse import observe, Langfuse
 
 load_dotenv()
 
+# Offline mode (isolated evaluation nodes): no Langfuse client, @observe is a no-op.
+LANGFUSE_OFFLINE = os.getenv("LANGFUSE_OFFLINE", "").strip().lower() in ("1", "true", "yes")
+
 LANGFUSE_PUBLIC_KEY = os.getenv("LANGFUSE_PUBLIC_KEY")
 LANGFUSE_SECRET_KEY = os.getenv("LANGFUSE_SECRET_KEY")
 LANGFUSE_HOST = os.getenv("LANGFUSE_HOST", "https://cloud.langfuse.com")
 
-if not LANGFUSE_PUBLIC_KEY or not LANGFUSE_SECRET_KEY:
-    raise ValueError(
-        "Missing Langfuse credentials. Please set LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY in your environment."
-    )
+if LANGFUSE_OFFLINE:
+    langfuse = None
+
+    def observe(func=None, **kwargs):
+        """No-op replacement of langfuse.observe, usable as @observe or @observe(name=...)."""
+        if callable(func):
+            return func
+        return lambda f: f
 
-# --- CLIENT ---
-langfuse = Langfuse(
-    public_key=LANGFUSE_PUBLIC_KEY,
-    secret_key=LANGFUSE_SECRET_KEY,
-    host=LANGFUSE_HOST
-)
+else:
+    from langfuse import observe, Langfuse
+
+    if not LANGFUSE_PUBLIC_KEY or not LANGFUSE_SECRET_KEY:
+        raise ValueError(
+            "Missing Langfuse credentials. Please set LANGFUSE_PUBLIC_KEY and LANGFUSE_SECRET_KEY in your environment "
+            "(or LANGFUSE_OFFLINE=1 to run without tracing)."
+        )
+
+    # --- CLIENT ---
+    langfuse = Langfuse(
+        public_key=LANGFUSE_PUBLIC_KEY,
+        secret_key=LANGFUSE_SECRET_KEY,
+        host=LANGFUSE_HOST
+    )
 
-# --- DECORATOR À IMPORTER ---
-observe = observe  # re-export propre
+    # --- DECORATOR À IMPORTER ---
+    observe = observe  # re-export propre
 
-__all__ = ["observe", "langfuse"]
\ No newline at end of file
+__all__ = ["observe", "langfuse", "LANGFUSE_OFFLINE"]
@@ -12,5 +12,41 @@ LLM_BASE_MODEL = "mistralai/Devstral-Small-2507"
 VLM_BASE_MODEL = "Qwen/Qwen2-VL-2B-Instruct"
 
 MAX_NEW_TOKENS = 4096
+# Per call site token caps (model/generation_profiles.py), bounded by MAX_NEW_TOKENS for
+# the LLM, follow the observed output lengths
+ADAPTIVE_MAX_NEW_TOKENS = os.getenv("ADAPTIVE_MAX_NEW_TOKENS", "1") == "1"
+
+# Checkpoints exported by model/prequantized.py (Devstral in NF4, Qwen2-VL in fp16),
+# memory-mapped at load. Missing or exported from another model: load from the hub.
+LLM_PREQUANTIZED_DIR = os.getenv("LLM_PREQUANTIZED_DIR", "models/devstral-nf4")
+VLM_PREQUANTIZED_DIR = os.getenv("VLM_PREQUANTIZED_DIR", "models/qwen2-vl-fp16")
+
+# Speculative decoding: a small draft model sharing Devstral's tokenizer proposes
+# SPECULATIVE_DRAFT_TOKENS tokens per step, verified by Devstral in one pass.
+# Unset: plain generate.
+LLM_DRAFT_MODEL = os.getenv("LLM_DRAFT_MODEL") or None
+SPECULATIVE_DRAFT_TOKENS = int(os.getenv("SPECULATIVE_DRAFT_TOKENS", "4"))
+
+# Constrain tool outputs (JSON) to their schema at decode time
+CONSTRAINED_DECODING = os.getenv("CONSTRAINED_DECODING", "1") == "1"
+
+# First tier of parse_declaration: keyword classifier + regex extractors,
+# the LLM only sees declarations classified below this confidence
+FAST_DECLARATION_PARSING = os.getenv("FAST_DECLARATION_PARSING", "1") == "1"
+FAST_PARSE_THRESHOLD = float(os.getenv("FAST_PARSE_THRESHOLD", "0.85"))
+# AskHuman replies are merged into the missing fields by the same extractors,
+# the LLM completion prompt only runs when one field cannot be extracted
+FAST_REPLY_MERGE = os.getenv("FAST_REPLY_MERGE", "1") == "1"
+
+# VLM analysis of the photos started during the declaration stage
+SPECULATIVE_IMAGE_ANALYSIS = os.getenv("SPECULATIVE_IMAGE_ANALYSIS", "1") == "1"
+
+# One KV cache / activation budget for Devstral and Qwen2-VL on the GPU
+# (runtime/device_memory.py), keeping GPU_MEMORY_MARGIN of the device free
+GPU_MEMORY_MANAGER = os.getenv("GPU_MEMORY_MANAGER", "1") == "1"
+GPU_MEMORY_MARGIN = float(os.getenv("GPU_MEMORY_MARGIN", "0.05"))
+
+# Load and exercise both models when the service starts (readiness waits for it)
+WARMUP_ON_START = os.getenv("WARMUP_ON_START", "1") == "1"
 
 N_HISTORY_ENTRIES = 10
\ No newline at end of file
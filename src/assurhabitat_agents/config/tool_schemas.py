@@ -0,0 +1,61 @@
+# JSON schemas of the tool outputs, used for constrained decoding.
+# Properties are generated in the order listed here.
+
+SINISTRE_TYPES = ["degats_des_eaux", "incendie_explosion", "vol_vandalisme", "ambiguous"]
+
+DAMAGE_TYPES = ["fire", "soot", "smoke", "water", "mold", "impact", "theft_signs", "unknown"]
+
+NULLABLE_STRING = {"type": ["string", "null"]}
+
+PARSE_DECLARATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "sinistre_type": {"type": "string", "enum": SINISTRE_TYPES},
+        "sinistre_confidence": {"type": "number"},
+        "sinistre_explain": {"type": "string"},
+        "candidates": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "type": {"type": "string", "enum": SINISTRE_TYPES},
+                    "score": {"type": "number"},
+                },
+            },
+        },
+        "extracted": {
+            "type": "object",
+            "properties": {
+                "date_sinistre": NULLABLE_STRING,
+                "lieu": NULLABLE_STRING,
+                "description": {"type": "string"},
+                "biens_impactes": {"type": "array", "items": {"type": "string"}},
+                "police_report_number": NULLABLE_STRING,
+            },
+        },
+    },
+}
+
+CHECK_GUARANTEE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "guaranteed": {"type": "boolean"},
+        "description": {"type": "string"},
+    },
+}
+
+CHECK_CONFORMITY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "description": {"type": "string"},
+        "detected_damage_types": {"type": "array", "items": {"type": "string", "enum": DAMAGE_TYPES}},
+    },
+}
+
+COST_ESTIMATION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "estimated_cost": {"type": "number"},
+        "explanation": {"type": "string"},
+    },
+}
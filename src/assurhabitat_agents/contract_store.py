@@ -0,0 +1,253 @@
+# src/assurhabitat_agents/contract_store.py
+"""
+Per-policyholder contract terms.
+
+garanties.yaml holds the standard terms of each sinistre type; individual
+contracts may have their own plafond, franchise and extra exclusions.
+ContractStore keeps them in SQLite (one row per policy_id x sinistre_type)
+with an in-memory LRU of the hot policies, and bulk-imports CSV or Parquet
+exports of the contract system.
+
+The policy of the claim being processed is pinned with pin_policy_id(), so
+tools resolve the right terms without the LLM having to pass the id around.
+"""
+import csv
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+from assurhabitat_agents.policy_kb import PolicyKB
+
+IMPORT_COLUMNS = ("policy_id", "sinistre_type", "plafond", "franchise", "exclusions")
+# exclusions are stored (and imported from CSV) as one string separated by this
+EXCLUSIONS_SEPARATOR = "|"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS contract_terms (
+    policy_id     TEXT NOT NULL,
+    sinistre_type TEXT NOT NULL,
+    plafond       REAL,
+    franchise     REAL,
+    exclusions    TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (policy_id, sinistre_type)
+) WITHOUT ROWID;
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class ContractTerms:
+    policy_id: str
+    sinistre_type: str
+    plafond: Optional[float]
+    franchise: Optional[float]
+    exclusions: Tuple[str, ...]
+
+    def apply(self, guarantee: Dict[str, Any]) -> Dict[str, Any]:
+        """Overlay these terms on the standard guarantee dict (None keeps the standard value)."""
+        merged = dict(guarantee)
+        if self.plafond is not None:
+            merged["plafond"] = self.plafond
+        if self.franchise is not None:
+            merged["franchise"] = self.franchise
+        if self.exclusions:
+            merged["exclusions"] = list(dict.fromkeys([*guarantee.get("exclusions", []), *self.exclusions]))
+        merged["policy_id"] = self.policy_id
+        return merged
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    number = float(value)
+    return None if number != number else number  # NaN from Parquet/pandas
+
+
+def _exclusions_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return EXCLUSIONS_SEPARATOR.join(str(v).strip() for v in value if str(v).strip())
+    return str(value).strip()
+
+
+def _default_kb() -> PolicyKB:
+    # imported here: utils builds the contract store
+    from assurhabitat_agents.utils import get_policy_kb
+
+    return get_policy_kb()
+
+
+def _canonical_type(kb: PolicyKB, sinistre_type: Any) -> str:
+    key = kb.resolve(str(sinistre_type).strip())
+    if key not in kb.garanties:
+        raise ValueError(f"Unknown sinistre type in contract import: {sinistre_type!r}")
+    return key
+
+
+class ContractStore:
+    """
+    SQLite-backed contract terms with an LRU of hot policies.
+
+    A cache entry holds every term of one policy (including "no contract",
+    so unknown ids do not hit the database again); imports invalidate it.
+    """
+
+    def __init__(self, db_path: Path, cache_size: int = 10_000):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._cache: "OrderedDict[str, Mapping[str, ContractTerms]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- lookups ----
+    def policy_terms(self, policy_id: str) -> Mapping[str, ContractTerms]:
+        """All terms of a policy keyed by sinistre type (empty if unknown)."""
+        with self._lock:
+            terms = self._cache.get(policy_id)
+            if terms is not None:
+                self._cache.move_to_end(policy_id)
+                self.hits += 1
+                return terms
+            self.misses += 1
+            rows = self._conn.execute(
+                "SELECT sinistre_type, plafond, franchise, exclusions FROM contract_terms WHERE policy_id = ?",
+                (policy_id,),
+            ).fetchall()
+            terms = {
+                sinistre_type: ContractTerms(
+                    policy_id=policy_id,
+                    sinistre_type=sinistre_type,
+                    plafond=plafond,
+                    franchise=franchise,
+                    exclusions=tuple(e for e in exclusions.split(EXCLUSIONS_SEPARATOR) if e),
+                )
+                for sinistre_type, plafond, franchise, exclusions in rows
+            }
+            self._cache[policy_id] = terms
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            return terms
+
+    def terms(self, policy_id: str, sinistre_type: str) -> Optional[ContractTerms]:
+        return self.policy_terms(policy_id).get(sinistre_type)
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM contract_terms").fetchone()[0]
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "cached_policies": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # ---- writes ----
+    def upsert(self, rows: Iterable[Mapping[str, Any]], batch_size: int = 5000, kb: Optional[PolicyKB] = None) -> int:
+        """
+        Insert or replace terms. Each row needs policy_id and sinistre_type;
+        plafond / franchise may be empty (standard terms apply).
+        sinistre_type may be a display name or an alias: it is stored under the
+        canonical key of `kb` (default: the current policy KB), the one the
+        guarantee lookups use. An unknown type raises ValueError and nothing
+        of the import is written.
+        """
+        kb = kb or _default_kb()
+        count = 0
+        batch = []
+        with self._lock:
+            with self._conn:
+                for row in rows:
+                    batch.append((
+                        str(row["policy_id"]).strip(),
+                        _canonical_type(kb, row["sinistre_type"]),
+                        _optional_float(row.get("plafond")),
+                        _optional_float(row.get("franchise")),
+                        _exclusions_text(row.get("exclusions")),
+                    ))
+                    if len(batch) >= batch_size:
+                        count += self._write(batch)
+                        batch = []
+                count += self._write(batch)
+            self._cache.clear()
+        return count
+
+    def _write(self, batch) -> int:
+        self._conn.executemany("INSERT OR REPLACE INTO contract_terms VALUES (?, ?, ?, ?, ?)", batch)
+        return len(batch)
+
+    def import_csv(self, path: Path, delimiter: str = ",", kb: Optional[PolicyKB] = None) -> int:
+        """Bulk import a CSV with the IMPORT_COLUMNS header; returns the number of rows."""
+        with open(path, newline="", encoding="utf-8") as f:
+            return self.upsert(csv.DictReader(f, delimiter=delimiter), kb=kb)
+
+    def import_parquet(self, path: Path, batch_size: int = 50_000, kb: Optional[PolicyKB] = None) -> int:
+        """Bulk import a Parquet file (needs pyarrow); returns the number of rows."""
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet import requires pyarrow (pip install pyarrow)") from e
+
+        def rows() -> Iterator[Dict[str, Any]]:
+            parquet = pq.ParquetFile(path)
+            columns = [c for c in IMPORT_COLUMNS if c in parquet.schema_arrow.names]
+            for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+                yield from batch.to_pylist()
+
+        return self.upsert(rows(), kb=kb)
+
+
+# =========================
+# Policy of the current claim
+# =========================
+_current_policy: ContextVar[Optional[str]] = ContextVar("current_policy_id", default=None)
+
+
+def current_policy_id() -> Optional[str]:
+    return _current_policy.get()
+
+
+@contextmanager
+def pin_policy_id(policy_id: Optional[str]):
+    """Lookups made in this context use the contract of `policy_id`."""
+    token = _current_policy.set(policy_id)
+    try:
+        yield policy_id
+    finally:
+        _current_policy.reset(token)
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import time
+
+    parser = argparse.ArgumentParser(description="Bulk import contract terms (CSV or Parquet)")
+    parser.add_argument("files", nargs="+", type=Path)
+    parser.add_argument("--db", type=Path, default=Path(os.getenv("CONTRACT_DB_PATH", "data/contracts.db")))
+    args = parser.parse_args()
+
+    store = ContractStore(args.db)
+    for path in args.files:
+        start = time.perf_counter()
+        n = store.import_parquet(path) if path.suffix == ".parquet" else store.import_csv(path)
+        print(f"{path}: {n} rows in {time.perf_counter() - start:.2f}s")
+    print(f"{args.db}: {store.count()} contract terms")
+    store.close()
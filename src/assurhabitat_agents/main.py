@@ -1,3 +1,5 @@
+from concurrent.futures import ThreadPoolExecutor
+
 from assurhabitat_agents.agents.orchestrator import Orchestrator
 from assurhabitat_agents.agents.declaration_agent import run_declar_agent
 from assurhabitat_agents.agents.validation_agent import run_valid_agent
@@ -16,9 +18,16 @@ image_paths = [p.strip() for p in images_input.split(",") if p.strip()]
 orch = Orchestrator(
     declaration_agent=run_declar_agent,
     validation_agent=run_valid_agent,
-    expertise_agent=run_expert_agent
+    expertise_agent=run_expert_agent,
+    # the VLM looks at the photos while the declaration agent talks to the LLM
+    image_executor=ThreadPoolExecutor(max_workers=1),
 )
 
 result = orch.run(user_text=user_text, image_paths=image_paths)
 
+# AskHuman suspends the claim: answer on the terminal and resume it
+while result["status"] == "waiting_for_human":
+    reply = input(result["question"] + "\n> ")
+    result = orch.resume(result["claim_id"], reply)
+
 print(result)
\ No newline at end of file
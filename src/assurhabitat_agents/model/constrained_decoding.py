@@ -0,0 +1,397 @@
+# src/assurhabitat_agents/model/constrained_decoding.py
+"""
+JSON-schema constrained decoding.
+
+`JsonSchemaMatcher` is a character-level pushdown recognizer for the JSON
+documents allowed by a (small) JSON schema. `JsonSchemaLogitsProcessor` uses
+it at every decode step to mask the tokens that would leave the set of valid
+prefixes, so the generation always parses, and forces EOS as soon as the
+top-level object is closed.
+
+Supported schema subset (enough for the tool outputs):
+  - "type": object | array | string | number | integer | boolean | null,
+    or a list of those (e.g. ["string", "null"])
+  - object "properties": every property is emitted, in declaration order
+  - array "items"
+  - string "enum"
+Output is compact JSON (no whitespace outside strings), which also keeps
+the generations short.
+"""
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+_NUMBER_PREFIX = re.compile(r"-?(?:(?:0|[1-9][0-9]*)(?:\.[0-9]*|(?:\.[0-9]+)?[eE][+-]?[0-9]*)?)?")
+_NUMBER_FULL = re.compile(r"-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+_INTEGER_PREFIX = re.compile(r"-?(0|[1-9][0-9]*)?")
+_INTEGER_FULL = re.compile(r"-?(0|[1-9][0-9]*)")
+
+_HEX_DIGITS = set("0123456789abcdefABCDEF")
+
+_LITERALS = {"t": ("true", "boolean"), "f": ("false", "boolean"), "n": ("null", "null")}
+
+
+def _types(schema: Dict[str, Any]) -> set:
+    t = schema.get("type")
+    if t is None:
+        return {"object", "array", "string", "number", "integer", "boolean", "null"}
+    return set(t) if isinstance(t, (list, tuple)) else {t}
+
+
+class JsonSchemaMatcher:
+    """
+    Incremental validator of JSON text against a schema.
+
+    feed(text) returns False (and leaves the matcher unchanged) as soon as
+    the text cannot be the prefix of a valid document. `done` is True once
+    the top-level value is complete.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        # frames are small lists: [kind, ...]
+        self.stack: List[list] = [["value", schema]]
+        self.done = False
+
+    def copy(self) -> "JsonSchemaMatcher":
+        clone = JsonSchemaMatcher.__new__(JsonSchemaMatcher)
+        clone.schema = self.schema
+        clone.stack = [list(frame) for frame in self.stack]
+        clone.done = self.done
+        return clone
+
+    # ---- public API ----
+    def feed(self, text: str) -> bool:
+        trial = self.copy()
+        for ch in text:
+            if not trial._feed_char(ch):
+                return False
+        self.stack, self.done = trial.stack, trial.done
+        return True
+
+    def accepts(self, text: str) -> bool:
+        """True if text can be appended without leaving the valid prefixes."""
+        trial = self.copy()
+        return all(trial._feed_char(ch) for ch in text)
+
+    # ---- transitions ----
+    def _complete_value(self) -> None:
+        """A value just ended: advance the enclosing container."""
+        if not self.stack:
+            self.done = True
+            return
+        top = self.stack[-1]
+        if top[0] == "obj":
+            _, props, idx = top
+            idx += 1
+            top[2] = idx
+            if idx < len(props):
+                name, sub_schema = props[idx]
+                self.stack.append(["value", sub_schema])
+                self.stack.append(["lit", f',"{name}":'])
+            else:
+                self.stack.append(["close", "}"])
+        elif top[0] == "arr":
+            top[2] = "after_item"
+
+    def _start_value(self, schema: Dict[str, Any], ch: str) -> bool:
+        allowed = _types(schema)
+        self.stack.pop()
+        if ch == "{" and "object" in allowed:
+            props = list(schema.get("properties", {}).items())
+            self.stack.append(["obj", props, 0])
+            if props:
+                name, sub_schema = props[0]
+                self.stack.append(["value", sub_schema])
+                self.stack.append(["lit", f'"{name}":'])
+            else:
+                self.stack.append(["close", "}"])
+            return True
+        if ch == "[" and "array" in allowed:
+            self.stack.append(["arr", schema.get("items", {}), "start"])
+            return True
+        if ch == '"' and "string" in allowed:
+            self.stack.append(["str", schema.get("enum"), "", False])
+            return True
+        if ch in _LITERALS and _LITERALS[ch][1] in allowed:
+            self.stack.append(["vlit", _LITERALS[ch][0][1:]])
+            return True
+        if (ch == "-" or ch.isdigit()) and allowed & {"number", "integer"}:
+            integer_only = "number" not in allowed
+            self.stack.append(["num", ch, integer_only])
+            return True
+        return False
+
+    def _feed_char(self, ch: str) -> bool:
+        if self.done:
+            return False
+        while True:
+            top = self.stack[-1]
+            kind = top[0]
+
+            if kind == "value":
+                return self._start_value(top[1], ch)
+
+            if kind in ("lit", "vlit", "close"):
+                expected = top[1]
+                if not expected or ch != expected[0]:
+                    return False
+                top[1] = expected[1:]
+                if not top[1]:
+                    self.stack.pop()
+                    if kind == "close":
+                        self.stack.pop()  # the object itself
+                    if kind != "lit":
+                        self._complete_value()
+                return True
+
+            if kind == "str":
+                # escaped: True right after a backslash, then the number of \uXXXX hex digits still expected
+                _, enum, buf, escaped = top
+                if escaped is True:
+                    if ch not in '"\\/bfnrtu':
+                        return False
+                    top[2], top[3] = buf + "\\" + ch, 4 if ch == "u" else False
+                    return True
+                if escaped:
+                    if ch not in _HEX_DIGITS:
+                        return False
+                    top[2], top[3] = buf + ch, escaped - 1 or False
+                    return True
+                if ch == "\\":
+                    if enum is not None:
+                        return False
+                    top[3] = True
+                    return True
+                if ch == '"':
+                    if enum is not None and buf not in enum:
+                        return False
+                    self.stack.pop()
+                    self._complete_value()
+                    return True
+                if ord(ch) < 0x20:
+                    return False
+                buf += ch
+                if enum is not None and not any(e.startswith(buf) for e in enum):
+                    return False
+                top[2] = buf
+                return True
+
+            if kind == "num":
+                _, buf, integer_only = top
+                prefix_re = _INTEGER_PREFIX if integer_only else _NUMBER_PREFIX
+                if prefix_re.fullmatch(buf + ch):
+                    top[1] = buf + ch
+                    return True
+                full_re = _INTEGER_FULL if integer_only else _NUMBER_FULL
+                if not full_re.fullmatch(buf):
+                    return False
+                # the number ends here: re-feed ch to the container
+                self.stack.pop()
+                self._complete_value()
+                if self.done:
+                    return False
+                continue
+
+            if kind == "arr":
+                _, item_schema, phase = top
+                if ch == "]":
+                    self.stack.pop()
+                    self._complete_value()
+                    return True
+                if phase == "start":
+                    top[2] = "item"
+                    self.stack.append(["value", item_schema])
+                    continue
+                if phase == "after_item" and ch == ",":
+                    top[2] = "item"
+                    self.stack.append(["value", item_schema])
+                    return True
+                return False
+
+            return False
+
+
+# =========================
+# Token vocabulary
+# =========================
+def build_token_strings(vocab_size: int, decode_token: Callable[[int], Optional[str]]) -> List[Optional[str]]:
+    """
+    Text of every token id, or None for tokens that must never be sampled
+    in JSON mode (special tokens, incomplete UTF-8 byte pieces).
+    """
+    strings: List[Optional[str]] = []
+    for token_id in range(vocab_size):
+        try:
+            text = decode_token(token_id)
+        except Exception:
+            text = None
+        strings.append(text if text else None)
+    return strings
+
+
+class JsonSchemaLogitsProcessor:
+    """
+    transformers LogitsProcessor masking the tokens that break the schema.
+
+    Candidates are checked in decreasing logit order: the first `top_k`
+    tokens are tried and every valid one among them is kept; the full
+    vocabulary is scanned only when none of them is valid. Once the
+    document is complete only EOS is allowed. Each decode step only runs
+    a topk over the logits; the full vocabulary is sorted only for a scan.
+    """
+
+    def __init__(
+        self,
+        schema: Dict[str, Any],
+        token_strings: Sequence[Optional[str]],
+        eos_token_id: int,
+        prompt_length: int,
+        top_k: int = 32,
+    ):
+        self.matcher = JsonSchemaMatcher(schema)
+        self.token_strings = token_strings
+        self.eos_token_id = eos_token_id
+        self.prompt_length = prompt_length
+        self.top_k = top_k
+        self._consumed = 0
+        self.full_scans = 0
+
+    def _advance(self, generated: Sequence[int]) -> None:
+        for token_id in generated[self._consumed:]:
+            text = self.token_strings[token_id] if token_id < len(self.token_strings) else None
+            if text:
+                self.matcher.feed(text)
+        self._consumed = len(generated)
+
+    def allowed_tokens(
+        self, ranked_ids: Sequence[int], full_ranking: Optional[Callable[[], Sequence[int]]] = None
+    ) -> List[int]:
+        """
+        ranked_ids: candidates in decreasing logit order (at least the top_k).
+        full_ranking: the whole vocabulary in that order, computed on demand for
+        the fallback scan (defaults to ranked_ids).
+        """
+        if self.matcher.done:
+            return [self.eos_token_id]
+        allowed = []
+        for token_id in ranked_ids[: self.top_k]:
+            text = self.token_strings[token_id] if token_id < len(self.token_strings) else None
+            if text and self.matcher.accepts(text):
+                allowed.append(token_id)
+        if allowed:
+            return allowed
+        self.full_scans += 1
+        ranked_ids = full_ranking() if full_ranking is not None else ranked_ids
+        for token_id in ranked_ids[self.top_k:]:
+            text = self.token_strings[token_id] if token_id < len(self.token_strings) else None
+            if text and self.matcher.accepts(text):
+                return [token_id]
+        return [self.eos_token_id]
+
+    def __call__(self, input_ids, scores):
+        import torch
+
+        generated = input_ids[0, self.prompt_length:].tolist()
+        self._advance(generated)
+        if self.matcher.done:
+            allowed = [self.eos_token_id]
+        else:
+            k = min(self.top_k, scores.shape[-1])
+            top = torch.topk(scores[0], k).indices.tolist()
+            allowed = self.allowed_tokens(top, lambda: torch.argsort(scores[0], descending=True).tolist())
+        mask = torch.full_like(scores, float("-inf"))
+        mask[:, allowed] = 0
+        return scores + mask
+
+
+# =========================
+# Metrics
+# =========================
+class GenerationStats:
+    """
+    Per call site counters, split between constrained and free-form
+    generations, used to measure what constrained decoding saves.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Dict[str, float]]] = {}
+
+    def _entry(self, call_site: str, constrained: bool) -> Dict[str, float]:
+        mode = "constrained" if constrained else "free_form"
+        site = self._data.setdefault(call_site, {})
+        return site.setdefault(mode, {"calls": 0, "tokens": 0, "parse_failures": 0})
+
+    def record_tokens(self, call_site: str, constrained: bool, tokens: int) -> None:
+        with self._lock:
+            entry = self._entry(call_site, constrained)
+            entry["calls"] += 1
+            entry["tokens"] += tokens
+
+    def record_parse(self, call_site: str, constrained: bool, ok: bool) -> None:
+        if ok:
+            return
+        with self._lock:
+            self._entry(call_site, constrained)["parse_failures"] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    # ---- persistence ----
+    # CONSTRAINED_DECODING is read once per process: save the counters of a
+    # run in each mode and merge them to compare the two.
+    def save(self, path: Path) -> None:
+        with self._lock:
+            data = {site: {mode: dict(values) for mode, values in modes.items()} for site, modes in self._data.items()}
+        Path(path).write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    def merge(self, path: Path) -> None:
+        """Add the counters saved by another run."""
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+        with self._lock:
+            for call_site, modes in data.items():
+                for mode, values in modes.items():
+                    entry = self._entry(call_site, mode == "constrained")
+                    for key, value in values.items():
+                        entry[key] = entry.get(key, 0) + value
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        For each call site: raw counters per mode and, when both modes were
+        observed (in this process or merged from a saved run), retries
+        avoided and tokens saved by the constrained calls (estimated from
+        the free-form failure rate and mean output length).
+        """
+        with self._lock:
+            report: Dict[str, Dict[str, Any]] = {}
+            for call_site, modes in self._data.items():
+                site: Dict[str, Any] = {mode: dict(values) for mode, values in modes.items()}
+                constrained, free = modes.get("constrained"), modes.get("free_form")
+                if constrained and free and constrained["calls"] and free["calls"]:
+                    free_failure_rate = free["parse_failures"] / free["calls"]
+                    site["retries_avoided"] = free_failure_rate * constrained["calls"] - constrained["parse_failures"]
+                    site["tokens_saved"] = (
+                        free["tokens"] / free["calls"] - constrained["tokens"] / constrained["calls"]
+                    ) * constrained["calls"]
+                report[call_site] = site
+            return report
+
+
+GENERATION_STATS = GenerationStats()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge the generation stats of runs with and without CONSTRAINED_DECODING")
+    parser.add_argument("files", nargs="+", type=Path)
+    args = parser.parse_args()
+
+    merged = GenerationStats()
+    for path in args.files:
+        merged.merge(path)
+    print(json.dumps(merged.report(), indent=2))
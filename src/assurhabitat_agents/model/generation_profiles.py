@@ -0,0 +1,207 @@
+# src/assurhabitat_agents/model/generation_profiles.py
+"""
+Generation profiles per call site.
+
+Each call site produces outputs of a very different size: a ReAct step is a
+few lines, a declaration or a coverage verdict a small JSON object, a cost
+estimation a JSON list that grows with the number of damaged items, the
+final expertise answer a short report. One MAX_NEW_TOKENS for all of them
+lets a runaway ReAct step run for 4096 tokens (and makes every LLM call
+reserve 4096 tokens of KV cache, see runtime/device_memory.py), while the
+128 tokens of vlm_inference truncate multi-item cost estimations.
+
+A GenerationProfile gives each call site:
+  - max_new_tokens: the initial token cap, bounded by [min_tokens, ceiling]
+  - temperature: 0.0 is greedy decoding (required by speculative decoding)
+  - stop: strings ending the generation, cut from the returned text
+
+With ADAPTIVE_MAX_NEW_TOKENS, the cap follows the observed output lengths:
+once `min_samples` outputs are known, it is `headroom` x their 99th
+percentile; when more than `max_truncation_rate` of the recent outputs hit
+the cap, it doubles instead (truncated outputs hide their real length).
+report() gives, per call site, the wasted budget (cap minus output length
+of the calls that ended on their own) and the truncated generations.
+"""
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+# a ReAct step ends where the model starts inventing the tool result
+REACT_STOP = ("\nObservation:",)
+
+
+@dataclass(frozen=True, slots=True)
+class GenerationProfile:
+    max_new_tokens: int
+    min_tokens: int = 32
+    ceiling: int = 4096
+    temperature: float = 0.0
+    stop: Tuple[str, ...] = ()
+    adaptive: bool = True
+
+
+DEFAULT_PROFILES: Dict[str, GenerationProfile] = {
+    # ReAct steps (Thought + Action + Arguments, or Answer)
+    "declaration_react": GenerationProfile(512, stop=REACT_STOP),
+    "validation_react": GenerationProfile(512, stop=REACT_STOP),
+    # the expertise answer is the final report of the claim
+    "expertise_react": GenerationProfile(1024, stop=REACT_STOP),
+    # tool JSON (schema-constrained or stopped when the JSON closes)
+    "parse_declaration": GenerationProfile(512),
+    "check_guarantee": GenerationProfile(256),
+    "check_conformity": GenerationProfile(256, ceiling=1024),
+    # one entry per damaged item
+    "cost_estimation": GenerationProfile(768, ceiling=2048),
+    "warmup": GenerationProfile(128, adaptive=False),
+    # unprofiled call sites keep the previous limits
+    "llm": GenerationProfile(4096, adaptive=False),
+    "vlm": GenerationProfile(128, ceiling=2048, adaptive=False),
+}
+
+
+def _percentile(values: Sequence[int], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+    return ordered[index]
+
+
+class GenerationProfiles:
+    """Profiles, adaptive caps and output length statistics per call site."""
+
+    def __init__(
+        self,
+        profiles: Optional[Dict[str, GenerationProfile]] = None,
+        adaptive: Optional[bool] = None,
+        window: int = 200,
+        min_samples: int = 20,
+        headroom: float = 1.25,
+        max_truncation_rate: float = 0.02,
+        default: str = "llm",
+    ):
+        self.profiles = dict(profiles if profiles is not None else DEFAULT_PROFILES)
+        self.adaptive = adaptive
+        self.window = window
+        self.min_samples = min_samples
+        self.headroom = headroom
+        self.max_truncation_rate = max_truncation_rate
+        self.default = default
+        self._lock = threading.Lock()
+        self._caps: Dict[str, int] = {}
+        self._recent: Dict[str, deque] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+
+    def _adaptive(self) -> bool:
+        # None: ADAPTIVE_MAX_NEW_TOKENS, read at the first generation (the config needs the HF stack)
+        if self.adaptive is None:
+            from assurhabitat_agents.config.model_config import ADAPTIVE_MAX_NEW_TOKENS
+
+            self.adaptive = ADAPTIVE_MAX_NEW_TOKENS
+        return self.adaptive
+
+    def profile(self, call_site: str) -> GenerationProfile:
+        return self.profiles.get(call_site) or self.profiles[self.default]
+
+    def max_new_tokens(self, call_site: str) -> int:
+        with self._lock:
+            return self._caps.get(call_site, self.profile(call_site).max_new_tokens)
+
+    def record(self, call_site: str, tokens: int, max_new_tokens: int, truncated: bool) -> None:
+        """One generation of `tokens`, run with cap `max_new_tokens`; truncated when it hit the cap."""
+        with self._lock:
+            stats = self._stats.setdefault(
+                call_site, {"calls": 0, "tokens": 0, "max_tokens": 0, "truncated": 0, "wasted_tokens": 0}
+            )
+            stats["calls"] += 1
+            stats["tokens"] += tokens
+            stats["max_tokens"] = max(stats["max_tokens"], tokens)
+            if truncated:
+                stats["truncated"] += 1
+            else:
+                stats["wasted_tokens"] += max(0, max_new_tokens - tokens)
+
+            recent = self._recent.setdefault(call_site, deque(maxlen=self.window))
+            recent.append((tokens, truncated))
+            profile = self.profile(call_site)
+            if profile.adaptive and self._adaptive():
+                self._adapt(call_site, profile, recent)
+
+    def _adapt(self, call_site: str, profile: GenerationProfile, recent: deque) -> None:
+        cap = self._caps.get(call_site, profile.max_new_tokens)
+        truncation_rate = sum(t for _, t in recent) / len(recent)
+        if truncation_rate > self.max_truncation_rate:
+            new_cap = cap * 2
+            # the lengths seen under the old cap are censored: start over
+            recent.clear()
+        elif len(recent) >= self.min_samples:
+            new_cap = math.ceil(_percentile([n for n, _ in recent], 0.99) * self.headroom)
+        else:
+            return
+        new_cap = min(profile.ceiling, max(profile.min_tokens, new_cap))
+        if new_cap != cap:
+            print(f"[generation] {call_site}: max_new_tokens {cap} -> {new_cap}")
+            self._caps[call_site] = new_cap
+
+    def reset(self) -> None:
+        with self._lock:
+            self._caps.clear()
+            self._recent.clear()
+            self._stats.clear()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per call site: current cap, output lengths, wasted budget and truncated generations."""
+        with self._lock:
+            report: Dict[str, Dict[str, Any]] = {}
+            for call_site, stats in self._stats.items():
+                lengths = [n for n, _ in self._recent.get(call_site, ())]
+                budget = stats["wasted_tokens"] + stats["tokens"]
+                report[call_site] = {
+                    **stats,
+                    "max_new_tokens": self._caps.get(call_site, self.profile(call_site).max_new_tokens),
+                    "mean_tokens": stats["tokens"] / stats["calls"],
+                    "p95_tokens": _percentile(lengths, 0.95) if lengths else None,
+                    "truncation_rate": stats["truncated"] / stats["calls"],
+                    "wasted_fraction": stats["wasted_tokens"] / budget if budget else 0.0,
+                }
+            return report
+
+
+class StopSequenceCriteria:
+    """
+    transformers StoppingCriteria: stops once the generated text contains one
+    of the stop strings (decoded token by token, like JsonStopCriteria).
+    """
+
+    def __init__(self, token_text: Callable[[int], Optional[str]], prompt_length: int, stop: Sequence[str]):
+        self.token_text = token_text
+        self.prompt_length = prompt_length
+        self.stop = tuple(stop)
+        self.text = ""
+        self.stopped = False
+        self._consumed = 0
+        self._tail = max((len(s) for s in self.stop), default=0)
+
+    def update(self, generated_ids) -> bool:
+        for token_id in generated_ids[self._consumed:]:
+            start = max(0, len(self.text) - self._tail)
+            self.text += self.token_text(token_id) or ""
+            if any(s in self.text[start:] for s in self.stop):
+                self.stopped = True
+        self._consumed = len(generated_ids)
+        return self.stopped
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        done = self.update(input_ids[0, self.prompt_length:].tolist())
+        return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+
+
+def cut_at_stop(text: str, stop: Sequence[str]) -> str:
+    """Text before the first stop string."""
+    cut = min((i for i in (text.find(s) for s in stop) if i >= 0), default=len(text))
+    return text[:cut]
+
+
+GENERATION_PROFILES = GenerationProfiles()
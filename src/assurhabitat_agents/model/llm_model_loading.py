@@ -1,6 +1,7 @@
 import torch
 import os
 import asyncio
+import time
 
 from typing import AsyncIterator
 from typing_extensions import TypedDict
@@ -8,7 +9,7 @@ from typing import Callable
 from functools import lru_cache
 
 from transformers import TextIteratorStreamer
-from transformers import BitsAndBytesConfig, AutoModelForCausalLM
+from transformers import BitsAndBytesConfig, AutoModelForCausalLM, LogitsProcessorList, StoppingCriteriaList
 # from transformers import Mistral3ForConditionalGeneration
 
 from mistral_common.tokens.tokenizers.mistral import MistralTokenizer
@@ -17,12 +18,29 @@ from mistral_common.protocol.instruct.request import ChatCompletionRequest
 
 from threading import Thread
 
-from assurhabitat_agents.config.model_config import HF_TOKEN, LLM_BASE_MODEL, MAX_NEW_TOKENS
+from assurhabitat_agents.config.model_config import (
+    HF_TOKEN,
+    LLM_BASE_MODEL,
+    MAX_NEW_TOKENS,
+    CONSTRAINED_DECODING,
+    LLM_DRAFT_MODEL,
+    SPECULATIVE_DRAFT_TOKENS,
+    LLM_PREQUANTIZED_DIR,
+)
 from assurhabitat_agents.config.langfuse_config import observe
+from assurhabitat_agents.model.constrained_decoding import (
+    GENERATION_STATS,
+    JsonSchemaLogitsProcessor,
+    build_token_strings,
+)
+from assurhabitat_agents.model.streaming_json import JsonStopCriteria
+from assurhabitat_agents.model.generation_profiles import GENERATION_PROFILES, StopSequenceCriteria, cut_at_stop
+from assurhabitat_agents.model.speculative_decoding import check_draft_compatible, speculative_generate
+from assurhabitat_agents.model.prequantized import LOAD_STATS, find_prequantized
+from assurhabitat_agents.runtime.device_memory import register_model, reserve_generation
 
-@lru_cache(maxsize=1)
-def _load_model():
-    
+def _quantize_from_hub():
+    """Devstral from the hub, quantized to NF4 by bitsandbytes at load."""
     bnb_config = BitsAndBytesConfig(
         load_in_4bit=True,
         bnb_4bit_quant_type='nf4',
@@ -30,19 +48,76 @@ def _load_model():
         bnb_4bit_compute_dtype=torch.bfloat16
         )
     
-    tokenizer = MistralTokenizer.from_hf_hub(LLM_BASE_MODEL)
-    model = AutoModelForCausalLM.from_pretrained(
+    return AutoModelForCausalLM.from_pretrained(
         LLM_BASE_MODEL,
         device_map="auto",
         #torch_dtype=torch.bfloat16,
         quantization_config=bnb_config,
         offload_buffers=True
     )
+
+def _load_prequantized(checkpoint):
+    """NF4 checkpoint saved by model/prequantized.py: safetensors are memory-mapped, nothing is re-quantized."""
+    return AutoModelForCausalLM.from_pretrained(
+        checkpoint,
+        device_map="auto",
+        torch_dtype=torch.bfloat16,
+    )
+
+@lru_cache(maxsize=1)
+def _load_model():
+    start = time.perf_counter()
+    tokenizer = MistralTokenizer.from_hf_hub(LLM_BASE_MODEL)
+    checkpoint = find_prequantized(LLM_PREQUANTIZED_DIR, LLM_BASE_MODEL)
+    if checkpoint is not None:
+        model = _load_prequantized(checkpoint)
+    else:
+        model = _quantize_from_hub()
+    LOAD_STATS.record("llm", "prequantized" if checkpoint is not None else "hub", time.perf_counter() - start)
+    register_model("llm", model)
     return tokenizer, model
 
+@lru_cache(maxsize=1)
+def _load_draft_model():
+    """Draft model for speculative decoding, or None when LLM_DRAFT_MODEL is not set."""
+    if not LLM_DRAFT_MODEL:
+        return None
+    _, model = _load_model()
+    draft = AutoModelForCausalLM.from_pretrained(
+        LLM_DRAFT_MODEL,
+        device_map="auto",
+        torch_dtype=torch.bfloat16,
+    )
+    check_draft_compatible(model, draft)
+    register_model("llm_draft", draft)
+    return draft
+
+@lru_cache(maxsize=1)
+def _llm_token_strings():
+    """Text of every Devstral token, computed once for constrained decoding."""
+    tokenizer, _ = _load_model()
+    raw = tokenizer.instruct_tokenizer.tokenizer
+    n_special = getattr(raw, "num_special_tokens", 0)
+
+    def decode_token(token_id):
+        if token_id < n_special:
+            return None
+        if hasattr(raw, "id_to_byte_piece"):
+            # incomplete UTF-8 pieces raise and are excluded
+            return raw.id_to_byte_piece(token_id).decode("utf-8")
+        return raw.id_to_piece(token_id).replace("▁", " ")
+
+    return build_token_strings(raw.n_words, decode_token), raw.eos_id
+
 @observe(name="llm inference")
-def llm_inference(prompt: str) -> str:
-    """Réalise une inférence au LLM Devstral (nécessite du code spécifique à Mistral)."""
+def llm_inference(prompt: str, json_schema: dict | None = None, call_site: str = "llm") -> str:
+    """
+    Réalise une inférence au LLM Devstral (nécessite du code spécifique à Mistral).
+    json_schema: when given (and CONSTRAINED_DECODING is on), the output is forced to
+    be a JSON document matching the schema. Otherwise generation still stops as
+    soon as the streamed JSON object is closed.
+    call_site: selects the generation profile (token cap, temperature, stop strings).
+    """
     tokenizer, model = _load_model()
     tokenized = tokenizer.encode_chat_completion(
         ChatCompletionRequest(
@@ -51,8 +126,65 @@ def llm_inference(prompt: str) -> str:
             ],
         )
     )
-    output = model.generate(
-        input_ids=torch.tensor([tokenized.tokens]).to("cuda"),
-        max_new_tokens=MAX_NEW_TOKENS,
-    )[0]
-    return tokenizer.decode(output[len(tokenized.tokens):])
\ No newline at end of file
+
+    # token cap, temperature and stop strings of the call site (adapted to its output lengths)
+    profile = GENERATION_PROFILES.profile(call_site)
+    max_new_tokens = min(GENERATION_PROFILES.max_new_tokens(call_site), MAX_NEW_TOKENS)
+    prompt_length = len(tokenized.tokens)
+
+    constrained = json_schema is not None and CONSTRAINED_DECODING
+    generate_kwargs = {}
+    criteria = []
+    if constrained:
+        token_strings, eos_id = _llm_token_strings()
+        generate_kwargs["logits_processor"] = LogitsProcessorList([
+            JsonSchemaLogitsProcessor(json_schema, token_strings, eos_id, prompt_length=prompt_length)
+        ])
+    elif json_schema is not None:
+        token_strings, _ = _llm_token_strings()
+        criteria.append(JsonStopCriteria(lambda i: token_strings[i] if i < len(token_strings) else None, prompt_length))
+    if profile.stop:
+        token_strings, _ = _llm_token_strings()
+        criteria.append(StopSequenceCriteria(
+            lambda i: token_strings[i] if i < len(token_strings) else None, prompt_length, profile.stop
+        ))
+    if criteria:
+        generate_kwargs["stopping_criteria"] = StoppingCriteriaList(criteria)
+
+    input_ids = torch.tensor([tokenized.tokens]).to("cuda")
+    eos_id = tokenizer.instruct_tokenizer.tokenizer.eos_id
+    # speculative decoding reproduces greedy decoding only
+    draft = _load_draft_model() if profile.temperature == 0.0 else None
+    # KV cache + activations budgeted against the VLM's (waits instead of spilling to CPU)
+    with reserve_generation("llm", prompt_length + max_new_tokens):
+        if draft is not None:
+            # greedy output of Devstral, fewer Devstral forward passes
+            output = speculative_generate(
+                model,
+                draft,
+                input_ids,
+                max_new_tokens=max_new_tokens,
+                num_draft_tokens=SPECULATIVE_DRAFT_TOKENS,
+                eos_token_id=eos_id,
+                logits_processor=generate_kwargs.get("logits_processor"),
+                stopping_criteria=generate_kwargs.get("stopping_criteria"),
+                call_site=call_site,
+            )[0]
+        else:
+            if profile.temperature > 0.0:
+                generate_kwargs.update(do_sample=True, temperature=profile.temperature)
+            else:
+                generate_kwargs["do_sample"] = False
+            output = model.generate(
+                input_ids=input_ids,
+                max_new_tokens=max_new_tokens,
+                **generate_kwargs,
+            )[0]
+    generated = output[prompt_length:].tolist()
+    GENERATION_STATS.record_tokens(call_site, constrained, len(generated))
+    stopped = (bool(generated) and generated[-1] == eos_id) or any(c.update(generated) for c in criteria)
+    GENERATION_PROFILES.record(
+        call_site, len(generated), max_new_tokens, truncated=len(generated) >= max_new_tokens and not stopped
+    )
+    text = tokenizer.decode(generated)
+    return cut_at_stop(text, profile.stop) if profile.stop else text
\ No newline at end of file
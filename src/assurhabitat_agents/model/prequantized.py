@@ -0,0 +1,179 @@
+# src/assurhabitat_agents/model/prequantized.py
+"""
+Pre-quantized, memory-mapped model checkpoints.
+
+Without them every worker start downloads Devstral in bf16 and quantizes it
+to NF4 with bitsandbytes, and loads Qwen2-VL from the hub cache with
+offload_buffers. The offline export saves each model once, as it is used at
+inference (Devstral already in NF4, Qwen2-VL in fp16), in safetensors
+shards. from_pretrained then memory-maps the shards and copies them to the
+GPU without re-quantizing.
+
+A checkpoint directory holds the shards, the config (with the quantization
+config for Devstral), the processor for Qwen2-VL, and a manifest. The
+loaders only use a checkpoint whose manifest names the configured base
+model; otherwise they fall back to the hub.
+
+Export (GPU node), printing the load time before and after:
+    cd src && python -m assurhabitat_agents.model.prequantized --llm-dir models/devstral-nf4 --vlm-dir models/qwen2-vl-fp16
+"""
+import argparse
+import gc
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+MANIFEST = "prequantized.json"
+
+
+# =========================
+# Manifest
+# =========================
+def write_manifest(out_dir, source: str, precision: str) -> Path:
+    """Record which base model the checkpoint in out_dir was exported from."""
+    out_dir = Path(out_dir)
+    path = out_dir / MANIFEST
+    path.write_text(json.dumps({
+        "source": source,
+        "precision": precision,
+        "format": "safetensors",
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }, indent=2), encoding="utf-8")
+    return path
+
+
+def find_prequantized(checkpoint_dir: Optional[str], source: str) -> Optional[Path]:
+    """
+    The checkpoint directory if it holds safetensors shards exported from
+    `source`, else None (missing, stale or incomplete export).
+    """
+    if not checkpoint_dir:
+        return None
+    path = Path(checkpoint_dir)
+    manifest = path / MANIFEST
+    if not manifest.is_file():
+        return None
+    try:
+        info = json.loads(manifest.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        print(f"[prequantized] unreadable manifest in {path}, loading {source} from the hub")
+        return None
+    if info.get("source") != source:
+        print(f"[prequantized] {path} was exported from {info.get('source')}, not {source}; loading from the hub")
+        return None
+    if not any(path.glob("*.safetensors")):
+        print(f"[prequantized] no safetensors shards in {path}; loading {source} from the hub")
+        return None
+    return path
+
+
+# =========================
+# Load times
+# =========================
+class LoadStats:
+    """Last load time of each model and where it was loaded from ("hub" or "prequantized")."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, model: str, source: str, seconds: float) -> None:
+        with self._lock:
+            self._data[model] = {"source": source, "seconds": round(seconds, 3)}
+        print(f"[load] {model} from {source}: {seconds:.1f}s")
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {model: dict(entry) for model, entry in self._data.items()}
+
+
+LOAD_STATS = LoadStats()
+
+
+# =========================
+# Offline export (GPU node)
+# =========================
+def _release() -> None:
+    """Free the device memory of a model the caller has already deleted (`del model` first)."""
+    import torch
+
+    gc.collect()
+    if torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+
+def export_llm(out_dir) -> Dict[str, float]:
+    """Quantize Devstral once and save it; returns the load time before/after (s)."""
+    from assurhabitat_agents.config.model_config import LLM_BASE_MODEL
+    from assurhabitat_agents.model import llm_model_loading as llm
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    model = llm._quantize_from_hub()
+    before = time.perf_counter() - start
+    model.save_pretrained(out_dir, safe_serialization=True, max_shard_size="2GB")
+    write_manifest(out_dir, LLM_BASE_MODEL, "nf4")
+    del model
+    _release()
+
+    start = time.perf_counter()
+    model = llm._load_prequantized(out_dir)
+    after = time.perf_counter() - start
+    del model
+    _release()
+    return {"hub_quantize_seconds": before, "prequantized_seconds": after}
+
+
+def export_vlm(out_dir) -> Dict[str, float]:
+    """Save Qwen2-VL (fp16) and its processor; returns the load time before/after (s)."""
+    from assurhabitat_agents.config.model_config import VLM_BASE_MODEL
+    from assurhabitat_agents.model import vlm_model_loading as vlm
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    processor, model = vlm._vlm_from_hub()
+    before = time.perf_counter() - start
+    model.save_pretrained(out_dir, safe_serialization=True, max_shard_size="2GB")
+    processor.save_pretrained(out_dir)
+    write_manifest(out_dir, VLM_BASE_MODEL, "fp16")
+    del model
+    _release()
+
+    start = time.perf_counter()
+    _, model = vlm._load_prequantized(out_dir)
+    after = time.perf_counter() - start
+    del model
+    _release()
+    return {"hub_quantize_seconds": before, "prequantized_seconds": after}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export pre-quantized, memory-mappable checkpoints")
+    parser.add_argument("--llm-dir", default="models/devstral-nf4")
+    parser.add_argument("--vlm-dir", default="models/qwen2-vl-fp16")
+    parser.add_argument("--skip-llm", action="store_true")
+    parser.add_argument("--skip-vlm", action="store_true")
+    args = parser.parse_args()
+
+    exports = []
+    if not args.skip_llm:
+        exports.append(("llm", export_llm, args.llm_dir))
+    if not args.skip_vlm:
+        exports.append(("vlm", export_vlm, args.vlm_dir))
+    for name, export, out_dir in exports:
+        times = export(out_dir)
+        print(f"{name} -> {out_dir}: load {times['hub_quantize_seconds']:.1f}s (hub) "
+              f"-> {times['prequantized_seconds']:.1f}s (pre-quantized), "
+              f"x{times['hub_quantize_seconds'] / times['prequantized_seconds']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+# src/assurhabitat_agents/model/speculative_decoding.py
+"""
+Speculative (assisted) decoding with a small draft model.
+
+At each round the draft model proposes `num_draft_tokens` tokens greedily,
+then the target model scores all of them in a single forward pass. The
+longest prefix of the proposal that matches the target's own greedy choice
+is accepted, plus one token from the target (the correction, or a bonus
+token when everything matched). The output is therefore exactly the greedy
+output of the target model; only the number of target forward passes
+changes. ReAct steps and tool JSON are short and templated, so most draft
+tokens are accepted.
+
+Logits processors and stopping criteria (constrained decoding, JSON stop)
+are applied by the target on the accepted prefix only, one position at a
+time, so their incremental state never sees a rejected draft token.
+
+Both models must share the tokenizer vocabulary. Tests use tiny randomly
+initialised CPU models.
+"""
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def vocab_size(model) -> int:
+    """Number of rows of the output (LM head) matrix."""
+    return model.get_output_embeddings().weight.shape[0]
+
+
+def check_draft_compatible(target, draft) -> None:
+    """Raise ValueError when the draft model cannot propose tokens for the target."""
+    if vocab_size(draft) != vocab_size(target):
+        raise ValueError(
+            f"Draft model vocabulary ({vocab_size(draft)}) differs from the target's ({vocab_size(target)})."
+        )
+
+
+def _forward(model, tokens, cache):
+    """Feed `tokens` (1 x n) after the cached prefix and return the logits (n x vocab)."""
+    out = model(input_ids=tokens, past_key_values=cache, use_cache=True)
+    return out.logits[0]
+
+
+def speculative_generate(
+    target,
+    draft,
+    input_ids,
+    max_new_tokens: int,
+    num_draft_tokens: int = 4,
+    eos_token_id: Optional[int] = None,
+    logits_processor=None,
+    stopping_criteria=None,
+    call_site: str = "llm",
+    stats: Optional["SpeculativeStats"] = None,
+):
+    """
+    Greedy generation of `target` assisted by `draft`.
+    input_ids: 1 x prompt_length tensor. Returns the 1 x (prompt + generated)
+    tensor, like model.generate().
+    """
+    import torch
+    from transformers import DynamicCache
+
+    stats = stats if stats is not None else SPECULATIVE_STATS
+    start = time.perf_counter()
+    device = input_ids.device
+    ids = input_ids
+    prompt_length = ids.shape[1]
+    target_cache, draft_cache = DynamicCache(), DynamicCache()
+    proposed = accepted_total = target_steps = 0
+    finished = False
+
+    with torch.no_grad():
+        while not finished:
+            length = ids.shape[1]
+            budget = max_new_tokens - (length - prompt_length)
+            if budget <= 0:
+                break
+
+            # ---- draft: propose up to k tokens (the target adds one more) ----
+            drafts = []
+            k = min(num_draft_tokens, budget - 1)
+            if k > 0:
+                feed = ids[:, draft_cache.get_seq_length():]
+                for _ in range(k):
+                    token = int(_forward(draft, feed, draft_cache)[-1].argmax())
+                    drafts.append(token)
+                    if token == eos_token_id:
+                        break
+                    feed = torch.tensor([[token]], device=device)
+            proposed += len(drafts)
+
+            # ---- target: score the prefix tail and all the drafts in one pass ----
+            cached = target_cache.get_seq_length()
+            feed = torch.cat([ids[:, cached:], torch.tensor([drafts], dtype=ids.dtype, device=device)], dim=1)
+            logits = _forward(target, feed, target_cache)
+            target_steps += 1
+            # row predicting the first token after ids
+            offset = length - cached - 1
+
+            new_tokens = []
+            accepted = 0
+            for i in range(len(drafts) + 1):
+                scores = logits[offset + i].unsqueeze(0)
+                current = torch.cat([ids, torch.tensor([new_tokens], dtype=ids.dtype, device=device)], dim=1)
+                if logits_processor is not None:
+                    scores = logits_processor(current, scores)
+                token = int(scores.argmax(-1))
+                new_tokens.append(token)
+                current = torch.cat([current, torch.tensor([[token]], dtype=ids.dtype, device=device)], dim=1)
+
+                if token == eos_token_id or len(new_tokens) >= budget:
+                    finished = True
+                elif stopping_criteria is not None and bool(stopping_criteria(current, scores).all()):
+                    finished = True
+                matched = i < len(drafts) and token == drafts[i]
+                accepted += matched
+                if finished or not matched:
+                    break
+
+            accepted_total += accepted
+            ids = current
+            # keep only the cache entries of accepted tokens (at most len(ids) - 1,
+            # the last token is fed at the next round)
+            keep = min(length + accepted, ids.shape[1] - 1)
+            target_cache.crop(keep)
+            draft_cache.crop(min(keep, draft_cache.get_seq_length()))
+
+    stats.record(
+        call_site,
+        proposed=proposed,
+        accepted=accepted_total,
+        target_steps=target_steps,
+        new_tokens=ids.shape[1] - prompt_length,
+        seconds=time.perf_counter() - start,
+    )
+    return ids
+
+
+class SpeculativeStats:
+    """
+    Per call site counters of speculative decoding:
+      - acceptance_rate: accepted / proposed draft tokens
+      - tokens_per_target_step: new tokens per target forward pass, i.e. the
+        speedup over plain greedy decoding if the draft were free
+      - tokens_per_second: measured decode throughput
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data: Dict[str, Dict[str, float]] = {}
+
+    def record(self, call_site: str, proposed: int, accepted: int, target_steps: int, new_tokens: int, seconds: float) -> None:
+        with self._lock:
+            entry = self._data.setdefault(
+                call_site,
+                {"calls": 0, "proposed": 0, "accepted": 0, "target_steps": 0, "new_tokens": 0, "seconds": 0.0},
+            )
+            entry["calls"] += 1
+            entry["proposed"] += proposed
+            entry["accepted"] += accepted
+            entry["target_steps"] += target_steps
+            entry["new_tokens"] += new_tokens
+            entry["seconds"] += seconds
+
+    def reset(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            report: Dict[str, Dict[str, Any]] = {}
+            for call_site, entry in self._data.items():
+                report[call_site] = {
+                    **entry,
+                    "acceptance_rate": entry["accepted"] / entry["proposed"] if entry["proposed"] else 0.0,
+                    "tokens_per_target_step": entry["new_tokens"] / entry["target_steps"] if entry["target_steps"] else 0.0,
+                    "tokens_per_second": entry["new_tokens"] / entry["seconds"] if entry["seconds"] else 0.0,
+                }
+            return report
+
+
+SPECULATIVE_STATS = SpeculativeStats()
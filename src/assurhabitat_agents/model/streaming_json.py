@@ -0,0 +1,255 @@
+# src/assurhabitat_agents/model/streaming_json.py
+"""
+Incremental JSON parser / repairer for model outputs.
+
+`StreamingJsonParser` consumes the generated text chunk by chunk (one
+decoded token at a time during generation, or the whole output at once)
+and rewrites it, in a single linear pass, into strict JSON:
+  - text before the first '{' and after the top-level close is dropped,
+  - single-quoted strings become double-quoted,
+  - unquoted identifiers become strings ([door] -> ["door"]),
+    True/False/None become true/false/null,
+  - trailing commas are removed,
+  - raw newlines / tabs inside strings are escaped,
+  - on close(), unterminated strings and containers are closed.
+
+`feed()` returns True as soon as the top-level value is closed, which
+`JsonStopCriteria` uses to stop generate() early.
+"""
+import json
+import re
+from typing import Any, Callable, List, Optional
+
+_NUMBER = re.compile(r"-?(0|[1-9][0-9]*)(\.[0-9]+)?([eE][+-]?[0-9]+)?")
+_BAREWORD_END = set(",:]}[{\"'")
+_CLOSERS = {"{": "}", "[": "]"}
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null", "true": "true", "false": "false", "null": "null"}
+_STRING_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+# runs of characters copied as-is, so long strings / words skip the per-char path
+_STRING_RUN = re.compile(r"[^\"'\\\x00-\x1f]+")
+_BAREWORD_RUN = re.compile(r"[^,:\]}\[{\"']+")
+
+
+class StreamingJsonParser:
+    """
+    Single-pass JSON repairer.
+
+    Each open container is a frame [opener, expecting] where expecting is
+    "key" | "colon" | "value" | "comma" for objects and "value" | "comma"
+    for arrays.
+    """
+
+    def __init__(self, start_chars: str = "{"):
+        self.start_chars = start_chars
+        self.out: List[str] = []
+        self.stack: List[list] = []
+        self.started = False
+        self.done = False
+        # string state
+        self._quote: Optional[str] = None
+        self._escaped = False
+        # bareword state
+        self._word: Optional[List[str]] = None
+        self._pending_comma = False
+
+    # ---- public API ----
+    def feed(self, chunk: str) -> bool:
+        """Consume a chunk; returns True once the top-level value is closed."""
+        i, n = 0, len(chunk)
+        while i < n and not self.done:
+            if not self.started:
+                starts = [j for j in (chunk.find(c, i) for c in self.start_chars) if j != -1]
+                if not starts:
+                    break
+                i = min(starts)
+            elif self._quote is not None and not self._escaped:
+                m = _STRING_RUN.match(chunk, i)
+                if m:
+                    self.out.append(m.group())
+                    i = m.end()
+                    continue
+            elif self._word is not None:
+                m = _BAREWORD_RUN.match(chunk, i)
+                if m:
+                    self._word.append(m.group())
+                    i = m.end()
+                    continue
+            self._feed_char(chunk[i])
+            i += 1
+        return self.done
+
+    def close(self) -> Any:
+        """
+        Finish the document (closing whatever is still open) and return the
+        parsed value. Raises ValueError if no JSON value was found.
+        """
+        if not self.started:
+            raise ValueError("No JSON object found in model output")
+        if not self.done:
+            if self._quote is not None:
+                if self._escaped:
+                    self.out.append("\\")
+                self.out.append('"')
+                self._quote = None
+                self._value_done()
+            self._flush_word()
+            while self.stack:
+                opener, expecting = self.stack[-1]
+                if opener == "{" and expecting == "colon":
+                    self.out.append(":null")
+                elif opener == "{" and expecting == "value":
+                    self.out.append("null")
+                self._close_container()
+        try:
+            return json.loads("".join(self.out))
+        except Exception as e:
+            raise ValueError(f"Could not repair model output as JSON: {e}")
+
+    # ---- transitions ----
+    def _value_done(self) -> None:
+        if not self.stack:
+            self.done = True
+            return
+        top = self.stack[-1]
+        if top[0] == "{":
+            top[1] = "colon" if top[1] == "key" else "comma"
+        else:
+            top[1] = "comma"
+
+    def _before_item(self) -> None:
+        """
+        Emit the comma deferred from the previous item (so trailing commas
+        are dropped), or insert a missing one.
+        """
+        top = self.stack[-1]
+        if top[1] == "comma":
+            top[1] = "key" if top[0] == "{" else "value"
+            self._pending_comma = True
+        if self._pending_comma:
+            self.out.append(",")
+            self._pending_comma = False
+
+    def _close_container(self) -> None:
+        opener, _ = self.stack.pop()
+        self._pending_comma = False
+        self.out.append(_CLOSERS[opener])
+        self._value_done()
+
+    def _flush_word(self) -> None:
+        if self._word is None:
+            return
+        word = "".join(self._word).strip()
+        self._word = None
+        in_key = bool(self.stack) and self.stack[-1] == ["{", "key"]
+        if not in_key and word in _PYTHON_LITERALS:
+            self.out.append(_PYTHON_LITERALS[word])
+        elif not in_key and _NUMBER.fullmatch(word):
+            self.out.append(word)
+        else:
+            self.out.append(json.dumps(word, ensure_ascii=False))
+        self._value_done()
+
+    def _feed_char(self, ch: str) -> None:
+        if not self.started:
+            if ch in self.start_chars:
+                self.started = True
+                self.stack.append([ch, "key" if ch == "{" else "value"])
+                self.out.append(ch)
+            return
+
+        # inside a string
+        if self._quote is not None:
+            if self._escaped:
+                self._escaped = False
+                if ch == "'":
+                    self.out.append("'")
+                else:
+                    self.out.append("\\" + ch)
+            elif ch == "\\":
+                self._escaped = True
+            elif ch == self._quote:
+                self.out.append('"')
+                self._quote = None
+                self._value_done()
+            elif ch == '"':
+                self.out.append('\\"')
+            else:
+                self.out.append(_STRING_ESCAPES.get(ch, ch))
+            return
+
+        # inside a bareword
+        if self._word is not None:
+            if ch not in _BAREWORD_END:
+                self._word.append(ch)
+                return
+            self._flush_word()
+
+        if ch.isspace():
+            return
+        if ch in "\"'":
+            self._before_item()
+            self._quote = ch
+            self.out.append('"')
+        elif ch in "{[":
+            self._before_item()
+            self.stack.append([ch, "key" if ch == "{" else "value"])
+            self.out.append(ch)
+        elif ch in "}]":
+            # close up to the matching opener (a missing closer is implied)
+            opener = "{" if ch == "}" else "["
+            if not any(frame[0] == opener for frame in self.stack):
+                return
+            while self.stack:
+                top_opener, expecting = self.stack[-1]
+                if top_opener == "{" and expecting == "colon":
+                    self.out.append(":null")
+                elif top_opener == "{" and expecting == "value":
+                    self.out.append("null")
+                self._close_container()
+                if top_opener == opener or self.done:
+                    break
+        elif ch == ",":
+            top = self.stack[-1]
+            if top[1] == "comma":
+                top[1] = "key" if top[0] == "{" else "value"
+                self._pending_comma = True
+        elif ch == ":":
+            top = self.stack[-1]
+            if top[0] == "{" and top[1] == "colon":
+                top[1] = "value"
+                self.out.append(":")
+        else:
+            self._before_item()
+            self._word = [ch]
+
+
+def parse_json_text(text: str, start_chars: str = "{") -> Any:
+    """Repair and parse a complete model output. Raises ValueError if no JSON is found."""
+    parser = StreamingJsonParser(start_chars)
+    parser.feed(text)
+    return parser.close()
+
+
+class JsonStopCriteria:
+    """
+    transformers StoppingCriteria: feeds each new token to a
+    StreamingJsonParser and stops generation once the JSON object is closed.
+    """
+
+    def __init__(self, token_text: Callable[[int], Optional[str]], prompt_length: int):
+        self.parser = StreamingJsonParser()
+        self.token_text = token_text
+        self.prompt_length = prompt_length
+        self._consumed = 0
+
+    def update(self, generated_ids) -> bool:
+        for token_id in generated_ids[self._consumed:]:
+            self.parser.feed(self.token_text(token_id) or "")
+        self._consumed = len(generated_ids)
+        return self.parser.done
+
+    def __call__(self, input_ids, scores, **kwargs):
+        import torch
+
+        done = self.update(input_ids[0, self.prompt_length:].tolist())
+        return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
@@ -1,20 +1,36 @@
 # src/assurhabitat_agents/model/vlm_model_loading.py
 
+import time
+
 import torch
 from functools import lru_cache
-from transformers import AutoProcessor, AutoModelForImageTextToText
+from transformers import AutoProcessor, AutoModelForImageTextToText, LogitsProcessorList, StoppingCriteriaList
 from huggingface_hub import login
 from qwen_vl_utils import process_vision_info
 
-from assurhabitat_agents.config.model_config import HF_TOKEN, VLM_BASE_MODEL
+from assurhabitat_agents.config.model_config import (
+    HF_TOKEN,
+    VLM_BASE_MODEL,
+    CONSTRAINED_DECODING,
+    VLM_PREQUANTIZED_DIR,
+)
 from assurhabitat_agents.config.langfuse_config import observe
+from assurhabitat_agents.runtime.cpu_tasks import get_prefetched_image
+from assurhabitat_agents.model.constrained_decoding import (
+    GENERATION_STATS,
+    JsonSchemaLogitsProcessor,
+    build_token_strings,
+)
+from assurhabitat_agents.model.streaming_json import JsonStopCriteria
+from assurhabitat_agents.model.generation_profiles import GENERATION_PROFILES, StopSequenceCriteria, cut_at_stop
+from assurhabitat_agents.model.prequantized import LOAD_STATS, find_prequantized
+from assurhabitat_agents.runtime.device_memory import register_model, reserve_generation
 
 device = "cuda" if torch.cuda.is_available() else "cpu"
 
 
-@lru_cache(maxsize=1)
-def load_vlm():
-    """Load processor + model once"""
+def _vlm_from_hub():
+    """Processor + Qwen2-VL from the hub cache."""
     processor = AutoProcessor.from_pretrained(VLM_BASE_MODEL)
     model = AutoModelForImageTextToText.from_pretrained(
         VLM_BASE_MODEL,
@@ -24,10 +40,60 @@ def load_vlm():
     )
     return processor, model
 
+def _load_prequantized(checkpoint):
+    """fp16 checkpoint + processor saved by model/prequantized.py, memory-mapped safetensors."""
+    processor = AutoProcessor.from_pretrained(checkpoint)
+    model = AutoModelForImageTextToText.from_pretrained(
+        checkpoint,
+        torch_dtype=torch.float16 if device == "cuda" else torch.float32,
+        device_map="auto",
+    )
+    return processor, model
+
+@lru_cache(maxsize=1)
+def load_vlm():
+    """Load processor + model once"""
+    start = time.perf_counter()
+    checkpoint = find_prequantized(VLM_PREQUANTIZED_DIR, VLM_BASE_MODEL)
+    if checkpoint is not None:
+        processor, model = _load_prequantized(checkpoint)
+    else:
+        processor, model = _vlm_from_hub()
+    LOAD_STATS.record("vlm", "prequantized" if checkpoint is not None else "hub", time.perf_counter() - start)
+    register_model("vlm", model)
+    return processor, model
+
+@lru_cache(maxsize=1)
+def _vlm_token_strings():
+    """Text of every Qwen2-VL token, computed once for constrained decoding."""
+    processor, model = load_vlm()
+    tok = processor.tokenizer
+    special_ids = set(tok.all_special_ids)
+
+    def decode_token(token_id):
+        if token_id in special_ids:
+            return None
+        text = tok.decode([token_id])
+        # byte-level pieces of a multi-byte character
+        return None if "\ufffd" in text else text
+
+    return build_token_strings(len(tok), decode_token), _eos_ids(model)[0]
+
+
+def _eos_ids(model) -> tuple:
+    """EOS token ids of the generation config (Qwen2-VL has several)."""
+    eos_id = model.generation_config.eos_token_id
+    return tuple(eos_id) if isinstance(eos_id, (list, tuple)) else (eos_id,)
+
 @observe(name="vlm inference")
-def vlm_inference(image_path: list[str], text: str):
+def vlm_inference(image_path: list[str], text: str, json_schema: dict | None = None, call_site: str = "vlm"):
     processor, model = load_vlm()
 
+    # Use the image already decoded by the CPU pool when available
+    image = get_prefetched_image(image_path)
+    if image is None:
+        image = image_path
+
     # Build multimodal content block
     # contents = [{"type": "image", "image": p} for p in image_paths]
     # contents.append({"type": "text", "text": text})
@@ -37,7 +103,7 @@ def vlm_inference(image_path: list[str], text: str):
         {
             "role": "user",
             "content": [
-                {"type": "image", "image": image_path},
+                {"type": "image", "image": image},
                 {"type": "text", "text": text},
             ],
         }
@@ -60,17 +126,52 @@ def vlm_inference(image_path: list[str], text: str):
         return_tensors="pt",
     ).to(model.device)
 
-    # Step 4: generate
-    output_ids = model.generate(**inputs, max_new_tokens=128)
+    # Step 4: generate (constrained to the JSON schema, or stopped when the JSON closes),
+    # with the token cap / temperature / stop strings of the call site
+    profile = GENERATION_PROFILES.profile(call_site)
+    max_new_tokens = GENERATION_PROFILES.max_new_tokens(call_site)
+    prompt_length = inputs.input_ids.shape[1]
+    constrained = json_schema is not None and CONSTRAINED_DECODING
+    generate_kwargs = {}
+    criteria = []
+    if constrained:
+        token_strings, eos_id = _vlm_token_strings()
+        generate_kwargs["logits_processor"] = LogitsProcessorList([
+            JsonSchemaLogitsProcessor(json_schema, token_strings, eos_id, prompt_length=prompt_length)
+        ])
+    elif json_schema is not None:
+        token_strings, _ = _vlm_token_strings()
+        criteria.append(JsonStopCriteria(lambda i: token_strings[i] if i < len(token_strings) else None, prompt_length))
+    if profile.stop:
+        token_strings, _ = _vlm_token_strings()
+        criteria.append(StopSequenceCriteria(
+            lambda i: token_strings[i] if i < len(token_strings) else None, prompt_length, profile.stop
+        ))
+    if criteria:
+        generate_kwargs["stopping_criteria"] = StoppingCriteriaList(criteria)
+    if profile.temperature > 0.0:
+        generate_kwargs.update(do_sample=True, temperature=profile.temperature)
+    else:
+        generate_kwargs["do_sample"] = False
+    with reserve_generation("vlm", prompt_length + max_new_tokens):
+        output_ids = model.generate(**inputs, max_new_tokens=max_new_tokens, **generate_kwargs)
 
     # Remove prompt part
     trimmed = [
         out[len(inp):] for inp, out in zip(inputs.input_ids, output_ids)
     ]
+    GENERATION_STATS.record_tokens(call_site, constrained, len(trimmed[0]))
+    generated = trimmed[0].tolist()
+    # EOS from the generation config: the token table is only built for constrained / stopped calls
+    stopped = (bool(generated) and generated[-1] in _eos_ids(model)) or any(c.update(generated) for c in criteria)
+    GENERATION_PROFILES.record(
+        call_site, len(generated), max_new_tokens, truncated=len(generated) >= max_new_tokens and not stopped
+    )
 
     # Step 5: decode
-    return processor.batch_decode(
+    text = processor.batch_decode(
         trimmed,
         skip_special_tokens=True,
         clean_up_tokenization_spaces=False
-    )[0]
\ No newline at end of file
+    )[0]
+    return cut_at_stop(text, profile.stop) if profile.stop else text
\ No newline at end of file
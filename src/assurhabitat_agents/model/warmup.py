@@ -0,0 +1,179 @@
+# src/assurhabitat_agents/model/warmup.py
+"""
+Model warm-up at worker start.
+
+The loaders are lru_cached and would otherwise run on the first claim, which
+then pays for the weight download, the 4-bit quantization, the CUDA context
+and the first-call kernel selection. warm_up() does all of it up front, per
+model:
+  - load the model (and the draft model of speculative decoding),
+  - build the token tables of constrained decoding,
+  - run a representative free-form and JSON-constrained generation
+    (a ReAct step for the LLM, a photo description for the VLM).
+
+WARMUP records each step's duration and error and the total cold-start time.
+The HTTP service reports it on /readyz, which stays 503 until every model is
+warm, so a load balancer never routes a claim to a cold worker.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+Step = Tuple[str, Callable[[], Any]]
+
+WARMUP_CALL_SITE = "warmup"
+
+_REACT_PROMPT = (
+    "You are the Declaration Agent for AssurHabitat. Decide the next step.\n"
+    "User declaration: Fuite d'eau dans la salle de bain hier soir, le plafond est abîmé.\n"
+    "Now propose the next single Thought + Action (or final answer)."
+)
+_JSON_PROMPT = (
+    "Does the guarantee cover a water leak in the bathroom? "
+    'Answer strictly in JSON: {"guaranteed": true, "description": "..."}'
+)
+_VLM_PROMPT = (
+    "Describe what is visible in the picture in 1–2 sentences and list the visible damage types. "
+    'Answer strictly in JSON: {"description": "...", "detected_damage_types": ["water"]}'
+)
+
+
+# =========================
+# Default steps (GPU node)
+# =========================
+def _llm_steps() -> List[Step]:
+    from assurhabitat_agents.config.tool_schemas import CHECK_GUARANTEE_SCHEMA
+    from assurhabitat_agents.model import llm_model_loading as llm
+
+    return [
+        ("load", llm._load_model),
+        ("load_draft", llm._load_draft_model),
+        ("token_strings", llm._llm_token_strings),
+        ("generate", lambda: llm.llm_inference(_REACT_PROMPT, call_site=WARMUP_CALL_SITE)),
+        ("generate_json", lambda: llm.llm_inference(
+            _JSON_PROMPT, json_schema=CHECK_GUARANTEE_SCHEMA, call_site=WARMUP_CALL_SITE
+        )),
+    ]
+
+
+def _dummy_photo():
+    """A small synthetic picture (grey wall with a darker stain)."""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGB", (448, 448), (200, 200, 195))
+    ImageDraw.Draw(image).ellipse((120, 80, 330, 260), fill=(120, 110, 90))
+    return image
+
+
+def _vlm_steps() -> List[Step]:
+    from assurhabitat_agents.config.tool_schemas import CHECK_CONFORMITY_SCHEMA
+    from assurhabitat_agents.model import vlm_model_loading as vlm
+
+    return [
+        ("load", vlm.load_vlm),
+        ("token_strings", vlm._vlm_token_strings),
+        ("generate_json", lambda: vlm.vlm_inference(
+            _dummy_photo(), _VLM_PROMPT, json_schema=CHECK_CONFORMITY_SCHEMA, call_site=WARMUP_CALL_SITE
+        )),
+    ]
+
+
+def default_warmup_steps() -> Dict[str, Callable[[], List[Step]]]:
+    """Steps per model, built lazily (importing them loads torch/transformers)."""
+    return {"llm": _llm_steps, "vlm": _vlm_steps}
+
+
+# =========================
+# State
+# =========================
+class WarmupState:
+    """Progress and timings of the warm-up, per model."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._models: Dict[str, Dict[str, Any]] = {}
+            self._started_at: Optional[float] = None
+            self._finished_at: Optional[float] = None
+
+    def start(self, models: Sequence[str]) -> None:
+        with self._lock:
+            self._started_at = time.perf_counter()
+            self._finished_at = None
+            self._models = {name: {"status": "pending", "seconds": 0.0, "steps": {}, "error": None} for name in models}
+
+    def model_started(self, name: str) -> None:
+        with self._lock:
+            self._models[name]["status"] = "warming"
+
+    def step_done(self, name: str, step: str, seconds: float) -> None:
+        with self._lock:
+            self._models[name]["steps"][step] = round(seconds, 3)
+            self._models[name]["seconds"] += seconds
+
+    def model_done(self, name: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            self._models[name]["status"] = "failed" if error else "warm"
+            self._models[name]["error"] = error
+
+    def finish(self) -> None:
+        with self._lock:
+            self._finished_at = time.perf_counter()
+
+    def warm_state(self) -> Dict[str, bool]:
+        """{model: warm?} (the readiness signal)."""
+        with self._lock:
+            return {name: m["status"] == "warm" for name, m in self._models.items()}
+
+    def ready(self) -> bool:
+        state = self.warm_state()
+        return bool(state) and all(state.values())
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            if self._started_at is None:
+                status, elapsed = "not_started", None
+            elif self._finished_at is None:
+                status, elapsed = "running", time.perf_counter() - self._started_at
+            else:
+                status, elapsed = "done", self._finished_at - self._started_at
+            return {
+                "status": status,
+                "cold_start_seconds": round(elapsed, 3) if elapsed is not None else None,
+                "models": {name: {**m, "steps": dict(m["steps"])} for name, m in self._models.items()},
+            }
+
+
+WARMUP = WarmupState()
+
+
+def warm_up(
+    models: Sequence[str] = ("llm", "vlm"),
+    steps: Optional[Dict[str, Callable[[], List[Step]]]] = None,
+    state: WarmupState = WARMUP,
+) -> Dict[str, Any]:
+    """
+    Load and exercise each model in turn. A failing step marks its model
+    "failed" (the worker never becomes ready) without stopping the others.
+    Returns state.report().
+    """
+    steps = steps or default_warmup_steps()
+    state.start(models)
+    for name in models:
+        state.model_started(name)
+        error = None
+        try:
+            for step_name, fn in steps[name]():
+                start = time.perf_counter()
+                fn()
+                state.step_done(name, step_name, time.perf_counter() - start)
+                print(f"[warmup] {name}.{step_name}: {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"[warmup] {name} failed: {error}")
+        state.model_done(name, error)
+    state.finish()
+    return state.report()
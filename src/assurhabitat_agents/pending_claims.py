@@ -0,0 +1,100 @@
+# src/assurhabitat_agents/pending_claims.py
+"""
+Claims suspended on a question to the policyholder.
+
+When an agent calls AskHuman, its graph stops and the Orchestrator saves the
+graph state here (JSON in SQLite) instead of holding a worker while a person
+types. Orchestrator.resume() reloads the state, injects the reply and
+continues from the agent's `action` node. A suspended claim costs one row.
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_claims (
+    claim_id     TEXT PRIMARY KEY,
+    stage        TEXT NOT NULL,
+    question     TEXT NOT NULL,
+    state        TEXT NOT NULL,
+    claim        TEXT NOT NULL,
+    suspended_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+
+class PendingClaimStore:
+    """
+    SQLite store of suspended claims. Each record holds:
+      - stage: the agent that asked ("declaration" | "expertise"),
+      - state: the agent graph state at the suspension point,
+      - claim: what the Orchestrator needs to continue (input, earlier results).
+    ":memory:" keeps the records in the process only.
+    """
+
+    def __init__(self, db_path: Union[str, Path] = ":memory:"):
+        if str(db_path) != ":memory:":
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self.db_path = str(db_path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.db_path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def save(self, claim_id: str, stage: str, question: str, state: Dict[str, Any], claim: Dict[str, Any]) -> None:
+        """Insert or replace the suspension point of a claim."""
+        row = (
+            claim_id,
+            stage,
+            question,
+            json.dumps(state, ensure_ascii=False, default=str),
+            json.dumps(claim, ensure_ascii=False, default=str),
+            time.time(),
+        )
+        with self._lock:
+            with self._conn:
+                self._conn.execute("INSERT OR REPLACE INTO pending_claims VALUES (?, ?, ?, ?, ?, ?)", row)
+
+    def get(self, claim_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage, question, state, claim, suspended_at FROM pending_claims WHERE claim_id = ?",
+                (claim_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        stage, question, state, claim, suspended_at = row
+        return {
+            "claim_id": claim_id,
+            "stage": stage,
+            "question": question,
+            "state": json.loads(state),
+            "claim": json.loads(claim),
+            "suspended_at": suspended_at,
+        }
+
+    def delete(self, claim_id: str) -> None:
+        with self._lock:
+            with self._conn:
+                self._conn.execute("DELETE FROM pending_claims WHERE claim_id = ?", (claim_id,))
+
+    def pending(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Oldest suspended claims first, without their states."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT claim_id, stage, question, suspended_at FROM pending_claims ORDER BY suspended_at LIMIT ?",
+                (limit,),
+            ).fetchall()
+        return [dict(zip(("claim_id", "stage", "question", "suspended_at"), row)) for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pending_claims").fetchone()[0]
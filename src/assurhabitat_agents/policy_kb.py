@@ -0,0 +1,392 @@
+# src/assurhabitat_agents/policy_kb.py
+"""
+Compiled policy knowledge base (sinistres.yaml + garanties.yaml).
+
+The YAML files are parsed once into a PolicyKB: frozen, slotted records,
+merged document lists computed at build time and an alias index, so every
+lookup is a dict get. Tools and agents share the same instance through
+utils.get_policy_kb() / load_policy_kb().
+
+PolicyKBWatcher hot-reloads the files into new snapshots; pin_policy_kb()
+lets a claim keep the snapshot it started with.
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import yaml
+
+DEFAULT_REQUIRED_FIELDS = ("date_sinistre", "lieu")
+VOL_NOTES = "Dépôt de plainte requis dans les 24h, joindre numéro de procès-verbal."
+
+_NON_ALNUM = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_key(key: str) -> str:
+    """Normalize a sinistre key for lookups (lowercase, replace spaces)."""
+    if not key:
+        return ""
+    return key.strip().lower().replace(" ", "_")
+
+
+def fold_key(key: str) -> str:
+    """Looser form used for aliases: no accents, any separator becomes '_'."""
+    folded = unicodedata.normalize("NFKD", key.lower())
+    folded = "".join(ch for ch in folded if not unicodedata.combining(ch))
+    return _NON_ALNUM.sub("_", folded).strip("_")
+
+
+def _dedupe(items: Iterable[str]) -> Tuple[str, ...]:
+    """Remove duplicates, keeping the first occurrence (linear)."""
+    return tuple(dict.fromkeys(items))
+
+
+@dataclass(frozen=True, slots=True)
+class SinistreRecord:
+    key: str
+    nom: Optional[str]
+    delai_declaration_jours_ouvres: Optional[int]
+    attendu_assure: Tuple[str, ...]
+    pieces_justificatives: Tuple[str, ...]
+    process_assurance: Tuple[str, ...]
+    cloture: Tuple[str, ...]
+    required_fields: Tuple[str, ...]
+    # pieces_justificatives + pieces_generales, de-duplicated
+    documents: Tuple[str, ...]
+    notes: str
+
+    def expected_fields(self) -> Dict[str, Any]:
+        return {
+            "nom": self.nom,
+            "delai_declaration_jours_ouvres": self.delai_declaration_jours_ouvres,
+            "attendu_assure": list(self.attendu_assure),
+            "pieces_justificatives": list(self.pieces_justificatives),
+            "process_assurance": list(self.process_assurance),
+            "cloture": list(self.cloture),
+            "required_fields": list(self.required_fields),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class GuaranteeRecord:
+    key: str
+    couverture: Tuple[str, ...]
+    exclusions: Tuple[str, ...]
+    plafond: Optional[float]
+    franchise: Optional[float]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "couverture": list(self.couverture),
+            "exclusions": list(self.exclusions),
+            "plafond": self.plafond,
+            "franchise": self.franchise,
+        }
+
+
+class PolicyKB:
+    """
+    Read-only view of the policy configuration.
+
+    Lookups accept the YAML key, the display name ("Dégâts des eaux") or any
+    alias listed under `aliases:` in sinistres.yaml, with or without accents.
+    Unknown types raise KeyError, like the utils functions always did.
+    """
+
+    __slots__ = ("sinistres", "garanties", "obligations_generales", "pieces_generales", "version", "_aliases")
+
+    def __init__(self, sinistres_data: Mapping[str, Any], garanties_data: Mapping[str, Any], version: int = 0):
+        self.version = version
+        garanties_data = garanties_data or {}
+        self.pieces_generales: Tuple[str, ...] = _dedupe(garanties_data.get("pieces_generales") or [])
+        self.obligations_generales = MappingProxyType(dict(garanties_data.get("obligations_generales") or {}))
+
+        sinistres: Dict[str, SinistreRecord] = {}
+        aliases: Dict[str, str] = {}
+        for raw_key, data in ((sinistres_data or {}).get("sinistres") or {}).items():
+            if not data:
+                continue
+            key = normalize_key(raw_key)
+            pieces = tuple(data.get("pieces_justificatives") or [])
+            sinistres[key] = SinistreRecord(
+                key=key,
+                nom=data.get("nom"),
+                delai_declaration_jours_ouvres=data.get("delai_declaration_jours_ouvres"),
+                attendu_assure=tuple(data.get("attendu_assure") or []),
+                pieces_justificatives=pieces,
+                process_assurance=tuple(data.get("process_assurance") or []),
+                cloture=tuple(data.get("cloture") or []),
+                required_fields=tuple(data.get("required_fields") or DEFAULT_REQUIRED_FIELDS),
+                documents=_dedupe(pieces + self.pieces_generales),
+                notes=VOL_NOTES if key.startswith("vol") else "",
+            )
+            for alias in [raw_key, data.get("nom") or "", *(data.get("aliases") or [])]:
+                if alias:
+                    aliases.setdefault(normalize_key(alias), key)
+                    aliases.setdefault(fold_key(alias), key)
+
+        garanties: Dict[str, GuaranteeRecord] = {}
+        for raw_key, data in (garanties_data.get("garanties") or {}).items():
+            if not data:
+                continue
+            key = normalize_key(raw_key)
+            garanties[key] = GuaranteeRecord(
+                key=key,
+                couverture=tuple(data.get("couverture") or []),
+                exclusions=tuple(data.get("exclusions") or []),
+                plafond=data.get("plafond"),
+                franchise=data.get("franchise"),
+            )
+            aliases.setdefault(key, key)
+            aliases.setdefault(fold_key(raw_key), key)
+
+        self.sinistres: Mapping[str, SinistreRecord] = MappingProxyType(sinistres)
+        self.garanties: Mapping[str, GuaranteeRecord] = MappingProxyType(garanties)
+        self._aliases = aliases
+
+    # ---- lookups ----
+    def resolve(self, sinistre_type: str) -> str:
+        """Canonical key for a type name or alias ('' stays '', unknown names are only normalized)."""
+        if not sinistre_type:
+            return ""
+        key = self._aliases.get(sinistre_type)
+        if key is not None:
+            return key
+        normalized = normalize_key(sinistre_type)
+        return self._aliases.get(normalized) or self._aliases.get(fold_key(sinistre_type)) or normalized
+
+    def sinistre(self, sinistre_type: str) -> SinistreRecord:
+        record = self.sinistres.get(self.resolve(sinistre_type))
+        if record is None:
+            raise KeyError(f"Unknown sinistre type in sinistres.yaml: {sinistre_type}")
+        return record
+
+    def guarantee(self, sinistre_type: str) -> GuaranteeRecord:
+        record = self.garanties.get(self.resolve(sinistre_type))
+        if record is None:
+            raise KeyError(f"Unknown sinistre type in garanties.yaml: {sinistre_type}")
+        return record
+
+    def aliases_of(self, sinistre_type: str) -> Tuple[str, ...]:
+        """Every name resolving to the type (key, display name and aliases, folded)."""
+        key = self.resolve(sinistre_type)
+        return tuple(sorted(alias for alias, target in self._aliases.items() if target == key))
+
+    # ---- dict views (same shapes as the historical utils functions) ----
+    def expected_fields(self, sinistre_type: str) -> Dict[str, Any]:
+        return self.sinistre(sinistre_type).expected_fields()
+
+    def guarantee_for_type(self, sinistre_type: str) -> Dict[str, Any]:
+        return self.guarantee(sinistre_type).as_dict()
+
+    def required_documents(self, sinistre_type: str) -> Dict[str, Any]:
+        """Documents for a type; unknown types only get the general pieces."""
+        key = self.resolve(sinistre_type)
+        record = self.sinistres.get(key)
+        if record is None:
+            return {"documents": list(self.pieces_generales), "notes": VOL_NOTES if key.startswith("vol") else ""}
+        return {"documents": list(record.documents), "notes": record.notes}
+
+
+def _file_stamp(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_policy_kb(sinistres_path: Path, garanties_path: Path) -> PolicyKB:
+    """
+    Compiled KB for a pair of files, parsed once per version of the files
+    (raises like utils.load_yaml).
+    """
+    sinistres_path, garanties_path = Path(sinistres_path), Path(garanties_path)
+    try:
+        stamps = (_file_stamp(sinistres_path), _file_stamp(garanties_path))
+    except FileNotFoundError:
+        stamps = None
+    return _compile_files(sinistres_path, garanties_path, stamps)
+
+
+@lru_cache(maxsize=16)
+def _compile_files(sinistres_path: Path, garanties_path: Path, stamps) -> PolicyKB:
+    from assurhabitat_agents.utils import load_yaml
+
+    return PolicyKB(load_yaml(sinistres_path), load_yaml(garanties_path))
+
+
+# =========================
+# Validation
+# =========================
+def validate_policy_data(sinistres_data: Mapping[str, Any], garanties_data: Mapping[str, Any]) -> List[str]:
+    """Return the list of problems found in the two YAML documents (empty when valid)."""
+    errors: List[str] = []
+    sinistres = (sinistres_data or {}).get("sinistres")
+    garanties = (garanties_data or {}).get("garanties")
+    if not isinstance(sinistres, dict) or not sinistres:
+        errors.append("sinistres.yaml: missing 'sinistres' mapping")
+        sinistres = {}
+    if not isinstance(garanties, dict) or not garanties:
+        errors.append("garanties.yaml: missing 'garanties' mapping")
+        garanties = {}
+
+    for key, data in sinistres.items():
+        if not isinstance(data, dict):
+            errors.append(f"sinistres.{key}: expected a mapping")
+            continue
+        fields = data.get("required_fields", [])
+        if not isinstance(fields, list) or not all(isinstance(f, str) for f in fields):
+            errors.append(f"sinistres.{key}.required_fields: expected a list of field names")
+        if normalize_key(key) not in {normalize_key(k) for k in garanties}:
+            errors.append(f"sinistres.{key}: no matching entry in garanties.yaml")
+
+    for key, data in garanties.items():
+        if not isinstance(data, dict):
+            errors.append(f"garanties.{key}: expected a mapping")
+            continue
+        plafond, franchise = data.get("plafond"), data.get("franchise", 0)
+        for name, value in (("plafond", plafond), ("franchise", franchise)):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value < 0):
+                errors.append(f"garanties.{key}.{name}: expected a non-negative number, got {value!r}")
+        if isinstance(plafond, (int, float)) and isinstance(franchise, (int, float)) and franchise > plafond:
+            errors.append(f"garanties.{key}: franchise ({franchise}) is above plafond ({plafond})")
+    return errors
+
+
+# =========================
+# Hot reload
+# =========================
+class PolicyKBWatcher:
+    """
+    Holds the current KB snapshot for a pair of YAML files and swaps in a new
+    one when they change.
+
+    Changes are detected by (mtime, size) and confirmed by a content hash, so
+    touching a file does not rebuild anything. New content is parsed and
+    validated first; an invalid edit is reported and the previous snapshot
+    stays in place. The swap is a single reference assignment: readers get
+    either the old or the new snapshot, never a mix.
+
+    current() re-checks the files at most every `interval` seconds, so
+    workers pick up contract updates without a restart. The first load has
+    no snapshot to fall back to: the constructor raises ValueError when it
+    fails.
+
+    The last `history` snapshots stay reachable by version (snapshot()), so a
+    claim suspended on a question resumes with the rules it started with.
+    """
+
+    def __init__(self, sinistres_path: Path, garanties_path: Path, interval: float = 5.0, history: int = 8):
+        self.paths = (Path(sinistres_path), Path(garanties_path))
+        self.interval = interval
+        self.history = history
+        self._snapshots: "OrderedDict[int, PolicyKB]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stamps = None
+        self._digest = None
+        self._last_check = 0.0
+        self.version = 0
+        self.reloads = 0
+        self.failed_reloads = 0
+        self.last_error: Optional[str] = None
+        self._kb = PolicyKB({}, {})
+        if not self.check():
+            # no previous snapshot to fall back to: refuse to serve an empty KB
+            raise ValueError(f"Cannot load the policy configuration: {self.last_error}")
+
+    def current(self) -> PolicyKB:
+        if self.interval is not None and time.monotonic() - self._last_check >= self.interval:
+            self.check()
+        return self._kb
+
+    def snapshot(self, version: int) -> Optional[PolicyKB]:
+        """The snapshot installed as `version`, or None once it left the history."""
+        with self._lock:
+            return self._snapshots.get(version)
+
+    def check(self) -> bool:
+        """Reload if the files changed; returns True when a new snapshot was installed."""
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                stamps = tuple(_file_stamp(p) for p in self.paths)
+            except OSError as e:
+                return self._fail(f"{type(e).__name__}: {e}", None)
+            if stamps == self._stamps:
+                return False
+
+            try:
+                contents = [p.read_bytes() for p in self.paths]
+            except OSError as e:
+                # removed or replaced between stat and read: retry at the next check
+                return self._fail(f"{type(e).__name__}: {e}", None)
+            digest = hashlib.sha256(b"\0".join(contents)).hexdigest()
+            if digest == self._digest:
+                self._stamps = stamps
+                return False
+
+            try:
+                sinistres_data, garanties_data = (yaml.safe_load(c.decode("utf-8")) or {} for c in contents)
+            except (yaml.YAMLError, UnicodeDecodeError) as e:
+                return self._fail(f"Invalid YAML: {e}", stamps)
+            errors = validate_policy_data(sinistres_data, garanties_data)
+            if errors:
+                return self._fail("; ".join(errors), stamps)
+
+            self._kb = PolicyKB(sinistres_data, garanties_data, version=self.version + 1)
+            self._stamps, self._digest = stamps, digest
+            self.version += 1
+            self._snapshots[self.version] = self._kb
+            while len(self._snapshots) > max(self.history, 1):
+                self._snapshots.popitem(last=False)
+            self.reloads += 1
+            self.last_error = None
+            if self.version > 1:
+                print(f"[policy_kb] reloaded policy configuration (version {self.version})")
+            return True
+
+    def _fail(self, error: str, stamps) -> bool:
+        # caller holds self._lock; keep serving the previous snapshot
+        if error != self.last_error:
+            print(f"[policy_kb] policy configuration not reloaded: {error}")
+        self.failed_reloads += 1
+        self.last_error = error
+        self._stamps = stamps
+        return False
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "reloads": self.reloads,
+            "failed_reloads": self.failed_reloads,
+            "last_error": self.last_error,
+        }
+
+
+# =========================
+# Per-claim snapshot
+# =========================
+_pinned_kb: ContextVar[Optional[PolicyKB]] = ContextVar("pinned_policy_kb", default=None)
+
+
+def pinned_kb() -> Optional[PolicyKB]:
+    return _pinned_kb.get()
+
+
+@contextmanager
+def pin_policy_kb(kb: PolicyKB):
+    """Serve `kb` to every lookup made in this context (one claim keeps one snapshot)."""
+    token = _pinned_kb.set(kb)
+    try:
+        yield kb
+    finally:
+        _pinned_kb.reset(token)
@@ -0,0 +1,139 @@
+# src/assurhabitat_agents/runtime/cpu_tasks.py
+"""
+CPU-bound tasks run by CpuTaskPool, plus the image prefetch registry read by
+vlm_inference. Everything here must stay importable without torch so the
+worker processes start fast.
+"""
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Same upper bound as qwen_vl_utils: the VLM processor resizes anything bigger.
+VLM_MAX_PIXELS = 16384 * 28 * 28
+PREFETCH_CACHE_SIZE = 256
+
+
+# =========================
+# Tasks (top-level, picklable)
+# =========================
+def decode_image(path: str, max_pixels: int = VLM_MAX_PIXELS):
+    """Open an image, convert it to RGB and downscale it to at most max_pixels."""
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img = img.convert("RGB")
+        width, height = img.size
+        if width * height > max_pixels:
+            scale = (max_pixels / (width * height)) ** 0.5
+            img = img.resize((max(1, int(width * scale)), max(1, int(height * scale))), Image.BICUBIC)
+        img.load()
+        return img
+
+
+def render_claim_report(result: Dict[str, Any]) -> str:
+    """Render the Orchestrator output as a markdown report for advisors."""
+    lines = [f"# Sinistre — {result.get('status', 'unknown')}", ""]
+
+    if result.get("reason"):
+        lines += [f"**Motif :** {result['reason']}", ""]
+    if result.get("message"):
+        lines += [f"**Message :** {result['message']}", ""]
+
+    validation = result.get("validation")
+    if isinstance(validation, dict):
+        parsed = validation.get("parsed_declaration") or {}
+        extracted = parsed.get("extracted") or {}
+        lines += [
+            "## Déclaration",
+            f"- Type : {parsed.get('sinistre_type')}",
+            f"- Date : {extracted.get('date_sinistre')}",
+            f"- Lieu : {extracted.get('lieu')}",
+            f"- Biens impactés : {', '.join(map(str, extracted.get('biens_impactes') or [])) or '-'}",
+            "",
+        ]
+
+    estimation = result.get("estimation")
+    if isinstance(estimation, dict):
+        lines += [
+            "## Estimation",
+            f"- Coût estimé : {estimation.get('estimated_cost')} €",
+            f"- Franchise : {estimation.get('franchise')} €",
+            f"- Plafond : {estimation.get('max_covered_amount')} €",
+            f"- Indemnisation finale : {estimation.get('final_compensation')} €",
+            "",
+        ]
+
+    if result.get("expertise_report"):
+        lines += ["## Rapport d'expertise", str(result["expertise_report"]), ""]
+
+    return "\n".join(lines).rstrip() + "\n"
+
+
+# =========================
+# Image prefetch registry
+# =========================
+FileSignature = Tuple[str, Optional[int], Optional[int]]
+
+# keyed by file signature: a photo replaced under the same path is decoded again
+_prefetched: "OrderedDict[FileSignature, Future]" = OrderedDict()
+_prefetch_lock = threading.Lock()
+
+
+def file_signature(path: str) -> FileSignature:
+    """(path, mtime, size) of a file; (path, None, None) if it cannot be stat'ed."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (path, None, None)
+    return (path, stat.st_mtime_ns, stat.st_size)
+
+
+def prefetch_images(pool, image_paths: Iterable[str]) -> None:
+    """Start decoding the images in the pool; vlm_inference picks them up later."""
+    with _prefetch_lock:
+        for path in image_paths:
+            if not isinstance(path, str):
+                continue
+            key = file_signature(path)
+            if key in _prefetched:
+                continue
+            _prefetched[key] = pool.submit(decode_image, path)
+            while len(_prefetched) > PREFETCH_CACHE_SIZE:
+                _prefetched.popitem(last=False)
+
+
+def get_prefetched_image(path: Any, timeout: Optional[float] = None):
+    """
+    Return the decoded image for `path` if it was prefetched, else None.
+    Waits for a pending decode; a failed decode returns None (the caller
+    falls back to letting the VLM processor open the file). The entry stays
+    for the other VLM calls of the claim (CheckConformity, CostEstimation)
+    until discard_prefetched_images.
+    """
+    if not isinstance(path, str):
+        return None
+    with _prefetch_lock:
+        future = _prefetched.get(file_signature(path))
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        return None
+
+
+def discard_prefetched_images(image_paths: Iterable[str]) -> None:
+    """Release the decoded images of a finished claim."""
+    with _prefetch_lock:
+        for path in image_paths:
+            if isinstance(path, str):
+                future = _prefetched.pop(file_signature(path), None)
+                if future is not None:
+                    future.cancel()
+
+
+def clear_prefetched_images() -> None:
+    with _prefetch_lock:
+        _prefetched.clear()
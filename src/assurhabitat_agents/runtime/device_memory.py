@@ -0,0 +1,274 @@
+# src/assurhabitat_agents/runtime/device_memory.py
+"""
+Device memory co-scheduling of the LLM and the VLM.
+
+Devstral and Qwen2-VL share one GPU, each loaded with device_map="auto".
+Nothing stopped a Devstral generation and a Qwen2-VL generation from
+allocating their KV caches and activations at the same time; when they did
+not fit, accelerate silently placed layers or buffers on the CPU, which
+multiplies latency.
+
+DeviceMemoryManager keeps one pool: the free device memory once the
+weights are loaded, minus a safety margin. Every generation reserves its
+estimated KV cache + activations (from the model config and its token
+budget) before running and waits while the pool cannot hold it, so
+concurrent LLM / VLM calls queue instead of spilling. There is no batched
+generate in the agents: batch_size() is the number of concurrent sequences
+of a model the pool holds, and reserve() admits at most that many.
+A request larger than the whole pool runs alone and is reported.
+
+Modules that accelerate put on "cpu" or "disk" at load are reported as
+offload events. SimulatedAllocator stands in for the GPU in tests.
+"""
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
+
+GiB = 1024 ** 3
+
+
+class DeviceOutOfMemory(RuntimeError):
+    """Raised by SimulatedAllocator when an allocation does not fit."""
+
+
+# =========================
+# Allocators
+# =========================
+class CudaAllocator:
+    """Free / total memory of a CUDA device (blocks cached by PyTorch count as free)."""
+
+    def __init__(self, device: int = 0):
+        self.device = device
+
+    def total(self) -> int:
+        import torch
+
+        return torch.cuda.mem_get_info(self.device)[1]
+
+    def free(self) -> int:
+        import torch
+
+        free, _ = torch.cuda.mem_get_info(self.device)
+        return free + torch.cuda.memory_reserved(self.device) - torch.cuda.memory_allocated(self.device)
+
+
+class SimulatedAllocator:
+    """In-memory device: allocate() / release() stand for model loads and other tenants."""
+
+    def __init__(self, total_bytes: int):
+        self._lock = threading.Lock()
+        self._total = total_bytes
+        self._used = 0
+
+    def total(self) -> int:
+        return self._total
+
+    def free(self) -> int:
+        with self._lock:
+            return self._total - self._used
+
+    def allocate(self, nbytes: int) -> None:
+        with self._lock:
+            if self._used + nbytes > self._total:
+                raise DeviceOutOfMemory(f"cannot allocate {nbytes} bytes ({self._total - self._used} free)")
+            self._used += nbytes
+
+    def release(self, nbytes: int) -> None:
+        with self._lock:
+            self._used = max(0, self._used - nbytes)
+
+
+# =========================
+# Per model memory estimates
+# =========================
+@dataclass(frozen=True, slots=True)
+class ModelMemoryProfile:
+    """Device bytes of a model: resident weights, plus per token and per sequence for a generation."""
+
+    name: str
+    weights_bytes: int
+    kv_bytes_per_token: int
+    activation_bytes_per_token: int
+    fixed_bytes: int = 0
+
+    def request_bytes(self, tokens: int) -> int:
+        """KV cache + activations of one sequence of `tokens` (prompt + max new tokens)."""
+        return tokens * (self.kv_bytes_per_token + self.activation_bytes_per_token) + self.fixed_bytes
+
+
+def profile_from_config(name: str, config, weights_bytes: int, dtype_bytes: int = 2) -> ModelMemoryProfile:
+    """
+    Estimate from a transformers config (the text decoder's for a VLM):
+    K and V of every layer per token, the MLP intermediate and a few hidden
+    states per token of activations, and the fp32 logits of one position.
+    """
+    text = getattr(config, "text_config", None) or config
+    heads = text.num_attention_heads
+    kv_heads = getattr(text, "num_key_value_heads", None) or heads
+    head_dim = getattr(text, "head_dim", None) or text.hidden_size // heads
+    return ModelMemoryProfile(
+        name=name,
+        weights_bytes=weights_bytes,
+        kv_bytes_per_token=2 * text.num_hidden_layers * kv_heads * head_dim * dtype_bytes,
+        activation_bytes_per_token=(2 * text.intermediate_size + 4 * text.hidden_size) * dtype_bytes,
+        fixed_bytes=text.vocab_size * 4,
+    )
+
+
+def offloaded_modules(model) -> Dict[str, str]:
+    """Modules accelerate placed off the GPU ({module: "cpu" | "disk"})."""
+    device_map = getattr(model, "hf_device_map", None) or {}
+    return {module: str(device) for module, device in device_map.items() if str(device) in ("cpu", "disk")}
+
+
+# =========================
+# Manager
+# =========================
+class DeviceMemoryManager:
+    """Shared KV / activation pool of the models loaded on one device."""
+
+    def __init__(self, allocator, margin_fraction: float = 0.05):
+        self.allocator = allocator
+        self.margin_fraction = margin_fraction
+        self._cond = threading.Condition()
+        self._profiles: Dict[str, ModelMemoryProfile] = {}
+        self._pool = 0
+        self._reserved = 0
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._offload: Dict[str, Dict[str, str]] = {}
+
+    # ---- models ----
+    def register(self, profile: ModelMemoryProfile, model=None) -> None:
+        """Call once the model is loaded: the pool is what its weights left free."""
+        with self._cond:
+            self._profiles[profile.name] = profile
+            self._stats.setdefault(profile.name, self._new_stats())
+            self._refresh_pool()
+            self._cond.notify_all()
+        if model is not None:
+            self.check_offload(profile.name, model)
+
+    def check_offload(self, name: str, model) -> Dict[str, str]:
+        offloaded = offloaded_modules(model)
+        with self._cond:
+            self._offload[name] = offloaded
+        if offloaded:
+            print(f"[device_memory] WARNING: {name} offloaded {len(offloaded)} module(s) "
+                  f"to {sorted(set(offloaded.values()))}: {sorted(offloaded)[:5]}")
+        return offloaded
+
+    def _refresh_pool(self) -> None:
+        # free memory now also holds the reservations in flight
+        margin = int(self.allocator.total() * self.margin_fraction)
+        self._pool = max(0, self.allocator.free() + self._reserved - margin)
+
+    @staticmethod
+    def _new_stats() -> Dict[str, Any]:
+        return {"requests": 0, "waits": 0, "wait_seconds": 0.0, "oversized": 0,
+                "in_flight": 0, "peak_in_flight": 0, "peak_reserved_bytes": 0}
+
+    # ---- scheduling ----
+    def batch_size(self, name: str, tokens: int) -> int:
+        """Concurrent sequences of `tokens` of this model the whole pool can hold."""
+        with self._cond:
+            return self._pool // max(1, self._profiles[name].request_bytes(tokens))
+
+    @contextmanager
+    def reserve(self, name: str, tokens: int, timeout: Optional[float] = None) -> Iterator[int]:
+        """
+        Hold the memory of one generation of `tokens` (prompt + max new tokens),
+        waiting while the pool cannot hold it. Raises TimeoutError after `timeout`.
+        A model not registered yet reserves nothing.
+        """
+        nbytes = self._profiles[name].request_bytes(tokens) if name in self._profiles else 0
+        start = time.perf_counter()
+        with self._cond:
+            stats = self._stats.setdefault(name, self._new_stats())
+            oversized = nbytes > self._pool
+            # an oversized request waits for an empty pool, then runs alone
+            fits = (lambda: self._reserved == 0) if oversized else (lambda: self._reserved + nbytes <= self._pool)
+            if not fits():
+                stats["waits"] += 1
+                if not self._cond.wait_for(fits, timeout=timeout):
+                    raise TimeoutError(f"{name}: {nbytes} bytes not available within {timeout}s")
+            waited = time.perf_counter() - start
+            self._reserved += nbytes
+            stats["requests"] += 1
+            stats["wait_seconds"] += waited
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+            stats["peak_reserved_bytes"] = max(stats["peak_reserved_bytes"], nbytes)
+            if oversized:
+                stats["oversized"] += 1
+                print(f"[device_memory] WARNING: {name} request of {nbytes / GiB:.2f} GiB exceeds the "
+                      f"{self._pool / GiB:.2f} GiB pool, running it alone")
+        try:
+            yield nbytes
+        finally:
+            with self._cond:
+                self._reserved -= nbytes
+                self._stats[name]["in_flight"] -= 1
+                self._cond.notify_all()
+
+    # ---- reporting ----
+    def reset(self) -> None:
+        with self._cond:
+            self._stats = {name: self._new_stats() for name in self._profiles}
+
+    def report(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "total_bytes": self.allocator.total(),
+                "free_bytes": self.allocator.free(),
+                "pool_bytes": self._pool,
+                "reserved_bytes": self._reserved,
+                "models": {
+                    name: {
+                        **self._stats.get(name, self._new_stats()),
+                        "weights_bytes": profile.weights_bytes,
+                        "kv_bytes_per_token": profile.kv_bytes_per_token,
+                        "offloaded_modules": dict(self._offload.get(name, {})),
+                    }
+                    for name, profile in self._profiles.items()
+                },
+                "offload": any(self._offload.values()),
+            }
+
+
+# =========================
+# Process-wide manager (CUDA only)
+# =========================
+@lru_cache(maxsize=1)
+def device_memory() -> Optional[DeviceMemoryManager]:
+    """The manager of GPU 0, or None without CUDA or with GPU_MEMORY_MANAGER=0."""
+    from assurhabitat_agents.config.model_config import GPU_MEMORY_MANAGER, GPU_MEMORY_MARGIN
+
+    if not GPU_MEMORY_MANAGER:
+        return None
+    try:
+        import torch
+    except ImportError:
+        return None
+    if not torch.cuda.is_available():
+        return None
+    return DeviceMemoryManager(CudaAllocator(), margin_fraction=GPU_MEMORY_MARGIN)
+
+
+def register_model(name: str, model) -> None:
+    """Budget a freshly loaded model and report its offloaded modules."""
+    manager = device_memory()
+    if manager is None:
+        return
+    profile = profile_from_config(name, model.config, weights_bytes=model.get_memory_footprint())
+    manager.register(profile, model)
+
+
+def reserve_generation(name: str, tokens: int):
+    """Context manager around one generate() call (no-op without the manager)."""
+    manager = device_memory()
+    if manager is None:
+        return nullcontext()
+    return manager.reserve(name, tokens)
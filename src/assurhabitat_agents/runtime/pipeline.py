@@ -0,0 +1,235 @@
+# src/assurhabitat_agents/runtime/pipeline.py
+"""
+Pipelined processing of many claims across the three agent stages.
+
+Orchestrator.run() drives one claim through declaration, validation and
+expertise one after the other, so the GPU serves only LLM calls during the
+declaration and only VLM calls afterwards. ClaimPipeline gives each stage
+its own worker threads and a bounded queue in front of it: claim N can be
+in expertise while claim N+1 is in validation and claim N+2 in declaration.
+A full queue blocks the stage feeding it (backpressure up to submit()).
+
+The stages are the Orchestrator's own (stage_declaration, stage_validation,
+stage_expertise), so results are the same as with run(). Claims suspended on
+AskHuman leave the pipeline with status "waiting_for_human" and are resumed
+with Orchestrator.resume().
+"""
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+from assurhabitat_agents.contract_store import pin_policy_id
+from assurhabitat_agents.policy_kb import pin_policy_kb
+from assurhabitat_agents.runtime.cpu_tasks import prefetch_images
+from assurhabitat_agents.utils import get_policy_watcher
+
+STAGES = ("declaration", "validation", "expertise")
+DEFAULT_WORKERS = {"declaration": 1, "validation": 1, "expertise": 1}
+DEFAULT_QUEUE_SIZE = 8
+
+_STOP = object()
+
+
+class _Item:
+    """A claim travelling through the pipeline."""
+
+    __slots__ = ("claim", "kb", "notify", "future")
+
+    def __init__(self, claim, kb, notify, future):
+        self.claim = claim
+        self.kb = kb
+        self.notify = notify
+        self.future = future
+
+
+class ClaimPipeline:
+    """
+    Staged claim processing with one worker pool per agent stage.
+
+    Usage:
+        with ClaimPipeline(orch, workers={"declaration": 2, "validation": 1, "expertise": 1}) as pipe:
+            futures = [pipe.submit(text, images) for text, images in claims]
+            results = [f.result() for f in futures]
+            print(pipe.metrics())
+    """
+
+    def __init__(self, orchestrator, workers: Optional[Dict[str, int]] = None, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.orchestrator = orchestrator
+        self.workers = {**DEFAULT_WORKERS, **(workers or {})}
+        unknown = set(self.workers) - set(STAGES)
+        if unknown:
+            raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+        if any(n < 1 for n in self.workers.values()):
+            raise ValueError("Each pipeline stage needs at least one worker.")
+        self.queue_size = queue_size
+        self._queues = {stage: queue.Queue(maxsize=queue_size) for stage in STAGES}
+        self._threads: Dict[str, List[threading.Thread]] = {stage: [] for stage in STAGES}
+        self._lock = threading.Lock()
+        self._started_at: Optional[float] = None
+        self._stats = {
+            stage: {"in_flight": 0, "completed": 0, "failed": 0, "busy_seconds": 0.0, "max_queue_depth": 0}
+            for stage in STAGES
+        }
+        self._submitted = 0
+        self._finished = 0
+
+    # ---- lifecycle ----
+    def start(self) -> "ClaimPipeline":
+        if self._started_at is not None:
+            return self
+        self._started_at = time.perf_counter()
+        for stage in STAGES:
+            for i in range(self.workers[stage]):
+                t = threading.Thread(target=self._worker, args=(stage,), name=f"pipeline-{stage}-{i}", daemon=True)
+                t.start()
+                self._threads[stage].append(t)
+        return self
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Let the queued claims finish, then stop the workers stage by stage."""
+        if self._started_at is None:
+            return
+        for stage in STAGES:
+            for _ in self._threads[stage]:
+                self._queues[stage].put(_STOP)
+            if wait:
+                # upstream workers are gone: nothing more reaches the next stage
+                for t in self._threads[stage]:
+                    t.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
+
+    # ---- submission ----
+    def submit(self, user_text, image_paths=None, on_event=None, policy_id=None) -> Future:
+        """
+        Queue a claim and return a Future of the same result as Orchestrator.run().
+        Blocks while the declaration queue is full.
+        """
+        if self._started_at is None:
+            raise RuntimeError("ClaimPipeline is not started.")
+        image_paths = image_paths or []
+        if self.orchestrator.cpu_pool is not None:
+            prefetch_images(self.orchestrator.cpu_pool, image_paths)
+        self.orchestrator.start_image_analysis(image_paths)
+
+        claim = {
+            "claim_id": uuid.uuid4().hex,
+            "user_text": user_text,
+            "image_paths": image_paths,
+            "policy_id": policy_id,
+        }
+        # the claim keeps the policy snapshot of its submission in every stage
+        kb = get_policy_watcher().current()
+        claim["policy_version"] = kb.version
+        item = _Item(claim, kb, on_event or (lambda event: None), Future())
+        with self._lock:
+            self._submitted += 1
+        self._put("declaration", item)
+        return item.future
+
+    def _put(self, stage: str, item: _Item) -> None:
+        q = self._queues[stage]
+        q.put(item)
+        with self._lock:
+            stats = self._stats[stage]
+            stats["max_queue_depth"] = max(stats["max_queue_depth"], q.qsize())
+
+    # ---- workers ----
+    def _stage_fn(self, stage: str) -> Callable:
+        return {
+            "declaration": self.orchestrator.stage_declaration,
+            "validation": self.orchestrator.stage_validation,
+            "expertise": self.orchestrator.stage_expertise,
+        }[stage]
+
+    def _worker(self, stage: str) -> None:
+        run_stage = self._stage_fn(stage)
+        next_stage = STAGES[STAGES.index(stage) + 1] if stage != STAGES[-1] else None
+        q = self._queues[stage]
+        while True:
+            item = q.get()
+            if item is _STOP:
+                return
+            with self._lock:
+                self._stats[stage]["in_flight"] += 1
+            start = time.perf_counter()
+            try:
+                with pin_policy_kb(item.kb), pin_policy_id(item.claim["policy_id"]):
+                    result = run_stage(item.claim, item.notify)
+                    if result is not None or next_stage is None:
+                        result = self.orchestrator.finalize(item.claim, result, item.kb)
+            except Exception as e:
+                self._record(stage, start, failed=True)
+                self._release(item)
+                self._finish(item, error=e)
+                continue
+            self._record(stage, start, failed=False)
+
+            if result is None:
+                self._put(next_stage, item)
+            else:
+                self._finish(item, result=result)
+
+    def _release(self, item: _Item) -> None:
+        # a failed claim never reaches finalize: drop its pending entry and
+        # image registries here, without letting a cleanup error stop the worker
+        try:
+            self.orchestrator.release(item.claim)
+        except Exception as e:
+            print(f"[pipeline] cleanup of claim {item.claim['claim_id']} failed: {type(e).__name__}: {e}")
+
+    def _record(self, stage: str, start: float, failed: bool) -> None:
+        with self._lock:
+            stats = self._stats[stage]
+            stats["in_flight"] -= 1
+            stats["failed" if failed else "completed"] += 1
+            stats["busy_seconds"] += time.perf_counter() - start
+
+    def _finish(self, item: _Item, result: Any = None, error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            self._finished += 1
+        if error is not None:
+            item.future.set_exception(error)
+        else:
+            item.future.set_result(result)
+
+    # ---- metrics ----
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of the pipeline:
+          - per stage: workers, queue_depth (waiting in front of the stage),
+            max_queue_depth, in_flight, completed / failed, busy_seconds,
+            utilization (busy / workers * uptime) and throughput_per_s
+          - claims submitted / finished / in the pipeline
+        """
+        with self._lock:
+            uptime = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+            stages = {}
+            for stage in STAGES:
+                stats = self._stats[stage]
+                workers = self.workers[stage]
+                stages[stage] = {
+                    **stats,
+                    "workers": workers,
+                    "queue_depth": self._queues[stage].qsize(),
+                    "queue_size": self.queue_size,
+                    "mean_seconds": stats["busy_seconds"] / stats["completed"] if stats["completed"] else 0.0,
+                    "utilization": min(stats["busy_seconds"] / (workers * uptime), 1.0) if uptime > 0 else 0.0,
+                    "throughput_per_s": stats["completed"] / uptime if uptime > 0 else 0.0,
+                }
+            return {
+                "uptime_seconds": uptime,
+                "submitted": self._submitted,
+                "finished": self._finished,
+                "in_pipeline": self._submitted - self._finished,
+                "throughput_per_s": self._finished / uptime if uptime > 0 else 0.0,
+                "stages": stages,
+            }
@@ -0,0 +1,127 @@
+# src/assurhabitat_agents/runtime/process_pool.py
+"""
+Process pool for the CPU-bound stages of claim processing (image decoding,
+report rendering), so they do not compete for the GIL with the thread
+driving `graph.stream`. GPU-bound LLM/VLM calls are not sent here.
+
+Workers are started with "forkserver" (or "spawn" where it is unavailable),
+never "fork": the service is multithreaded and holds CUDA contexts, and a
+forked child can inherit a lock held by another thread.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+def _timed_call(fn: Callable, args: tuple, kwargs: dict):
+    """Runs inside the worker process: returns the result and the CPU-side duration."""
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def _default_start_method() -> str:
+    return "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class CpuTaskPool:
+    """
+    Thin wrapper around ProcessPoolExecutor that keeps utilization metrics.
+
+    Tasks must be top-level (picklable) functions, e.g. the ones in
+    assurhabitat_agents.runtime.cpu_tasks.
+
+    Usage:
+        with CpuTaskPool(max_workers=4) as pool:
+            image = pool.run(decode_image, "photo.png")
+            print(pool.metrics())
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, name: str = "cpu", start_method: Optional[str] = None):
+        self.name = name
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.start_method = start_method or _default_start_method()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers, mp_context=multiprocessing.get_context(self.start_method)
+        )
+        self._lock = threading.Lock()
+        self._started_at = time.perf_counter()
+        self._in_flight = 0
+        self._tasks: Dict[str, Dict[str, float]] = {}
+
+    def _task_stats(self, task_name: str) -> Dict[str, float]:
+        return self._tasks.setdefault(
+            task_name, {"submitted": 0, "completed": 0, "failed": 0, "busy_seconds": 0.0}
+        )
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Schedule fn(*args, **kwargs) in a worker process and return a Future of its result."""
+        task_name = getattr(fn, "__name__", repr(fn))
+        with self._lock:
+            self._in_flight += 1
+            self._task_stats(task_name)["submitted"] += 1
+
+        outer: Future = Future()
+
+        def _on_done(inner: Future):
+            try:
+                result, elapsed = inner.result()
+            except BaseException as e:
+                with self._lock:
+                    self._in_flight -= 1
+                    self._task_stats(task_name)["failed"] += 1
+                outer.set_exception(e)
+                return
+            with self._lock:
+                self._in_flight -= 1
+                stats = self._task_stats(task_name)
+                stats["completed"] += 1
+                stats["busy_seconds"] += elapsed
+            outer.set_result(result)
+
+        self._executor.submit(_timed_call, fn, args, kwargs).add_done_callback(_on_done)
+        return outer
+
+    def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Blocking variant of submit."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Snapshot of the pool state:
+          - utilization: busy time of all tasks / (workers * pool uptime)
+          - in_flight: tasks submitted and not finished yet (queued or running)
+          - tasks: per task counters and mean duration
+        """
+        with self._lock:
+            uptime = time.perf_counter() - self._started_at
+            busy = sum(s["busy_seconds"] for s in self._tasks.values())
+            tasks = {
+                name: {
+                    **stats,
+                    "mean_seconds": stats["busy_seconds"] / stats["completed"] if stats["completed"] else 0.0,
+                }
+                for name, stats in self._tasks.items()
+            }
+            return {
+                "pool": self.name,
+                "workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "uptime_seconds": uptime,
+                "busy_seconds": busy,
+                "utilization": min(busy / (self.max_workers * uptime), 1.0) if uptime > 0 else 0.0,
+                "tasks": tasks,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        return False
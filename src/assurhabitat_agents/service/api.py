@@ -0,0 +1,179 @@
+# src/assurhabitat_agents/service/api.py
+"""
+HTTP API on top of ClaimService (FastAPI).
+
+Endpoints:
+    POST /claims                  submit a claim (header X-Tenant-Id), 202 or 429
+    GET  /claims/{job_id}         claim status and result
+    GET  /claims/{job_id}/stream  progress events as NDJSON
+    POST /claims/{job_id}/reply   answer the question of a claim waiting_for_human
+    GET  /healthz                 liveness probe
+    GET  /readyz                  readiness probe (503 while models are cold),
+                                  with the warm-up timings
+
+Run:
+    cd src && python -m assurhabitat_agents.service.api
+"""
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+from assurhabitat_agents.service.claim_service import AdmissionRejected, ClaimService
+from assurhabitat_agents.utils import get_policy_watcher
+
+
+class ClaimRequest(BaseModel):
+    user_text: str
+    image_paths: List[str] = []
+    policy_id: Optional[str] = None
+
+
+class ReplyRequest(BaseModel):
+    reply: str
+
+
+def default_warm_state() -> Dict[str, bool]:
+    """
+    With WARMUP_ON_START, a model is warm once the start-up warm-up ran it.
+    Otherwise, once its lru_cached loader has been called.
+    """
+    from assurhabitat_agents.config.model_config import WARMUP_ON_START
+
+    if WARMUP_ON_START:
+        from assurhabitat_agents.model.warmup import WARMUP
+
+        return WARMUP.warm_state() or {"llm": False, "vlm": False}
+
+    from assurhabitat_agents.model.llm_model_loading import _load_model
+    from assurhabitat_agents.model.vlm_model_loading import load_vlm
+
+    return {
+        "llm": _load_model.cache_info().currsize > 0,
+        "vlm": load_vlm.cache_info().currsize > 0,
+    }
+
+
+def start_warmup() -> threading.Thread:
+    """Warm the models in the background: /healthz answers, /readyz stays 503 meanwhile."""
+    from assurhabitat_agents.model.warmup import warm_up
+
+    thread = threading.Thread(target=warm_up, name="model-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def create_app(service: ClaimService, warmup: bool = False) -> FastAPI:
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        # an invalid policy configuration fails the start-up, not every claim
+        get_policy_watcher()
+        if warmup:
+            start_warmup()
+        service.start()
+        yield
+        service.stop(timeout=5)
+
+    app = FastAPI(title="AssurHabitat claims", lifespan=lifespan)
+
+    @app.post("/claims", status_code=202)
+    def submit_claim(claim: ClaimRequest, x_tenant_id: Optional[str] = Header(default="default")):
+        try:
+            return service.submit(
+                claim.user_text, claim.image_paths, tenant=x_tenant_id or "default", policy_id=claim.policy_id
+            )
+        except AdmissionRejected as e:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": e.reason},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+    @app.get("/claims/{job_id}")
+    def claim_status(job_id: str):
+        job = service.status(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail="Unknown claim")
+        return job
+
+    @app.post("/claims/{job_id}/reply", status_code=202)
+    def reply_claim(job_id: str, body: ReplyRequest):
+        try:
+            return service.reply(job_id, body.reply)
+        except KeyError:
+            raise HTTPException(status_code=404, detail="Unknown claim")
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        except AdmissionRejected as e:
+            return JSONResponse(
+                status_code=429,
+                content={"detail": e.reason},
+                headers={"Retry-After": str(e.retry_after)},
+            )
+
+    @app.get("/claims/{job_id}/stream")
+    def claim_stream(job_id: str):
+        if service.status(job_id) is None:
+            raise HTTPException(status_code=404, detail="Unknown claim")
+        lines = (json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in service.stream(job_id))
+        return StreamingResponse(lines, media_type="application/x-ndjson")
+
+    @app.get("/healthz")
+    def healthz():
+        health = service.health()
+        return JSONResponse(status_code=200 if health["alive"] else 503, content=health)
+
+    @app.get("/readyz")
+    def readyz():
+        readiness = service.readiness()
+        return JSONResponse(status_code=200 if readiness["ready"] else 503, content=readiness)
+
+    return app
+
+
+def build_default_service() -> ClaimService:
+    from assurhabitat_agents.agents.orchestrator import Orchestrator
+    from assurhabitat_agents.agents.declaration_agent import run_declar_agent
+    from assurhabitat_agents.agents.validation_agent import run_valid_agent
+    from assurhabitat_agents.agents.expertise_agent import run_expert_agent
+    from assurhabitat_agents.pending_claims import PendingClaimStore
+    from assurhabitat_agents.config.model_config import SPECULATIVE_IMAGE_ANALYSIS, WARMUP_ON_START
+    from assurhabitat_agents.model.warmup import WARMUP
+
+    image_executor = None
+    if SPECULATIVE_IMAGE_ANALYSIS:
+        image_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vlm-speculative")
+
+    orch = Orchestrator(
+        declaration_agent=run_declar_agent,
+        validation_agent=run_valid_agent,
+        expertise_agent=run_expert_agent,
+        pending_store=PendingClaimStore(os.getenv("PENDING_CLAIMS_DB", "data/pending_claims.db")),
+        image_executor=image_executor,
+    )
+    return ClaimService(
+        orch,
+        workers=int(os.getenv("CLAIM_WORKERS", "1")),
+        max_queue=int(os.getenv("CLAIM_MAX_QUEUE", "32")),
+        max_per_tenant=int(os.getenv("CLAIM_MAX_PER_TENANT", "4")),
+        warm_state=default_warm_state,
+        warmup_report=WARMUP.report if WARMUP_ON_START else None,
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    from assurhabitat_agents.config.model_config import WARMUP_ON_START
+
+    try:
+        get_policy_watcher()
+    except ValueError as e:
+        raise SystemExit(f"[service] {e}")
+    uvicorn.run(create_app(build_default_service(), warmup=WARMUP_ON_START), host="0.0.0.0", port=int(os.getenv("PORT", "8000")))
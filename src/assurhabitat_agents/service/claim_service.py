@@ -0,0 +1,286 @@
+# src/assurhabitat_agents/service/claim_service.py
+"""
+Claim processing service: bounded work queue in front of the Orchestrator,
+with per-tenant concurrency limits and load shedding. Framework-agnostic;
+the HTTP layer lives in service/api.py.
+"""
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+TERMINAL_STATUSES = ("completed", "failed")
+# the claim is parked (no worker held) until reply() re-queues it
+WAITING_STATUS = "waiting_for_human"
+# how often an idle worker checks for shutdown
+WORKER_POLL_SECONDS = 0.2
+
+
+class AdmissionRejected(Exception):
+    """Raised when a claim cannot be accepted right now (mapped to HTTP 429)."""
+
+    def __init__(self, reason: str, retry_after: int = 5):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class ClaimService:
+    """
+    Runs claims through an Orchestrator on a fixed number of worker threads.
+
+    Admission control, checked on submit:
+      - the work queue is bounded (max_queue); a full queue sheds load,
+      - each tenant may have at most max_per_tenant claims queued or running.
+
+    Jobs are plain dicts:
+        {"job_id", "tenant", "status", "submitted_at", "started_at",
+         "finished_at", "result", "error", "claim_id", "question", "events": [...]}
+    status goes queued -> running -> completed | failed | waiting_for_human.
+    A claim waiting for the policyholder holds no worker; reply() queues it
+    again and the worker resumes it through Orchestrator.resume().
+    """
+
+    def __init__(
+        self,
+        orchestrator,
+        workers: int = 1,
+        max_queue: int = 32,
+        max_per_tenant: int = 4,
+        retain_jobs: int = 1000,
+        warm_state: Optional[Callable[[], Dict[str, bool]]] = None,
+        warmup_report: Optional[Callable[[], Dict[str, Any]]] = None,
+    ):
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_per_tenant = max_per_tenant
+        self.retain_jobs = retain_jobs
+        self.warm_state = warm_state or (lambda: {})
+        self.warmup_report = warmup_report
+
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=max_queue)
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._active_per_tenant: Dict[str, int] = {}
+        self._running = 0
+        self._shed = 0
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        # set by stop(): no new claims, workers exit once the queue is drained
+        self._stopping = threading.Event()
+
+    # ---- LIFECYCLE ----
+    def start(self) -> None:
+        self._stopping.clear()
+        for i in range(self.workers):
+            t = threading.Thread(target=self._worker, name=f"claim-worker-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Refuse new claims and wait for the workers to finish the queued ones."""
+        # an event, not a sentinel in the queue: put() would block on a full queue
+        self._stopping.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+    # ---- ADMISSION ----
+    def submit(
+        self,
+        user_text: str,
+        image_paths: Optional[List[str]] = None,
+        tenant: str = "default",
+        policy_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Queue a claim; raises AdmissionRejected when the service is saturated."""
+        with self._cond:
+            if self._stopping.is_set():
+                raise AdmissionRejected("Service is shutting down.")
+            if self._active_per_tenant.get(tenant, 0) >= self.max_per_tenant:
+                self._shed += 1
+                raise AdmissionRejected(f"Tenant '{tenant}' already has {self.max_per_tenant} claims in progress.")
+
+            job_id = uuid.uuid4().hex
+            job = {
+                "job_id": job_id,
+                "tenant": tenant,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "input": {"user_text": user_text, "image_paths": image_paths or [], "policy_id": policy_id},
+                "result": None,
+                "error": None,
+                "claim_id": None,
+                "question": None,
+                "events": [{"stage": "service", "status": "queued"}],
+            }
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                self._shed += 1
+                raise AdmissionRejected("Model queue is saturated, retry later.")
+
+            self._jobs[job_id] = job
+            self._active_per_tenant[tenant] = self._active_per_tenant.get(tenant, 0) + 1
+            self._evict_finished()
+            return self._public(job)
+
+    def reply(self, job_id: str, reply: str) -> Dict[str, Any]:
+        """
+        Queue a claim waiting for the policyholder with their reply.
+        Raises KeyError (unknown job), ValueError (not waiting) or AdmissionRejected.
+        """
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                raise KeyError(job_id)
+            if job["status"] != WAITING_STATUS:
+                raise ValueError(f"Claim {job_id} is {job['status']}, not waiting for a reply.")
+            if self._stopping.is_set():
+                raise AdmissionRejected("Service is shutting down.")
+            tenant = job["tenant"]
+            if self._active_per_tenant.get(tenant, 0) >= self.max_per_tenant:
+                self._shed += 1
+                raise AdmissionRejected(f"Tenant '{tenant}' already has {self.max_per_tenant} claims in progress.")
+            try:
+                self._queue.put_nowait(job_id)
+            except queue.Full:
+                self._shed += 1
+                raise AdmissionRejected("Model queue is saturated, retry later.")
+
+            job["input"]["reply"] = reply
+            job["status"] = "queued"
+            job["question"] = None
+            self._active_per_tenant[tenant] = self._active_per_tenant.get(tenant, 0) + 1
+            self._append_event(job, {"stage": "service", "status": "queued"})
+            return self._public(job)
+
+    def _evict_finished(self) -> None:
+        # keep the job table bounded: drop the oldest finished jobs
+        excess = len(self._jobs) - self.retain_jobs
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id]["status"] in TERMINAL_STATUSES:
+                del self._jobs[job_id]
+                excess -= 1
+
+    # ---- WORKERS ----
+    def _worker(self) -> None:
+        while True:
+            try:
+                job_id = self._queue.get(timeout=WORKER_POLL_SECONDS)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            with self._cond:
+                job = self._jobs[job_id]
+                job["status"] = "running"
+                job["started_at"] = time.time()
+                self._running += 1
+                self._append_event(job, {"stage": "service", "status": "running"})
+                reply = job["input"].pop("reply", None)
+
+            on_event = lambda event, job=job: self._record_event(job, event)
+            try:
+                if reply is None:
+                    result = self.orchestrator.run(
+                        user_text=job["input"]["user_text"],
+                        image_paths=job["input"]["image_paths"],
+                        policy_id=job["input"]["policy_id"],
+                        on_event=on_event,
+                    )
+                else:
+                    result = self.orchestrator.resume(job["claim_id"], reply, on_event=on_event)
+                waiting = isinstance(result, dict) and result.get("status") == WAITING_STATUS
+                status, error = (WAITING_STATUS if waiting else "completed"), None
+            except Exception as e:
+                result, status, error = None, "failed", f"{type(e).__name__}: {e}"
+
+            with self._cond:
+                if status == WAITING_STATUS:
+                    job["claim_id"] = result.get("claim_id")
+                    job["question"] = result.get("question")
+                job["result"] = result
+                job["error"] = error
+                job["status"] = status
+                job["finished_at"] = time.time()
+                self._running -= 1
+                self._active_per_tenant[job["tenant"]] -= 1
+                self._append_event(job, {"stage": "service", "status": status})
+
+    def _append_event(self, job: Dict[str, Any], event: Dict[str, Any]) -> None:
+        # caller holds self._cond
+        job["events"].append(event)
+        self._cond.notify_all()
+
+    def _record_event(self, job: Dict[str, Any], event: Dict[str, Any]) -> None:
+        with self._cond:
+            self._append_event(job, event)
+
+    # ---- QUERIES ----
+    @staticmethod
+    def _public(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if k not in ("events", "input")}
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+
+    @staticmethod
+    def _stream_ended(job: Dict[str, Any]) -> bool:
+        return job["status"] in TERMINAL_STATUSES or job["status"] == WAITING_STATUS
+
+    def stream(self, job_id: str, timeout: float = 600.0) -> Iterator[Dict[str, Any]]:
+        """
+        Yield the events of a job as they happen, until it finishes, waits for
+        the policyholder (a new stream follows the resumed run) or times out.
+        """
+        deadline = time.monotonic() + timeout
+        sent = 0
+        while True:
+            with self._cond:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return
+                while sent >= len(job["events"]) and not self._stream_ended(job):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return
+                    self._cond.wait(remaining)
+                new_events = job["events"][sent:]
+                finished = self._stream_ended(job)
+            for event in new_events:
+                yield event
+            sent += len(new_events)
+            if finished and sent >= len(job["events"]):
+                return
+
+    def health(self) -> Dict[str, Any]:
+        """Liveness: worker threads alive and queue figures."""
+        with self._cond:
+            return {
+                "alive": bool(self._threads) and all(t.is_alive() for t in self._threads),
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self.max_queue,
+                "running": self._running,
+                "waiting_for_human": sum(job["status"] == WAITING_STATUS for job in self._jobs.values()),
+                "shed": self._shed,
+            }
+
+    def readiness(self) -> Dict[str, Any]:
+        """Readiness: alive, models warm, and room left in the queue."""
+        health = self.health()
+        models = self.warm_state()
+        ready = health["alive"] and all(models.values()) and health["queue_depth"] < self.max_queue
+        readiness = {"ready": ready, "models": models, **health}
+        if self.warmup_report is not None:
+            # warm-up progress, per step timings and cold_start_seconds
+            readiness["warmup"] = self.warmup_report()
+        return readiness
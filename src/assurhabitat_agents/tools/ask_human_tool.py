@@ -1,17 +1,30 @@
 from assurhabitat_agents.config.langfuse_config import observe
 
+
+class HumanInputRequired(Exception):
+    """
+    Raised by ask_human: the agent graph suspends on this question and the
+    claim waits for Orchestrator.resume() instead of blocking a worker.
+    """
+
+    def __init__(self, question: str):
+        super().__init__(question)
+        self.question = question
+
+
 @observe(name="ask_human")
 def ask_human(question: str) -> str:
-    """Ask for user input.
+    """Ask the policyholder for input.
 
     Parameters
     ----------
-    message : str
+    question : str
         The message to indicates to the user what data is needed. (required)
 
-    Returns:
-    -------
-    str
-        The user's input.
+    Raises
+    ------
+    HumanInputRequired
+        Always: the reply arrives asynchronously, through Orchestrator.resume(),
+        and is injected in the agent state as the observation of this call.
     """
-    return input(question)
\ No newline at end of file
+    raise HumanInputRequired(question)
@@ -1,25 +1,32 @@
 # src/assurhabitat_agents/tools/sinistre_conformity_tool.py
 """
 This tool take a picture and the sinistre type as arguments and analyze if the picture is conforme to the declared sinistre, using a VLM
+
+The VLM only reports what is visible (the declared type is matched against it
+by the validation agent), so the analysis can start as soon as the photos
+arrive: start_image_analysis() runs it in the background during the
+declaration stage and check_conformity() picks up the precomputed result.
 """
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, Optional
+
 from transformers import Qwen2VLForConditionalGeneration, AutoTokenizer, AutoProcessor
 from qwen_vl_utils import process_vision_info
 
 from assurhabitat_agents.model.vlm_model_loading import vlm_inference
+from assurhabitat_agents.model.constrained_decoding import GENERATION_STATS
+from assurhabitat_agents.model.streaming_json import parse_json_text
+from assurhabitat_agents.runtime.cpu_tasks import FileSignature, file_signature
+from assurhabitat_agents.config.model_config import CONSTRAINED_DECODING
+from assurhabitat_agents.config.tool_schemas import CHECK_CONFORMITY_SCHEMA
 from assurhabitat_agents.config.langfuse_config import observe
 
-@observe(name="check_conformity")
-def check_conformity(image_paths, parsed_declaration):
-    if not image_paths:
-        return {"error": "Missing images"}
-    
-    image_path = image_paths[0]
-
-    prompt = f"""
-You are an insurance expert analyzing a claim.
+SPECULATIVE_CACHE_SIZE = 256
 
-Here is the declared sinistre:
-{parsed_declaration}
+CONFORMITY_PROMPT = """
+You are an insurance expert analyzing the picture of a claim.
 
 TASK 1 — Describe what is visible in the picture in 1–2 sentences.
 
@@ -28,31 +35,104 @@ TASK 2 — Identify visible damage types.
 Return the types of damage visible in the image among:
 ["fire", "soot", "smoke", "water", "mold", "impact", "theft_signs", "unknown"]
 
-Do NOT decide if the image matches the declaration.
+Do NOT decide if the image matches a declaration.
 Only report what is visible.
 Answer strictly in JSON using this format:
 
-{{
+{
   "description": "...",
   "detected_damage_types": ["fire", "soot"]
-}}
+}
 
 Do NOT add any text outside the JSON.
 """
 
-    output = vlm_inference(image_path, prompt)
+def analyze_image(image_path: str) -> Dict[str, Any]:
+    """VLM description and damage types of one picture (independent of the declaration)."""
+    output = vlm_inference(image_path, CONFORMITY_PROMPT, json_schema=CHECK_CONFORMITY_SCHEMA, call_site="check_conformity")
 
     # Try parsing JSON
-    import json
+    detected_damage_types = []
     try:
-        parsed = json.loads(output)
+        parsed = parse_json_text(output)
         description = parsed.get("description", "")
         detected_damage_types = parsed.get("detected_damage_types", [])
+        GENERATION_STATS.record_parse("check_conformity", CONSTRAINED_DECODING, ok=True)
     except Exception:
+        GENERATION_STATS.record_parse("check_conformity", CONSTRAINED_DECODING, ok=False)
         description = output.strip()
 
     return {
         "description": description,
         "detected_damage_types": detected_damage_types,
         "raw_output": output
-    }
\ No newline at end of file
+    }
+
+
+# =========================
+# Speculative analysis
+# =========================
+# keyed by (path, mtime, size): a photo replaced under the same path
+# (another claim reusing an upload name) never gets the previous analysis
+_speculative: "OrderedDict[FileSignature, Future]" = OrderedDict()
+_speculative_lock = threading.Lock()
+
+
+def start_image_analysis(executor, image_paths) -> None:
+    """Run analyze_image on the first picture in `executor` (a thread pool: the VLM is in-process)."""
+    if not image_paths or not isinstance(image_paths[0], str):
+        return
+    image_path = image_paths[0]
+    key = file_signature(image_path)
+    with _speculative_lock:
+        if key in _speculative:
+            return
+        _speculative[key] = executor.submit(analyze_image, image_path)
+        while len(_speculative) > SPECULATIVE_CACHE_SIZE:
+            _speculative.popitem(last=False)
+
+
+def take_image_analysis(image_path: Any, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """
+    Consume the speculative analysis of `image_path`, waiting for it if still
+    running. None if none was started or it failed (the caller runs the VLM).
+    """
+    if not isinstance(image_path, str):
+        return None
+    with _speculative_lock:
+        future = _speculative.pop(file_signature(image_path), None)
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=timeout)
+    except Exception:
+        return None
+
+
+def discard_image_analysis(image_paths) -> None:
+    """Drop the unused analysis of a finished claim (rejected before CheckConformity...)."""
+    if not image_paths or not isinstance(image_paths[0], str):
+        return
+    with _speculative_lock:
+        future = _speculative.pop(file_signature(image_paths[0]), None)
+    if future is not None:
+        future.cancel()
+
+
+def clear_image_analyses() -> None:
+    with _speculative_lock:
+        _speculative.clear()
+
+
+@observe(name="check_conformity")
+def check_conformity(image_paths, parsed_declaration):
+    if not image_paths:
+        return {"error": "Missing images"}
+    
+    image_path = image_paths[0]
+
+    # started during the declaration stage (Orchestrator.start_image_analysis)
+    speculative = take_image_analysis(image_path)
+    if speculative is not None:
+        return speculative
+    return analyze_image(image_path)
@@ -1,10 +1,13 @@
 # src/assurhabitat_agents/tools/check_guarantee_tool.py
-from assurhabitat_agents.utils import get_guarantee_for_type
-from assurhabitat_agents.model.llm_model_loading import llm_inference
-
-
 from typing import Dict, Any
-from assurhabitat_agents.utils import get_guarantee_for_type
+
+from assurhabitat_agents.utils import get_guarantee_for_type, get_policy_kb
+from assurhabitat_agents.tools.coverage_rules import COVERAGE_STATS, RULE_CONFIDENCE_THRESHOLD, evaluate_coverage
+from assurhabitat_agents.model.llm_model_loading import llm_inference
+from assurhabitat_agents.model.streaming_json import parse_json_text
+from assurhabitat_agents.model.constrained_decoding import GENERATION_STATS
+from assurhabitat_agents.config.model_config import CONSTRAINED_DECODING
+from assurhabitat_agents.config.tool_schemas import CHECK_GUARANTEE_SCHEMA
 from assurhabitat_agents.config.langfuse_config import observe
 
 @observe(name="check_guarantee")
@@ -16,6 +19,25 @@ def check_guarantee(parsed_declaration: Dict[str, Any]) -> Dict[str, Any]:
     except Exception as e:
         return {"guaranteed": False, "description": f"Lookup failed: {e}"}
 
+    # ---- deterministic pre-check: clear cases never reach the LLM ----
+    kb = get_policy_kb()
+    try:
+        sinistre_delay = kb.sinistre(sin_type).delai_declaration_jours_ouvres
+    except KeyError:
+        sinistre_delay = None
+    rules = evaluate_coverage(
+        parsed_declaration, guarantee, kb.obligations_generales, sinistre_delay, type_aliases=kb.aliases_of(sin_type)
+    )
+    if rules["guaranteed"] is not None and rules["confidence"] >= RULE_CONFIDENCE_THRESHOLD:
+        COVERAGE_STATS.record("rules", rules["guaranteed"])
+        return {
+            "guaranteed": rules["guaranteed"],
+            "description": " ".join(rules["reasons"]),
+            "decided_by": "rules",
+            "confidence": rules["confidence"],
+        }
+
+    findings = "\n".join(f"- {reason}" for reason in rules["reasons"])
     prompt = f"""
 You are an insurance expert. 
 Determine if the following declaration is covered by the insurance guarantee.
@@ -26,6 +48,9 @@ Declaration:
 Guarantee:
 {guarantee}
 
+Rule-based findings (to confirm or refute):
+{findings}
+
 Answer ONLY with a JSON object with keys:
 - guaranteed: true/false
 - description: one-sentence explanation
@@ -34,14 +59,18 @@ Example:
 {{"guaranteed": true, "description": "Covered because X"}}
 """
 
-    raw = llm_inference(prompt)
+    raw = llm_inference(prompt, json_schema=CHECK_GUARANTEE_SCHEMA, call_site="check_guarantee")
     try:
-        data = json.loads(extract_json(raw))
-    except:
+        data = parse_json_text(raw)
+        GENERATION_STATS.record_parse("check_guarantee", CONSTRAINED_DECODING, ok=True)
+    except Exception:
+        GENERATION_STATS.record_parse("check_guarantee", CONSTRAINED_DECODING, ok=False)
         # fallback simple logic
         data = {
             "guaranteed": "true" in raw.lower(),
             "description": raw
         }
 
+    COVERAGE_STATS.record("llm", data.get("guaranteed"))
+    data["decided_by"] = "llm"
     return data
\ No newline at end of file
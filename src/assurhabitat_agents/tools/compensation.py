@@ -0,0 +1,112 @@
+# src/assurhabitat_agents/tools/compensation.py
+"""
+Franchise / plafond pricing of a claim.
+
+compute_compensation() is the per-claim rule used by cost_estimation;
+batch_compensation() applies the same rule with NumPy to whole portfolios
+(re-pricing after a change of terms, what-if simulations) and returns
+exactly the same values.
+"""
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+from assurhabitat_agents.utils import get_guarantee_for_type
+
+
+def compute_compensation(estimated_cost: float, franchise: float = 0, plafond: Optional[float] = None) -> float:
+    """Amount paid for one claim: cost minus franchise, floored at 0, capped at plafond (None = no cap)."""
+    after_franchise = max(estimated_cost - franchise, 0)
+    if plafond is None:
+        return after_franchise
+    return min(after_franchise, plafond)
+
+
+def _as_float_array(values: Any, size: int, name: str) -> np.ndarray:
+    array = np.asarray(values, dtype=np.float64)
+    if array.ndim == 0:
+        return np.full(size, float(array))
+    if array.shape != (size,):
+        raise ValueError(f"{name} has shape {array.shape}, expected ({size},)")
+    return array
+
+
+def _plafond_array(values: Any, size: int) -> np.ndarray:
+    """Like _as_float_array, with None (no plafond) mapped to NaN."""
+    if values is None:
+        return np.full(size, np.nan)
+    array = np.asarray(values)
+    if array.dtype == object:
+        array = np.where(np.equal(array, None), np.nan, array)
+    return _as_float_array(array, size, "plafonds")
+
+
+def resolve_terms(
+    sinistre_types: Sequence[str],
+    policy_ids: Optional[Sequence[Optional[str]]] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Franchise and plafond arrays for each row, from garanties.yaml overlaid
+    with the contract terms of the row's policy. Each distinct
+    (policy_id, sinistre_type) pair is looked up once; a missing plafond is NaN.
+    """
+    # plain Python strings hash much faster than numpy scalars
+    if isinstance(sinistre_types, np.ndarray):
+        sinistre_types = sinistre_types.tolist()
+    if isinstance(policy_ids, np.ndarray):
+        policy_ids = policy_ids.tolist()
+    if policy_ids is not None and len(policy_ids) != len(sinistre_types):
+        raise ValueError(f"policy_ids has {len(policy_ids)} rows, expected {len(sinistre_types)}")
+    keys = sinistre_types if policy_ids is None else zip(policy_ids, sinistre_types)
+
+    # factorize in one pass (a dict is much faster than np.unique on strings)
+    codes: Dict[Any, int] = {}
+    inverse = np.fromiter((codes.setdefault(key, len(codes)) for key in keys), dtype=np.intp, count=len(sinistre_types))
+
+    franchises = np.empty(len(codes), dtype=np.float64)
+    plafonds = np.empty(len(codes), dtype=np.float64)
+    for key, i in codes.items():
+        policy_id, sinistre_type = (None, key) if policy_ids is None else key
+        guarantee = get_guarantee_for_type(sinistre_type, policy_id=policy_id)
+        franchises[i] = guarantee.get("franchise", 0)
+        plafond = guarantee.get("plafond", None)
+        plafonds[i] = np.nan if plafond is None else plafond
+    return {"franchise": franchises[inverse], "plafond": plafonds[inverse]}
+
+
+def batch_compensation(
+    estimated_costs: Any,
+    sinistre_types: Optional[Sequence[str]] = None,
+    franchises: Any = None,
+    plafonds: Any = None,
+    policy_ids: Optional[Sequence[Optional[str]]] = None,
+) -> np.ndarray:
+    """
+    Vectorized compute_compensation over arrays of claims.
+
+    Terms come from `franchises` / `plafonds` (arrays or scalars, NaN or None
+    plafond = no cap) when given, else from the guarantees of `sinistre_types`
+    (and the contracts of `policy_ids`); without sinistre_types a missing
+    `plafonds` means no cap. Returns a float64 array of final_compensation.
+    """
+    costs = np.asarray(estimated_costs, dtype=np.float64)
+    if costs.ndim != 1:
+        raise ValueError(f"estimated_costs must be 1-D, got shape {costs.shape}")
+    size = costs.shape[0]
+
+    if franchises is None or (plafonds is None and sinistre_types is not None):
+        if sinistre_types is None:
+            raise ValueError("sinistre_types is required when franchises/plafonds are not given")
+        if len(sinistre_types) != size:
+            raise ValueError(f"sinistre_types has {len(sinistre_types)} rows, expected {size}")
+        terms = resolve_terms(sinistre_types, policy_ids)
+        if franchises is None:
+            franchises = terms["franchise"]
+        if plafonds is None:
+            plafonds = terms["plafond"]
+
+    franchise = _as_float_array(franchises, size, "franchises")
+    plafond = _plafond_array(plafonds, size)
+
+    after_franchise = np.maximum(costs - franchise, 0.0)
+    return np.where(np.isnan(plafond), after_franchise, np.minimum(after_franchise, plafond))
@@ -1,8 +1,12 @@
 from PIL import Image
-import json
 
 from assurhabitat_agents.model.vlm_model_loading import vlm_inference
+from assurhabitat_agents.model.constrained_decoding import GENERATION_STATS
+from assurhabitat_agents.model.streaming_json import parse_json_text
 from assurhabitat_agents.utils import get_guarantee_for_type
+from assurhabitat_agents.tools.compensation import compute_compensation
+from assurhabitat_agents.config.model_config import CONSTRAINED_DECODING
+from assurhabitat_agents.config.tool_schemas import COST_ESTIMATION_SCHEMA
 from assurhabitat_agents.config.langfuse_config import observe
 
 @observe(name="cost_estimation")
@@ -24,23 +28,21 @@ Return ONLY a JSON object, strictly in this format:
 - Return ONLY valid JSON.
 - No commentary, no markdown.
 """
-    raw_output = vlm_inference(image_path, prompt)
+    raw_output = vlm_inference(image_path, prompt, json_schema=COST_ESTIMATION_SCHEMA, call_site="cost_estimation")
 
     try:
-        analysis = json.loads(raw_output)
+        analysis = parse_json_text(raw_output)
         estimated_cost = float(analysis["estimated_cost"])
         explanation = analysis["explanation"]
     except Exception:
+        GENERATION_STATS.record_parse("cost_estimation", CONSTRAINED_DECODING, ok=False)
         return {"error": f"VLM JSON parsing failed: {raw_output}"}
+    GENERATION_STATS.record_parse("cost_estimation", CONSTRAINED_DECODING, ok=True)
 
     garant = get_guarantee_for_type(parsed_declaration["sinistre_type"])
     plafond = garant.get("plafond", None)
     franchise = garant.get("franchise", 0)
-    after_franchise = max(estimated_cost - franchise, 0)
-    if plafond is None:
-        final_compensation = after_franchise
-    else:
-        final_compensation = min(after_franchise, plafond)
+    final_compensation = compute_compensation(estimated_cost, franchise, plafond)
 
     output = {
         "estimated_cost": estimated_cost,
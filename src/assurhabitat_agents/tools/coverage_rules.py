@@ -0,0 +1,275 @@
+# src/assurhabitat_agents/tools/coverage_rules.py
+"""
+Deterministic coverage pre-check used by check_guarantee.
+
+Decides the clear cases from the guarantee lists and the policy obligations,
+and leaves everything else to the LLM:
+  - a declaration matching every distinguishing keyword of an exclusion
+    -> not covered,
+  - exclusion cues (négligence, volontaire, sans effraction, ...), a partial
+    exclusion match or a declaration made after the deadline
+    -> escalate,
+  - an exclusion about missing evidence ("sans effraction") without the
+    positive evidence in the declaration (effraction, escalade, violence)
+    -> escalate,
+  - a confidently classified sinistre whose text matches most of the
+    distinguishing keywords of one couverture item -> covered. The words
+    naming the sinistre type itself (vol, incendie, its aliases) and generic
+    words (causé, dégâts, voisins, murs...) do not count: "Vol de mon vélo"
+    is not a covered theft, and neither is mould on a wall never repaired.
+"""
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from assurhabitat_agents.policy_kb import fold_key
+
+# Below this confidence the LLM decides
+RULE_CONFIDENCE_THRESHOLD = 0.85
+# sinistre_confidence needed to trust the parsed sinistre_type
+MIN_TYPE_CONFIDENCE = 0.8
+
+_STOPWORDS = {
+    "de", "des", "du", "la", "le", "les", "un", "une", "et", "ou", "en", "au", "aux", "a", "par",
+    "pour", "sur", "dans", "avec", "si", "ne", "pas", "non", "est", "ete", "son", "sa", "ses",
+    "leur", "d", "l", "s", "y", "comme", "lors", "ayant", "cause", "the", "of", "and", "or",
+}
+# Wording that usually points at an exclusion; the LLM has to confirm it.
+EXCLUSION_CUES = (
+    "negligence", "negligent", "volontaire", "intentionnel", "intentional", "expres", "sans effraction",
+    "laisse ouvert", "non ferme", "non declare", "defaut d entretien", "manque d entretien",
+    "pas entretenu", "deja connu", "connue depuis", "travaux non declares",
+)
+
+# Exclusions about missing evidence: cue in the exclusion -> words that establish the evidence.
+# Without one of them in the declaration the rules never auto-cover.
+EVIDENCE_REQUIRED = {
+    "sans effraction": "effraction escalade violence agression forcee fracturee arrachee",
+}
+
+# Words of the couverture lists that say nothing about the cause of the damage
+GENERIC_COVERAGE_WORDS = (
+    "cause causes causee causees causer degat degats dommage dommages endommage "
+    "responsabilite civile voisin voisins mur murs toiture joint joints plafond sol"
+)
+# Share of an item's distinguishing keywords the declaration must contain (strict majority)
+MIN_COVERAGE_MATCH = 0.5
+
+_DATE_FORMATS = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d.%m.%Y")
+
+
+def _stem(token: str) -> str:
+    if len(token) > 3 and token.endswith(("s", "x")):
+        token = token[:-1]
+    if len(token) > 4 and token.endswith("e"):
+        token = token[:-1]
+    return token
+
+
+def keywords(text: str) -> Set[str]:
+    """Accent-free stemmed content words of a text."""
+    return {_stem(t) for t in fold_key(text).split("_") if t and t not in _STOPWORDS}
+
+
+def parse_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if not isinstance(value, str):
+        return None
+    for fmt in _DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def business_days_between(start: date, end: date) -> int:
+    """Working days (Mon-Fri) after `start` up to and including `end`."""
+    if end <= start:
+        return 0
+    days = (end - start).days
+    weeks, remainder = divmod(days, 7)
+    count = weeks * 5
+    for offset in range(1, remainder + 1):
+        if (start + timedelta(days=offset)).weekday() < 5:
+            count += 1
+    return count
+
+
+def declaration_deadline(sinistre_type: str, obligations: Dict[str, Any], sinistre_delay: Optional[int]) -> Optional[int]:
+    """Deadline in working days: obligations_generales wins for theft, else the sinistre's own delay."""
+    if sinistre_type.startswith("vol") and obligations.get("vol_vandalisme_jours_ouvres") is not None:
+        return obligations["vol_vandalisme_jours_ouvres"]
+    if sinistre_delay is not None:
+        return sinistre_delay
+    return obligations.get("declaration_sinistre_jours_ouvres")
+
+
+def _declaration_text(parsed_declaration: Dict[str, Any]) -> str:
+    extracted = parsed_declaration.get("extracted") or {}
+    parts: List[str] = [
+        str(extracted.get("description") or ""),
+        str(parsed_declaration.get("sinistre_explain") or ""),
+        " ".join(map(str, extracted.get("biens_impactes") or [])),
+    ]
+    return " ".join(parts)
+
+
+def _matched_coverage(couverture: Iterable[str], words: Set[str], type_words: Set[str]) -> Optional[tuple]:
+    """
+    (item, matched keywords) of the couverture item whose distinguishing
+    keywords the declaration matches best, when it matches most of them.
+    Naming the sinistre ("vol", "incendie") or generic words are not evidence.
+    """
+    ignored = type_words | keywords(GENERIC_COVERAGE_WORDS)
+    best = None
+    for item in couverture:
+        distinguishing = keywords(item) - ignored
+        if not distinguishing:
+            continue
+        matched = sorted(distinguishing & words)
+        share = len(matched) / len(distinguishing)
+        if share > MIN_COVERAGE_MATCH and (best is None or share > best[0]):
+            best = (share, item, matched)
+    return best[1:] if best else None
+
+
+def evaluate_coverage(
+    parsed_declaration: Dict[str, Any],
+    guarantee: Dict[str, Any],
+    obligations: Optional[Dict[str, Any]] = None,
+    sinistre_delay: Optional[int] = None,
+    declared_on: Optional[date] = None,
+    type_aliases: Iterable[str] = (),
+) -> Dict[str, Any]:
+    """
+    Rule-based coverage decision.
+    type_aliases: names of the sinistre type (PolicyKB.aliases_of), not counted
+    as coverage evidence.
+    Returns {"guaranteed": bool | None, "confidence": float, "reasons": [...],
+             "matched_exclusions": [...], "late_declaration": bool | None}.
+    guaranteed is None when the rules cannot decide.
+    """
+    sinistre_type = str(parsed_declaration.get("sinistre_type") or "")
+    text = _declaration_text(parsed_declaration)
+    folded_text = " ".join(fold_key(text).split("_"))
+    words = keywords(text)
+
+    coverage_words: Set[str] = set()
+    for item in guarantee.get("couverture", []):
+        coverage_words |= keywords(item)
+    type_words = keywords(sinistre_type.replace("_", " "))
+    for alias in type_aliases:
+        type_words |= keywords(alias)
+
+    reasons: List[str] = []
+    matched_exclusions: List[str] = []
+    partial_exclusions: List[str] = []
+    for exclusion in guarantee.get("exclusions", []):
+        # only the words that distinguish the exclusion from the covered cases count
+        distinguishing = keywords(exclusion) - coverage_words
+        if not distinguishing:
+            continue
+        hit = len(distinguishing & words) / len(distinguishing)
+        if hit == 1.0 and len(distinguishing) >= 2:
+            matched_exclusions.append(exclusion)
+        elif hit >= 0.5:
+            partial_exclusions.append(exclusion)
+
+    cues = [cue for cue in EXCLUSION_CUES if cue in folded_text]
+
+    # declaration deadline
+    late: Optional[bool] = None
+    occurred = parse_date((parsed_declaration.get("extracted") or {}).get("date_sinistre"))
+    deadline = declaration_deadline(sinistre_type, obligations or {}, sinistre_delay)
+    if occurred is not None and deadline is not None:
+        declared = declared_on or parse_date(parsed_declaration.get("date_declaration")) or date.today()
+        elapsed = business_days_between(occurred, declared)
+        late = elapsed > deadline
+        if late:
+            reasons.append(f"Déclaration faite {elapsed} jours ouvrés après le sinistre (délai: {deadline}).")
+
+    result = {
+        "guaranteed": None,
+        "confidence": 0.0,
+        "reasons": reasons,
+        "matched_exclusions": matched_exclusions,
+        "late_declaration": late,
+    }
+
+    if matched_exclusions:
+        result["guaranteed"] = False
+        result["confidence"] = 0.9
+        reasons.append(f"Exclusion applicable: {matched_exclusions[0]}")
+        return result
+
+    if cues or partial_exclusions:
+        reasons.append("Indices d'exclusion: " + ", ".join(cues + partial_exclusions))
+        return result
+    if late:
+        return result
+
+    missing_evidence = [
+        exclusion
+        for exclusion in guarantee.get("exclusions", [])
+        for cue, evidence in EVIDENCE_REQUIRED.items()
+        if cue in " ".join(fold_key(exclusion).split("_")) and not (keywords(evidence) & words)
+    ]
+    if missing_evidence:
+        reasons.append("Aucun élément ne permet d'écarter l'exclusion: " + ", ".join(missing_evidence))
+        return result
+
+    type_confidence = float(parsed_declaration.get("sinistre_confidence") or 0.0)
+    covered_item = _matched_coverage(guarantee.get("couverture", []), words, type_words)
+    if type_confidence >= MIN_TYPE_CONFIDENCE and covered_item:
+        item, covered_words = covered_item
+        result["guaranteed"] = True
+        result["confidence"] = min(0.95, type_confidence)
+        reasons.append(f"Sinistre {sinistre_type} couvert: {item} ({', '.join(covered_words)}), aucune exclusion relevée.")
+    else:
+        reasons.append("Classification ou description insuffisante pour décider sans le LLM.")
+    return result
+
+
+# =========================
+# Metrics
+# =========================
+class CoverageStats:
+    """How many guarantee checks were decided by the rules vs sent to the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.rules_covered = 0
+            self.rules_not_covered = 0
+            self.escalated = 0
+
+    def record(self, decided_by: str, guaranteed: Optional[bool]) -> None:
+        with self._lock:
+            if decided_by == "llm":
+                self.escalated += 1
+            elif guaranteed:
+                self.rules_covered += 1
+            else:
+                self.rules_not_covered += 1
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            decided = self.rules_covered + self.rules_not_covered
+            total = decided + self.escalated
+            return {
+                "total": total,
+                "rules_covered": self.rules_covered,
+                "rules_not_covered": self.rules_not_covered,
+                "escalated_to_llm": self.escalated,
+                "llm_bypass_rate": decided / total if total else 0.0,
+            }
+
+
+COVERAGE_STATS = CoverageStats()
@@ -0,0 +1,412 @@
+# src/assurhabitat_agents/tools/declaration_fast_path.py
+"""
+First tier of parse_declaration: a CPU keyword classifier plus regex
+extractors (French and English) for the date, the room, the damaged items,
+the police report number and photo paths.
+
+The classifier is linear over a weighted lexicon: each sinistre type gets
+the sum of the weights of its keywords found in the text, and a softmax
+with an extra "no evidence" class turns the scores into probabilities,
+so a declaration mentioning nothing specific, or two types at once
+("du feu et de l'eau"), stays under the threshold and goes to the LLM.
+A keyword right after a negation ("pas de feu", "sans effraction") is not
+evidence. The LLM is only bypassed on enough evidence (two distinct
+keywords or a high raw score) with a clear margin over the runner-up: a
+single keyword ("Mon vol a été annulé") already reaches 0.87.
+
+The same extractors merge the policyholder's reply to AskHuman into the
+missing fields (merge_reply); only replies they cannot map go back to the
+LLM completion prompt.
+"""
+import copy
+import math
+import re
+import threading
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from assurhabitat_agents.policy_kb import fold_key
+from assurhabitat_agents.tools.coverage_rules import keywords, parse_date
+
+# weight of the "no evidence" class in the softmax
+NO_EVIDENCE_SCORE = 0.0
+# evidence needed to bypass the LLM, on top of the probability threshold:
+# MIN_EVIDENCE_HITS distinct keywords or a raw score of MIN_EVIDENCE_SCORE,
+# and MIN_SCORE_MARGIN of raw score over the runner-up type
+MIN_EVIDENCE_HITS = 2
+MIN_EVIDENCE_SCORE = 5.0
+MIN_SCORE_MARGIN = 2.0
+# a keyword preceded by one of these within NEGATION_WINDOW words is dropped
+NEGATIONS = {"pas", "sans", "aucun", "aucune", "ni", "jamais", "no", "not", "without", "never"}
+NEGATION_WINDOW = 3
+
+LEXICON: Dict[str, Dict[str, float]] = {
+    "degats_des_eaux": {
+        "fuite": 3, "eau": 2, "inondation": 3, "inonde": 3, "infiltration": 3, "infiltre": 3,
+        "canalisation": 2.5, "tuyau": 2.5, "debordement": 2.5, "deborde": 2.5, "degat des eaux": 3,
+        "humidite": 1.5, "moisissure": 1.5, "robinet": 1.5, "chauffe eau": 2, "lave linge": 1,
+        "pluie": 1.5,
+        "water": 2, "leak": 3, "leaked": 3, "leaking": 3, "rain": 1.5, "flood": 3, "flooded": 3, "pipe": 2.5, "overflow": 2.5,
+        "plumbing": 2.5, "damp": 1.5, "mold": 1.5, "tap": 1.5,
+    },
+    "incendie_explosion": {
+        "incendie": 3, "feu": 3, "flamme": 2.5, "brule": 2.5, "fumee": 2, "suie": 2.5, "explosion": 3,
+        "explose": 3, "pompier": 2, "court circuit": 2, "carbonise": 2.5,
+        "fire": 3, "burnt": 2.5, "burned": 2.5, "burning": 2.5, "flame": 2.5, "smoke": 2, "soot": 2.5,
+        "exploded": 3, "firefighter": 2, "short circuit": 2, "blaze": 3,
+    },
+    "vol_vandalisme": {
+        "vol": 3, "vole": 3, "cambriolage": 3, "cambriole": 3, "cambrioleur": 3, "effraction": 3,
+        "vandalisme": 3, "vandalise": 3, "tag": 2, "graffiti": 2.5, "force": 1.5, "forcee": 2, "plainte": 2,
+        "theft": 3, "stolen": 3, "steal": 3, "burglary": 3, "burglar": 3, "break in": 3, "broke into": 3,
+        "vandalism": 3, "vandalized": 3, "vandalised": 3, "burglarized": 3, "forced": 2, "police": 1.5,
+        "missing": 1.5, "disappeared": 2,
+    },
+}
+
+_MONTHS = {
+    "janvier": 1, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6, "juillet": 7, "aout": 8,
+    "septembre": 9, "octobre": 10, "novembre": 11, "decembre": 12,
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7, "august": 8,
+    "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8, "sep": 9, "sept": 9,
+    "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH = "(" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\b"
+_DAY = r"(\d{1,2}|1er|premier|first)(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+(\d{4}))?"
+
+# patterns run on the accent-free lowercase text
+_DATE_PATTERNS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r"\b(\d{4})-(\d{1,2})-(\d{1,2})\b"), "ymd"),
+    (re.compile(r"\b(\d{1,2})[/.](\d{1,2})[/.](\d{4}|\d{2})\b"), "dmy"),
+    (re.compile(r"\b" + _DAY + r"\s+(?:of\s+)?" + _MONTH + _YEAR), "day_month"),
+    (re.compile(r"\b" + _MONTH + r"\s+(?:the\s+)?" + _DAY + r"\b" + _YEAR), "month_day"),
+]
+_RELATIVE_DAYS = [
+    (re.compile(r"\bavant[- ]hier\b|\bday before yesterday\b"), 2),
+    (re.compile(r"\bhier\b|\byesterday\b|\blast night\b"), 1),
+    (re.compile(r"\baujourd ?hui\b|\bce matin\b|\bce soir\b|\bcette nuit\b|\btoday\b|\bthis morning\b|\btonight\b"), 0),
+]
+
+# displayed as found in the text (plural / accents kept)
+_ROOMS = [
+    "salle de bains?", "salle d'eau", "salle à manger", "salle a manger", "cuisine", "salon", "séjour", "sejour",
+    "chambre", "garage", "cave", "grenier", "sous-sol", "couloir", "entrée", "hall", "toilettes", "buanderie", "bureau",
+    "jardin", "balcon", "terrasse", "véranda", "veranda",
+    "bathroom", "kitchen", "living room", "dining room", "bedroom", "basement", "attic", "hallway", "garden",
+    "laundry room", "office", "cellar", "entrance",
+]
+_ITEMS = [
+    "plafonds?", "sols?", "murs?", "portes?", "fenêtres?", "fenetres?", "four", "parquet", "moquette", "tapis",
+    "meubles?(?: sous-lavabo)?", "canapés?", "lits?", "télévision", "television", "télé", "ordinateurs?",
+    "bijoux", "vélos?", "toiture", "toit", "volets?", "placards?", "cuisinière", "réfrigérateur", "frigo",
+    "lave-linge", "lave-vaisselle", "peintures?", "papier peint", "carrelage", "rideaux?", "vitres?", "serrure",
+    "ceilings?", "floors?", "walls?", "doors?", "windows?", "oven", "carpets?", "rugs?", "furniture", "sofa",
+    "couch", "beds?", "tv", "laptops?", "computers?", "jewel(?:le)?ry", "bikes?", "roof", "shutters?",
+    "cupboards?", "fridge", "washing machine", "dishwasher", "paint", "wallpaper", "tiles?", "curtains?",
+    "lock", "debris",
+]
+_ROOM_RE = re.compile(r"\b(" + "|".join(_ROOMS) + r")\b", re.IGNORECASE)
+_ITEM_RE = re.compile(r"\b(" + "|".join(_ITEMS) + r")\b", re.IGNORECASE)
+_POLICE_REPORT_RE = re.compile(
+    r"(?:plainte|proc[eè]s[- ]verbal|\bpv\b|r[ée]c[ée]piss[ée]|police report|report number|complaint)",
+    re.IGNORECASE,
+)
+# identifiers after a report keyword (up to _REPORT_WINDOW characters), optionally introduced by n°/numéro/PV/réf
+_REPORT_ID_RE = re.compile(
+    r"(?:(n°\s*:?\s*|\bno\.?\s+|\b(?:num[ée]ro|number|r[ée]f(?:[ée]rence)?|pv)\b\.?\s*:?\s*))?"
+    r"(?<![\w\-/])([A-Z]{0,4}[-/]?\d[\w\-/]{2,})",
+    re.IGNORECASE,
+)
+# shape of an identifier given without an introducer: a letter prefix and 3+ digits, or 5+ digits
+_REPORT_SHAPE_RE = re.compile(r"^(?:[A-Z]{1,4}[-/]?\d{3,}|\d{5,})(?:[-/]\w+)*$", re.IGNORECASE)
+# never an identifier: ordinals (15e, 2ème), times (14h30), amounts (450€, 450 euros)
+_NOT_REPORT_ID_RE = re.compile(r"^\d+(?:e|er|ere|eme|ème|nd|nde|st|rd|th)$|^\d{1,2}h\d{0,2}$", re.IGNORECASE)
+_AMOUNT_SUFFIX_RE = re.compile(r"\s*(?:€|eur\b|euros?\b|\$)", re.IGNORECASE)
+_REPORT_WINDOW = 60
+_PHOTO_RE = re.compile(r"[\w\-./\\]+\.(?:jpe?g|png|webp|heic|gif|bmp)\b", re.IGNORECASE)
+# a bare identifier given as the answer to "quel est le numéro de plainte ?"
+_BARE_ID_RE = re.compile(r"^(n[°o]\.?\s*)?([A-Z]{0,4}[-/]?\d[\w\-/]{2,})$", re.IGNORECASE)
+_SEGMENT_RE = re.compile(r"[,;\n]+")
+# free-text fields taken as the whole reply when they are the only question
+_FREE_TEXT_FIELDS = {"lieu": 8, "description": None}
+
+
+def _fold(text: str) -> str:
+    """Lowercase accent-free words separated by single spaces."""
+    return " ".join(fold_key(text).split("_"))
+
+
+# single words are matched on stemmed keywords, phrases on the folded text
+_WORDS = {t: {next(iter(keywords(k))): w for k, w in lex.items() if " " not in k} for t, lex in LEXICON.items()}
+_PHRASES = {t: {_fold(k): w for k, w in lex.items() if " " in k} for t, lex in LEXICON.items()}
+
+
+# =========================
+# Classifier
+# =========================
+def _negated(tokens: List[str], position: int) -> bool:
+    return any(t in NEGATIONS for t in tokens[max(0, position - NEGATION_WINDOW):position])
+
+
+def classify(text: str) -> Dict[str, Any]:
+    """
+    Score the text against each sinistre type.
+    Returns {"scores": {type: prob}, "raw": {type: score}, "evidence": {type: [keywords]}},
+    probabilities summing to 1 with the "no evidence" class.
+    """
+    tokens = _fold(text).split()
+    # stemmed keywords, except those following a negation
+    words = set()
+    for i, token in enumerate(tokens):
+        if not _negated(tokens, i):
+            words |= keywords(token)
+    folded = f" {' '.join(tokens)} "
+    raw: Dict[str, float] = {}
+    evidence: Dict[str, List[str]] = {}
+    for sinistre_type in LEXICON:
+        hits = [w for w in _WORDS[sinistre_type] if w in words]
+        for phrase in _PHRASES[sinistre_type]:
+            start = folded.find(f" {phrase} ")
+            if start >= 0 and not _negated(tokens, folded[:start].count(" ")):
+                hits.append(phrase)
+        evidence[sinistre_type] = hits
+        raw[sinistre_type] = sum(_WORDS[sinistre_type].get(h) or _PHRASES[sinistre_type][h] for h in hits)
+
+    top = max(max(raw.values()), NO_EVIDENCE_SCORE)
+    exp = {t: math.exp(s - top) for t, s in raw.items()}
+    total = sum(exp.values()) + math.exp(NO_EVIDENCE_SCORE - top)
+    return {"scores": {t: e / total for t, e in exp.items()}, "raw": raw, "evidence": evidence}
+
+
+def has_enough_evidence(classification: Dict[str, Any], sinistre_type: str) -> bool:
+    """Enough distinct keywords (or raw score) and a clear margin over the other types."""
+    raw = classification["raw"]
+    runner_up = max((s for t, s in raw.items() if t != sinistre_type), default=0.0)
+    enough = (
+        len(classification["evidence"][sinistre_type]) >= MIN_EVIDENCE_HITS
+        or raw[sinistre_type] >= MIN_EVIDENCE_SCORE
+    )
+    return enough and raw[sinistre_type] - runner_up >= MIN_SCORE_MARGIN
+
+
+# =========================
+# Extractors
+# =========================
+def _latest_date(year: Optional[str], month: int, day: int, reference: date) -> Optional[date]:
+    """Build a date; without a year, the latest occurrence not after `reference`."""
+    try:
+        if year:
+            y = int(year)
+            return date(y + 2000 if y < 100 else y, month, day)
+        candidate = date(reference.year, month, day)
+        return candidate if candidate <= reference else date(reference.year - 1, month, day)
+    except ValueError:
+        return None
+
+
+def _day_number(token: str) -> int:
+    return 1 if token in ("1er", "premier", "first") else int(token)
+
+
+def extract_date(text: str, reference: Optional[date] = None) -> Optional[str]:
+    """First explicit or relative date of the text, as YYYY-MM-DD."""
+    reference = reference or date.today()
+    folded = _fold(text)
+    # numeric dates need the separators the folding removes
+    raw = text.lower()
+    for pattern, kind in _DATE_PATTERNS:
+        source = raw if kind in ("ymd", "dmy") else folded
+        m = pattern.search(source)
+        if not m:
+            continue
+        if kind == "ymd":
+            found = parse_date(m.group(0))
+        elif kind == "dmy":
+            found = _latest_date(m.group(3), int(m.group(2)), int(m.group(1)), reference)
+        elif kind == "day_month":
+            found = _latest_date(m.group(3), _MONTHS[m.group(2)], _day_number(m.group(1)), reference)
+        else:
+            found = _latest_date(m.group(3), _MONTHS[m.group(1)], _day_number(m.group(2)), reference)
+        if found:
+            return found.isoformat()
+    for pattern, days in _RELATIVE_DAYS:
+        if pattern.search(folded):
+            return (reference - timedelta(days=days)).isoformat()
+    return None
+
+
+def extract_lieu(text: str) -> Optional[str]:
+    m = _ROOM_RE.search(text)
+    return m.group(1).lower() if m else None
+
+
+def extract_items(text: str) -> List[str]:
+    return list(dict.fromkeys(m.group(1).lower() for m in _ITEM_RE.finditer(text)))
+
+
+def _report_id(candidate: str, following: str, introduced: bool) -> bool:
+    """Whether `candidate` can be a report identifier (introduced by n°/numéro/PV, or shaped like one)."""
+    if _NOT_REPORT_ID_RE.match(candidate) or _AMOUNT_SUFFIX_RE.match(following):
+        return False
+    if extract_date(candidate) is not None:
+        return False
+    return introduced or bool(_REPORT_SHAPE_RE.match(candidate))
+
+
+def extract_police_report_number(text: str) -> Optional[str]:
+    """
+    Identifier following a police report keyword: the one introduced by
+    n°/numéro/PV/réf if any, else the first shaped like an identifier
+    ("plainte déposée le 12/10/2026 sous le numéro 45821" -> 45821).
+    Dates, ordinals, times and amounts are never taken
+    ("plainte au commissariat du 15e à 14h30" -> None).
+    """
+    for m in _POLICE_REPORT_RE.finditer(text):
+        line_end = text.find("\n", m.end())
+        tail = text[m.end(): len(text) if line_end < 0 else line_end]
+        candidates = [c for c in _REPORT_ID_RE.finditer(tail)
+                      if c.start(2) < _REPORT_WINDOW and _report_id(c.group(2), tail[c.end():], bool(c.group(1)))]
+        if candidates:
+            introduced = [c for c in candidates if c.group(1)]
+            return (introduced or candidates)[0].group(2)
+    return None
+
+
+def extract_photo_paths(text: str) -> List[str]:
+    return list(dict.fromkeys(m.group(0) for m in _PHOTO_RE.finditer(text)))
+
+
+# =========================
+# Fast path
+# =========================
+def fast_parse(raw_input: str, threshold: float, reference: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """
+    Parse a declaration without the LLM. Returns the parse_declaration dict,
+    or None when the classifier is not confident enough or lacks evidence (or the input merges
+    a previous JSON, which only the LLM knows how to update).
+    """
+    if "{" in raw_input:
+        return None
+    classification = classify(raw_input)
+    scores = classification["scores"]
+    sinistre_type, confidence = max(scores.items(), key=lambda kv: kv[1])
+    if confidence < threshold or not has_enough_evidence(classification, sinistre_type):
+        return None
+
+    extracted: Dict[str, Any] = {
+        "date_sinistre": extract_date(raw_input, reference),
+        "lieu": extract_lieu(raw_input),
+        "description": raw_input.strip(),
+        "biens_impactes": extract_items(raw_input),
+    }
+    if sinistre_type == "vol_vandalisme":
+        extracted["police_report_number"] = extract_police_report_number(raw_input)
+
+    return {
+        "sinistre_type": sinistre_type,
+        "sinistre_confidence": round(confidence, 4),
+        "sinistre_explain": "Mots-clés: " + ", ".join(classification["evidence"][sinistre_type]),
+        "candidates": [
+            {"type": t, "score": round(s, 4)}
+            for t, s in sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+            if s >= 0.01
+        ],
+        "extracted": extracted,
+        "parsed_by": "fast_path",
+    }
+
+
+# =========================
+# Reply merge
+# =========================
+def _bare_report_number(reply: str) -> Optional[str]:
+    """A reply segment that is only an identifier (not a date nor a photo)."""
+    for segment in _SEGMENT_RE.split(reply):
+        segment = segment.strip()
+        m = _BARE_ID_RE.match(segment)
+        if m and not _PHOTO_RE.search(segment) and _report_id(m.group(2), "", bool(m.group(1))):
+            return m.group(2)
+    return None
+
+
+def _extract_field(field: str, reply: str, reference: Optional[date]) -> Any:
+    if field == "date_sinistre":
+        return extract_date(reply, reference)
+    if field == "police_report_number":
+        return extract_police_report_number(reply) or _bare_report_number(reply)
+    if field == "photo":
+        return extract_photo_paths(reply) or None
+    if field == "lieu":
+        return extract_lieu(reply)
+    if field == "biens_impactes":
+        return extract_items(reply) or None
+    return None
+
+
+def merge_reply(
+    parsed_declaration: Dict[str, Any],
+    missing: List[str],
+    reply: str,
+    reference: Optional[date] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Fill the missing fields of parsed_declaration["extracted"] from the
+    policyholder's reply. Returns an updated copy, or None when one of the
+    fields cannot be extracted (the LLM completion prompt handles it).
+    Fields already present are never modified.
+    """
+    if not missing or not reply or not reply.strip():
+        return None
+    reply = reply.strip()
+
+    filled: Dict[str, Any] = {}
+    for field in missing:
+        value = _extract_field(field, reply, reference)
+        if value is None and len(missing) == 1 and field in _FREE_TEXT_FIELDS:
+            # single open question ("Où ?"): the reply is the answer
+            max_words = _FREE_TEXT_FIELDS[field]
+            if max_words is None or len(reply.split()) <= max_words:
+                value = reply
+        if value is None:
+            return None
+        filled[field] = value
+
+    merged = copy.deepcopy(parsed_declaration)
+    merged.setdefault("extracted", {}).update(filled)
+    return merged
+
+
+class FastPathStats:
+    """How many declarations (or replies) the first tier handled vs sent to the LLM."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.fast_path = 0
+            self.llm = 0
+
+    def record(self, bypassed: bool) -> None:
+        with self._lock:
+            if bypassed:
+                self.fast_path += 1
+            else:
+                self.llm += 1
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.fast_path + self.llm
+            return {
+                "total": total,
+                "fast_path": self.fast_path,
+                "llm": self.llm,
+                "llm_bypass_rate": self.fast_path / total if total else 0.0,
+            }
+
+
+FAST_PATH_STATS = FastPathStats()
+REPLY_MERGE_STATS = FastPathStats()
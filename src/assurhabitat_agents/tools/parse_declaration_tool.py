@@ -1,13 +1,18 @@
-import json
 from typing import Any, Dict, List, Optional
 from assurhabitat_agents.model.llm_model_loading import llm_inference
+from assurhabitat_agents.model.streaming_json import parse_json_text
+from assurhabitat_agents.model.constrained_decoding import GENERATION_STATS
+from assurhabitat_agents.tools.declaration_fast_path import FAST_PATH_STATS, fast_parse
+from assurhabitat_agents.config.model_config import CONSTRAINED_DECODING, FAST_DECLARATION_PARSING, FAST_PARSE_THRESHOLD
+from assurhabitat_agents.config.tool_schemas import PARSE_DECLARATION_SCHEMA
 from assurhabitat_agents.config.langfuse_config import observe
 
 def _safe_parse_json(maybe_json: Any) -> Dict[str, Any]:
     """
     Try to convert the LLM output into a Python dict.
     Accepts either a dict (already parsed) or a JSON string.
-    Tries a few simple fixes if the string is not pure JSON.
+    Repairs common faults (text around the JSON, single quotes, unquoted
+    identifiers, trailing commas) in a single pass.
     Raises ValueError if it cannot parse.
     """
     if isinstance(maybe_json, dict):
@@ -16,20 +21,7 @@ def _safe_parse_json(maybe_json: Any) -> Dict[str, Any]:
     if not isinstance(maybe_json, str):
         raise ValueError("LLM output is neither dict nor string")
 
-    text = maybe_json.strip()
-    # Try direct json.loads
-    try:
-        return json.loads(text)
-    except Exception:
-        # Sometimes LLM adds text before JSON -> try to find first '{'
-        first_brace = text.find('{')
-        if first_brace != -1:
-            try:
-                return json.loads(text[first_brace:])
-            except Exception:
-                pass
-    # If still failing, raise a clear error
-    raise ValueError("Could not parse LLM output as JSON")
+    return parse_json_text(maybe_json)
 
 @observe(name="parse_declaration")
 def parse_declaration(raw_input: str) -> Dict[str, Any]:
@@ -55,7 +47,15 @@ def parse_declaration(raw_input: str) -> Dict[str, Any]:
     Notes:
     - The LLM must judge the sinistre type based on the raw_input only.
     - The function returns a dict with defaults for missing fields.
+    - Declarations the keyword classifier is confident about are parsed
+      locally (declaration_fast_path) and never reach the LLM;
+      "parsed_by" tells which tier answered.
     """
+    if FAST_DECLARATION_PARSING:
+        fast = fast_parse(raw_input, FAST_PARSE_THRESHOLD)
+        FAST_PATH_STATS.record(bypassed=fast is not None)
+        if fast is not None:
+            return fast
 
     # Build a simple prompt with a strict JSON output requirement and few examples.
     prompt = f"""
@@ -103,12 +103,14 @@ Now process this input text:
 """.strip()
 
     # Call the LLM (llm_inference is expected to return either a dict or a JSON string)
-    llm_output = llm_inference(prompt)
+    llm_output = llm_inference(prompt, json_schema=PARSE_DECLARATION_SCHEMA, call_site="parse_declaration")
 
     # Parse result safely
     try:
         parsed = _safe_parse_json(llm_output)
+        GENERATION_STATS.record_parse("parse_declaration", CONSTRAINED_DECODING, ok=True)
     except ValueError as e:
+        GENERATION_STATS.record_parse("parse_declaration", CONSTRAINED_DECODING, ok=False)
         # On parse error, return a safe fallback structure with error info in explanation
         return {
             "sinistre_type": "ambiguous",
@@ -120,7 +122,8 @@ Now process this input text:
                 "lieu": None,
                 "description": raw_input.strip(),
                 "biens_impactes": []
-            }
+            },
+            "parsed_by": "llm",
         }
 
     # Normalize output to ensure expected keys exist
@@ -150,6 +153,9 @@ Now process this input text:
         "description": extracted.get("description") or raw_input.strip(),
         "biens_impactes": extracted.get("biens_impactes") if isinstance(extracted.get("biens_impactes"), list) else []
     }
+    if "police_report_number" in extracted:
+        extracted_safe["police_report_number"] = extracted.get("police_report_number")
     result["extracted"] = extracted_safe
+    result["parsed_by"] = "llm"
 
     return result
\ No newline at end of file
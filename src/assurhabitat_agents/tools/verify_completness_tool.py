@@ -1,7 +1,27 @@
-from typing import Dict, Any, List
+import ast
+import json
+from typing import Dict, Any, List, Sequence
+
+import numpy as np
+
 from assurhabitat_agents.utils import get_expected_fields
 from assurhabitat_agents.config.langfuse_config import observe
 
+# used when the YAML of a sinistre lists no required_fields
+DEFAULT_REQUIRED_FIELDS = ["date_sinistre", "lieu", "description"]
+
+
+def _is_missing(value: Any) -> bool:
+    """A field is missing when absent/None, an empty string or an empty list."""
+    if value is None:
+        return True
+    if isinstance(value, str) and value.strip() == "":
+        return True
+    if isinstance(value, list) and len(value) == 0:
+        return True
+    return False
+
+
 @observe(name="verify_completeness")
 def verify_completeness(parsed_declaration: dict) -> Dict[str, Any]:
     """
@@ -21,56 +41,90 @@ def verify_completeness(parsed_declaration: dict) -> Dict[str, Any]:
     - photos are not required unless explicitly listed in YAML
     - description is always present (fallback), so usually not required
     """
-    sinistre_type = parsed_declaration["sinistre_type"]
-    extracted = parsed_declaration["extracted"]
-
-    # Load expected config from YAML
-    expected = get_expected_fields(sinistre_type)
-    print(f"TOOL verify_completeness: Champs requis pour ce sinistre: {expected}")
-    
     # if a JSON string accidentally passed, try to parse it
     if isinstance(parsed_declaration, str):
         try:
             parsed_declaration = json.loads(parsed_declaration)
         except Exception:
-            import ast
             try:
                 parsed_declaration = ast.literal_eval(parsed_declaration)
             except Exception:
                 # give a clear error early
                 return {"is_complete": False, "missing": [], "error": "parsed_declaration not parseable"}
 
+    sinistre_type = parsed_declaration["sinistre_type"]
+    extracted = parsed_declaration["extracted"]
+
+    # Expected config from the policy knowledge base
+    expected = get_expected_fields(sinistre_type)
+
     # Get the required_fields list from the YAML,
     # or a minimal default
-    required_fields: List[str] = expected.get(
-        "required_fields",
-        ["date_sinistre", "lieu", "description"]  # simplified minimal default
-    )
+    required_fields: List[str] = expected.get("required_fields") or DEFAULT_REQUIRED_FIELDS
 
-    missing_fields: List[str] = []
+    missing_fields = [field_name for field_name in required_fields if _is_missing(extracted.get(field_name))]
 
-    for field_name in required_fields:
-        value = extracted.get(field_name)
+    # Return final result
+    return {
+        "is_complete": len(missing_fields) == 0,
+        "missing": missing_fields
+    }
 
-        # Case 1: completely missing
-        if value is None:
-            missing_fields.append(field_name)
-            continue
 
-        # Case 2: empty string
-        if isinstance(value, str) and value.strip() == "":
-            missing_fields.append(field_name)
-            continue
+def verify_completeness_batch(parsed_declarations: Sequence[dict]) -> Dict[str, Any]:
+    """
+    Bulk version of verify_completeness for re-checking claim backlogs.
 
-        # Case 3: empty list (ex: photos or biens_impactes)
-        if isinstance(value, list) and len(value) == 0:
-            missing_fields.append(field_name)
+    Declarations are grouped by sinistre_type, the required fields are
+    resolved once per group and each field is checked column-wise over the
+    group. Returns:
+      {
+        "fields": [every field required by at least one type],
+        "missing": bool matrix (n_declarations x n_fields),
+        "is_complete": bool vector (n_declarations),
+        "errors": {row index: message} for malformed rows / unknown types
+      }
+    A field not required for a row's type is never reported missing.
+    """
+    n = len(parsed_declarations)
+    groups: Dict[str, List[int]] = {}
+    errors: Dict[int, str] = {}
+    for i, declaration in enumerate(parsed_declarations):
+        if not isinstance(declaration, dict) or not isinstance(declaration.get("extracted"), dict):
+            errors[i] = "parsed_declaration not parseable"
             continue
+        if not isinstance(declaration.get("sinistre_type"), str):
+            # lists are unhashable, other types break the type lookup
+            errors[i] = f"Invalid sinistre type: {declaration.get('sinistre_type')!r}"
+            continue
+        groups.setdefault(declaration.get("sinistre_type"), []).append(i)
 
-        # Otherwise: field is OK
+    # resolve required fields once per type
+    required: Dict[str, List[str]] = {}
+    for sinistre_type, rows in groups.items():
+        try:
+            required[sinistre_type] = get_expected_fields(sinistre_type).get("required_fields") or DEFAULT_REQUIRED_FIELDS
+        except KeyError:
+            for i in rows:
+                errors[i] = f"Unknown sinistre type: {sinistre_type}"
+        except Exception as e:
+            # one bad group does not fail the whole backlog
+            for i in rows:
+                errors[i] = f"{type(e).__name__}: {e}"
 
-    # Return final result
-    return {
-        "is_complete": len(missing_fields) == 0,
-        "missing": missing_fields
-    }
\ No newline at end of file
+    fields = list(dict.fromkeys(f for type_fields in required.values() for f in type_fields))
+    column = {f: j for j, f in enumerate(fields)}
+    missing = np.zeros((n, len(fields)), dtype=bool)
+
+    for sinistre_type, type_fields in required.items():
+        rows = np.asarray(groups[sinistre_type], dtype=np.intp)
+        extracted = [parsed_declarations[i]["extracted"] for i in rows]
+        for field_name in type_fields:
+            missing[rows, column[field_name]] = np.fromiter(
+                (_is_missing(e.get(field_name)) for e in extracted), dtype=bool, count=len(extracted)
+            )
+
+    is_complete = ~missing.any(axis=1)
+    if errors:
+        is_complete[list(errors)] = False
+    return {"fields": fields, "missing": missing, "is_complete": is_complete, "errors": errors}
@@ -1,8 +1,21 @@
+import os
 import yaml
 import re
 import json
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from assurhabitat_agents.model.streaming_json import StreamingJsonParser
+from assurhabitat_agents.contract_store import ContractStore, current_policy_id
+from assurhabitat_agents.policy_kb import (
+    PolicyKB,
+    PolicyKBWatcher,
+    load_policy_kb,
+    normalize_key,
+    pin_policy_kb,
+    pinned_kb,
+)
 
 # Config directory (expects sinistres.yaml and garanties.yaml in a `config` folder
 # next to this utils.py file).
@@ -25,99 +38,95 @@ def load_yaml(path: Path) -> Dict[str, Any]:
             raise ValueError(f"Invalid YAML in {path}: {e}")
 
 
-# Load configs once at module import (simple and efficient for a small project).
-try:
-    SINISTRES_DATA: Dict[str, Any] = load_yaml(SINISTRES_PATH)
-except FileNotFoundError:
-    SINISTRES_DATA = {}
-except ValueError:
-    SINISTRES_DATA = {}
+# Compiled knowledge base shared by every tool and agent. The watcher reloads
+# it when the YAML files change (checked at most every POLICY_RELOAD_INTERVAL
+# seconds, 0 = on every lookup), so contract updates need no worker restart.
+POLICY_RELOAD_INTERVAL = float(os.getenv("POLICY_RELOAD_INTERVAL", "5"))
 
-try:
-    GARANTIES_DATA: Dict[str, Any] = load_yaml(GARANTIES_PATH)
-except FileNotFoundError:
-    GARANTIES_DATA = {}
-except ValueError:
-    GARANTIES_DATA = {}
+
+@lru_cache(maxsize=1)
+def get_policy_watcher() -> PolicyKBWatcher:
+    """
+    Shared policy watcher, built on first use so that importing this module
+    never fails. Raises ValueError when the policy configuration cannot be
+    loaded (nothing is cached: the next call retries); entry points call it at
+    start-up to fail fast.
+    """
+    return PolicyKBWatcher(SINISTRES_PATH, GARANTIES_PATH, interval=POLICY_RELOAD_INTERVAL)
+
+
+def get_policy_kb() -> PolicyKB:
+    """
+    Return the policy knowledge base: the snapshot pinned for the current
+    claim (see policy_snapshot), else the latest one.
+    """
+    return pinned_kb() or get_policy_watcher().current()
+
+
+def policy_snapshot(version: Optional[int] = None):
+    """
+    Context manager pinning a snapshot for the duration of one claim: the
+    snapshot `version` (a resumed claim keeps the rules it started with), else
+    the latest one. Versions are counted per process; one that is no longer
+    held (older than the watcher history, or saved before a restart) falls
+    back to the latest snapshot.
+    """
+    watcher = get_policy_watcher()
+    kb = watcher.snapshot(version) if version is not None else None
+    if kb is None:
+        kb = watcher.current()
+        if version is not None and version != kb.version:
+            print(f"[policy_kb] policy version {version} no longer held, using version {kb.version}")
+    return pin_policy_kb(kb)
 
 
 def _normalize_key(key: str) -> str:
     """Normalize a sinistre key for lookups (lowercase, replace spaces)."""
-    if not key:
-        return ""
-    return key.strip().lower().replace(" ", "_")
+    return normalize_key(key)
 
 
 def get_expected_fields(sinistre_type: str) -> Dict[str, Any]:
     """
     Return the process/expected fields for a given sinistre type.
-    This reads from SINISTRES_DATA and returns a dict with defaults.
+    This reads from the policy knowledge base and returns a dict with defaults.
     Raises KeyError if the type is unknown.
     """
-    key = _normalize_key(sinistre_type)
-    sinistres = SINISTRES_DATA.get("sinistres", {})
-    data = sinistres.get(key)
-    if not data:
-        raise KeyError(f"Unknown sinistre type in sinistres.yaml: {sinistre_type}")
-
-    # Provide some safe defaults if keys are missing
-    return {
-        "nom": data.get("nom"),
-        "delai_declaration_jours_ouvres": data.get("delai_declaration_jours_ouvres"),
-        "attendu_assure": data.get("attendu_assure", []),
-        "pieces_justificatives": data.get("pieces_justificatives", []),
-        "process_assurance": data.get("process_assurance", []),
-        "cloture": data.get("cloture", []),
-        # allow YAML to specify required_fields; otherwise keep a minimal set
-        "required_fields": data.get("required_fields", ["date_sinistre", "lieu"])
-    }
-
-
-def get_guarantee_for_type(sinistre_type: str) -> Dict[str, Any]:
+    return get_policy_kb().expected_fields(sinistre_type)
+
+
+@lru_cache(maxsize=1)
+def get_contract_store() -> Optional[ContractStore]:
+    """Shared contract store, or None when CONTRACT_DB_PATH is not set."""
+    db_path = os.getenv("CONTRACT_DB_PATH")
+    return ContractStore(Path(db_path)) if db_path else None
+
+
+def get_guarantee_for_type(sinistre_type: str, policy_id: Optional[str] = None) -> Dict[str, Any]:
     """
-    Return the guarantee information for a sinistre type from garanties.yaml.
+    Return the guarantee information for a sinistre type from garanties.yaml,
+    overlaid with the contract terms of the policy (policy_id, else the policy
+    pinned for the current claim) when a contract store is configured.
     Raises KeyError if the type is unknown.
     """
-    key = _normalize_key(sinistre_type)
-    garanties = GARANTIES_DATA.get("garanties", {})
-    data = garanties.get(key)
-    if not data:
-        raise KeyError(f"Unknown sinistre type in garanties.yaml: {sinistre_type}")
-
-    return {
-        "couverture": data.get("couverture", []),
-        "exclusions": data.get("exclusions", []),
-        "plafond": data.get("plafond"),
-        "franchise": data.get("franchise"),
-    }
+    kb = get_policy_kb()
+    guarantee = kb.guarantee_for_type(sinistre_type)
+    policy_id = policy_id or current_policy_id()
+    store = get_contract_store() if policy_id else None
+    if store is not None:
+        terms = store.terms(policy_id, kb.resolve(sinistre_type))
+        if terms is not None:
+            return terms.apply(guarantee)
+    return guarantee
 
 
 def get_required_documents(sinistre_type: str) -> Dict[str, Any]:
     """
     Return required documents for a sinistre type.
-    Combines local pieces_justificatives from sinistres.yaml with global pieces_generales.
+    Combines local pieces_justificatives from sinistres.yaml with global pieces_generales
+    (merged once, when the knowledge base is built).
     Returns a dict: { "documents": [...], "notes": "..." }
     """
-    key = _normalize_key(sinistre_type)
-    sinistres = SINISTRES_DATA.get("sinistres", {})
-    garanties = GARANTIES_DATA
-
-    local = []
-    if key in sinistres:
-        local = sinistres[key].get("pieces_justificatives", [])
-
-    global_pieces = garanties.get("pieces_generales", []) if garanties else []
-    # combine while preserving order and removing duplicates
-    combined = []
-    for item in (local + global_pieces):
-        if item not in combined:
-            combined.append(item)
-
-    notes = ""
-    if key.startswith("vol"):
-        notes = "Dépôt de plainte requis dans les 24h, joindre numéro de procès-verbal."
-
-    return {"documents": combined, "notes": notes}
+    return get_policy_kb().required_documents(sinistre_type)
 
 
 # Optional helper for consumers: safe_get that doesn't raise KeyError
@@ -132,43 +141,115 @@ def safe_get_expected_fields(sinistre_type: str) -> Optional[Dict[str, Any]]:
         return None
     
 
-def parse_output(output: str):
-    text = output.strip()
+# =========================
+# ReAct output parsing
+# =========================
+# One alternation over every section marker, so a single finditer pass splits
+# the output into its Thought / Action / Arguments / Answer sections.
+_STEP_MARKER = re.compile(
+    r"(?mi)^[ \t]*(thought|action|arguments|observation|llm output|answer|réponse)[ \t]*:[ \t]*"
+)
 
-    # Action
-    m_action = re.search(r"(?mi)^Action:\s*(?P<tool>[^\n]+)", text)
-    m_args = re.search(r"(?mi)^Arguments:\s*(?P<args>[\s\S]+)$", text)
 
-    if m_action:
-        tool = m_action.group("tool").strip()
-        args = {}
+class ReActStep(NamedTuple):
+    """
+    One parsed LLM step.
+    kind: "action" | "answer" | "thought"
+    text: the answer for "answer", the whole output otherwise
+    error: set (instead of raising) when the arguments could not be parsed
+    """
+    kind: str
+    text: str
+    tool: Optional[str] = None
+    arguments: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
 
-        if m_args:
-            raw = m_args.group("args").strip()
 
-            # Trim noise
-            for token in ["Observation", "LLM output", "Thought", "Action"]:
-                idx = raw.find(token)
-                if idx > 0:
-                    raw = raw[:idx].strip()
+def _parse_arguments(raw: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    """Arguments as a JSON object (repaired, possibly partial) or key=value lines."""
+    raw = raw.strip()
+    if not raw:
+        return {}, None
 
-            # JSON only (lists OR dicts)
-            try:
-                parsed = json.loads(raw)
-                if not isinstance(parsed, dict):
-                    raise ValueError("Arguments must be a JSON object.")
-                args = parsed
-            except Exception:
-                raise ValueError(f"Invalid JSON arguments: {raw}")
+    if raw[0] == "{":
+        # well-formed JSON is the common case: let the C decoder take it
+        try:
+            parsed = json.loads(raw)
+            if isinstance(parsed, dict):
+                return parsed, None
+        except ValueError:
+            pass
+    if "{" in raw:
+        parser = StreamingJsonParser()
+        parser.feed(raw)
+        try:
+            return parser.close(), None
+        except ValueError:
+            return {}, f"Invalid JSON arguments: {raw}"
+
+    args: Dict[str, Any] = {}
+    for line in raw.splitlines():
+        key, sep, value = line.partition("=")
+        if not sep or not key.strip():
+            continue
+        value = value.strip()
+        try:
+            args[key.strip()] = json.loads(value)
+        except ValueError:
+            args[key.strip()] = value
+    if not args:
+        return {}, f"Arguments must be a JSON object or key=value lines: {raw}"
+    return args, None
 
-        return ("action", tool, args)
 
-    # Final response
-    m_resp = re.search(r"(?mi)^(Réponse|Answer):\s*(?P<ans>[\s\S]+)$", text)
-    if m_resp:
-        return ("answer", m_resp.group("ans").strip(), None)
+def parse_step(output: str) -> ReActStep:
+    """
+    Parse an LLM output following the Thought/Action/Arguments/Answer grammar.
+    An Action wins over an Answer; without both the output is a Thought.
+    Never raises: argument errors are reported in ReActStep.error.
+    """
+    text = output.strip()
 
-    return ("thought", text, None)
+    # first occurrence of each section: label -> (start, end) of its content
+    sections: Dict[str, Tuple[int, int]] = {}
+    label, content_start = None, 0
+    for m in _STEP_MARKER.finditer(text):
+        if label is not None and label not in sections:
+            sections[label] = (content_start, m.start())
+        label, content_start = m.group(1).lower(), m.end()
+    if label is not None and label not in sections:
+        sections[label] = (content_start, len(text))
+
+    if "action" in sections:
+        start, end = sections["action"]
+        tool = text[start:end].split("\n", 1)[0].strip().strip("`*\"' ")
+        if not tool:
+            return ReActStep("action", text, error="Empty tool name after 'Action:'")
+        args, error = ({}, None)
+        if "arguments" in sections:
+            start, end = sections["arguments"]
+            args, error = _parse_arguments(text[start:end])
+        return ReActStep("action", text, tool, args, error)
+
+    answer = sections.get("answer") or sections.get("réponse")
+    if answer:
+        # the answer runs to the end of the output
+        return ReActStep("answer", text[answer[0]:].strip())
+
+    return ReActStep("thought", text)
+
+
+def parse_output(output: str):
+    """
+    Tuple form of parse_step: ("action", tool, args), ("answer", text, None)
+    or ("thought", text, None). Raises ValueError on invalid arguments.
+    """
+    step = parse_step(output)
+    if step.error:
+        raise ValueError(step.error)
+    if step.kind == "action":
+        return ("action", step.tool, step.arguments)
+    return (step.kind, step.text, None)
 
 
 class DocTools:
@@ -188,72 +269,26 @@ class DocTools:
         self.sinistres_path = sinistres_path or SINISTRES_PATH
         self.garanties_path = garanties_path or GARANTIES_PATH
         
-        # Load data
-        self.sinistres_data = load_yaml(self.sinistres_path)
-        self.garanties_data = load_yaml(self.garanties_path)
+        # Compiled knowledge base, parsed once per pair of paths
+        self.kb = load_policy_kb(Path(self.sinistres_path), Path(self.garanties_path))
     
     def get_expected_fields(self, sinistre_type: str) -> Dict[str, Any]:
         """
         Return the process/expected fields for a given sinistre type.
-        Wrapper around the module-level function using instance data.
+        Wrapper around the knowledge base of this instance.
         """
-        key = _normalize_key(sinistre_type)
-        sinistres = self.sinistres_data.get("sinistres", {})
-        data = sinistres.get(key)
-        if not data:
-            raise KeyError(f"Unknown sinistre type in sinistres.yaml: {sinistre_type}")
-        
-        return {
-            "nom": data.get("nom"),
-            "delai_declaration_jours_ouvres": data.get("delai_declaration_jours_ouvres"),
-            "attendu_assure": data.get("attendu_assure", []),
-            "pieces_justificatives": data.get("pieces_justificatives", []),
-            "process_assurance": data.get("process_assurance", []),
-            "cloture": data.get("cloture", []),
-            "required_fields": data.get("required_fields", ["date_sinistre", "lieu"])
-        }
+        return self.kb.expected_fields(sinistre_type)
     
     def get_guarantee_for_type(self, sinistre_type: str) -> Dict[str, Any]:
         """
         Return the guarantee information for a sinistre type.
-        Wrapper around the module-level function using instance data.
+        Wrapper around the knowledge base of this instance.
         """
-        key = _normalize_key(sinistre_type)
-        garanties = self.garanties_data.get("garanties", {})
-        data = garanties.get(key)
-        if not data:
-            raise KeyError(f"Unknown sinistre type in garanties.yaml: {sinistre_type}")
-        
-        return {
-            "couverture": data.get("couverture", []),
-            "exclusions": data.get("exclusions", []),
-            "plafond": data.get("plafond"),
-            "franchise": data.get("franchise"),
-        }
+        return self.kb.guarantee_for_type(sinistre_type)
     
     def get_required_documents(self, sinistre_type: str) -> Dict[str, Any]:
         """
         Return required documents for a sinistre type.
         Combines local pieces_justificatives with global pieces_generales.
         """
-        key = _normalize_key(sinistre_type)
-        sinistres = self.sinistres_data.get("sinistres", {})
-        
-        local = []
-        if key in sinistres:
-            local = sinistres[key].get("pieces_justificatives", [])
-        
-        global_pieces = self.garanties_data.get("pieces_generales", [])
-        
-        # Combine while preserving order and removing duplicates
-        combined = []
-        for item in (local + global_pieces):
-            if item not in combined:
-                combined.append(item)
-        
-        notes = ""
-        if key.startswith("vol"):
-            notes = "Dépôt de plainte requis dans les 24h, joindre numéro de procès-verbal."
-        
-        return {"documents": combined, "notes": notes}
-
+        return self.kb.required_documents(sinistre_type)
@@ -206,6 +206,34 @@ class TestDeclarationAgent:
             # Should have processed human response
             assert len(result_state["history"]) > len(state["history"])
     
+    def test_tool_execution_ask_human_merges_without_llm(self):
+        """Test that an extractable human reply does not re-run DeclarationParser."""
+        state: DeclarationReActState = {
+            "question": "Test",
+            "pictures": [],
+            "history": [],
+            "last_action": "AskHuman",
+            "last_arguments": {"question": "Quelle est la date?"},
+            "last_observation": None,
+            "is_complete": False,
+            "parsed_declaration": get_sample_parsed_declaration("incomplete_water"),
+            "missing": ["date_sinistre"],
+            "answer": None,
+            "pending_question": None,
+            "human_reply": "Le 2025-01-07 vers midi",
+        }
+        parser = Mock()
+        verifier = Mock(return_value={"is_complete": True, "missing": []})
+
+        with patch("assurhabitat_agents.agents.declaration_agent.tools",
+                   {"AskHuman": Mock(), "DeclarationParser": parser, "InformationVerification": verifier}):
+            result_state = node_tool_execution_declar(state)
+
+        parser.assert_not_called()
+        assert result_state["parsed_declaration"]["extracted"]["date_sinistre"] == "2025-01-07"
+        assert result_state["is_complete"] is True
+        assert result_state["missing"] == []
+
     def test_tool_execution_unknown_tool(self):
         """Test tool execution with unknown tool name."""
         state: DeclarationReActState = {
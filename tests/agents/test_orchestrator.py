@@ -105,7 +105,13 @@ class TestOrchestrator:
                 "compatible": False,
                 "detected_damage_types": ["fire"]
             },
-            "guarantee_report": None
+            "guarantee_report": None,
+            "rejection": {
+                "status": "rejected",
+                "reason": "Les photos ne correspondent pas au sinistre déclaré.",
+                "criterion": "image_conformity",
+                "detected_damage_types": ["fire"],
+            },
         }
         
         result = orchestrator.run(
@@ -115,6 +121,7 @@ class TestOrchestrator:
         
         assert result["status"] == "rejected"
         assert "photos ne correspondent pas" in result["reason"]
+        assert result["criterion"] == "image_conformity"
         assert mock_agents["expertise"].call_count == 0  # Should not reach expertise
     
     def test_orchestrator_not_covered_by_guarantee(self, orchestrator, mock_agents):
@@ -129,7 +136,13 @@ class TestOrchestrator:
         mock_agents["validation"].return_value = {
             "image_conformity": {"compatible": True, "detected_damage_types": ["water"]},
             "is_garanteed": {"match": False},
-            "guarantee_report": {"guaranteed": False, "description": "Excluded"}
+            "guarantee_report": {"guaranteed": False, "description": "Excluded"},
+            "rejection": {
+                "status": "not_covered",
+                "reason": "Le sinistre n'est pas couvert par le contrat.",
+                "criterion": "guarantee",
+                "description": "Excluded",
+            },
         }
         
         result = orchestrator.run(
@@ -369,3 +382,151 @@ class TestOrchestrator:
         # Should default to empty list (not crash)
         assert result["status"] == "error"
 
+
+    def test_orchestrator_not_covered_from_rejection(self, orchestrator, mock_agents):
+        """Test that the structured rejection of the validation graph ends the claim."""
+        mock_agents["declaration"].return_value = {
+            "parsed_declaration": get_sample_parsed_declaration("complete_water"),
+            "is_complete": True,
+        }
+        mock_agents["validation"].return_value = {
+            "image_conformity": {"compatible": True, "detected_damage_types": ["water"]},
+            "guarantee_report": {"guaranteed": False, "description": "Excluded"},
+            "rejection": {"status": "not_covered", "criterion": "guarantee"},
+        }
+
+        result = orchestrator.run(user_text="Fuite d'eau", image_paths=["water.jpg"])
+
+        assert result["status"] == "not_covered"
+        assert mock_agents["expertise"].call_count == 0
+
+    def test_orchestrator_failed_conformity_check_is_not_a_rejection(self, orchestrator, mock_agents):
+        """Test that a CheckConformity error (no 'compatible' key) does not crash the validation stage."""
+        mock_agents["declaration"].return_value = {
+            "parsed_declaration": get_sample_parsed_declaration("complete_water"),
+            "is_complete": True,
+        }
+        mock_agents["validation"].return_value = {
+            "image_conformity": {"error": "Missing images"},
+            "guarantee_report": {"guaranteed": True},
+            "rejection": None,
+        }
+        mock_agents["expertise"].return_value = {
+            "estimation": {"estimated_cost": 1000, "final_compensation": 850},
+            "report": "Report"
+        }
+
+        result = orchestrator.run(user_text="Fuite d'eau", image_paths=["water.jpg"])
+
+        assert result["status"] == "completed"
+
+    def test_orchestrator_suspends_on_question_and_resumes(self, orchestrator, mock_agents):
+        """Test that AskHuman parks the claim and resume() continues with the reply."""
+        waiting_state = {
+            "question": "Fuite d'eau",
+            "last_action": "AskHuman",
+            "last_arguments": {"question": "Quand le sinistre a-t-il eu lieu ?"},
+            "pending_question": "Quand le sinistre a-t-il eu lieu ?",
+            "human_reply": None,
+        }
+        mock_agents["declaration"].side_effect = [
+            waiting_state,
+            {
+                "parsed_declaration": get_sample_parsed_declaration("complete_water"),
+                "is_complete": True,
+                "pending_question": None,
+            },
+        ]
+        mock_agents["validation"].return_value = {
+            "image_conformity": {"compatible": True},
+            "guarantee_report": {"guaranteed": True}
+        }
+        mock_agents["expertise"].return_value = {
+            "estimation": {"estimated_cost": 1000, "final_compensation": 850},
+            "report": "Report"
+        }
+
+        waiting = orchestrator.run(user_text="Fuite d'eau", image_paths=["test.jpg"])
+
+        assert waiting["status"] == "waiting_for_human"
+        assert waiting["question"] == "Quand le sinistre a-t-il eu lieu ?"
+        assert mock_agents["validation"].call_count == 0
+
+        result = orchestrator.resume(waiting["claim_id"], "Le 5 janvier")
+
+        resumed_state = mock_agents["declaration"].call_args[0][0]
+        assert resumed_state["human_reply"] == "Le 5 janvier"
+        assert resumed_state["last_action"] == "AskHuman"
+        assert result["status"] == "completed"
+        assert orchestrator.pending_store.get(waiting["claim_id"]) is None
+
+    def test_orchestrator_resume_keeps_policy_snapshot(self, orchestrator, mock_agents, tmp_path, monkeypatch):
+        """Test that a claim resumed after a reload keeps the policy version it started with."""
+        from assurhabitat_agents import utils
+        from assurhabitat_agents.policy_kb import PolicyKBWatcher
+
+        sinistres, garanties = tmp_path / "sinistres.yaml", tmp_path / "garanties.yaml"
+        sinistres.write_bytes(utils.SINISTRES_PATH.read_bytes())
+        garanties.write_bytes(utils.GARANTIES_PATH.read_bytes())
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=None)
+        monkeypatch.setattr(utils, "get_policy_watcher", lambda: watcher)
+
+        seen_versions = []
+
+        def validation(state):
+            seen_versions.append(utils.get_policy_kb().version)
+            return {"image_conformity": {"compatible": True}, "guarantee_report": {"guaranteed": True}}
+
+        mock_agents["declaration"].side_effect = [
+            {"pending_question": "Quand ?", "human_reply": None},
+            {"parsed_declaration": get_sample_parsed_declaration("complete_water"), "pending_question": None},
+        ]
+        mock_agents["validation"].side_effect = validation
+        mock_agents["expertise"].return_value = {"estimation": {"estimated_cost": 1000}, "report": "Report"}
+
+        waiting = orchestrator.run(user_text="Fuite d'eau")
+        with open(garanties, "a", encoding="utf-8") as f:
+            f.write("\n# contract update\n")
+        assert watcher.check() is True
+
+        result = orchestrator.resume(waiting["claim_id"], "Hier")
+
+        assert seen_versions == [1]
+        assert result["policy_version"] == 1
+        assert watcher.current().version == 2
+
+    def test_orchestrator_resume_unknown_claim(self, orchestrator):
+        """Test that resuming an unknown claim raises KeyError."""
+        with pytest.raises(KeyError):
+            orchestrator.resume("unknown", "reply")
+
+    def test_orchestrator_discards_unused_image_analysis(self, mock_agents):
+        """Test that a finished claim drops its speculative analysis, a suspended one keeps it."""
+        orchestrator = Orchestrator(
+            declaration_agent=mock_agents["declaration"],
+            validation_agent=mock_agents["validation"],
+            expertise_agent=mock_agents["expertise"],
+            image_executor=Mock(),
+        )
+        mock_agents["declaration"].side_effect = [
+            {"pending_question": "Quand ?", "human_reply": None},
+            {"parsed_declaration": None, "pending_question": None},
+        ]
+
+        with patch.object(orchestrator, "start_image_analysis"), \
+                patch.object(orchestrator, "discard_image_analysis") as discard:
+            waiting = orchestrator.run(user_text="Fuite d'eau", image_paths=["water.jpg"])
+            assert discard.call_count == 0
+            result = orchestrator.resume(waiting["claim_id"], "Hier")
+
+        assert result["status"] == "error"
+        discard.assert_called_once_with(["water.jpg"])
+
+    def test_orchestrator_releases_prefetched_images(self, orchestrator, mock_agents):
+        """Test that a finished claim releases its decoded photos."""
+        mock_agents["declaration"].return_value = {"parsed_declaration": None, "pending_question": None}
+
+        with patch("assurhabitat_agents.agents.orchestrator.discard_prefetched_images") as discard:
+            orchestrator.run(user_text="Fuite d'eau", image_paths=["water.jpg"])
+
+        discard.assert_called_once_with(["water.jpg"])
@@ -140,6 +140,61 @@ class TestValidationAgent:
             
             assert result_state["guarantee_report"] is not None
             assert result_state["guarantee_report"]["guaranteed"] is False
+            # early exit: structured rejection, no further Thought step
+            assert result_state["rejection"]["status"] == "not_covered"
+            assert result_state["rejection"]["description"] == "Not covered due to exclusion"
+            assert result_state["answer"] == result_state["rejection"]["reason"]
+
+    def test_validation_agent_incompatible_images_exit_early(self):
+        """Test that incompatible images reject the claim right after CheckConformity."""
+        state: ValidationReActState = {
+            "images_path": ["fire.jpg"],
+            "history": [],
+            "last_action": "CheckConformity",
+            "last_arguments": {},
+            "last_observation": None,
+            "parsed_declaration": get_sample_parsed_declaration("complete_water"),
+            "image_conformity": None,
+            "guarantee_report": None,
+            "answer": None,
+            "rejection": None,
+        }
+
+        with patch("assurhabitat_agents.agents.validation_agent.tools") as mock_tools:
+            mock_tools.__contains__.return_value = True
+            mock_tools.__getitem__.return_value = Mock(return_value={
+                "description": "Burnt kitchen",
+                "detected_damage_types": ["fire", "soot"],
+            })
+
+            result_state = node_tool_execution_valid(state)
+
+        assert result_state["rejection"]["status"] == "rejected"
+        assert result_state["rejection"]["detected_damage_types"] == ["fire", "soot"]
+
+    def test_validation_agent_undetermined_guarantee_is_not_rejected(self):
+        """Test that guaranteed=None (undetermined) does not exit early."""
+        state: ValidationReActState = {
+            "images_path": [],
+            "history": [],
+            "last_action": "CheckGuarantee",
+            "last_arguments": {},
+            "last_observation": None,
+            "parsed_declaration": get_sample_parsed_declaration("complete_water"),
+            "image_conformity": {"compatible": True, "detected_damage_types": ["water"]},
+            "guarantee_report": None,
+            "answer": None,
+            "rejection": None,
+        }
+
+        with patch("assurhabitat_agents.agents.validation_agent.tools") as mock_tools:
+            mock_tools.__contains__.return_value = True
+            mock_tools.__getitem__.return_value = Mock(return_value={"guaranteed": None, "description": "?"})
+
+            result_state = node_tool_execution_valid(state)
+
+        assert result_state["rejection"] is None
+        assert result_state["answer"] is None
     
     def test_validation_agent_no_images(self, patch_llm_inference):
         """Test validation agent when no images provided."""
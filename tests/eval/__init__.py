@@ -0,0 +1 @@
+"""Tests for evaluation scripts."""
@@ -0,0 +1,94 @@
+"""
+Unit tests for eval/batch_scoring.py
+The batch API must reproduce scoring.score_declaration exactly.
+"""
+import json
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "eval"))
+
+from batch_scoring import TokenEncoder, batch_jaccard, score_declarations_batch
+from scoring import score_declaration
+from utils_scoring import list_similarity, text_similarity
+
+GOLDEN_PATH = Path(__file__).resolve().parents[2] / "eval" / "golden_dataset.json"
+
+WORDS = ["fuite", "d'eau", "salle", "de", "bain", "plafond", "Sol", "feu!", "cuisine", "porte", "vol", "mur,"]
+TYPES = ["degats_des_eaux", "incendie_explosion", "vol_vandalisme", "ambiguous"]
+
+
+def _random_text(rng):
+    if rng.random() < 0.1:
+        return rng.choice([None, "", "!!!"])
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 8)))
+
+
+def _random_declaration(rng):
+    extracted = {
+        "date_sinistre": rng.choice([None, "2025-01-05", "2025-01-06"]),
+        "lieu": _random_text(rng),
+        "description": _random_text(rng),
+        "biens_impactes": [rng.choice(WORDS) for _ in range(rng.randint(0, 4))],
+    }
+    if rng.random() < 0.1:
+        del extracted["lieu"]
+    return {"sinistre_type": rng.choice(TYPES), "extracted": extracted}
+
+
+def test_batch_matches_per_case_scoring_on_random_cases():
+    rng = random.Random(0)
+    outputs = [_random_declaration(rng) for _ in range(500)]
+    expected = [{"parsed_declaration": _random_declaration(rng)} for _ in range(500)]
+
+    table = score_declarations_batch(outputs, expected)
+
+    assert table.case_results() == [score_declaration(o, e) for o, e in zip(outputs, expected)]
+
+
+def test_batch_matches_golden_dataset_self_scores():
+    cases = json.loads(GOLDEN_PATH.read_text())
+    expected = [c["expected_declaration_agent"] for c in cases]
+    outputs = [c["expected_declaration_agent"]["parsed_declaration"] for c in reversed(cases)]
+
+    table = score_declarations_batch(outputs, expected, case_ids=[c["case_id"] for c in cases])
+
+    assert table.case_results() == [score_declaration(o, e) for o, e in zip(outputs, expected)]
+    records = table.to_records()
+    assert records[0]["case_id"] == "INC_01"
+    assert set(records[0]) == {"case_id", "sinistre_type", "date_sinistre", "lieu", "description", "biens_impactes", "score"}
+
+
+def test_batch_jaccard_matches_scalar_helpers():
+    encoder = TokenEncoder()
+    pairs = [("Salle de bain", "salle de BAIN, cuisine"), ("", "x"), (None, None), ("a b", "c d")]
+    scores = batch_jaccard(
+        [encoder.encode_text(a) for a, _ in pairs],
+        [encoder.encode_text(b) for _, b in pairs],
+        encoder.size,
+    )
+    assert scores.tolist() == [text_similarity(a, b) for a, b in pairs]
+
+    lists = [(["Porte", "TV"], ["porte"]), ([], ["a"]), (["a", "A"], ["a"])]
+    scores = batch_jaccard(
+        [encoder.encode_list(a) for a, _ in lists],
+        [encoder.encode_list(b) for _, b in lists],
+        encoder.size,
+    )
+    assert scores.tolist() == [list_similarity(a, b) for a, b in lists]
+
+
+def test_encoder_tokenizes_each_string_once():
+    encoder = TokenEncoder()
+    first = encoder.encode_text("fuite d'eau")
+    assert encoder.encode_text("fuite d'eau") is first
+
+
+def test_length_mismatch():
+    with pytest.raises(ValueError):
+        score_declarations_batch([{}], [])
@@ -0,0 +1,106 @@
+"""
+Unit tests for eval/offline_store.py
+Tests local dataset loading, SQLite score storage and per-family aggregation.
+"""
+import json
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "eval"))
+
+from offline_store import OfflineEvalStore, load_local_dataset
+
+GOLDEN_PATH = Path(__file__).resolve().parents[2] / "eval" / "golden_dataset.json"
+
+
+def _record(case_id, family, decl, valid, status="ok"):
+    return {
+        "case_id": case_id,
+        "sinistre_family": family,
+        "status": status,
+        "scores": {"declaration_agent": decl, "validation_agent": valid},
+        "details": {"declaration_agent": "{}", "validation_agent": "[]"},
+        "duration_s": 1.0,
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = OfflineEvalStore(tmp_path / "offline.db")
+    yield s
+    s.close()
+
+
+def test_load_local_dataset_json_jsonl_and_dir(tmp_path):
+    golden = load_local_dataset(GOLDEN_PATH)
+    assert len(golden) == 9
+
+    jsonl = tmp_path / "extra.jsonl"
+    jsonl.write_text("\n".join(json.dumps(c) for c in golden[:2]) + "\n")
+    assert [c["case_id"] for c in load_local_dataset(jsonl)] == ["INC_01", "INC_02"]
+
+    (tmp_path / "golden.json").write_text(json.dumps(golden[2:4]))
+    assert len(load_local_dataset(tmp_path)) == 4
+
+
+def test_load_local_dataset_missing(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_local_dataset(tmp_path / "nope.json")
+
+
+def test_cases_roundtrip(store):
+    golden = load_local_dataset(GOLDEN_PATH)
+    store.add_cases(golden)
+    store.add_cases(golden)  # idempotent
+
+    cases = store.get_cases()
+
+    assert len(cases) == 9
+    inc = next(c for c in cases if c["case_id"] == "INC_01")
+    assert inc["expected_validation_agent"]["is_guaranteed"] is True
+
+
+def test_aggregate_by_family(store):
+    run_id = store.start_run({"model": "test"})
+    store.record_case(run_id, _record("INC_01", "incendie_explosion", 1.0, 1.0), {"status": "completed"})
+    store.record_case(run_id, _record("INC_02", "incendie_explosion", 0.5, 0.0))
+    store.record_case(run_id, _record("WAT_01", "degats_des_eaux", 0.8, 1.0))
+
+    metrics = store.aggregate_by_family(run_id)
+
+    assert metrics["incendie_explosion"]["declaration_agent"]["mean"] == 0.75
+    assert metrics["incendie_explosion"]["declaration_agent"]["count"] == 2
+    assert metrics["degats_des_eaux"]["validation_agent"]["min"] == 1.0
+    assert metrics["_all"]["declaration_agent"]["count"] == 3
+
+
+def test_record_case_overwrites_previous_scores(store):
+    run_id = store.start_run()
+    store.record_case(run_id, _record("INC_01", "incendie_explosion", 0.2, 0.0))
+    store.record_case(run_id, _record("INC_01", "incendie_explosion", 0.9, 1.0))
+
+    assert store.get_scores(run_id) == {"INC_01": {"declaration_agent": 0.9, "validation_agent": 1.0}}
+
+
+def test_error_rate(store):
+    run_id = store.start_run()
+    store.record_case(run_id, _record("A", "f", 1.0, 1.0))
+    failed = {"case_id": "B", "sinistre_family": "f", "status": "error", "error": "boom"}
+    store.record_case(run_id, failed)
+
+    assert store.error_rate(run_id) == 0.5
+
+
+def test_sync_to_langfuse_pushes_once(store):
+    run_id = store.start_run()
+    store.record_case(run_id, _record("A", "f", 1.0, 0.5), {"status": "completed"})
+    client = MagicMock()
+
+    assert store.sync_to_langfuse(run_id, client=client) == 1
+    span = client.start_as_current_observation.return_value.__enter__.return_value
+    assert span.score.call_count == 2
+
+    assert store.sync_to_langfuse(run_id, client=client) == 0
@@ -0,0 +1,159 @@
+"""
+Unit tests for eval/parallel_evaluation.py
+Tests resume, fingerprint invalidation and incremental JSONL writes.
+"""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "eval"))
+
+from parallel_evaluation import (
+    ResultsLog,
+    case_fingerprint,
+    run_parallel_evaluation,
+)
+
+
+def _case(case_id, text="Fuite d'eau dans la cuisine"):
+    return {
+        "case_id": case_id,
+        "sinistre_family": "degats_des_eaux",
+        "input": {"user_text": text, "image_paths": ["img.png"]},
+        "expected_declaration_agent": {
+            "parsed_declaration": {
+                "sinistre_type": "degats_des_eaux",
+                "extracted": {
+                    "date_sinistre": "2025-01-05",
+                    "lieu": "cuisine",
+                    "description": "fuite d'eau",
+                    "biens_impactes": ["sol"]
+                }
+            }
+        },
+        "expected_validation_agent": {"image_conformity": True, "is_guaranteed": True},
+    }
+
+
+class FakeOrchestrator:
+    calls = []
+
+    def run(self, user_text, image_paths=None):
+        FakeOrchestrator.calls.append(user_text)
+        if "boom" in user_text:
+            raise RuntimeError("model server down")
+        return {
+            "validation": {
+                "parsed_declaration": {
+                    "sinistre_type": "degats_des_eaux",
+                    "extracted": {
+                        "date_sinistre": "2025-01-05",
+                        "lieu": "cuisine",
+                        "description": "fuite d'eau",
+                        "biens_impactes": ["sol"]
+                    }
+                },
+                "image_conformity": {"compatible": True},
+                "guarantee_report": {"guaranteed": True},
+            }
+        }
+
+
+@pytest.fixture(autouse=True)
+def reset_calls():
+    FakeOrchestrator.calls = []
+
+
+def test_scores_are_written_incrementally(tmp_path):
+    results = tmp_path / "results.jsonl"
+    cases = [_case("A"), _case("B"), _case("C")]
+
+    out = run_parallel_evaluation(cases, FakeOrchestrator, results_path=results, max_workers=2, prompts_fp="p")
+
+    lines = [json.loads(l) for l in results.read_text().splitlines()]
+    assert sorted(l["case_id"] for l in lines) == ["A", "B", "C"]
+    assert out["A"]["scores"]["declaration_agent"] == 1.0
+    assert out["A"]["scores"]["validation_agent"] == 1.0
+
+
+def test_resume_skips_unchanged_cases(tmp_path):
+    results = tmp_path / "results.jsonl"
+    cases = [_case("A"), _case("B")]
+    run_parallel_evaluation(cases, FakeOrchestrator, results_path=results, prompts_fp="p")
+    FakeOrchestrator.calls = []
+
+    run_parallel_evaluation(cases, FakeOrchestrator, results_path=results, prompts_fp="p")
+
+    assert FakeOrchestrator.calls == []
+
+
+def test_changed_input_prompt_or_model_reruns(tmp_path):
+    results = tmp_path / "results.jsonl"
+    run_parallel_evaluation([_case("A"), _case("B")], FakeOrchestrator, results_path=results, prompts_fp="p")
+
+    FakeOrchestrator.calls = []
+    run_parallel_evaluation([_case("A", text="Nouvelle fuite"), _case("B")], FakeOrchestrator, results_path=results, prompts_fp="p")
+    assert FakeOrchestrator.calls == ["Nouvelle fuite"]
+
+    FakeOrchestrator.calls = []
+    run_parallel_evaluation([_case("B")], FakeOrchestrator, results_path=results, prompts_fp="p2")
+    assert len(FakeOrchestrator.calls) == 1
+
+    FakeOrchestrator.calls = []
+    run_parallel_evaluation([_case("B")], FakeOrchestrator, results_path=results, prompts_fp="p2", model_version="v2")
+    assert len(FakeOrchestrator.calls) == 1
+
+
+def test_failed_cases_are_recorded_and_retried(tmp_path):
+    results = tmp_path / "results.jsonl"
+    cases = [_case("A", text="boom")]
+
+    out = run_parallel_evaluation(cases, FakeOrchestrator, results_path=results, prompts_fp="p")
+    assert out["A"]["status"] == "error"
+    assert "model server down" in out["A"]["error"]
+
+    run_parallel_evaluation(cases, FakeOrchestrator, results_path=results, prompts_fp="p")
+    assert len(FakeOrchestrator.calls) == 2
+
+
+def test_results_log_ignores_truncated_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"case_id": "A", "status": "ok"}\n{"case_id": "B", "sta')
+
+    records = ResultsLog(path).load()
+
+    assert list(records) == ["A"]
+
+
+def test_append_after_truncated_line(tmp_path):
+    """The record written after an interrupted run is not glued to the fragment"""
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"case_id": "A", "status": "ok"}\n{"case_id": "B", "sta')
+
+    log = ResultsLog(path)
+    log.append({"case_id": "C", "status": "ok"})
+    log.append({"case_id": "D", "status": "ok"})
+
+    assert list(ResultsLog(path).load()) == ["A", "C", "D"]
+
+
+def test_append_keeps_complete_last_line(tmp_path):
+    path = tmp_path / "results.jsonl"
+    path.write_text('{"case_id": "A", "status": "ok"}')
+
+    ResultsLog(path).append({"case_id": "B", "status": "ok"})
+
+    assert list(ResultsLog(path).load()) == ["A", "B"]
+
+
+def test_case_fingerprint_is_stable():
+    case = _case("A")
+    assert case_fingerprint(case, "p", "m") == case_fingerprint(dict(case), "p", "m")
+    assert case_fingerprint(case, "p", "m") != case_fingerprint(case, "p", "m2")
+
+
+def test_invalid_worker_count(tmp_path):
+    with pytest.raises(ValueError):
+        run_parallel_evaluation([], FakeOrchestrator, results_path=tmp_path / "r.jsonl", max_workers=0)
@@ -15,7 +15,7 @@ class MockLLM:
         self.last_prompt = None
         self.responses = []
         
-    def __call__(self, prompt: str) -> str:
+    def __call__(self, prompt: str, **kwargs) -> str:
         """Called when used as llm_inference replacement."""
         self.call_count += 1
         self.last_prompt = prompt
@@ -66,7 +66,7 @@ Arguments: {"image_paths": [], "parsed_declaration": {}}"""
         self.responses = []
 
 
-def mock_llm_inference(prompt: str) -> str:
+def mock_llm_inference(prompt: str, **kwargs) -> str:
     """Simple mock function that can replace llm_inference."""
     # Parse declaration requests
     if "parse_declaration" in prompt.lower() or "DeclarationParser" in prompt:
@@ -15,7 +15,7 @@ class MockVLM:
         self.last_prompt = None
         self.responses = []
         
-    def __call__(self, image_path: str, prompt: str) -> str:
+    def __call__(self, image_path: str, prompt: str, **kwargs) -> str:
         """Called when used as vlm_inference replacement."""
         self.call_count += 1
         self.last_image_path = image_path
@@ -95,7 +95,7 @@ class MockVLM:
         self.responses = []
 
 
-def mock_vlm_inference(image_path: str, prompt: str) -> str:
+def mock_vlm_inference(image_path: str, prompt: str, **kwargs) -> str:
     """Simple mock function that can replace vlm_inference."""
     # Cost estimation
     if "cost" in prompt.lower() or "estimation" in prompt.lower():
@@ -0,0 +1 @@
+"""Tests for model module."""
@@ -0,0 +1,230 @@
+"""
+Unit tests for model/constrained_decoding.py
+Tests the JSON-schema matcher, the token masking and the generation stats.
+"""
+import json
+
+import pytest
+
+from assurhabitat_agents.config.tool_schemas import (
+    CHECK_CONFORMITY_SCHEMA,
+    CHECK_GUARANTEE_SCHEMA,
+    COST_ESTIMATION_SCHEMA,
+    PARSE_DECLARATION_SCHEMA,
+)
+from assurhabitat_agents.model.constrained_decoding import (
+    GenerationStats,
+    JsonSchemaLogitsProcessor,
+    JsonSchemaMatcher,
+    build_token_strings,
+)
+
+VALID_DOCUMENTS = [
+    (CHECK_GUARANTEE_SCHEMA, {"guaranteed": True, "description": "Couvert par l'article 2"}),
+    (COST_ESTIMATION_SCHEMA, {"estimated_cost": 1250.5, "explanation": "Remplacement du parquet"}),
+    (CHECK_CONFORMITY_SCHEMA, {"description": "Traces d'eau", "detected_damage_types": ["water", "mold"]}),
+    (
+        PARSE_DECLARATION_SCHEMA,
+        {
+            "sinistre_type": "degats_des_eaux",
+            "sinistre_confidence": 0.9,
+            "sinistre_explain": "fuite",
+            "candidates": [{"type": "degats_des_eaux", "score": 0.9}, {"type": "ambiguous", "score": 0.1}],
+            "extracted": {
+                "date_sinistre": "2024-03-12",
+                "lieu": None,
+                "description": "Fuite sous l'évier \"cuisine\"",
+                "biens_impactes": ["parquet"],
+                "police_report_number": None,
+            },
+        },
+    ),
+]
+
+
+def _compact(doc):
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":"))
+
+
+class TestJsonSchemaMatcher:
+    """Tests for the character-level schema matcher"""
+
+    @pytest.mark.parametrize("schema,doc", VALID_DOCUMENTS)
+    def test_accepts_valid_documents(self, schema, doc):
+        """Compact documents matching the schema are accepted and complete"""
+        matcher = JsonSchemaMatcher(schema)
+        assert matcher.feed(_compact(doc))
+        assert matcher.done
+
+    def test_rejects_wrong_property_order(self):
+        """Properties must follow the schema order"""
+        matcher = JsonSchemaMatcher(CHECK_GUARANTEE_SCHEMA)
+        assert not matcher.feed('{"description"')
+
+    def test_rejects_enum_violation(self):
+        """Strings with an enum must stay a prefix of an allowed value"""
+        matcher = JsonSchemaMatcher(PARSE_DECLARATION_SCHEMA)
+        assert matcher.feed('{"sinistre_type":"incendie')
+        assert not matcher.accepts("_x")
+        assert not matcher.accepts('"')
+
+    def test_rejects_wrong_type(self):
+        """A boolean field does not accept a string"""
+        matcher = JsonSchemaMatcher(CHECK_GUARANTEE_SCHEMA)
+        assert not matcher.feed('{"guaranteed":"yes"')
+
+    def test_failed_feed_leaves_state_unchanged(self):
+        """A rejected chunk does not advance the matcher"""
+        matcher = JsonSchemaMatcher(COST_ESTIMATION_SCHEMA)
+        assert matcher.feed('{"estimated_cost":12')
+        assert not matcher.feed("x")
+        assert matcher.feed('.5,"explanation":"ok"}')
+        assert matcher.done
+
+    @pytest.mark.parametrize("bad", ["-.5", "1.e", "01", "--1"])
+    def test_rejects_invalid_numbers(self, bad):
+        """Malformed numbers are rejected"""
+        matcher = JsonSchemaMatcher(COST_ESTIMATION_SCHEMA)
+        assert not matcher.feed('{"estimated_cost":' + bad + ',')
+
+    def test_nothing_accepted_after_close(self):
+        """Trailing text after the top-level object is refused"""
+        matcher = JsonSchemaMatcher(CHECK_GUARANTEE_SCHEMA)
+        assert matcher.feed('{"guaranteed":false,"description":""}')
+        assert not matcher.accepts(" ")
+
+    @pytest.mark.parametrize("escape,valid", [
+        ("\\u00e9", True), ("\\n", True), ("\\uZZ", False), ("\\u00g1", False), ("\\u12\"", False),
+    ])
+    def test_unicode_escape_needs_four_hex_digits(self, escape, valid):
+        """\\u must be followed by exactly four hex digits, like json.loads expects"""
+        matcher = JsonSchemaMatcher(CHECK_GUARANTEE_SCHEMA)
+        doc = '{"guaranteed":true,"description":"' + escape + '"}'
+        assert matcher.feed(doc) is valid
+        if valid:
+            assert matcher.done
+            json.loads(doc)
+
+    def test_nullable_string(self):
+        """["string", "null"] accepts null"""
+        matcher = JsonSchemaMatcher({"type": "object", "properties": {"lieu": {"type": ["string", "null"]}}})
+        assert matcher.feed('{"lieu":null}')
+        assert matcher.done
+
+
+# A toy vocabulary: single characters plus a few multi-char tokens
+VOCAB = ["<eos>", "<unk>"] + list('{}[]":,.-0123456789abcdefghijklmnopqrstuvwxyz_ ') + [
+    '{"', '":', '","', "true", "false", "null", "guaranteed", "description",
+]
+EOS = 0
+
+
+def _token_strings():
+    return build_token_strings(len(VOCAB), lambda i: None if VOCAB[i].startswith("<") else VOCAB[i])
+
+
+class TestJsonSchemaLogitsProcessor:
+    """Tests for the token masking used during generate()"""
+
+    def test_special_tokens_excluded(self):
+        """Special tokens map to None and are never allowed"""
+        strings = _token_strings()
+        assert strings[0] is None and strings[1] is None
+
+    def test_only_eos_after_completion(self):
+        """Once the object is closed only EOS is allowed"""
+        proc = JsonSchemaLogitsProcessor(CHECK_GUARANTEE_SCHEMA, _token_strings(), EOS, prompt_length=0)
+        proc.matcher.feed('{"guaranteed":true,"description":"x"}')
+        assert proc.allowed_tokens(list(range(len(VOCAB)))) == [EOS]
+
+    def test_full_scan_fallback(self):
+        """When no top-k token is valid, the full vocabulary is scanned"""
+        proc = JsonSchemaLogitsProcessor(CHECK_GUARANTEE_SCHEMA, _token_strings(), EOS, prompt_length=0, top_k=2)
+        ranked = [VOCAB.index("a"), VOCAB.index("b")] + list(range(len(VOCAB)))
+        allowed = proc.allowed_tokens(ranked)
+        assert len(allowed) == 1 and VOCAB[allowed[0]] in ("{", '{"')
+        assert proc.full_scans == 1
+
+    def test_full_ranking_only_computed_for_a_scan(self):
+        """The whole vocabulary is only sorted when no top-k token is valid"""
+        proc = JsonSchemaLogitsProcessor(CHECK_GUARANTEE_SCHEMA, _token_strings(), EOS, prompt_length=0, top_k=2)
+        calls = []
+
+        def full_ranking():
+            calls.append(1)
+            return [VOCAB.index("a"), VOCAB.index("b")] + list(range(len(VOCAB)))
+
+        assert proc.allowed_tokens([VOCAB.index("{"), VOCAB.index("a")], full_ranking) == [VOCAB.index("{")]
+        assert calls == []
+        allowed = proc.allowed_tokens([VOCAB.index("a"), VOCAB.index("b")], full_ranking)
+        assert VOCAB[allowed[0]] in ("{", '{"')
+        assert calls == [1] and proc.full_scans == 1
+
+    def test_greedy_decode_is_valid_json(self):
+        """Simulated greedy decoding with adversarial preferences still parses"""
+        strings = _token_strings()
+        proc = JsonSchemaLogitsProcessor(CHECK_GUARANTEE_SCHEMA, strings, EOS, prompt_length=0, top_k=8)
+        # the "model" prefers prose for a while, then wants to stop
+        prose = [VOCAB.index(t) for t in ["a", "b", " ", "true", '"', '":', '","', "}"]]
+        stop = [VOCAB.index(t) for t in ['"', "}", "a"]]
+
+        generated = []
+        for step in range(200):
+            preference = prose if step < 20 else stop
+            ranked = preference + [i for i in range(len(VOCAB)) if i not in preference]
+            proc._advance(generated)
+            token_id = proc.allowed_tokens(ranked)[0]
+            if token_id == EOS:
+                break
+            generated.append(token_id)
+
+        text = "".join(strings[i] for i in generated)
+        data = json.loads(text)
+        assert set(data) == {"guaranteed", "description"}
+        assert isinstance(data["guaranteed"], bool)
+
+
+class TestGenerationStats:
+    """Tests for the constrained vs free-form counters"""
+
+    def test_report_estimates_savings(self):
+        """Retries avoided and tokens saved are derived from both modes"""
+        stats = GenerationStats()
+        for ok in (True, False, True, False):
+            stats.record_tokens("check_guarantee", False, 100)
+            stats.record_parse("check_guarantee", False, ok)
+        for _ in range(4):
+            stats.record_tokens("check_guarantee", True, 60)
+            stats.record_parse("check_guarantee", True, True)
+
+        site = stats.report()["check_guarantee"]
+        assert site["free_form"]["parse_failures"] == 2
+        assert site["retries_avoided"] == pytest.approx(2.0)
+        assert site["tokens_saved"] == pytest.approx(160.0)
+
+    def test_saved_runs_are_merged(self, tmp_path):
+        """A free-form run and a constrained run saved separately give the estimate"""
+        free, constrained = GenerationStats(), GenerationStats()
+        for ok in (True, False, True, False):
+            free.record_tokens("check_guarantee", False, 100)
+            free.record_parse("check_guarantee", False, ok)
+        for _ in range(4):
+            constrained.record_tokens("check_guarantee", True, 60)
+        free.save(tmp_path / "free.json")
+        constrained.save(tmp_path / "constrained.json")
+
+        merged = GenerationStats()
+        merged.merge(tmp_path / "free.json")
+        merged.merge(tmp_path / "constrained.json")
+        site = merged.report()["check_guarantee"]
+        assert site["retries_avoided"] == pytest.approx(2.0)
+        assert site["tokens_saved"] == pytest.approx(160.0)
+
+    def test_single_mode_has_no_estimate(self):
+        """Without a free-form baseline only raw counters are reported"""
+        stats = GenerationStats()
+        stats.record_tokens("vlm", True, 10)
+        site = stats.report()["vlm"]
+        assert "retries_avoided" not in site
+        stats.reset()
+        assert stats.report() == {}
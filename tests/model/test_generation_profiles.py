@@ -0,0 +1,110 @@
+"""
+Unit tests for model/generation_profiles.py
+Tests the per call site profiles, the adaptive token caps, the wasted /
+truncated report and the stop strings.
+"""
+import pytest
+
+from assurhabitat_agents.model.generation_profiles import (
+    DEFAULT_PROFILES,
+    GenerationProfile,
+    GenerationProfiles,
+    StopSequenceCriteria,
+    cut_at_stop,
+)
+
+
+@pytest.fixture
+def profiles():
+    return GenerationProfiles(
+        {"react": GenerationProfile(512, min_tokens=32, ceiling=1024), "llm": GenerationProfile(4096, adaptive=False)},
+        adaptive=True,
+        min_samples=10,
+    )
+
+
+class TestGenerationProfiles:
+    """Tests for the token caps and their adaptation."""
+
+    def test_defaults_per_call_site(self):
+        assert DEFAULT_PROFILES["cost_estimation"].max_new_tokens > 128
+        assert DEFAULT_PROFILES["declaration_react"].stop
+        profiles = GenerationProfiles(adaptive=False)
+        assert profiles.max_new_tokens("check_guarantee") == 256
+        # unknown call sites fall back to the generic LLM profile
+        assert profiles.profile("unknown") == DEFAULT_PROFILES["llm"]
+
+    def test_cap_follows_output_lengths(self, profiles):
+        for n in range(60, 160, 10):  # 10 outputs of 60..150 tokens
+            profiles.record("react", n, profiles.max_new_tokens("react"), truncated=False)
+        # 1.25 x p99 (150)
+        assert profiles.max_new_tokens("react") == 188
+
+    def test_cap_waits_for_min_samples(self, profiles):
+        for _ in range(9):
+            profiles.record("react", 40, 512, truncated=False)
+        assert profiles.max_new_tokens("react") == 512
+
+    def test_truncation_doubles_the_cap(self, profiles):
+        for _ in range(10):
+            profiles.record("react", 100, profiles.max_new_tokens("react"), truncated=False)
+        assert profiles.max_new_tokens("react") == 125
+        profiles.record("react", 125, 125, truncated=True)
+        assert profiles.max_new_tokens("react") == 250
+
+    def test_cap_bounds(self, profiles):
+        for _ in range(10):
+            profiles.record("react", 1, 512, truncated=False)
+        assert profiles.max_new_tokens("react") == 32
+        for _ in range(10):
+            profiles.record("react", 1024, 1024, truncated=True)
+        assert profiles.max_new_tokens("react") == 1024
+
+    def test_non_adaptive_profile(self, profiles):
+        for _ in range(20):
+            profiles.record("llm", 50, 4096, truncated=False)
+        assert profiles.max_new_tokens("llm") == 4096
+
+    def test_adaptation_disabled(self):
+        profiles = GenerationProfiles({"llm": GenerationProfile(512)}, adaptive=False, min_samples=1)
+        profiles.record("llm", 10, 512, truncated=False)
+        assert profiles.max_new_tokens("llm") == 512
+
+    def test_report_wasted_and_truncated(self, profiles):
+        profiles.record("react", 100, 512, truncated=False)
+        profiles.record("react", 300, 512, truncated=False)
+        profiles.record("react", 512, 512, truncated=True)
+
+        report = profiles.report()["react"]
+        assert report["calls"] == 3
+        assert report["truncated"] == 1
+        assert report["truncation_rate"] == pytest.approx(1 / 3)
+        # budget left unused by the calls that ended on their own
+        assert report["wasted_tokens"] == 412 + 212
+        assert report["wasted_fraction"] == pytest.approx(624 / (624 + 912))
+        assert report["max_tokens"] == 512
+
+        profiles.reset()
+        assert profiles.report() == {}
+
+
+class TestStopSequences:
+    """Tests for StopSequenceCriteria and cut_at_stop."""
+
+    TOKENS = ["Thought", ":", " check", "\n", "Action", ": AskHuman", "\n", "Obs", "ervation", ": 42"]
+
+    def test_stops_across_tokens(self):
+        criteria = StopSequenceCriteria(lambda i: self.TOKENS[i], prompt_length=0, stop=["\nObservation:"])
+        ids = list(range(len(self.TOKENS)))
+        assert criteria.update(ids[:8]) is False
+        assert criteria.update(ids[:10]) is True
+        assert criteria.stopped is True
+
+    def test_special_tokens_ignored(self):
+        criteria = StopSequenceCriteria(lambda i: None, prompt_length=0, stop=["\nObservation:"])
+        assert criteria.update([1, 2, 3]) is False
+
+    def test_cut_at_stop(self):
+        text = "".join(self.TOKENS)
+        assert cut_at_stop(text, ["\nObservation:"]) == "Thought: check\nAction: AskHuman"
+        assert cut_at_stop("Answer: ok", ["\nObservation:"]) == "Answer: ok"
@@ -0,0 +1,65 @@
+"""
+Unit tests for model/prequantized.py
+Tests the checkpoint manifest lookup and the load time records.
+"""
+import json
+
+from assurhabitat_agents.model.prequantized import (
+    MANIFEST,
+    LoadStats,
+    find_prequantized,
+    write_manifest,
+)
+
+SOURCE = "mistralai/Devstral-Small-2507"
+
+
+def _export(tmp_path, source=SOURCE, shards=True):
+    if shards:
+        (tmp_path / "model-00001-of-00002.safetensors").write_bytes(b"\0")
+    write_manifest(tmp_path, source, "nf4")
+    return tmp_path
+
+
+class TestFindPrequantized:
+    """Tests for find_prequantized."""
+
+    def test_matching_checkpoint(self, tmp_path):
+        assert find_prequantized(str(_export(tmp_path)), SOURCE) == tmp_path
+        manifest = json.loads((tmp_path / MANIFEST).read_text(encoding="utf-8"))
+        assert manifest["precision"] == "nf4"
+        assert manifest["format"] == "safetensors"
+
+    def test_no_directory(self, tmp_path):
+        assert find_prequantized(None, SOURCE) is None
+        assert find_prequantized(str(tmp_path / "missing"), SOURCE) is None
+
+    def test_exported_from_another_model(self, tmp_path):
+        _export(tmp_path, source="Qwen/Qwen2-VL-2B-Instruct")
+        assert find_prequantized(str(tmp_path), SOURCE) is None
+
+    def test_incomplete_export(self, tmp_path):
+        _export(tmp_path, shards=False)
+        assert find_prequantized(str(tmp_path), SOURCE) is None
+
+    def test_unreadable_manifest(self, tmp_path):
+        _export(tmp_path)
+        (tmp_path / MANIFEST).write_text("{not json", encoding="utf-8")
+        assert find_prequantized(str(tmp_path), SOURCE) is None
+
+
+class TestLoadStats:
+    """Tests for the load time records."""
+
+    def test_report_keeps_last_load(self):
+        stats = LoadStats()
+        stats.record("llm", "hub", 212.4)
+        stats.record("llm", "prequantized", 31.25)
+        stats.record("vlm", "prequantized", 4.0)
+
+        assert stats.report() == {
+            "llm": {"source": "prequantized", "seconds": 31.25},
+            "vlm": {"source": "prequantized", "seconds": 4.0},
+        }
+        stats.reset()
+        assert stats.report() == {}
@@ -0,0 +1,152 @@
+"""
+Unit tests for model/speculative_decoding.py
+Tests that draft-assisted decoding returns the target's greedy output, with
+tiny randomly initialised CPU models, and the acceptance statistics.
+"""
+import pytest
+
+from assurhabitat_agents.model.speculative_decoding import SpeculativeStats
+
+VOCAB = 64
+
+
+def _tiny_llama(seed, vocab=VOCAB, layers=2):
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    torch.manual_seed(seed)
+    config = transformers.LlamaConfig(
+        vocab_size=vocab,
+        hidden_size=32,
+        intermediate_size=64,
+        num_hidden_layers=layers,
+        num_attention_heads=4,
+        num_key_value_heads=2,
+        max_position_embeddings=256,
+    )
+    model = transformers.LlamaForCausalLM(config).eval()
+    # random weights: no EOS unless a test passes one
+    model.generation_config.eos_token_id = None
+    return model
+
+
+@pytest.fixture(scope="module")
+def target():
+    return _tiny_llama(seed=0)
+
+
+@pytest.fixture(scope="module")
+def draft():
+    return _tiny_llama(seed=1, layers=1)
+
+
+def _prompt(length=7):
+    import torch
+
+    return torch.arange(3, 3 + length).unsqueeze(0) % VOCAB
+
+
+def _greedy(model, input_ids, max_new_tokens, **kwargs):
+    return model.generate(
+        input_ids=input_ids,
+        max_new_tokens=max_new_tokens,
+        do_sample=False,
+        pad_token_id=0,
+        **kwargs,
+    )
+
+
+class TestSpeculativeGenerate:
+    """Tests for speculative_generate with CPU stand-in models."""
+
+    @pytest.mark.parametrize("num_draft_tokens", [1, 3, 5])
+    def test_matches_target_greedy_output(self, target, draft, num_draft_tokens):
+        from assurhabitat_agents.model.speculative_decoding import speculative_generate
+
+        stats = SpeculativeStats()
+        expected = _greedy(target, _prompt(), 20)
+        output = speculative_generate(target, draft, _prompt(), 20, num_draft_tokens, stats=stats)
+
+        assert output.tolist() == expected.tolist()
+        report = stats.report()["llm"]
+        assert report["new_tokens"] == 20
+        assert 0 <= report["acceptance_rate"] <= 1
+
+    def test_identical_draft_accepts_everything(self, target):
+        from assurhabitat_agents.model.speculative_decoding import speculative_generate
+
+        stats = SpeculativeStats()
+        output = speculative_generate(target, target, _prompt(), 20, num_draft_tokens=4, stats=stats, call_site="react")
+
+        assert output.tolist() == _greedy(target, _prompt(), 20).tolist()
+        report = stats.report()["react"]
+        assert report["acceptance_rate"] == 1.0
+        # 4 accepted drafts + 1 target token per forward pass
+        assert report["tokens_per_target_step"] == pytest.approx(5.0)
+
+    def test_stops_on_eos(self, target, draft):
+        from assurhabitat_agents.model.speculative_decoding import speculative_generate
+
+        full = _greedy(target, _prompt(), 10)[0].tolist()
+        eos = full[_prompt().shape[1] + 3]
+        output = speculative_generate(target, draft, _prompt(), 10, 3, eos_token_id=eos, stats=SpeculativeStats())
+
+        generated = output[0, _prompt().shape[1]:].tolist()
+        assert generated[-1] == eos
+        assert eos not in generated[:-1]
+
+    def test_logits_processor_sees_accepted_prefix_only(self, target, draft):
+        from transformers import LogitsProcessorList
+        from assurhabitat_agents.model.speculative_decoding import speculative_generate
+
+        prompt_length = _prompt().shape[1]
+
+        class BanOddAfterEven:
+            """Incremental processor: records every prefix it is called with."""
+
+            def __init__(self):
+                self.prefixes = []
+
+            def __call__(self, input_ids, scores):
+                self.prefixes.append(input_ids[0, prompt_length:].tolist())
+                last = input_ids[0, -1].item()
+                if last % 2 == 0:
+                    scores = scores.clone()
+                    scores[:, 1::2] = float("-inf")
+                return scores
+
+        expected = _greedy(target, _prompt(), 15, logits_processor=LogitsProcessorList([BanOddAfterEven()]))
+        processor = BanOddAfterEven()
+        output = speculative_generate(target, draft, _prompt(), 15, 4, logits_processor=processor, stats=SpeculativeStats())
+
+        assert output.tolist() == expected.tolist()
+        generated = output[0, prompt_length:].tolist()
+        # each call extends the accepted output by exactly one token
+        assert processor.prefixes == [generated[:i] for i in range(len(generated))]
+
+    def test_vocabulary_mismatch(self, target):
+        from assurhabitat_agents.model.speculative_decoding import check_draft_compatible
+
+        with pytest.raises(ValueError, match="vocabulary"):
+            check_draft_compatible(target, _tiny_llama(seed=2, vocab=VOCAB * 2))
+
+
+class TestSpeculativeStats:
+    """Tests for the acceptance / speedup counters."""
+
+    def test_report(self):
+        stats = SpeculativeStats()
+        stats.record("parse_declaration", proposed=8, accepted=6, target_steps=2, new_tokens=8, seconds=0.5)
+        stats.record("parse_declaration", proposed=4, accepted=2, target_steps=1, new_tokens=3, seconds=0.25)
+
+        report = stats.report()["parse_declaration"]
+        assert report["calls"] == 2
+        assert report["acceptance_rate"] == pytest.approx(8 / 12)
+        assert report["tokens_per_target_step"] == pytest.approx(11 / 3)
+        assert report["tokens_per_second"] == pytest.approx(11 / 0.75)
+
+    def test_reset(self):
+        stats = SpeculativeStats()
+        stats.record("llm", proposed=0, accepted=0, target_steps=1, new_tokens=1, seconds=0.0)
+        assert stats.report()["llm"]["acceptance_rate"] == 0.0
+        stats.reset()
+        assert stats.report() == {}
@@ -0,0 +1,98 @@
+"""
+Unit tests for model/streaming_json.py
+Tests the incremental JSON repairer and the early-stop criteria.
+"""
+import pytest
+
+from assurhabitat_agents.model.streaming_json import (
+    JsonStopCriteria,
+    StreamingJsonParser,
+    parse_json_text,
+)
+
+
+class TestParseJsonText:
+    """Tests for the one-shot repair helper"""
+
+    def test_strict_json(self):
+        """Valid JSON is returned unchanged"""
+        assert parse_json_text('{"a": 1, "b": [true, null, "x"]}') == {"a": 1, "b": [True, None, "x"]}
+
+    def test_text_around_json(self):
+        """Text before the object and after its close is ignored"""
+        text = 'Here is the result: {"guaranteed": true} Hope it helps {not json}'
+        assert parse_json_text(text) == {"guaranteed": True}
+
+    def test_single_quotes(self):
+        """Single-quoted strings and escaped apostrophes are converted"""
+        assert parse_json_text("{'lieu': 'salle d\\'eau', 'note': 'il dit \"stop\"'}") == {
+            "lieu": "salle d'eau",
+            "note": 'il dit "stop"',
+        }
+
+    def test_unquoted_identifiers(self):
+        """Barewords become strings, Python literals become JSON literals"""
+        text = '{"biens_impactes":[door, front window], "ok": True, "ref": None, lieu: cuisine}'
+        assert parse_json_text(text) == {
+            "biens_impactes": ["door", "front window"],
+            "ok": True,
+            "ref": None,
+            "lieu": "cuisine",
+        }
+
+    def test_trailing_and_missing_commas(self):
+        """Trailing commas are dropped and missing ones inserted"""
+        assert parse_json_text('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+        assert parse_json_text('{"a": 1 "b": 2}') == {"a": 1, "b": 2}
+
+    def test_raw_newline_in_string(self):
+        """Control characters inside strings are escaped"""
+        assert parse_json_text('{"description": "ligne 1\nligne 2"}') == {"description": "ligne 1\nligne 2"}
+
+    def test_truncated_output_is_closed(self):
+        """A generation cut by max_new_tokens is closed on the fly"""
+        assert parse_json_text('{"a": "coupé') == {"a": "coupé"}
+        assert parse_json_text('{"a": [1, {"b": ') == {"a": [1, {"b": None}]}
+
+    def test_no_json_raises(self):
+        """Text without any object raises ValueError"""
+        with pytest.raises(ValueError):
+            parse_json_text("Not JSON at all, no braces")
+
+
+class TestStreamingJsonParser:
+    """Tests for chunked feeding"""
+
+    def test_chunked_equals_whole(self):
+        """Feeding one character at a time gives the same result"""
+        text = "Réponse : {'a': [door, 2,], \"b\": {\"c\": 'd'}} fin"
+        parser = StreamingJsonParser()
+        for ch in text:
+            parser.feed(ch)
+        assert parser.close() == parse_json_text(text) == {"a": ["door", 2], "b": {"c": "d"}}
+
+    def test_done_when_top_level_closes(self):
+        """feed() returns True exactly when the top-level object closes"""
+        parser = StreamingJsonParser()
+        assert parser.feed('{"a": "}"') is False
+        assert parser.feed(', "b": {}') is False
+        assert parser.feed("} and more") is True
+        assert parser.close() == {"a": "}", "b": {}}
+
+
+class TestJsonStopCriteria:
+    """Tests for the generate() early-stop hook"""
+
+    def test_stops_after_closing_brace(self):
+        """Generation stops on the token that closes the object"""
+        tokens = ['Sure', ' {"', 'a', '":', ' 1', '}', ' done']
+        criteria = JsonStopCriteria(lambda i: tokens[i], prompt_length=0)
+        stops = [criteria.update(list(range(n))) for n in range(1, len(tokens) + 1)]
+        assert stops.index(True) == 5
+        assert criteria.parser.close() == {"a": 1}
+
+    def test_unknown_tokens_ignored(self):
+        """Tokens without text (special tokens) do not break the parser"""
+        tokens = ["{", None, '"a":2}']
+        criteria = JsonStopCriteria(lambda i: tokens[i], prompt_length=0)
+        assert criteria.update([0, 1, 2])
@@ -0,0 +1,88 @@
+"""
+Unit tests for model/warmup.py
+Tests the warm-up sequence, its timings and the readiness signal, with fake
+steps standing in for the model loaders.
+"""
+import threading
+import time
+
+import pytest
+
+from assurhabitat_agents.model.warmup import WarmupState, warm_up
+
+
+def _steps(calls, fail=None, block=None):
+    """Fake per-model steps recording their calls; `fail` names a step that raises."""
+
+    def step(model, name):
+        def run():
+            if block is not None and name == "generate":
+                block.wait(5)
+            if (model, name) == fail:
+                raise RuntimeError("CUDA out of memory")
+            time.sleep(0.01)
+            calls.append((model, name))
+        return name, run
+
+    return {
+        "llm": lambda: [step("llm", "load"), step("llm", "token_strings"), step("llm", "generate")],
+        "vlm": lambda: [step("vlm", "load"), step("vlm", "generate")],
+    }
+
+
+class TestWarmUp:
+    """Tests for warm_up and WarmupState."""
+
+    def test_runs_every_step_in_order(self):
+        calls, state = [], WarmupState()
+        report = warm_up(steps=_steps(calls), state=state)
+
+        assert calls == [("llm", "load"), ("llm", "token_strings"), ("llm", "generate"),
+                         ("vlm", "load"), ("vlm", "generate")]
+        assert state.ready() is True
+        assert state.warm_state() == {"llm": True, "vlm": True}
+        assert report["status"] == "done"
+        assert set(report["models"]["llm"]["steps"]) == {"load", "token_strings", "generate"}
+        assert report["models"]["vlm"]["seconds"] >= 0.02
+        assert report["cold_start_seconds"] >= report["models"]["llm"]["seconds"] + report["models"]["vlm"]["seconds"] - 1e-3
+
+    def test_failed_step_keeps_worker_not_ready(self):
+        calls, state = [], WarmupState()
+        report = warm_up(steps=_steps(calls, fail=("llm", "token_strings")), state=state)
+
+        # the LLM stops at its failed step, the VLM still warms up
+        assert ("llm", "generate") not in calls
+        assert ("vlm", "generate") in calls
+        assert report["models"]["llm"]["status"] == "failed"
+        assert "CUDA out of memory" in report["models"]["llm"]["error"]
+        assert state.warm_state() == {"llm": False, "vlm": True}
+        assert state.ready() is False
+
+    def test_not_ready_while_running(self):
+        calls, state, block = [], WarmupState(), threading.Event()
+        thread = threading.Thread(target=warm_up, kwargs={"steps": _steps(calls, block=block), "state": state})
+        thread.start()
+        try:
+            deadline = time.time() + 5
+            while ("llm", "token_strings") not in calls and time.time() < deadline:
+                time.sleep(0.01)
+            report = state.report()
+            assert report["status"] == "running"
+            assert report["models"]["llm"]["status"] == "warming"
+            assert report["models"]["vlm"]["status"] == "pending"
+            assert state.ready() is False
+        finally:
+            block.set()
+            thread.join(5)
+        assert state.ready() is True
+
+    def test_not_started(self):
+        state = WarmupState()
+        assert state.ready() is False
+        assert state.report() == {"status": "not_started", "cold_start_seconds": None, "models": {}}
+
+    def test_only_requested_models(self):
+        calls, state = [], WarmupState()
+        warm_up(models=("vlm",), steps=_steps(calls), state=state)
+        assert state.warm_state() == {"vlm": True}
+        assert all(model == "vlm" for model, _ in calls)
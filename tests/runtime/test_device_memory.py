@@ -0,0 +1,158 @@
+"""
+Unit tests for runtime/device_memory.py
+Tests the shared KV / activation pool of the LLM and the VLM on a simulated
+device: budgets, batch sizes, waiting instead of spilling, offload reports.
+"""
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from assurhabitat_agents.runtime.device_memory import (
+    GiB,
+    DeviceMemoryManager,
+    DeviceOutOfMemory,
+    ModelMemoryProfile,
+    SimulatedAllocator,
+    offloaded_modules,
+    profile_from_config,
+)
+
+# 1 MiB per token of KV + activations, to keep the numbers readable
+MiB = 1024 ** 2
+LLM = ModelMemoryProfile("llm", weights_bytes=14 * GiB, kv_bytes_per_token=MiB // 2, activation_bytes_per_token=MiB // 2)
+VLM = ModelMemoryProfile("vlm", weights_bytes=5 * GiB, kv_bytes_per_token=MiB // 2, activation_bytes_per_token=MiB // 2)
+
+
+@pytest.fixture
+def device():
+    """24 GiB GPU with Devstral and Qwen2-VL loaded: 5 GiB left."""
+    allocator = SimulatedAllocator(24 * GiB)
+    manager = DeviceMemoryManager(allocator, margin_fraction=0.0)
+    for profile in (LLM, VLM):
+        allocator.allocate(profile.weights_bytes)
+        manager.register(profile)
+    return allocator, manager
+
+
+class TestSimulatedAllocator:
+    def test_out_of_memory(self):
+        allocator = SimulatedAllocator(2 * GiB)
+        allocator.allocate(GiB)
+        with pytest.raises(DeviceOutOfMemory):
+            allocator.allocate(2 * GiB)
+        allocator.release(GiB)
+        assert allocator.free() == 2 * GiB
+
+
+class TestProfile:
+    def test_from_config(self):
+        config = SimpleNamespace(num_hidden_layers=40, num_attention_heads=32, num_key_value_heads=8,
+                                 head_dim=128, hidden_size=5120, intermediate_size=32768, vocab_size=131072)
+        profile = profile_from_config("llm", config, weights_bytes=14 * GiB)
+        # K and V, 40 layers, 8 KV heads of 128 in bf16
+        assert profile.kv_bytes_per_token == 2 * 40 * 8 * 128 * 2
+        assert profile.request_bytes(1000) == 1000 * (profile.kv_bytes_per_token + profile.activation_bytes_per_token) + 131072 * 4
+
+    def test_vlm_uses_text_config(self):
+        text = SimpleNamespace(num_hidden_layers=28, num_attention_heads=12, num_key_value_heads=2,
+                               hidden_size=1536, intermediate_size=8960, vocab_size=151936)
+        profile = profile_from_config("vlm", SimpleNamespace(text_config=text), weights_bytes=5 * GiB)
+        assert profile.kv_bytes_per_token == 2 * 28 * 2 * (1536 // 12) * 2
+
+
+class TestDeviceMemoryManager:
+    def test_pool_is_memory_left_by_weights(self, device):
+        _, manager = device
+        report = manager.report()
+        assert report["pool_bytes"] == 5 * GiB
+        assert set(report["models"]) == {"llm", "vlm"}
+
+    def test_margin(self):
+        allocator = SimulatedAllocator(20 * GiB)
+        manager = DeviceMemoryManager(allocator, margin_fraction=0.1)
+        manager.register(LLM)
+        assert manager.report()["pool_bytes"] == 18 * GiB
+
+    def test_batch_size_from_free_memory(self, device):
+        allocator, manager = device
+        # 5 GiB pool, 1 GiB per 1024-token sequence
+        assert manager.batch_size("llm", 1024) == 5
+        assert manager.batch_size("vlm", 2048) == 2
+        # another process takes 2 GiB: the pool shrinks at the next registration
+        allocator.allocate(2 * GiB)
+        manager.register(VLM)
+        assert manager.batch_size("llm", 1024) == 3
+
+    def test_llm_and_vlm_share_the_pool(self, device):
+        _, manager = device
+        order = []
+        with manager.reserve("llm", 4096):  # 4 GiB of the 5
+            def vlm_call():
+                with manager.reserve("vlm", 2048):  # 2 GiB: must wait
+                    order.append("vlm")
+
+            thread = threading.Thread(target=vlm_call)
+            thread.start()
+            time.sleep(0.05)
+            assert order == []
+            order.append("llm done")
+        thread.join(5)
+
+        assert order == ["llm done", "vlm"]
+        report = manager.report()
+        assert report["models"]["vlm"]["waits"] == 1
+        assert report["models"]["vlm"]["wait_seconds"] > 0
+        assert report["reserved_bytes"] == 0
+
+    def test_concurrency_capped_by_batch_size(self, device):
+        _, manager = device
+        barrier_release = threading.Event()
+
+        def call():
+            with manager.reserve("llm", 2048):  # 2 GiB: at most 2 at a time
+                barrier_release.wait(5)
+
+        threads = [threading.Thread(target=call) for _ in range(4)]
+        for t in threads:
+            t.start()
+        time.sleep(0.05)
+        assert manager.report()["models"]["llm"]["in_flight"] == 2
+        barrier_release.set()
+        for t in threads:
+            t.join(5)
+        stats = manager.report()["models"]["llm"]
+        assert stats["requests"] == 4
+        assert stats["peak_in_flight"] == 2
+
+    def test_oversized_request_runs_alone(self, device):
+        _, manager = device
+        with manager.reserve("llm", 8192) as nbytes:  # 8 GiB > 5 GiB pool
+            assert nbytes == 8 * GiB
+        assert manager.report()["models"]["llm"]["oversized"] == 1
+
+    def test_timeout(self, device):
+        _, manager = device
+        with manager.reserve("llm", 4096):
+            with pytest.raises(TimeoutError):
+                with manager.reserve("vlm", 2048, timeout=0.05):
+                    pass
+
+    def test_unregistered_model_reserves_nothing(self, device):
+        _, manager = device
+        with manager.reserve("draft", 100000) as nbytes:
+            assert nbytes == 0
+
+    def test_offload_reported(self, device):
+        _, manager = device
+        model = SimpleNamespace(hf_device_map={"model.embed_tokens": 0, "model.layers.38": "cpu", "lm_head": "disk"})
+        assert offloaded_modules(model) == {"model.layers.38": "cpu", "lm_head": "disk"}
+
+        manager.check_offload("llm", model)
+        report = manager.report()
+        assert report["offload"] is True
+        assert report["models"]["llm"]["offloaded_modules"] == {"model.layers.38": "cpu", "lm_head": "disk"}
+
+        manager.check_offload("llm", SimpleNamespace(hf_device_map={"": 0}))
+        assert manager.report()["offload"] is False
@@ -0,0 +1,142 @@
+"""
+Unit tests for runtime/pipeline.py
+Tests staged processing of several claims, stage overlap, early exits and metrics.
+"""
+import threading
+import time
+
+import pytest
+
+from assurhabitat_agents.agents.orchestrator import Orchestrator
+from assurhabitat_agents.runtime.pipeline import ClaimPipeline
+
+STAGE_SECONDS = 0.05
+
+
+class StageRecorder:
+    """Agent doubles that sleep and record which claims run concurrently in each stage."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.active = {"declaration": set(), "validation": set(), "expertise": set()}
+        self.overlaps = set()
+
+    def _run(self, stage, key):
+        with self.lock:
+            self.active[stage].add(key)
+            busy = {s for s, keys in self.active.items() if keys and s != stage}
+            self.overlaps.update(tuple(sorted((stage, s))) for s in busy)
+        time.sleep(STAGE_SECONDS)
+        with self.lock:
+            self.active[stage].discard(key)
+
+    def declaration(self, state):
+        self._run("declaration", state["question"])
+        if state["question"] == "illisible":
+            return {"parsed_declaration": None}
+        return {"parsed_declaration": {"sinistre_type": "degats_des_eaux", "description": state["question"]}}
+
+    def validation(self, state):
+        self._run("validation", state["parsed_declaration"]["description"])
+        return {"image_conformity": {"compatible": True}, "guarantee_report": {"guaranteed": True}}
+
+    def expertise(self, state):
+        description = state["parsed_declaration"]["description"]
+        self._run("expertise", description)
+        if description == "boom":
+            raise RuntimeError("GPU out of memory")
+        return {"estimation": {"final_compensation": 100.0}, "report": f"Report {description}"}
+
+
+@pytest.fixture
+def recorder():
+    return StageRecorder()
+
+
+@pytest.fixture
+def orchestrator(recorder):
+    return Orchestrator(
+        declaration_agent=recorder.declaration,
+        validation_agent=recorder.validation,
+        expertise_agent=recorder.expertise,
+    )
+
+
+class TestClaimPipeline:
+    """Test suite for ClaimPipeline."""
+
+    def test_results_match_sequential_run(self, orchestrator):
+        sequential = orchestrator.run("Fuite 0", ["a.png"])
+
+        with ClaimPipeline(orchestrator) as pipe:
+            pipelined = pipe.submit("Fuite 0", ["a.png"]).result(timeout=5)
+
+        for key in ("status", "expertise_report", "estimation", "validation", "policy_version"):
+            assert pipelined[key] == sequential[key]
+        assert pipelined["claim_id"] != sequential["claim_id"]
+
+    def test_stages_overlap_across_claims(self, orchestrator, recorder):
+        with ClaimPipeline(orchestrator, queue_size=2) as pipe:
+            futures = [pipe.submit(f"Fuite {i}") for i in range(6)]
+            results = [f.result(timeout=10) for f in futures]
+
+        assert [r["expertise_report"] for r in results] == [f"Report Fuite {i}" for i in range(6)]
+        assert ("declaration", "expertise") in recorder.overlaps
+        assert ("declaration", "validation") in recorder.overlaps
+
+    def test_early_exit_and_failure(self, orchestrator):
+        events = []
+        with ClaimPipeline(orchestrator) as pipe:
+            rejected = pipe.submit("illisible", on_event=events.append)
+            failed = pipe.submit("boom")
+            assert rejected.result(timeout=5)["status"] == "error"
+            with pytest.raises(RuntimeError, match="GPU out of memory"):
+                failed.result(timeout=5)
+            metrics = pipe.metrics()
+
+        assert {"stage": "declaration", "status": "done", "parsed_declaration": None} in events
+        assert not any(e["stage"] == "validation" for e in events)
+        assert metrics["stages"]["validation"]["completed"] == 1
+        assert metrics["stages"]["expertise"]["failed"] == 1
+        assert metrics["finished"] == 2
+
+    def test_failed_claim_is_released(self, orchestrator, monkeypatch):
+        released = []
+
+        def release(claim):
+            released.append(claim["user_text"])
+            if claim["user_text"] == "boom":
+                raise OSError("registry unavailable")
+
+        monkeypatch.setattr(orchestrator, "release", release)
+        with ClaimPipeline(orchestrator) as pipe:
+            with pytest.raises(RuntimeError, match="GPU out of memory"):
+                pipe.submit("boom", ["boom.png"]).result(timeout=5)
+            # a cleanup error does not stop the worker
+            assert pipe.submit("Fuite 0").result(timeout=5)["status"] == "completed"
+
+        assert released == ["boom", "Fuite 0"]
+
+    def test_metrics(self, orchestrator):
+        with ClaimPipeline(orchestrator, workers={"declaration": 2}, queue_size=3) as pipe:
+            for f in [pipe.submit(f"Fuite {i}") for i in range(4)]:
+                f.result(timeout=5)
+            metrics = pipe.metrics()
+
+        declaration = metrics["stages"]["declaration"]
+        assert declaration["workers"] == 2
+        assert declaration["completed"] == 4
+        assert declaration["queue_size"] == 3
+        assert declaration["queue_depth"] == 0
+        assert 1 <= declaration["max_queue_depth"] <= 3
+        assert declaration["throughput_per_s"] > 0
+        assert metrics["submitted"] == metrics["finished"] == 4
+        assert metrics["in_pipeline"] == 0
+
+    def test_invalid_configuration(self, orchestrator):
+        with pytest.raises(ValueError, match="Unknown"):
+            ClaimPipeline(orchestrator, workers={"triage": 1})
+        with pytest.raises(ValueError, match="at least one"):
+            ClaimPipeline(orchestrator, workers={"expertise": 0})
+        with pytest.raises(RuntimeError, match="not started"):
+            ClaimPipeline(orchestrator).submit("Fuite")
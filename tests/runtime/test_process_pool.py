@@ -0,0 +1,128 @@
+"""
+Unit tests for runtime/process_pool.py and runtime/cpu_tasks.py
+Tests task dispatch to worker processes, utilization metrics and CPU tasks.
+"""
+import pytest
+
+from assurhabitat_agents.runtime.process_pool import CpuTaskPool
+from assurhabitat_agents.runtime.cpu_tasks import (
+    clear_prefetched_images,
+    discard_prefetched_images,
+    get_prefetched_image,
+    prefetch_images,
+    render_claim_report,
+)
+
+
+def _square(x):
+    return x * x
+
+
+def _fail(x):
+    raise ValueError(f"bad input {x}")
+
+
+@pytest.fixture
+def pool():
+    with CpuTaskPool(max_workers=2, name="test") as p:
+        yield p
+
+
+class TestCpuTaskPool:
+    """Test suite for CpuTaskPool."""
+
+    def test_run_and_submit(self, pool):
+        assert pool.run(_square, 3) == 9
+        futures = [pool.submit(_square, i) for i in range(10)]
+        assert [f.result() for f in futures] == [i * i for i in range(10)]
+
+    def test_metrics_count_tasks(self, pool):
+        for i in range(5):
+            pool.run(_square, i)
+
+        metrics = pool.metrics()
+
+        assert metrics["pool"] == "test"
+        assert metrics["workers"] == 2
+        assert metrics["in_flight"] == 0
+        assert metrics["tasks"]["_square"]["completed"] == 5
+        assert 0.0 <= metrics["utilization"] <= 1.0
+
+    def test_failures_are_propagated_and_counted(self, pool):
+        with pytest.raises(ValueError, match="bad input 1"):
+            pool.run(_fail, 1)
+
+        assert pool.metrics()["tasks"]["_fail"]["failed"] == 1
+
+    def test_workers_are_not_forked(self, pool):
+        assert pool.start_method in ("forkserver", "spawn")
+
+
+class TestCpuTasks:
+    """Test suite for the CPU-bound tasks."""
+
+    def test_render_completed_report(self):
+        result = {
+            "status": "completed",
+            "expertise_report": "Dégâts limités au plafond.",
+            "estimation": {"estimated_cost": 2000.0, "franchise": 150, "max_covered_amount": 25000, "final_compensation": 1850.0},
+            "validation": {
+                "parsed_declaration": {
+                    "sinistre_type": "degats_des_eaux",
+                    "extracted": {"date_sinistre": "2025-01-05", "lieu": "cuisine", "biens_impactes": ["sol", "mur"]},
+                }
+            },
+        }
+
+        report = render_claim_report(result)
+
+        assert report.startswith("# Sinistre — completed")
+        assert "Indemnisation finale : 1850.0 €" in report
+        assert "sol, mur" in report
+
+    def test_render_rejected_report(self):
+        report = render_claim_report({"status": "rejected", "reason": "Photos non conformes", "validation": "Error"})
+        assert "Photos non conformes" in report
+
+    def test_prefetch_registry(self, pool):
+        clear_prefetched_images()
+        assert get_prefetched_image("missing.png") is None
+
+        # decode fails (no such file / no PIL) -> callers fall back to the path
+        prefetch_images(pool, ["does_not_exist.png"])
+        assert get_prefetched_image("does_not_exist.png") is None
+        clear_prefetched_images()
+
+    def test_prefetch_registry_follows_file_contents(self, tmp_path):
+        import os
+        from concurrent.futures import Future
+
+        class FakePool:
+            def __init__(self):
+                self.decoded = []
+
+            def submit(self, fn, path):
+                self.decoded.append(path)
+                future = Future()
+                future.set_result(f"decoded #{len(self.decoded)}")
+                return future
+
+        clear_prefetched_images()
+        photo = tmp_path / "upload.png"
+        photo.write_bytes(b"first claim")
+        fake = FakePool()
+        prefetch_images(fake, [str(photo)])
+        # read by CheckConformity, then CostEstimation
+        assert get_prefetched_image(str(photo)) == "decoded #1"
+        assert get_prefetched_image(str(photo)) == "decoded #1"
+
+        # another claim uploads a different photo under the same name
+        photo.write_bytes(b"second claim, other photo")
+        os.utime(photo, ns=(0, 0))
+        assert get_prefetched_image(str(photo)) is None
+        prefetch_images(fake, [str(photo)])
+        assert get_prefetched_image(str(photo)) == "decoded #2"
+
+        discard_prefetched_images([str(photo)])
+        assert get_prefetched_image(str(photo)) is None
+        clear_prefetched_images()
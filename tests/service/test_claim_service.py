@@ -0,0 +1,229 @@
+"""
+Unit tests for service/claim_service.py and service/api.py
+Tests the bounded queue, per-tenant limits, load shedding and probes.
+"""
+import threading
+import time
+
+import pytest
+
+from assurhabitat_agents.service.claim_service import AdmissionRejected, ClaimService
+
+
+class BlockingOrchestrator:
+    """Orchestrator double that waits until released, emitting stage events."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def run(self, user_text, image_paths=None, on_event=None, policy_id=None):
+        on_event({"stage": "declaration", "status": "started"})
+        self.release.wait(5)
+        if user_text == "boom":
+            raise RuntimeError("GPU out of memory")
+        on_event({"stage": "declaration", "status": "done"})
+        return {"status": "completed", "echo": user_text}
+
+    def resume(self, claim_id, reply, on_event=None):
+        on_event({"stage": "declaration", "status": "resumed"})
+        return {"status": "completed", "echo": reply, "claim_id": claim_id}
+
+
+class AskingOrchestrator(BlockingOrchestrator):
+    """Orchestrator double whose declaration agent asks the policyholder a question."""
+
+    def run(self, user_text, image_paths=None, on_event=None, policy_id=None):
+        on_event({"stage": "declaration", "status": "started"})
+        return {"status": "waiting_for_human", "stage": "declaration",
+                "question": "Quand le sinistre a-t-il eu lieu ?", "claim_id": "c-1"}
+
+
+@pytest.fixture
+def orchestrator():
+    return BlockingOrchestrator()
+
+
+@pytest.fixture
+def service(orchestrator):
+    svc = ClaimService(orchestrator, workers=1, max_queue=2, max_per_tenant=2,
+                       warm_state=lambda: {"llm": True, "vlm": True})
+    svc.start()
+    yield svc
+    orchestrator.release.set()
+    svc.stop(timeout=5)
+
+
+def _wait_finished(service, job_id):
+    for _ in service.stream(job_id, timeout=5):
+        pass
+    return service.status(job_id)
+
+
+class TestClaimService:
+    """Test suite for ClaimService."""
+
+    def test_submit_and_complete(self, service, orchestrator):
+        job = service.submit("Fuite d'eau", ["a.png"], tenant="t1")
+        assert job["status"] in ("queued", "running")
+
+        orchestrator.release.set()
+        final = _wait_finished(service, job["job_id"])
+
+        assert final["status"] == "completed"
+        assert final["result"] == {"status": "completed", "echo": "Fuite d'eau"}
+
+    def test_stream_yields_progress_events(self, service, orchestrator):
+        job = service.submit("Fuite d'eau", tenant="t1")
+        orchestrator.release.set()
+
+        events = list(service.stream(job["job_id"], timeout=5))
+
+        assert events[0] == {"stage": "service", "status": "queued"}
+        assert {"stage": "declaration", "status": "done"} in events
+        assert events[-1] == {"stage": "service", "status": "completed"}
+
+    def test_per_tenant_limit(self, service):
+        service.submit("a", tenant="t1")
+        service.submit("b", tenant="t1")
+
+        with pytest.raises(AdmissionRejected, match="t1"):
+            service.submit("c", tenant="t1")
+
+    def test_queue_saturation_sheds_load(self, orchestrator):
+        svc = ClaimService(orchestrator, workers=1, max_queue=1, max_per_tenant=10)
+        # no worker started: nothing is dequeued
+        svc.submit("a", tenant="t1")
+
+        with pytest.raises(AdmissionRejected, match="saturated"):
+            svc.submit("b", tenant="t2")
+        assert svc.health()["shed"] == 1
+
+    def test_stop_with_full_queue_drains_and_returns(self, orchestrator):
+        svc = ClaimService(orchestrator, workers=1, max_queue=2, max_per_tenant=10)
+        svc.start()
+        jobs = [svc.submit("a", tenant="a")]
+        for _ in range(50):
+            if svc.status(jobs[0]["job_id"])["status"] == "running":
+                break
+            time.sleep(0.05)
+        # one running, two queued: the queue is full
+        jobs += [svc.submit(text, tenant=text) for text in ("b", "c")]
+
+        stopper = threading.Thread(target=svc.stop, kwargs={"timeout": 5})
+        stopper.start()
+        with pytest.raises(AdmissionRejected, match="shutting down"):
+            svc.submit("d", tenant="d")
+        orchestrator.release.set()
+        stopper.join(5)
+
+        assert not stopper.is_alive()
+        assert [svc.status(job["job_id"])["status"] for job in jobs] == ["completed"] * 3
+
+    def test_failed_claim_frees_tenant_slot(self, service, orchestrator):
+        job = service.submit("boom", tenant="t1")
+        orchestrator.release.set()
+        final = _wait_finished(service, job["job_id"])
+
+        assert final["status"] == "failed"
+        assert "GPU out of memory" in final["error"]
+        service.submit("a", tenant="t1")
+        service.submit("b", tenant="t1")
+
+    def test_readiness_reports_model_warm_state(self, orchestrator):
+        svc = ClaimService(orchestrator, warm_state=lambda: {"llm": True, "vlm": False})
+        svc.start()
+        try:
+            readiness = svc.readiness()
+            assert readiness["alive"] is True
+            assert readiness["ready"] is False
+            assert readiness["models"] == {"llm": True, "vlm": False}
+        finally:
+            svc.stop(timeout=5)
+
+    def test_readiness_includes_warmup_report(self, orchestrator):
+        report = {"status": "running", "cold_start_seconds": 12.5, "models": {}}
+        svc = ClaimService(orchestrator, warm_state=lambda: {"llm": False, "vlm": False},
+                           warmup_report=lambda: report)
+        svc.start()
+        try:
+            readiness = svc.readiness()
+            assert readiness["ready"] is False
+            assert readiness["warmup"]["cold_start_seconds"] == 12.5
+        finally:
+            svc.stop(timeout=5)
+
+    def test_unknown_job(self, service):
+        assert service.status("nope") is None
+        assert list(service.stream("nope")) == []
+        with pytest.raises(KeyError):
+            service.reply("nope", "hier")
+
+    def test_waiting_claim_frees_worker_and_resumes_on_reply(self):
+        svc = ClaimService(AskingOrchestrator(), workers=1, max_per_tenant=1)
+        svc.start()
+        try:
+            job = svc.submit("Fuite d'eau", tenant="t1")
+            waiting = _wait_finished(svc, job["job_id"])
+            assert waiting["status"] == "waiting_for_human"
+            assert waiting["question"] == "Quand le sinistre a-t-il eu lieu ?"
+            assert svc.health()["waiting_for_human"] == 1
+
+            # the waiting claim holds neither a worker nor a tenant slot
+            other = svc.submit("Cambriolage", tenant="t1")
+            assert _wait_finished(svc, other["job_id"])["status"] == "waiting_for_human"
+
+            svc.reply(job["job_id"], "hier soir")
+            events = list(svc.stream(job["job_id"], timeout=5))
+            assert {"stage": "declaration", "status": "resumed"} in events
+            final = svc.status(job["job_id"])
+            assert final["status"] == "completed"
+            assert final["result"] == {"status": "completed", "echo": "hier soir", "claim_id": "c-1"}
+        finally:
+            svc.stop(timeout=5)
+
+    def test_reply_to_claim_not_waiting(self, service):
+        job = service.submit("Fuite d'eau", tenant="t1")
+        with pytest.raises(ValueError, match="not waiting"):
+            service.reply(job["job_id"], "hier")
+
+
+class TestClaimApi:
+    """Test suite for the HTTP layer."""
+
+    @pytest.fixture
+    def client(self, orchestrator):
+        pytest.importorskip("fastapi")
+        pytest.importorskip("httpx")
+        from fastapi.testclient import TestClient
+        from assurhabitat_agents.service.api import create_app
+
+        svc = ClaimService(orchestrator, workers=1, max_queue=1, max_per_tenant=5,
+                           warm_state=lambda: {"llm": True, "vlm": True})
+        with TestClient(create_app(svc)) as c:
+            yield c
+            orchestrator.release.set()
+
+    def test_submit_status_and_stream(self, client, orchestrator):
+        resp = client.post("/claims", json={"user_text": "Fuite"}, headers={"X-Tenant-Id": "t1"})
+        assert resp.status_code == 202
+        job_id = resp.json()["job_id"]
+
+        orchestrator.release.set()
+        lines = client.get(f"/claims/{job_id}/stream").text.strip().splitlines()
+        assert '"completed"' in lines[-1]
+        assert client.get(f"/claims/{job_id}").json()["status"] == "completed"
+
+    def test_429_when_saturated(self, client):
+        # one running (blocked) + one queued fills max_queue=1
+        client.post("/claims", json={"user_text": "a"})
+        responses = [client.post("/claims", json={"user_text": str(i)}) for i in range(3)]
+
+        rejected = [r for r in responses if r.status_code == 429]
+        assert rejected
+        assert rejected[0].headers["Retry-After"]
+
+    def test_probes(self, client):
+        assert client.get("/healthz").status_code == 200
+        assert client.get("/readyz").json()["ready"] is True
+        assert client.get("/claims/unknown").status_code == 404
+        assert client.post("/claims/unknown/reply", json={"reply": "hier"}).status_code == 404
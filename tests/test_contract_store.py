@@ -0,0 +1,121 @@
+"""
+Unit tests for contract_store.py
+Tests per-policy contract terms: bulk import, LRU cache and guarantee overlay.
+"""
+import pytest
+
+from assurhabitat_agents import utils
+from assurhabitat_agents.contract_store import ContractStore, current_policy_id, pin_policy_id
+
+CSV = """policy_id,sinistre_type,plafond,franchise,exclusions
+P-001,degats_des_eaux,40000,100,Piscine|Sous-sol non aménagé
+P-001,vol_vandalisme,,50,
+P-002,Degats des eaux,10000,300,
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    csv_path = tmp_path / "contracts.csv"
+    csv_path.write_text(CSV, encoding="utf-8")
+    s = ContractStore(tmp_path / "contracts.db", cache_size=2)
+    assert s.import_csv(csv_path) == 3
+    yield s
+    s.close()
+
+
+class TestContractStore:
+    """Tests for storage and lookups"""
+
+    def test_lookup(self, store):
+        """Terms are found per policy and normalized sinistre type"""
+        terms = store.terms("P-001", "degats_des_eaux")
+        assert (terms.plafond, terms.franchise) == (40000, 100)
+        assert terms.exclusions == ("Piscine", "Sous-sol non aménagé")
+        assert store.terms("P-002", "degats_des_eaux").plafond == 10000
+        assert store.terms("P-001", "incendie_explosion") is None
+
+    def test_empty_values_keep_standard_terms(self, store):
+        """An empty plafond in the import keeps the standard ceiling"""
+        guarantee = {"couverture": [], "exclusions": ["Négligence"], "plafond": 20000, "franchise": 200}
+        merged = store.terms("P-001", "vol_vandalisme").apply(guarantee)
+        assert merged["plafond"] == 20000
+        assert merged["franchise"] == 50
+        assert merged["exclusions"] == ["Négligence"]
+        assert guarantee["franchise"] == 200
+
+    def test_lru_cache(self, store):
+        """Hot policies are served from memory, cold ones evicted"""
+        store.policy_terms("P-001")
+        store.policy_terms("P-001")
+        store.policy_terms("UNKNOWN")
+        store.policy_terms("UNKNOWN")
+        store.policy_terms("P-002")
+        metrics = store.metrics()
+        assert (metrics["hits"], metrics["misses"]) == (2, 3)
+        assert metrics["cached_policies"] == 2
+
+    def test_import_invalidates_cache(self, store):
+        """Re-imported terms are visible immediately"""
+        assert store.terms("P-002", "degats_des_eaux").plafond == 10000
+        store.upsert([{"policy_id": "P-002", "sinistre_type": "degats_des_eaux", "plafond": 12000}])
+        assert store.terms("P-002", "degats_des_eaux").plafond == 12000
+        assert store.count() == 3
+
+    def test_display_name_is_stored_under_the_canonical_key(self, store, monkeypatch):
+        """A type imported by its display name is found by the guarantee lookups"""
+        monkeypatch.setattr(utils, "get_contract_store", lambda: store)
+        store.upsert([{"policy_id": "P-003", "sinistre_type": "Dégâts des eaux", "plafond": 7000, "franchise": 90}])
+        assert set(store.policy_terms("P-003")) == {"degats_des_eaux"}
+        guarantee = utils.get_guarantee_for_type("degats_des_eaux", policy_id="P-003")
+        assert (guarantee["plafond"], guarantee["franchise"]) == (7000, 90)
+
+    def test_unknown_type_rejects_the_import(self, store):
+        with pytest.raises(ValueError, match="inondation_martienne"):
+            store.upsert([
+                {"policy_id": "P-004", "sinistre_type": "incendie_explosion", "plafond": 1},
+                {"policy_id": "P-004", "sinistre_type": "inondation_martienne", "plafond": 1},
+            ])
+        assert store.policy_terms("P-004") == {}
+
+    def test_parquet_import(self, tmp_path):
+        """Parquet exports are imported in batches"""
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        path = tmp_path / "contracts.parquet"
+        pq.write_table(pa.table({
+            "policy_id": ["P-1", "P-2"],
+            "sinistre_type": ["incendie_explosion", "incendie_explosion"],
+            "plafond": [50000.0, None],
+            "franchise": [250.0, 400.0],
+        }), path)
+        store = ContractStore(tmp_path / "c.db")
+        assert store.import_parquet(path) == 2
+        assert store.terms("P-2", "incendie_explosion").plafond is None
+        store.close()
+
+
+class TestGuaranteeResolution:
+    """Tests for utils.get_guarantee_for_type with a contract store"""
+
+    @pytest.fixture(autouse=True)
+    def configured_store(self, store, monkeypatch):
+        monkeypatch.setattr(utils, "get_contract_store", lambda: store)
+
+    def test_pinned_policy(self):
+        """The policy pinned for the claim is applied"""
+        standard = utils.get_guarantee_for_type("degats_des_eaux")
+        with pin_policy_id("P-001"):
+            assert current_policy_id() == "P-001"
+            contract = utils.get_guarantee_for_type("degats_des_eaux")
+        assert contract["plafond"] == 40000
+        assert contract["policy_id"] == "P-001"
+        assert "Piscine" in contract["exclusions"]
+        assert current_policy_id() is None
+        assert utils.get_guarantee_for_type("degats_des_eaux") == standard
+
+    def test_explicit_policy_and_unknown_policy(self):
+        """An explicit policy_id wins; unknown policies get the standard terms"""
+        assert utils.get_guarantee_for_type("Dégâts des eaux", policy_id="P-002")["plafond"] == 10000
+        standard = utils.get_policy_kb().guarantee_for_type("degats_des_eaux")
+        assert utils.get_guarantee_for_type("degats_des_eaux", policy_id="NOPE") == standard
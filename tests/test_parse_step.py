@@ -0,0 +1,63 @@
+"""
+Unit tests for utils.parse_step / utils.parse_output
+Tests the single-pass ReAct output parser on well-formed and malformed outputs.
+"""
+import pytest
+
+from assurhabitat_agents.utils import ReActStep, parse_output, parse_step
+
+
+def test_action_with_json_arguments():
+    step = parse_step('Thought: ask the date\nAction: AskHuman\nArguments: {"question": "Quand ?"}')
+    assert step == ReActStep("action", step.text, "AskHuman", {"question": "Quand ?"}, None)
+
+
+def test_action_without_arguments():
+    step = parse_step("Action: InformationVerification")
+    assert (step.kind, step.tool, step.arguments, step.error) == ("action", "InformationVerification", {}, None)
+
+
+def test_arguments_stop_at_next_section():
+    step = parse_step('Action: AskHuman\nArguments: {"question": "Quelle Action ?"}\nObservation: waiting')
+    assert step.arguments == {"question": "Quelle Action ?"}
+
+
+def test_partial_and_sloppy_json_arguments():
+    truncated = parse_step('Action: CheckGuarantee\nArguments: {"parsed_declaration": {"sinistre_type": "vol_vandalisme"')
+    assert truncated.arguments == {"parsed_declaration": {"sinistre_type": "vol_vandalisme"}}
+    sloppy = parse_step("Action: AskHuman\nArguments: {'question': 'Où ?', 'items': [door],}")
+    assert sloppy.arguments == {"question": "Où ?", "items": ["door"]}
+    assert sloppy.error is None
+
+
+def test_key_value_arguments():
+    step = parse_step("Action: AskHuman\nArguments: question=Où a eu lieu le sinistre ?\nretries=2")
+    assert step.arguments == {"question": "Où a eu lieu le sinistre ?", "retries": 2}
+
+
+def test_invalid_arguments_reported_not_raised():
+    step = parse_step("Action: AskHuman\nArguments: please ask the user")
+    assert step.kind == "action"
+    assert step.arguments == {}
+    assert step.error
+
+
+@pytest.mark.parametrize("output", ["Answer: Dossier complet.", "answer: Dossier complet.", "Réponse: Dossier complet."])
+def test_answer(output):
+    assert parse_step(output) == ReActStep("answer", "Dossier complet.")
+
+
+def test_action_wins_over_answer():
+    assert parse_step("Answer: done\nAction: AskHuman").kind == "action"
+
+
+def test_thought_only():
+    step = parse_step("  I am still thinking about it.  ")
+    assert step == ReActStep("thought", "I am still thinking about it.")
+
+
+def test_parse_output_tuple_form():
+    assert parse_output('Action: X\nArguments: {"a": 1}') == ("action", "X", {"a": 1})
+    assert parse_output("Answer: ok") == ("answer", "ok", None)
+    with pytest.raises(ValueError):
+        parse_output("Action: X\nArguments: not json")
@@ -0,0 +1,61 @@
+"""
+Unit tests for pending_claims.py
+Tests the persistence of claims suspended on a question to the policyholder.
+"""
+import pytest
+
+from assurhabitat_agents.pending_claims import PendingClaimStore
+
+STATE = {
+    "user_input": "Fuite d'eau",
+    "last_action": {"name": "AskHuman", "arguments": {"question": "Quelle date ?"}},
+    "pending_question": "Quelle date ?",
+    "human_reply": None,
+}
+CLAIM = {"claim_id": "c-1", "user_text": "Fuite d'eau", "image_paths": ["a.png"], "policy_id": None}
+
+
+@pytest.fixture
+def store(tmp_path):
+    s = PendingClaimStore(tmp_path / "pending.db")
+    yield s
+    s.close()
+
+
+class TestPendingClaimStore:
+    """Tests for save / get / delete"""
+
+    def test_roundtrip(self, store):
+        store.save("c-1", "declaration", "Quelle date ?", STATE, CLAIM)
+
+        record = store.get("c-1")
+        assert record["stage"] == "declaration"
+        assert record["question"] == "Quelle date ?"
+        assert record["state"] == STATE
+        assert record["claim"] == CLAIM
+
+    def test_save_replaces_previous_suspension(self, store):
+        store.save("c-1", "declaration", "Quelle date ?", STATE, CLAIM)
+        store.save("c-1", "expertise", "Quel montant ?", STATE, CLAIM)
+
+        assert store.count() == 1
+        assert store.get("c-1")["stage"] == "expertise"
+
+    def test_delete_and_pending(self, store):
+        store.save("c-1", "declaration", "Quelle date ?", STATE, CLAIM)
+        store.save("c-2", "expertise", "Quel montant ?", STATE, CLAIM)
+
+        assert [r["claim_id"] for r in store.pending()] == ["c-1", "c-2"]
+        store.delete("c-1")
+        assert store.get("c-1") is None
+        assert store.count() == 1
+
+    def test_persisted_on_disk(self, tmp_path):
+        path = tmp_path / "pending.db"
+        first = PendingClaimStore(path)
+        first.save("c-1", "declaration", "Quelle date ?", STATE, CLAIM)
+        first.close()
+
+        second = PendingClaimStore(path)
+        assert second.get("c-1")["claim"] == CLAIM
+        second.close()
@@ -0,0 +1,260 @@
+"""
+Unit tests for policy_kb.py
+Tests the compiled knowledge base: records, merged documents and alias lookups.
+"""
+import dataclasses
+import os
+
+import pytest
+import yaml
+
+from assurhabitat_agents.policy_kb import (
+    PolicyKB,
+    PolicyKBWatcher,
+    fold_key,
+    load_policy_kb,
+    pin_policy_kb,
+    pinned_kb,
+    validate_policy_data,
+)
+from assurhabitat_agents.utils import (
+    SINISTRES_PATH,
+    GARANTIES_PATH,
+    DocTools,
+    get_guarantee_for_type,
+    get_policy_kb,
+    get_required_documents,
+)
+
+SINISTRES = {
+    "sinistres": {
+        "degats_des_eaux": {
+            "nom": "Dégâts des eaux",
+            "aliases": ["water damage"],
+            "delai_declaration_jours_ouvres": 5,
+            "pieces_justificatives": ["Photos", "Constat amiable", "Photos"],
+            "required_fields": ["date_sinistre", "lieu", "description"],
+        },
+        "vol_vandalisme": {"nom": "Vol", "pieces_justificatives": ["Dépôt de plainte"]},
+    }
+}
+GARANTIES = {
+    "garanties": {
+        "degats_des_eaux": {"couverture": ["fuite"], "exclusions": ["négligence"], "plafond": 5000, "franchise": 150},
+    },
+    "obligations_generales": {"declaration_sinistre_jours_ouvres": 5},
+    "pieces_generales": ["Photos", "RIB"],
+}
+
+
+@pytest.fixture
+def kb():
+    return PolicyKB(SINISTRES, GARANTIES)
+
+
+class TestPolicyKB:
+    """Tests for lookups on a compiled knowledge base"""
+
+    def test_records_are_frozen(self, kb):
+        """Records cannot be modified once compiled"""
+        record = kb.guarantee("degats_des_eaux")
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            record.plafond = 0
+        assert not hasattr(record, "__dict__")
+
+    def test_documents_merged_once(self, kb):
+        """Local and general documents are merged without duplicates, in order"""
+        assert kb.sinistre("degats_des_eaux").documents == ("Photos", "Constat amiable", "RIB")
+        assert kb.required_documents("vol_vandalisme")["notes"].startswith("Dépôt de plainte")
+        assert kb.required_documents("inconnu") == {"documents": ["Photos", "RIB"], "notes": ""}
+
+    @pytest.mark.parametrize("name", ["degats_des_eaux", " Degats des eaux ", "Dégâts des eaux", "WATER DAMAGE"])
+    def test_alias_lookup(self, kb, name):
+        """Keys, display names and aliases resolve to the same record"""
+        assert kb.resolve(name) == "degats_des_eaux"
+        assert kb.guarantee_for_type(name)["plafond"] == 5000
+
+    def test_aliases_of(self, kb):
+        """Every name of a type, used to keep them out of the coverage evidence"""
+        aliases = kb.aliases_of("Dégâts des eaux")
+        assert "water_damage" in aliases
+        assert "degats_des_eaux" in aliases
+        assert not any(alias.startswith("vol") for alias in aliases)
+
+    def test_unknown_type_raises(self, kb):
+        """Unknown types keep raising KeyError"""
+        with pytest.raises(KeyError):
+            kb.expected_fields("ambiguous")
+        with pytest.raises(KeyError):
+            kb.guarantee_for_type("vol_vandalisme")
+
+    def test_dict_views_are_copies(self, kb):
+        """Callers may mutate the returned dicts without touching the KB"""
+        fields = kb.expected_fields("degats_des_eaux")
+        fields["required_fields"].append("photos")
+        assert kb.expected_fields("degats_des_eaux")["required_fields"] == ["date_sinistre", "lieu", "description"]
+
+    def test_default_required_fields(self, kb):
+        assert kb.expected_fields("vol_vandalisme")["required_fields"] == ["date_sinistre", "lieu"]
+
+    def test_fold_key(self):
+        assert fold_key("Incendie / explosion") == "incendie_explosion"
+
+
+class TestSharedKB:
+    """Tests for the instance shared by tools and agents"""
+
+    def test_utils_functions_use_shared_kb(self):
+        """utils functions answer from the shared knowledge base"""
+        assert get_guarantee_for_type("degats_des_eaux") == get_policy_kb().guarantee_for_type("degats_des_eaux")
+        assert get_required_documents("vol")["notes"]
+
+    def test_yaml_parsed_once_per_paths(self):
+        """DocTools instances on the same files share one compiled KB"""
+        assert DocTools().kb is DocTools().kb is load_policy_kb(SINISTRES_PATH, GARANTIES_PATH)
+
+
+def _write(path, data, bump=0):
+    path.write_text(yaml.safe_dump(data, allow_unicode=True), encoding="utf-8")
+    # make sure the mtime moves even on coarse filesystems
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+
+
+@pytest.fixture
+def policy_files(tmp_path):
+    sinistres = tmp_path / "sinistres.yaml"
+    garanties = tmp_path / "garanties.yaml"
+    _write(sinistres, {"sinistres": {"degats_des_eaux": SINISTRES["sinistres"]["degats_des_eaux"]}})
+    _write(garanties, GARANTIES)
+    return sinistres, garanties
+
+
+def _with_plafond(plafond, franchise=150):
+    data = dict(GARANTIES)
+    data["garanties"] = {"degats_des_eaux": dict(GARANTIES["garanties"]["degats_des_eaux"], plafond=plafond, franchise=franchise)}
+    return data
+
+
+class TestPolicyKBWatcher:
+    """Tests for hot reload of the YAML files"""
+
+    def test_reload_on_change(self, policy_files):
+        """An edited file is compiled into a new snapshot"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=None)
+        assert watcher.version == 1
+        assert watcher.current().guarantee("degats_des_eaux").plafond == 5000
+
+        _write(garanties, _with_plafond(8000), bump=1)
+        assert watcher.check() is True
+        assert watcher.current().guarantee("degats_des_eaux").plafond == 8000
+        assert watcher.current().version == 2
+
+    def test_touch_without_change(self, policy_files):
+        """Same content with a new mtime does not rebuild the KB"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=None)
+        kb = watcher.current()
+        _write(garanties, GARANTIES, bump=1)
+        assert watcher.check() is False
+        assert watcher.current() is kb
+
+    @pytest.mark.parametrize("content", ["garanties: [unclosed", yaml.safe_dump(_with_plafond(100, franchise=500))])
+    def test_invalid_edit_keeps_snapshot(self, policy_files, content):
+        """Invalid YAML or inconsistent values are rejected"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=None)
+        kb = watcher.current()
+        garanties.write_text(content, encoding="utf-8")
+        st = os.stat(garanties)
+        os.utime(garanties, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+        assert watcher.check() is False
+        assert watcher.current() is kb
+        assert watcher.metrics()["failed_reloads"] == 1
+        assert watcher.last_error
+
+    @pytest.mark.parametrize("content", ["garanties: [unclosed", yaml.safe_dump(_with_plafond(100, franchise=500))])
+    def test_invalid_initial_load_raises(self, policy_files, content):
+        """Without a previous snapshot, an invalid configuration is not served as an empty KB"""
+        sinistres, garanties = policy_files
+        garanties.write_text(content, encoding="utf-8")
+        with pytest.raises(ValueError):
+            PolicyKBWatcher(sinistres, garanties, interval=None)
+
+    def test_missing_file_at_start_raises(self, policy_files, tmp_path):
+        sinistres, _ = policy_files
+        with pytest.raises(ValueError, match="FileNotFoundError"):
+            PolicyKBWatcher(sinistres, tmp_path / "missing.yaml", interval=None)
+
+    def test_file_removed_between_stat_and_read(self, policy_files, monkeypatch):
+        """A read error keeps the snapshot instead of failing the claim"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=0)
+        kb = watcher.current()
+        _write(garanties, _with_plafond(8000), bump=1)
+
+        def removed(self):
+            raise FileNotFoundError(f"No such file: {self}")
+
+        monkeypatch.setattr(type(garanties), "read_bytes", removed)
+        assert watcher.current() is kb
+        assert "FileNotFoundError" in watcher.last_error
+
+        monkeypatch.undo()
+        assert watcher.current().guarantee("degats_des_eaux").plafond == 8000
+
+    def test_interval_throttles_checks(self, policy_files):
+        """current() only re-stats the files once the interval has elapsed"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=3600)
+        _write(garanties, _with_plafond(8000), bump=1)
+        assert watcher.current().guarantee("degats_des_eaux").plafond == 5000
+        watcher.interval = 0
+        assert watcher.current().guarantee("degats_des_eaux").plafond == 8000
+
+    def test_pinned_snapshot_survives_reload(self, policy_files):
+        """A claim keeps the snapshot it started with"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=None)
+        with pin_policy_kb(watcher.current()):
+            _write(garanties, _with_plafond(8000), bump=1)
+            watcher.check()
+            assert pinned_kb().guarantee("degats_des_eaux").plafond == 5000
+        assert pinned_kb() is None
+        assert watcher.current().guarantee("degats_des_eaux").plafond == 8000
+
+    def test_snapshot_by_version(self, policy_files):
+        """Recent snapshots stay reachable by version, older ones leave the history"""
+        sinistres, garanties = policy_files
+        watcher = PolicyKBWatcher(sinistres, garanties, interval=None, history=2)
+        first = watcher.current()
+        for bump, plafond in enumerate((6000, 7000), start=1):
+            _write(garanties, _with_plafond(plafond), bump=bump)
+            assert watcher.check() is True
+
+        assert watcher.snapshot(1) is None
+        assert watcher.snapshot(2).guarantee("degats_des_eaux").plafond == 6000
+        assert watcher.snapshot(3) is watcher.current()
+        assert first.version == 1
+
+    def test_shared_watcher_built_lazily(self, tmp_path, monkeypatch):
+        """An invalid configuration fails get_policy_watcher(), not the import, and is retried"""
+        from assurhabitat_agents import utils
+
+        monkeypatch.setattr(utils, "GARANTIES_PATH", tmp_path / "missing.yaml")
+        utils.get_policy_watcher.cache_clear()
+        try:
+            with pytest.raises(ValueError, match="FileNotFoundError"):
+                utils.get_policy_watcher()
+            monkeypatch.setattr(utils, "GARANTIES_PATH", GARANTIES_PATH)
+            assert utils.get_policy_watcher().version == 1
+        finally:
+            utils.get_policy_watcher.cache_clear()
+
+    def test_validate_shipped_config(self):
+        """The YAML files in the repo pass validation"""
+        sinistres = yaml.safe_load(SINISTRES_PATH.read_text(encoding="utf-8"))
+        garanties = yaml.safe_load(GARANTIES_PATH.read_text(encoding="utf-8"))
+        assert validate_policy_data(sinistres, garanties) == []
@@ -242,3 +242,96 @@ class TestCheckConformity:
         assert "detected_damage_types" in result
         assert result["detected_damage_types"] == ["unknown"]
 
+
+
+class TestSpeculativeAnalysis:
+    """Test suite for the image analysis started during the declaration stage."""
+
+    @pytest.fixture(autouse=True)
+    def vlm(self, mock_vlm):
+        from assurhabitat_agents.tools.check_conformity_tool import clear_image_analyses
+
+        clear_image_analyses()
+        with patch("assurhabitat_agents.tools.check_conformity_tool.vlm_inference", side_effect=mock_vlm):
+            yield mock_vlm
+        clear_image_analyses()
+
+    def test_precomputed_analysis_is_reused(self, vlm):
+        from concurrent.futures import ThreadPoolExecutor
+        from assurhabitat_agents.tools.check_conformity_tool import start_image_analysis
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start_image_analysis(executor, ["data/FireDamage_7.png", "other.png"])
+            result = check_conformity(
+                image_paths=["data/FireDamage_7.png"],
+                parsed_declaration={"sinistre_type": "incendie_explosion"}
+            )
+
+        assert "fire" in result["detected_damage_types"]
+        assert vlm.call_count == 1
+        assert vlm.last_image_path == "data/FireDamage_7.png"
+        # the prompt does not depend on the declaration
+        assert "incendie_explosion" not in vlm.last_prompt
+
+    def test_analysis_is_consumed_once(self, vlm):
+        from concurrent.futures import ThreadPoolExecutor
+        from assurhabitat_agents.tools.check_conformity_tool import start_image_analysis
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start_image_analysis(executor, ["water_1.png"])
+            start_image_analysis(executor, ["water_1.png"])
+            for _ in range(2):
+                check_conformity(image_paths=["water_1.png"], parsed_declaration={"sinistre_type": "degats_des_eaux"})
+
+        # one speculative call, then a direct one for the second claim
+        assert vlm.call_count == 2
+
+    def test_failed_speculation_falls_back_to_vlm(self, vlm):
+        from concurrent.futures import Future
+        from assurhabitat_agents.tools.check_conformity_tool import start_image_analysis
+
+        class FailingExecutor:
+            def submit(self, fn, *args):
+                future = Future()
+                future.set_exception(RuntimeError("CUDA error"))
+                return future
+
+        start_image_analysis(FailingExecutor(), ["fire.png"])
+        result = check_conformity(image_paths=["fire.png"], parsed_declaration={"sinistre_type": "incendie_explosion"})
+
+        assert "fire" in result["detected_damage_types"]
+        assert vlm.call_count == 1
+
+    def test_replaced_photo_is_not_served_the_previous_analysis(self, vlm, tmp_path):
+        import os
+        from concurrent.futures import ThreadPoolExecutor
+        from assurhabitat_agents.tools.check_conformity_tool import start_image_analysis
+
+        photo = tmp_path / "upload.png"
+        photo.write_bytes(b"first claim")
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            start_image_analysis(executor, [str(photo)])
+            executor.shutdown(wait=True)
+        # another claim uploads a different photo under the same name
+        photo.write_bytes(b"second claim, other photo")
+        os.utime(photo, ns=(0, 0))
+        check_conformity(image_paths=[str(photo)], parsed_declaration={"sinistre_type": "incendie_explosion"})
+
+        assert vlm.call_count == 2
+
+    def test_discarded_analysis_is_cancelled(self, vlm):
+        from concurrent.futures import Future
+        from assurhabitat_agents.tools.check_conformity_tool import discard_image_analysis, start_image_analysis
+
+        pending = Future()
+
+        class PendingExecutor:
+            def submit(self, fn, *args):
+                return pending
+
+        start_image_analysis(PendingExecutor(), ["fire.png"])
+        discard_image_analysis(["fire.png"])
+        check_conformity(image_paths=["fire.png"], parsed_declaration={"sinistre_type": "incendie_explosion"})
+
+        assert pending.cancelled()
+        assert vlm.call_count == 1
@@ -0,0 +1,64 @@
+"""
+Unit tests for compensation.py
+Tests the batch pricing against the per-claim franchise / plafond rule.
+"""
+import numpy as np
+import pytest
+
+from assurhabitat_agents.tools.compensation import batch_compensation, compute_compensation
+from assurhabitat_agents.utils import get_guarantee_for_type
+
+TYPES = ["degats_des_eaux", "incendie_explosion", "vol_vandalisme"]
+
+
+class TestComputeCompensation:
+    """Tests for the per-claim rule"""
+
+    @pytest.mark.parametrize("cost,franchise,plafond,expected", [
+        (1000, 150, 25000, 850),
+        (100, 150, 25000, 0),
+        (50000, 300, 20000, 20000),
+        (50000, 300, None, 49700),
+    ])
+    def test_rule(self, cost, franchise, plafond, expected):
+        assert compute_compensation(cost, franchise, plafond) == expected
+
+
+class TestBatchCompensation:
+    """Tests for the vectorized pricing"""
+
+    def test_matches_per_claim_rule(self):
+        """Random portfolio priced identically by both paths, including edge values"""
+        rng = np.random.default_rng(0)
+        size = 20_000
+        costs = np.concatenate([rng.uniform(0, 150_000, size), [0.0, 150.0, 150.0 + 1e-9, 25150.0]])
+        types = rng.choice(TYPES, costs.size)
+
+        result = batch_compensation(costs, types)
+
+        expected = []
+        for cost, sinistre_type in zip(costs.tolist(), types.tolist()):
+            guarantee = get_guarantee_for_type(sinistre_type)
+            expected.append(compute_compensation(cost, guarantee.get("franchise", 0), guarantee.get("plafond")))
+        assert np.array_equal(result, np.array(expected, dtype=np.float64))
+
+    def test_explicit_terms_and_no_plafond(self):
+        """What-if terms override the guarantees; None / NaN plafond means no cap"""
+        costs = [1000.0, 60000.0, 60000.0]
+        result = batch_compensation(costs, franchises=[0, 500, 500], plafonds=[None, 30000, np.nan])
+        assert result.tolist() == [1000.0, 30000.0, 59500.0]
+        assert batch_compensation(costs, franchises=100).tolist() == [900.0, 59900.0, 59900.0]
+
+    def test_scalar_override_with_types(self):
+        """A single new franchise re-prices the portfolio, plafonds still from the guarantees"""
+        costs = np.array([1000.0, 200000.0])
+        result = batch_compensation(costs, ["degats_des_eaux", "vol_vandalisme"], franchises=0)
+        assert result.tolist() == [1000.0, get_guarantee_for_type("vol_vandalisme")["plafond"]]
+
+    def test_shape_errors(self):
+        with pytest.raises(ValueError):
+            batch_compensation([1.0, 2.0], franchises=[1.0])
+        with pytest.raises(ValueError):
+            batch_compensation([1.0, 2.0])
+        with pytest.raises(ValueError):
+            batch_compensation([1.0, 2.0], ["incendie_explosion"])
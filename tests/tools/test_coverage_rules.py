@@ -0,0 +1,204 @@
+"""
+Unit tests for coverage_rules.py
+Tests the deterministic guarantee pre-check run before the LLM.
+"""
+from datetime import date
+
+import pytest
+
+from assurhabitat_agents.tools.coverage_rules import (
+    CoverageStats,
+    business_days_between,
+    declaration_deadline,
+    evaluate_coverage,
+    keywords,
+    parse_date,
+)
+
+WATER_GUARANTEE = {
+    "couverture": ["Fuite accidentelle de canalisation", "Débordement d'appareil ménager"],
+    "exclusions": ["Défaut d'entretien connu", "Infiltration lente par négligence"],
+    "plafond": 5000,
+    "franchise": 150,
+}
+THEFT_GUARANTEE = {
+    "couverture": ["Vol avec effraction"],
+    "exclusions": ["Vol sans effraction claire"],
+    "plafond": 8000,
+    "franchise": 300,
+}
+OBLIGATIONS = {"declaration_sinistre_jours_ouvres": 5, "vol_vandalisme_jours_ouvres": 2}
+
+
+def _declaration(description, sinistre_type="degats_des_eaux", confidence=0.95, date_sinistre="2025-01-06"):
+    return {
+        "sinistre_type": sinistre_type,
+        "sinistre_confidence": confidence,
+        "extracted": {"date_sinistre": date_sinistre, "description": description, "biens_impactes": []},
+    }
+
+
+def test_keywords_fold_accents_and_plurals():
+    assert keywords("Dégâts des eaux") == keywords("degat eau")
+    assert "de" not in keywords("Fuite de canalisation")
+
+
+def test_parse_date_formats():
+    assert parse_date("2025-01-05") == date(2025, 1, 5)
+    assert parse_date("05/01/2025") == date(2025, 1, 5)
+    assert parse_date("hier") is None
+    assert parse_date(None) is None
+
+
+def test_business_days_skip_weekends():
+    # Friday 2025-01-03 -> Monday 2025-01-06
+    assert business_days_between(date(2025, 1, 3), date(2025, 1, 6)) == 1
+    assert business_days_between(date(2025, 1, 6), date(2025, 1, 20)) == 10
+    assert business_days_between(date(2025, 1, 6), date(2025, 1, 6)) == 0
+
+
+def test_theft_deadline_uses_obligations():
+    assert declaration_deadline("vol_vandalisme", OBLIGATIONS, 5) == 2
+    assert declaration_deadline("degats_des_eaux", OBLIGATIONS, 3) == 3
+    assert declaration_deadline("degats_des_eaux", OBLIGATIONS, None) == 5
+
+
+def test_clear_covered_case_is_decided():
+    result = evaluate_coverage(
+        _declaration("Fuite d'une canalisation dans la cuisine"),
+        WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is True
+    assert result["confidence"] >= 0.9
+    assert result["late_declaration"] is False
+
+
+def test_full_exclusion_match_is_not_covered():
+    result = evaluate_coverage(
+        _declaration("Défaut d'entretien connu du joint de la douche"),
+        WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is False
+    assert result["matched_exclusions"] == ["Défaut d'entretien connu"]
+
+
+@pytest.mark.parametrize("description", [
+    "Fuite après avoir laissé le robinet ouvert, négligence de ma part",
+    "Infiltration lente depuis des mois",
+])
+def test_exclusion_hints_escalate(description):
+    result = evaluate_coverage(
+        _declaration(description), WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7)
+    )
+    assert result["guaranteed"] is None
+
+
+def test_shared_coverage_words_do_not_trigger_exclusion():
+    # "vol" and "effraction" appear in both lists: only "sans"/"claire" distinguish the exclusion
+    result = evaluate_coverage(
+        _declaration("Vol avec effraction, porte forcée", sinistre_type="vol_vandalisme"),
+        THEFT_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is True
+
+
+def test_late_declaration_escalates():
+    result = evaluate_coverage(
+        _declaration("Vol avec effraction", sinistre_type="vol_vandalisme"),
+        THEFT_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 10),
+    )
+    assert result["guaranteed"] is None
+    assert result["late_declaration"] is True
+    assert "jours ouvrés" in result["reasons"][0]
+
+
+def test_low_type_confidence_escalates():
+    result = evaluate_coverage(
+        _declaration("Fuite de canalisation", confidence=0.5),
+        WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is None
+
+
+def test_coverage_stats_bypass_rate():
+    stats = CoverageStats()
+    stats.record("rules", True)
+    stats.record("rules", False)
+    stats.record("llm", True)
+    stats.record("llm", False)
+    report = stats.report()
+    assert report["total"] == 4
+    assert report["escalated_to_llm"] == 2
+    assert report["llm_bypass_rate"] == pytest.approx(0.5)
+
+
+FULL_THEFT_GUARANTEE = {
+    "couverture": ["Vol avec effraction.", "Vol par escalade.", "Vol avec violence ou agression.",
+                   "Détériorations lors d’une tentative de vol."],
+    "exclusions": ["Vol sans effraction claire.", "Vol par négligence (porte laissée ouverte)."],
+}
+
+
+def test_bare_theft_is_not_auto_covered():
+    # naming the sinistre is not coverage evidence, and nothing shows a break-in
+    result = evaluate_coverage(
+        _declaration("Vol de mon vélo dans le jardin", sinistre_type="vol_vandalisme", confidence=0.87),
+        FULL_THEFT_GUARANTEE, OBLIGATIONS, 2, declared_on=date(2025, 1, 7),
+        type_aliases=["vol", "cambriolage", "vandalisme", "theft"],
+    )
+    assert result["guaranteed"] is None
+    assert "Vol sans effraction claire." in result["reasons"][-1]
+
+
+def test_type_name_alone_is_not_coverage():
+    guarantee = {"couverture": ["Incendie accidentel."], "exclusions": []}
+    result = evaluate_coverage(
+        _declaration("Incendie dans le garage", sinistre_type="incendie_explosion"),
+        guarantee, OBLIGATIONS, 5, declared_on=date(2025, 1, 7), type_aliases=["incendie"],
+    )
+    assert result["guaranteed"] is None
+
+
+def test_theft_with_evidence_is_covered():
+    result = evaluate_coverage(
+        _declaration("Vol de bijoux par escalade du balcon", sinistre_type="vol_vandalisme"),
+        FULL_THEFT_GUARANTEE, OBLIGATIONS, 2, declared_on=date(2025, 1, 7),
+        type_aliases=["vol", "cambriolage", "vandalisme", "theft"],
+    )
+    assert result["guaranteed"] is True
+
+
+SHIPPED_WATER_GUARANTEE = {
+    "couverture": ["Fuite, rupture ou débordement de canalisation.",
+                   "Infiltrations accidentelles (toiture, murs, joints).",
+                   "Débordement d’appareils électroménagers.",
+                   "Dégâts causés aux voisins (responsabilité civile)."],
+    "exclusions": ["Manque d’entretien manifeste.", "Infiltration lente connue mais non traitée.",
+                   "Travaux non déclarés ayant endommagé la plomberie."],
+}
+
+
+def test_maintenance_case_sharing_a_generic_word_escalates():
+    # "mur" and "causées" appear in the couverture but prove nothing
+    result = evaluate_coverage(
+        _declaration("Moisissures causées par l'humidité du mur que je n'ai jamais réparé depuis des années"),
+        SHIPPED_WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is None
+
+
+def test_neighbour_mention_alone_escalates():
+    result = evaluate_coverage(
+        _declaration("L'eau a coulé chez le voisin du dessous"),
+        SHIPPED_WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is None
+
+
+def test_specific_coverage_item_is_decided():
+    result = evaluate_coverage(
+        _declaration("Rupture d'une canalisation, fuite sous l'évier"),
+        SHIPPED_WATER_GUARANTEE, OBLIGATIONS, 5, declared_on=date(2025, 1, 7),
+    )
+    assert result["guaranteed"] is True
+    assert "Fuite, rupture ou débordement de canalisation." in result["reasons"][-1]
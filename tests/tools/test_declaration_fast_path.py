@@ -0,0 +1,182 @@
+"""
+Unit tests for declaration_fast_path.py
+Tests the keyword classifier and the French / English extractors.
+"""
+from datetime import date
+
+import pytest
+
+from assurhabitat_agents.tools.declaration_fast_path import (
+    FastPathStats,
+    classify,
+    extract_date,
+    extract_items,
+    extract_lieu,
+    extract_photo_paths,
+    extract_police_report_number,
+    fast_parse,
+    merge_reply,
+)
+
+REFERENCE = date(2025, 1, 10)
+THRESHOLD = 0.85
+
+
+class TestClassifier:
+    """Tests for the keyword classifier"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Fuite d'eau dans la salle de bain, dégâts au plafond", "degats_des_eaux"),
+        ("Un incendie s'est déclaré dans ma cuisine", "incendie_explosion"),
+        ("Cambriolage chez moi, la porte a été forcée", "vol_vandalisme"),
+        ("My washing machine leaked, water everywhere", "degats_des_eaux"),
+        ("Someone stole my laptop after a break in", "vol_vandalisme"),
+    ])
+    def test_clear_declarations(self, text, expected):
+        scores = classify(text)["scores"]
+        assert max(scores, key=scores.get) == expected
+        assert scores[expected] >= THRESHOLD
+
+    @pytest.mark.parametrize("text", [
+        "Il y a eu des dégâts chez moi.",
+        "Il y a eu du feu et de l'eau dans mon salon hier.",
+    ])
+    def test_unclear_declarations_stay_below_threshold(self, text):
+        assert max(classify(text)["scores"].values()) < THRESHOLD
+
+
+class TestExtractors:
+    """Tests for the regex extractors"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Le 5 janvier 2025 vers 14h30", "2025-01-05"),
+        ("sinistre du 03/01/2025", "2025-01-03"),
+        ("survenu le 2025-01-04", "2025-01-04"),
+        ("le 1er janvier", "2025-01-01"),
+        ("on the 1st of january", "2025-01-01"),
+        ("burnt on July 23rd", "2024-07-23"),
+        ("Un incendie s'est déclaré hier soir", "2025-01-09"),
+        ("Cambriolage ce matin", "2025-01-10"),
+        ("Il y a eu des dégâts", None),
+    ])
+    def test_dates(self, text, expected):
+        assert extract_date(text, REFERENCE) == expected
+
+    def test_lieu_and_items(self):
+        text = "Fuite dans la salle de bain, le plafond et les murs sont abîmés"
+        assert extract_lieu(text) == "salle de bain"
+        assert extract_items(text) == ["plafond", "murs"]
+        assert extract_lieu("smoke damaged the walls of my kitchen") == "kitchen"
+        assert extract_lieu("Il y a eu des dégâts") is None
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Numéro de plainte: 12345", "12345"),
+        ("procès-verbal n° PV-2025-0042 déposé", "PV-2025-0042"),
+        ("police report number 98765", "98765"),
+        ("Cambriolage, plainte pas encore déposée", None),
+        ("plainte déposée le 12/10/2026 sous le numéro 45821", "45821"),
+        ("plainte du 2025-01-04, récépissé n° R-77812", "R-77812"),
+        ("plainte au commissariat du 15e arrondissement", None),
+        ("plainte à 14h30 au commissariat", None),
+        ("plainte pour un montant 450€ de bijoux", None),
+        ("plainte déposée, PV 2025A17", "2025A17"),
+    ])
+    def test_police_report_number(self, text, expected):
+        assert extract_police_report_number(text) == expected
+
+
+class TestFastParse:
+    """Tests for the first tier of parse_declaration"""
+
+    def test_confident_declaration_is_parsed_locally(self):
+        result = fast_parse("Cambriolage dans la chambre le 7 janvier, numéro de plainte 12345", THRESHOLD, REFERENCE)
+        assert result["sinistre_type"] == "vol_vandalisme"
+        assert result["parsed_by"] == "fast_path"
+        assert result["candidates"][0]["type"] == "vol_vandalisme"
+        assert result["extracted"] == {
+            "date_sinistre": "2025-01-07",
+            "lieu": "chambre",
+            "description": "Cambriolage dans la chambre le 7 janvier, numéro de plainte 12345",
+            "biens_impactes": [],
+            "police_report_number": "12345",
+        }
+
+    def test_police_report_only_for_theft(self):
+        result = fast_parse("Fuite d'eau dans la cuisine", THRESHOLD, REFERENCE)
+        assert "police_report_number" not in result["extracted"]
+
+    @pytest.mark.parametrize("text", [
+        # negated keyword
+        "Pas de feu, juste une odeur bizarre",
+        # a single keyword reaches 0.87 but is not enough evidence
+        "Mon vol a été annulé, je suis bloqué à l'aéroport",
+    ])
+    def test_weak_evidence_goes_to_llm(self, text):
+        assert fast_parse(text, THRESHOLD, REFERENCE) is None
+
+    def test_negated_keyword_is_not_evidence(self):
+        assert classify("Pas de feu, juste une odeur bizarre")["evidence"]["incendie_explosion"] == []
+        assert classify("Cambriolage sans effraction")["evidence"]["vol_vandalisme"] == ["cambriolag"]
+
+    def test_ambiguous_or_merged_input_goes_to_llm(self):
+        assert fast_parse("Il y a eu des dégâts chez moi", THRESHOLD, REFERENCE) is None
+        merged = '{"sinistre_type": "degats_des_eaux"} Fuite d\'eau, date: 5 janvier'
+        assert fast_parse(merged, THRESHOLD, REFERENCE) is None
+
+    def test_stats(self):
+        stats = FastPathStats()
+        for bypassed in (True, True, True, False):
+            stats.record(bypassed)
+        assert stats.report()["llm_bypass_rate"] == pytest.approx(0.75)
+
+
+PARSED = {
+    "sinistre_type": "vol_vandalisme",
+    "sinistre_confidence": 0.99,
+    "sinistre_explain": "break-in",
+    "candidates": [{"type": "vol_vandalisme", "score": 0.99}],
+    "extracted": {"date_sinistre": None, "lieu": "chambre", "description": "effraction", "biens_impactes": ["porte"]},
+}
+
+
+class TestMergeReply:
+    """Tests for the deterministic merge of AskHuman replies"""
+
+    def test_photo_and_bare_report_number(self):
+        merged = merge_reply(PARSED, ["photo", "police_report_number"], "photo_12.jpg, 445677", REFERENCE)
+        assert merged["extracted"]["photo"] == ["photo_12.jpg"]
+        assert merged["extracted"]["police_report_number"] == "445677"
+        assert merged["extracted"]["lieu"] == "chambre"
+        assert merged["sinistre_type"] == "vol_vandalisme"
+        # the input is not modified
+        assert "photo" not in PARSED["extracted"]
+
+    def test_date_and_report_number_in_a_sentence(self):
+        merged = merge_reply(PARSED, ["date_sinistre", "police_report_number"],
+                             "C'était le 7 janvier, numéro de plainte PV-2025-0042", REFERENCE)
+        assert merged["extracted"]["date_sinistre"] == "2025-01-07"
+        assert merged["extracted"]["police_report_number"] == "PV-2025-0042"
+
+    def test_ordinal_is_not_taken_as_report_number(self):
+        # no introduced identifier: the LLM merge handles the reply
+        assert merge_reply(PARSED, ["police_report_number"], "j'ai porté plainte au commissariat du 15e", REFERENCE) is None
+        assert merge_reply(PARSED, ["police_report_number"], "14h30", REFERENCE) is None
+
+    def test_date_is_not_taken_as_report_number(self):
+        assert merge_reply(PARSED, ["police_report_number"], "03/01/2025", REFERENCE) is None
+        merged = merge_reply(PARSED, ["police_report_number"], "J'ai porté plainte le 12/10/2026, numéro 45821", REFERENCE)
+        assert merged["extracted"]["police_report_number"] == "45821"
+
+    def test_single_open_question_takes_the_reply(self):
+        parsed = dict(PARSED, extracted=dict(PARSED["extracted"], lieu=None))
+        assert merge_reply(parsed, ["lieu"], "dans la véranda", REFERENCE)["extracted"]["lieu"] == "véranda"
+        assert merge_reply(parsed, ["lieu"], "chez ma tante", REFERENCE)["extracted"]["lieu"] == "chez ma tante"
+
+    def test_unextractable_reply_goes_to_llm(self):
+        assert merge_reply(PARSED, ["date_sinistre"], "je ne sais plus trop", REFERENCE) is None
+        assert merge_reply(PARSED, ["date_sinistre", "lieu"], "hier", REFERENCE) is None
+        assert merge_reply(PARSED, ["numero_contrat"], "ABC-123", REFERENCE) is None
+        assert merge_reply(PARSED, [], "hier", REFERENCE) is None
+
+    def test_photo_paths(self):
+        assert extract_photo_paths("voici data/img/porte_1.png et /tmp/a.JPEG") == ["data/img/porte_1.png", "/tmp/a.JPEG"]
@@ -0,0 +1,105 @@
+"""
+Unit tests for verify_completness_tool.py
+Tests the single and batch completeness checks.
+"""
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from assurhabitat_agents.tools.verify_completness_tool import verify_completeness, verify_completeness_batch
+from assurhabitat_agents.utils import get_expected_fields
+from tests.fixtures.sample_cases import get_sample_parsed_declaration
+
+
+def _declaration(sinistre_type, **extracted):
+    return {"sinistre_type": sinistre_type, "extracted": extracted}
+
+
+class TestVerifyCompleteness:
+    """Tests for the single-declaration check"""
+
+    def test_complete(self, capsys):
+        result = verify_completeness(get_sample_parsed_declaration("complete_water"))
+        assert result == {"is_complete": True, "missing": []}
+        assert capsys.readouterr().out == ""
+
+    def test_missing_and_empty_fields(self):
+        result = verify_completeness(_declaration("incendie_explosion", date_sinistre="2025-01-06", lieu="  "))
+        assert result["is_complete"] is False
+        assert result["missing"] == ["lieu", "description"]
+
+
+class TestVerifyCompletenessBatch:
+    """Tests for the bulk mode"""
+
+    def test_matches_single_check(self):
+        declarations = [
+            get_sample_parsed_declaration("complete_water"),
+            _declaration("incendie_explosion", date_sinistre="2025-01-06", description="Four brûlé"),
+            _declaration("vol_vandalisme", lieu="salon", description="", date_sinistre=None),
+            _declaration("degats_des_eaux", date_sinistre="2025-01-05", lieu="cuisine", description="Fuite"),
+        ]
+        result = verify_completeness_batch(declarations)
+
+        assert result["errors"] == {}
+        for i, declaration in enumerate(declarations):
+            single = verify_completeness(declaration)
+            row_missing = [f for f, m in zip(result["fields"], result["missing"][i]) if m]
+            assert sorted(row_missing) == sorted(single["missing"])
+            assert bool(result["is_complete"][i]) is single["is_complete"]
+
+    def test_unknown_type_and_malformed_rows(self):
+        declarations = [
+            _declaration("inconnu", description="x"),
+            "not a declaration",
+            _declaration("incendie_explosion", date_sinistre="2025-01-06", lieu="cuisine", description="Feu"),
+        ]
+        result = verify_completeness_batch(declarations)
+        assert set(result["errors"]) == {0, 1}
+        assert result["is_complete"].tolist() == [False, False, True]
+        assert not result["missing"][:2].any()
+
+    @pytest.mark.parametrize("sinistre_type", [["degats_des_eaux"], 3, None])
+    def test_non_string_type_is_a_malformed_row(self, sinistre_type):
+        declarations = [
+            _declaration(sinistre_type, description="x"),
+            _declaration("incendie_explosion", date_sinistre="2025-01-06", lieu="cuisine", description="Feu"),
+        ]
+        result = verify_completeness_batch(declarations)
+        assert set(result["errors"]) == {0}
+        assert result["is_complete"].tolist() == [False, True]
+
+    def test_failing_type_lookup_only_fails_its_group(self):
+        declarations = [
+            _declaration("degats_des_eaux", description="x"),
+            _declaration("incendie_explosion", date_sinistre="2025-01-06", lieu="cuisine", description="Feu"),
+        ]
+
+        def lookup(sinistre_type):
+            if sinistre_type == "degats_des_eaux":
+                raise AttributeError("broken entry")
+            return get_expected_fields(sinistre_type)
+
+        with patch("assurhabitat_agents.tools.verify_completness_tool.get_expected_fields", side_effect=lookup):
+            result = verify_completeness_batch(declarations)
+        assert result["errors"] == {0: "AttributeError: broken entry"}
+        assert result["is_complete"].tolist() == [False, True]
+
+    def test_large_backlog(self, capsys):
+        """100k declarations are checked in well under a few seconds, without output"""
+        types = ["degats_des_eaux", "incendie_explosion", "vol_vandalisme"]
+        declarations = [
+            _declaration(types[i % 3], date_sinistre="2025-01-05" if i % 7 else None, lieu="cuisine", description="d")
+            for i in range(100_000)
+        ]
+        start = time.perf_counter()
+        result = verify_completeness_batch(declarations)
+        elapsed = time.perf_counter() - start
+
+        assert result["missing"].shape == (100_000, len(result["fields"]))
+        assert int((~result["is_complete"]).sum()) == len(range(0, 100_000, 7))
+        assert np.array_equal(result["missing"][:, result["fields"].index("lieu")], np.zeros(100_000, dtype=bool))
+        assert elapsed < 5
+        assert capsys.readouterr().out == ""